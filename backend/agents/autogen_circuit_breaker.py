@@ -0,0 +1,285 @@
+"""
+AutoGen v0.7 Circuit-Breaking Model Client
+Fails LLM calls fast while the provider is degraded.
+
+The breaker watches a sliding window of recent calls and opens when either
+  - the error rate reaches CIRCUIT_ERROR_RATE, or
+  - the share of calls slower than CIRCUIT_SLOW_CALL_SECONDS reaches CIRCUIT_SLOW_RATE
+(once the window holds at least CIRCUIT_MIN_CALLS). While open, every call
+raises CircuitOpenError immediately, and the orchestrator serves deterministic
+fallbacks instead. After CIRCUIT_OPEN_SECONDS one probe call is let through
+(half-open): success closes the breaker, failure opens it again.
+
+Admission is decided before the rate limiter, but latency only counts the
+time the call spent with the provider: waits in the limiter queue (re-queued
+429s included) are reported by the limiter and left out.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+
+from backend.agents.autogen_rate_limiter import QueueClock, queue_clock
+
+
+CIRCUIT_WINDOW = int(os.environ.get("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.environ.get("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_ERROR_RATE = float(os.environ.get("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get("CIRCUIT_SLOW_CALL_SECONDS", "20"))
+CIRCUIT_SLOW_RATE = float(os.environ.get("CIRCUIT_SLOW_RATE", "0.8"))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Sliding-window breaker with closed -> open -> half-open -> closed states.
+    """
+
+    def __init__(
+        self,
+        name: str = "llm",
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+        slow_rate: float = CIRCUIT_SLOW_RATE,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            name: Label used in logs and stats (e.g. the model name).
+            window: Number of recent calls the rates are computed over.
+            min_calls: Calls needed in the window before the breaker may trip.
+            error_rate: Failure share that opens the breaker.
+            slow_call_seconds: A call at least this slow counts as slow.
+            slow_rate: Slow-call share that opens the breaker.
+            open_seconds: How long the breaker stays open before a probe.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self._clock = clock
+
+        # (failed, slow) per call
+        self._calls: Deque[tuple] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+        self._rejected = 0
+        self._trips = 0
+        self._last_trip_reason: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now (a half-open breaker admits one probe)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self._rejected += 1
+        return False
+
+    def record(self, seconds: float, failed: bool) -> None:
+        """Record the outcome of a call that allow() admitted."""
+        slow = seconds >= self.slow_call_seconds
+        if self._state == HALF_OPEN:
+            self._probing = False
+            if failed or slow:
+                self._trip("probe failed" if failed else f"probe took {seconds:.1f}s")
+            else:
+                self._state = CLOSED
+                self._calls.clear()
+                print(f"✅ Circuit '{self.name}' closed")
+            return
+
+        self._calls.append((failed, slow))
+        if self._state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        errors = sum(1 for f, _ in self._calls if f) / len(self._calls)
+        slows = sum(1 for _, s in self._calls if s) / len(self._calls)
+        if errors >= self.error_rate:
+            self._trip(f"error rate {errors:.0%}")
+        elif slows >= self.slow_rate:
+            self._trip(f"slow-call rate {slows:.0%} (>= {self.slow_call_seconds}s)")
+
+    def release_probe(self) -> None:
+        """A probe ended without an outcome (e.g. it was cancelled); allow another."""
+        if self._state == HALF_OPEN:
+            self._probing = False
+
+    def _trip(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._calls.clear()
+        self._trips += 1
+        self._last_trip_reason = reason
+        print(f"🔌 Circuit '{self.name}' opened: {reason}")
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        calls = list(self._calls)
+        return {
+            "state": state,
+            "window_calls": len(calls),
+            "window_error_rate": round(sum(1 for f, _ in calls if f) / len(calls), 4) if calls else 0.0,
+            "window_slow_rate": round(sum(1 for _, s in calls if s) / len(calls), 4) if calls else 0.0,
+            "trips": self._trips,
+            "rejected": self._rejected,
+            "last_trip_reason": self._last_trip_reason,
+            "retry_in_seconds": round(max(0.0, self._opened_at + self.open_seconds - self._clock()), 2)
+            if state == OPEN else 0.0,
+        }
+
+
+class CircuitBreakingChatCompletionClient(ChatCompletionClient):
+    """
+    ChatCompletionClient decorator that rejects calls while its breaker is open
+    and reports every call's latency and outcome to it.
+    """
+
+    def __init__(self, wrapped: ChatCompletionClient, breaker: CircuitBreaker):
+        self.wrapped = wrapped
+        self.breaker = breaker
+
+    def _admit(self) -> QueueClock:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit '{self.breaker.name}' is open; LLM call skipped.")
+        # Installed for the call below; the limiter reports its queue waits to it
+        clock = QueueClock(parent=queue_clock.get())
+        queue_clock.set(clock)
+        return clock
+
+    def _finish(self, clock: QueueClock, failed: bool) -> None:
+        queue_clock.set(clock.parent)
+        self.breaker.record(clock.active_seconds(), failed=failed)
+
+    def _cancelled(self, clock: QueueClock) -> None:
+        # A call cut off by a hard timeout is a slow call; one cancelled early
+        # (client left, hedge lost) or still queued says nothing about the provider
+        queue_clock.set(clock.parent)
+        elapsed = clock.active_seconds()
+        if not clock.queued and elapsed >= self.breaker.slow_call_seconds:
+            self.breaker.record(elapsed, failed=True)
+        else:
+            self.breaker.release_probe()
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools=[],
+        tool_choice="auto",
+        json_output=None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        clock = self._admit()
+        try:
+            result = await self.wrapped.create(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+            )
+        except asyncio.CancelledError:
+            self._cancelled(clock)
+            raise
+        except Exception:
+            self._finish(clock, failed=True)
+            raise
+        self._finish(clock, failed=False)
+        return result
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools=[],
+        tool_choice="auto",
+        json_output=None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        clock = self._admit()
+        try:
+            async for chunk in self.wrapped.create_stream(
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                json_output=json_output,
+                extra_create_args=extra_create_args,
+                cancellation_token=cancellation_token,
+                **kwargs,
+            ):
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self._cancelled(clock)
+            raise
+        except Exception:
+            self._finish(clock, failed=True)
+            raise
+        self._finish(clock, failed=False)
+
+    async def close(self) -> None:
+        await self.wrapped.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.wrapped.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.wrapped.total_usage()
+
+    def count_tokens(self, messages, *, tools=[]) -> int:
+        return self.wrapped.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages, *, tools=[]) -> int:
+        return self.wrapped.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):
+        return self.wrapped.capabilities
+
+    @property
+    def model_info(self):
+        return self.wrapped.model_info
+
+
+_shared_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Returns the process-wide breaker for one model (created on first use)."""
+    if name not in _shared_breakers:
+        _shared_breakers[name] = CircuitBreaker(name)
+    return _shared_breakers[name]
+
+
+def circuit_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every breaker created so far, keyed by model."""
+    return {name: breaker.stats() for name, breaker in _shared_breakers.items()}
@@ -0,0 +1,453 @@
+"""
+AutoGen v0.7 Rate-Limited Model Client
+Adaptive token-bucket limiter in front of the Groq model client, one per
+model (provider limits are per model), sized from MODEL_RATE_LIMITS.
+
+- Two buckets: requests per minute and (estimated) tokens per minute.
+- Fair queueing: waiters are grouped by evaluation (the `rate_limit_key`
+  context variable) and served round-robin, so one large evaluation or batch
+  cannot starve the others.
+- Adaptive: a 429 halves the refill rate and pauses the limiter for the
+  provider's `retry-after`; every success recovers the rate additively.
+- Queue time is reported to the task's QueueClock (the `queue_clock` context
+  variable), so agent deadlines and the circuit breaker only time the
+  provider.
+"""
+import asyncio
+import inspect
+import os
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, Mapping, Optional, Sequence, Union
+
+import openai
+from autogen_core import CancellationToken
+from autogen_core.models import ChatCompletionClient, CreateResult, LLMMessage, RequestUsage
+
+from backend.llm_config import get_model_rate_limits
+
+
+# Identifies the evaluation a model call belongs to (set by the orchestrator)
+rate_limit_key: ContextVar[str] = ContextVar("rate_limit_key", default="default")
+
+
+class QueueClock:
+    """
+    Time the model calls of one task spent queued in the limiter.
+
+    RateLimitedChatCompletionClient reports every acquire (re-queued 429s
+    included) to the clock in `queue_clock`, which passes it on to its
+    `parent`, so nested callers can each subtract queue time from their own
+    measurements.
+    """
+
+    def __init__(
+        self,
+        parent: Optional["QueueClock"] = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            parent: Clock installed before this one; it sees the same events.
+            clock: Monotonic time source.
+            on_change: Called whenever a call joins the queue or is granted.
+        """
+        self.parent = parent
+        self.on_change = on_change
+        self._clock = clock
+        self._created_at = clock()
+        self._queued_since: Optional[float] = None
+        self._queued_total = 0.0
+
+    @property
+    def queued(self) -> bool:
+        """Whether a call is waiting in the limiter right now."""
+        return self._queued_since is not None
+
+    def queued_seconds(self) -> float:
+        """Total time queued, including a wait still in progress."""
+        total = self._queued_total
+        if self._queued_since is not None:
+            total += self._clock() - self._queued_since
+        return total
+
+    def active_seconds(self) -> float:
+        """Time since the clock was created, queue time excluded."""
+        return self._clock() - self._created_at - self.queued_seconds()
+
+    def enqueued(self) -> None:
+        self._queued_since = self._clock()
+        self._changed()
+        if self.parent is not None:
+            self.parent.enqueued()
+
+    def granted(self) -> None:
+        if self._queued_since is not None:
+            self._queued_total += self._clock() - self._queued_since
+            self._queued_since = None
+        self._changed()
+        if self.parent is not None:
+            self.parent.granted()
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+
+# Queue-time listener of the current task (set by the wrapper and the breaker)
+queue_clock: ContextVar[Optional[QueueClock]] = ContextVar("queue_clock", default=None)
+
+# Defaults of a bare AdaptiveRateLimiter; get_rate_limiter sizes each model's
+# limiter from MODEL_RATE_LIMITS instead. 0 disables a bucket
+DEFAULT_RPM = int(os.environ.get("LLM_RATE_LIMIT_RPM", "30"))
+DEFAULT_TPM = int(os.environ.get("LLM_RATE_LIMIT_TPM", "12000"))
+# Completion tokens assumed per call until the real usage is known
+DEFAULT_COMPLETION_ESTIMATE = int(os.environ.get("LLM_RATE_LIMIT_COMPLETION_ESTIMATE", "1024"))
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, tokens: int, enqueued_at: float):
+        self.future = future
+        self.tokens = tokens
+        self.enqueued_at = enqueued_at
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket limiter with per-key round-robin queueing and AIMD rate control.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_RPM,
+        tokens_per_minute: int = DEFAULT_TPM,
+        burst_seconds: float = 60.0,
+        min_scale: float = 0.1,
+        recovery_step: float = 0.05,
+        default_retry_after: float = 1.0,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget (0 = unlimited).
+            tokens_per_minute: Token budget (0 = unlimited).
+            burst_seconds: Bucket capacity expressed in seconds of refill.
+            min_scale: Floor for the adaptive rate multiplier.
+            recovery_step: Multiplier increase per successful call.
+            default_retry_after: Pause used when a 429 carries no retry-after.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_scale = min_scale
+        self.recovery_step = recovery_step
+        self.default_retry_after = default_retry_after
+        self._clock = clock
+
+        # A bucket must hold at least one request, or nothing is ever granted
+        self._req_capacity = max(1.0, requests_per_minute * burst_seconds / 60.0)
+        self._tok_capacity = tokens_per_minute * burst_seconds / 60.0
+        self._req_level = self._req_capacity
+        self._tok_level = self._tok_capacity
+        self._scale = 1.0
+        self._paused_until = 0.0
+        self._last_refill = clock()
+
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self._granted = 0
+        self._rate_limited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # ── Public API ───────────────────────────────────────────
+
+    async def acquire(self, tokens: int = 0, key: Optional[str] = None) -> float:
+        """
+        Wait for permission to send one request of ~`tokens` tokens.
+
+        Returns:
+            Seconds spent queued.
+        """
+        key = key or rate_limit_key.get()
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), tokens, self._clock())
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._ensure_dispatcher(loop)
+
+        await waiter.future
+        waited = self._clock() - waiter.enqueued_at
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return waited
+
+    def on_success(self, estimated_tokens: int = 0, actual_tokens: Optional[int] = None) -> None:
+        """Recover the rate and settle the token estimate against real usage."""
+        self._scale = min(1.0, self._scale + self.recovery_step)
+        if actual_tokens is not None and self.tokens_per_minute:
+            self._refill()
+            self._tok_level -= actual_tokens - estimated_tokens
+            self._tok_level = max(-self._tok_capacity, min(self._tok_capacity, self._tok_level))
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Back off after a 429: halve the rate, drain the buckets, pause."""
+        self._rate_limited += 1
+        self._scale = max(self.min_scale, self._scale * 0.5)
+        self._refill()
+        self._req_level = min(self._req_level, 0.0)
+        self._tok_level = min(self._tok_level, 0.0)
+        pause = retry_after if retry_after is not None else self.default_retry_after
+        self._paused_until = max(self._paused_until, self._clock() + pause)
+
+    def stats(self) -> Dict[str, Any]:
+        depth_by_key = {k: len(q) for k, q in self._queues.items() if q}
+        return {
+            "queue_depth": sum(depth_by_key.values()),
+            "queue_depth_by_key": depth_by_key,
+            "granted": self._granted,
+            "rate_limited": self._rate_limited,
+            "avg_wait_ms": round(self._total_wait / self._granted * 1000, 2) if self._granted else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+            "total_wait_ms": round(self._total_wait * 1000, 2),
+            "rate_scale": round(self._scale, 4),
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "paused_for_ms": round(max(0.0, self._paused_until - self._clock()) * 1000, 2),
+        }
+
+    # ── Internals ────────────────────────────────────────────
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_minute:
+            rate = self.requests_per_minute / 60.0 * self._scale
+            self._req_level = min(self._req_capacity, self._req_level + elapsed * rate)
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60.0 * self._scale
+            self._tok_level = min(self._tok_capacity, self._tok_level + elapsed * rate)
+
+    def _delay_for(self, tokens: int) -> float:
+        """Seconds until a request of `tokens` fits in both buckets."""
+        self._refill()
+        delay = max(0.0, self._paused_until - self._clock())
+        if self.requests_per_minute and self._req_level < 1.0:
+            rate = self.requests_per_minute / 60.0 * self._scale
+            delay = max(delay, (1.0 - self._req_level) / rate)
+        if self.tokens_per_minute:
+            needed = min(tokens, self._tok_capacity)
+            if self._tok_level < needed:
+                rate = self.tokens_per_minute / 60.0 * self._scale
+                delay = max(delay, (needed - self._tok_level) / rate)
+        return delay
+
+    def _ensure_dispatcher(self, loop) -> None:
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            if not queue:
+                del self._queues[key]
+                continue
+            waiter = queue[0]
+            if waiter.future.done():
+                # Caller was cancelled while queued
+                queue.popleft()
+                continue
+
+            delay = self._delay_for(waiter.tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            queue.popleft()
+            if self.requests_per_minute:
+                self._req_level -= 1.0
+            if self.tokens_per_minute:
+                self._tok_level -= min(waiter.tokens, self._tok_capacity)
+            self._granted += 1
+            waiter.future.set_result(None)
+
+            # Round-robin: this key goes to the back of the line
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read retry-after / retry-after-ms from a provider 429 response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def estimate_tokens(messages: Sequence[LLMMessage], completion_estimate: int = DEFAULT_COMPLETION_ESTIMATE) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) plus expected completion."""
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", "")
+        chars += len(content) if isinstance(content, str) else len(str(content))
+    return chars // 4 + completion_estimate
+
+
+class RateLimitedChatCompletionClient(ChatCompletionClient):
+    """
+    ChatCompletionClient decorator that routes every call through an
+    AdaptiveRateLimiter and transparently re-queues provider 429s.
+    """
+
+    def __init__(
+        self,
+        wrapped: ChatCompletionClient,
+        limiter: AdaptiveRateLimiter,
+        max_rate_limit_retries: int = 3,
+        completion_estimate: int = DEFAULT_COMPLETION_ESTIMATE,
+    ):
+        self.wrapped = wrapped
+        self.limiter = limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.completion_estimate = completion_estimate
+        # Streamed replies only report usage when asked to; without it the
+        # limiter would have to keep the (pessimistic) estimate
+        self._stream_usage = "include_usage" in inspect.signature(wrapped.create_stream).parameters
+
+    async def create(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools=[],
+        tool_choice="auto",
+        json_output=None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> CreateResult:
+        estimate = estimate_tokens(messages, self.completion_estimate)
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self._acquire(estimate)
+            try:
+                result = await self.wrapped.create(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                )
+            except openai.RateLimitError as e:
+                self.limiter.on_rate_limited(_retry_after_seconds(e))
+                if attempt == self.max_rate_limit_retries:
+                    raise
+                continue
+            self.limiter.on_success(estimate, _usage_total(result.usage))
+            return result
+        raise AssertionError("unreachable")
+
+    async def create_stream(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        tools=[],
+        tool_choice="auto",
+        json_output=None,
+        extra_create_args: Mapping[str, Any] = {},
+        cancellation_token: Optional[CancellationToken] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        estimate = estimate_tokens(messages, self.completion_estimate)
+        if self._stream_usage:
+            kwargs.setdefault("include_usage", True)
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self._acquire(estimate)
+            started = False
+            try:
+                async for chunk in self.wrapped.create_stream(
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    json_output=json_output,
+                    extra_create_args=extra_create_args,
+                    cancellation_token=cancellation_token,
+                    **kwargs,
+                ):
+                    started = True
+                    if isinstance(chunk, CreateResult):
+                        self.limiter.on_success(estimate, _usage_total(chunk.usage))
+                    yield chunk
+                return
+            except openai.RateLimitError as e:
+                self.limiter.on_rate_limited(_retry_after_seconds(e))
+                # Only safe to retry before anything reached the caller
+                if started or attempt == self.max_rate_limit_retries:
+                    raise
+
+    async def _acquire(self, estimate: int) -> None:
+        clock = queue_clock.get()
+        if clock is not None:
+            clock.enqueued()
+        try:
+            await self.limiter.acquire(estimate)
+        finally:
+            # Also when cancelled (hedge loser, client gone), or the clock
+            # would count this call as queued forever
+            if clock is not None:
+                clock.granted()
+
+    async def close(self) -> None:
+        await self.wrapped.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self.wrapped.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self.wrapped.total_usage()
+
+    def count_tokens(self, messages, *, tools=[]) -> int:
+        return self.wrapped.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages, *, tools=[]) -> int:
+        return self.wrapped.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):
+        return self.wrapped.capabilities
+
+    @property
+    def model_info(self):
+        return self.wrapped.model_info
+
+
+def _usage_total(usage: Optional[RequestUsage]) -> Optional[int]:
+    if usage is None:
+        return None
+    return (usage.prompt_tokens or 0) + (usage.completion_tokens or 0)
+
+
+_shared_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(model: str) -> AdaptiveRateLimiter:
+    """Returns the process-wide limiter of one model (created on first use)."""
+    if model not in _shared_limiters:
+        _shared_limiters[model] = AdaptiveRateLimiter(**get_model_rate_limits(model))
+    return _shared_limiters[model]
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every limiter created so far, keyed by model."""
+    return {model: limiter.stats() for model, limiter in _shared_limiters.items()}
@@ -1,11 +1,26 @@
 """
 AutoGen v0.7 Agent Registry
 Initializes all 7 specialist evaluation agents + a user proxy.
+Also provides a process-wide AgentRegistry that owns one shared model client
+and hands out agent sets from a bounded pool.
 """
-from typing import Dict
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
 from autogen_agentchat.agents import AssistantAgent, UserProxyAgent
-from backend.agents.autogen_utils import get_model_client, load_system_prompt
+from autogen_core import CancellationToken
+from backend.agents.autogen_circuit_breaker import CircuitBreakingChatCompletionClient, get_circuit_breaker
+from backend.agents.autogen_rate_limiter import RateLimitedChatCompletionClient, get_rate_limiter
+from backend.agents.autogen_utils import build_http_client, get_model_client, load_system_prompt
+from backend.llm_config import DEFAULT_TIER, get_model_tiers
+
 
+# Stream model output token by token (needed for /evaluate-stream deltas;
+# on_messages still returns the complete reply either way)
+MODEL_CLIENT_STREAM = os.environ.get("AGENT_STREAMING", "1") != "0"
 
 # Agent specification: logical name -> prompt file prefix
 AGENT_SPECS = [
@@ -19,13 +34,21 @@ AGENT_SPECS = [
 ]
 
 
-def initialize_agents(model_client=None) -> Dict[str, AssistantAgent]:
+def tier_agent_name(agent_name: str, tier: str) -> str:
+    """Key of an agent's variant on a cheaper model tier, e.g. "evaluator_market@small"."""
+    return agent_name if tier == DEFAULT_TIER else f"{agent_name}@{tier}"
+
+
+def initialize_agents(model_client=None, tier_clients=None) -> Dict[str, AssistantAgent]:
     """
     Factory function that creates all evaluation agents.
 
     Args:
         model_client: Optional pre-configured ChatCompletionClient.
                       If None, creates one from GROQ_API_KEY env var.
+        tier_clients: Optional tier -> ChatCompletionClient for model routing.
+                      Every agent also gets a variant per tier other than
+                      DEFAULT_TIER, keyed by tier_agent_name().
 
     Returns:
         Dict mapping agent name -> AssistantAgent instance.
@@ -44,9 +67,21 @@ def initialize_agents(model_client=None) -> Dict[str, AssistantAgent]:
             model_client=model_client,
             system_message=system_message,
             description=spec["desc"],
+            model_client_stream=MODEL_CLIENT_STREAM,
         )
         agents[spec["name"]] = agent
 
+        for tier, tier_client in (tier_clients or {}).items():
+            if tier == DEFAULT_TIER:
+                continue
+            agents[tier_agent_name(spec["name"], tier)] = AssistantAgent(
+                name=spec["name"],
+                model_client=tier_client,
+                system_message=system_message,
+                description=spec["desc"],
+                model_client_stream=MODEL_CLIENT_STREAM,
+            )
+
     # User proxy — represents the orchestrator / end-user trigger
     agents["user_proxy"] = UserProxyAgent(
         name="user_proxy",
@@ -56,9 +91,197 @@ def initialize_agents(model_client=None) -> Dict[str, AssistantAgent]:
     return agents
 
 
+def clone_agent(agent):
+    """
+    Returns a fresh agent with the same client, prompt and description.
+    Used to send a duplicate (hedged) request without sharing conversation
+    history with the original. Non-AssistantAgent objects are returned as-is.
+    """
+    if not isinstance(agent, AssistantAgent):
+        return agent
+
+    system_message = agent._system_messages[0].content if agent._system_messages else None
+    return AssistantAgent(
+        name=agent.name,
+        model_client=agent._model_client,
+        system_message=system_message,
+        description=agent.description,
+        model_client_stream=agent._model_client_stream,
+    )
+
+
 def get_agent_registry() -> Dict[str, AssistantAgent]:
     """
     Convenience alias for initialize_agents().
     Returns the full registry dictionary.
     """
     return initialize_agents()
+
+
+# Maximum number of agent sets alive at once (one set serves one evaluation)
+DEFAULT_POOL_SIZE = int(os.environ.get("AGENT_POOL_SIZE", "8"))
+
+
+class AgentRegistry:
+    """
+    Process-wide agent registry.
+
+    Builds one keep-alive model client per model tier and reuses them for
+    every agent set.
+    AssistantAgent keeps conversation history in its model context, so a set
+    is checked out by exactly one evaluation at a time and reset on release.
+    """
+
+    def __init__(self, model_client=None, pool_size: int = DEFAULT_POOL_SIZE):
+        """
+        Args:
+            model_client: Optional pre-configured ChatCompletionClient.
+                          If None, creates one backed by a shared httpx pool
+                          and the process-wide limiter of each model.
+            pool_size: Upper bound on concurrently checked-out agent sets.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be >= 1")
+
+        self._owns_client = model_client is None
+        self._http_client = None
+        self.tier_clients: Dict[str, Any] = {}
+        if model_client is None:
+            self._http_client = build_http_client()
+            # SDK retries disabled so 429s reach the limiter, which re-queues them;
+            # the breaker sits outside so an open circuit never waits in the queue
+            self.tier_clients = {
+                tier: CircuitBreakingChatCompletionClient(
+                    RateLimitedChatCompletionClient(
+                        get_model_client(http_client=self._http_client, max_retries=0, model=model),
+                        get_rate_limiter(model),
+                    ),
+                    get_circuit_breaker(model),
+                )
+                for tier, model in get_model_tiers().items()
+            }
+            model_client = self.tier_clients[DEFAULT_TIER]
+
+        self.model_client = model_client
+        self.pool_size = pool_size
+
+        self._idle: List[Dict[str, Any]] = []
+        self._available: Optional[asyncio.Condition] = None
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._discarded = 0
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the registry can be built outside a running loop
+        if self._available is None:
+            self._available = asyncio.Condition()
+        return self._available
+
+    def _build_agent_set(self) -> Dict[str, Any]:
+        self._created += 1
+        return initialize_agents(self.model_client, self.tier_clients)
+
+    async def _checkout(self) -> Dict[str, Any]:
+        if self._closed:
+            raise RuntimeError("AgentRegistry is closed.")
+
+        condition = self._condition()
+        async with condition:
+            if not self._idle and self._created >= self.pool_size:
+                self._waits += 1
+                wait_started = time.perf_counter()
+                await condition.wait_for(
+                    lambda: self._idle or self._created < self.pool_size
+                )
+                self._wait_seconds += time.perf_counter() - wait_started
+
+            agents = self._idle.pop() if self._idle else self._build_agent_set()
+            self._in_use += 1
+            self._checkouts += 1
+            return agents
+
+    async def _release(self, agents: Dict[str, Any]) -> None:
+        healthy = True
+        try:
+            token = CancellationToken()
+            for agent in agents.values():
+                await agent.on_reset(token)
+        except Exception as e:
+            print(f"⚠️ Discarding agent set after failed reset: {e}")
+            healthy = False
+
+        condition = self._condition()
+        async with condition:
+            self._in_use -= 1
+            if healthy and not self._closed:
+                self._idle.append(agents)
+            else:
+                self._created -= 1
+                self._discarded += 1
+            condition.notify()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Check out an agent set for one evaluation.
+
+        Usage:
+            async with registry.acquire() as agents:
+                orchestrator = AutoGenEvaluationOrchestrator(agents=agents)
+        """
+        agents = await self._checkout()
+        try:
+            yield agents
+        finally:
+            await self._release(agents)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilisation counters."""
+        return {
+            "pool_size": self.pool_size,
+            "created": self._created,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "checkouts": self._checkouts,
+            "waits": self._waits,
+            "total_wait_ms": round(self._wait_seconds * 1000, 2),
+            "discarded": self._discarded,
+        }
+
+    async def close(self) -> None:
+        """Drop pooled agents and close the shared model client."""
+        self._closed = True
+        self._idle.clear()
+        if self._owns_client:
+            for client in self.tier_clients.values():
+                await client.close()
+            if self._http_client is not None:
+                await self._http_client.aclose()
+
+
+_shared_registry: Optional[AgentRegistry] = None
+
+
+def get_shared_registry() -> AgentRegistry:
+    """
+    Returns the process-wide AgentRegistry, creating it on first use.
+    Normally created by the FastAPI lifespan; lazy creation covers entry points
+    (e.g. serverless) that never run the lifespan hook.
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = AgentRegistry()
+    return _shared_registry
+
+
+async def close_shared_registry() -> None:
+    """Closes and forgets the process-wide AgentRegistry, if any."""
+    global _shared_registry
+    if _shared_registry is not None:
+        registry, _shared_registry = _shared_registry, None
+        await registry.close()
@@ -3,22 +3,64 @@ AutoGen v0.7 Utility Functions
 Bridges Groq API to AutoGen's ChatCompletionClient interface.
 """
 import os
+from functools import lru_cache
+
+import httpx
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
+from backend.llm_config import GroqConfig
+
+
+# Connection pool limits for the shared keep-alive HTTP client
+HTTP_MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "32"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))
 
-def get_model_client() -> OpenAIChatCompletionClient:
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Returns an httpx.AsyncClient with a bounded keep-alive connection pool.
+    Sharing one instance across requests avoids a new TLS handshake per evaluation.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
+
+
+def get_model_client(
+    http_client: httpx.AsyncClient = None,
+    max_retries: int = None,
+    model: str = None,
+) -> OpenAIChatCompletionClient:
     """
     Returns an OpenAI-compatible ChatCompletionClient configured for Groq.
     AutoGen v0.7 requires a model_client (not llm_config dict).
+
+    Args:
+        http_client: Optional shared httpx.AsyncClient. If None, the OpenAI SDK
+                     creates its own private connection pool.
+        max_retries: Optional override of the OpenAI SDK's built-in retries.
+        model: Groq model name. Defaults to GroqConfig.MODEL_NAME.
     """
     api_key = os.environ.get("GROQ_API_KEY")
     if not api_key:
         raise ValueError("GROQ_API_KEY environment variable is not set.")
 
+    extra = {}
+    if http_client is not None:
+        extra["http_client"] = http_client
+    if max_retries is not None:
+        extra["max_retries"] = max_retries
+
     client = OpenAIChatCompletionClient(
-        model="llama-3.3-70b-versatile",
+        model=model or GroqConfig.MODEL_NAME,
         api_key=api_key,
-        base_url="https://api.groq.com/openai/v1",
+        base_url=GroqConfig.get_base_url(),
         temperature=0.2,     # Low temp for factual analysis
         model_info={
             "vision": False,
@@ -27,14 +69,17 @@ def get_model_client() -> OpenAIChatCompletionClient:
             "structured_output": False,
             "family": "unknown",
         },
+        **extra,
     )
     return client
 
 
+@lru_cache(maxsize=None)
 def load_system_prompt(agent_name: str) -> str:
     """
     Loads the system prompt from backend/prompts/{agent_name}_system.txt.
     Falls back to a generic prompt if the file doesn't exist.
+    Cached per process -- prompt files only change on deploy.
     """
     # this file lives in backend/agents/
     # prompts live in backend/prompts/
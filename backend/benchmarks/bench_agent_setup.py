@@ -0,0 +1,72 @@
+"""
+Benchmark: per-request agent setup cost.
+
+Before: every request calls initialize_agents(), which builds a new model
+client (and HTTP connection pool) and re-reads all prompt files.
+After:  requests check an agent set out of the process-wide AgentRegistry.
+
+Run:
+    GROQ_API_KEY=dummy python -m backend.benchmarks.bench_agent_setup
+No network calls are made -- this measures setup cost only.
+"""
+import asyncio
+import os
+import statistics
+import time
+
+from backend.agents.autogen_registry import AgentRegistry, initialize_agents
+from backend.agents.autogen_utils import load_system_prompt
+
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "200"))
+
+
+def _summarize(label: str, samples_ms):
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{label:<28} mean={statistics.mean(samples_ms):8.3f} ms  "
+        f"p50={statistics.median(samples_ms):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def bench_per_request_init():
+    samples = []
+    for _ in range(ITERATIONS):
+        load_system_prompt.cache_clear()  # old behaviour re-read prompt files
+        started = time.perf_counter()
+        initialize_agents()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def bench_registry_acquire():
+    registry = AgentRegistry(pool_size=4)
+    samples = []
+    try:
+        for _ in range(ITERATIONS):
+            # Includes the reset on release so both sides pay full per-request cost
+            started = time.perf_counter()
+            async with registry.acquire():
+                pass
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        stats = registry.stats()
+        await registry.close()
+    return samples, stats
+
+
+def main():
+    os.environ.setdefault("GROQ_API_KEY", "bench-dummy-key")
+
+    before = bench_per_request_init()
+    after, stats = asyncio.run(bench_registry_acquire())
+
+    print(f"Per-request agent setup ({ITERATIONS} iterations)")
+    _summarize("before: initialize_agents()", before)
+    _summarize("after:  registry.acquire()", after)
+    print(f"speedup (mean): {statistics.mean(before) / max(statistics.mean(after), 1e-9):.0f}x")
+    print(f"pool stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
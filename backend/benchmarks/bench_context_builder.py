@@ -0,0 +1,121 @@
+"""
+Benchmark: building and serialising the advanced agents' contexts.
+
+Before: build_autogen_context deep-copied the base context and every
+upstream output for each of Risk, Longevity and Investor Fit, and each
+context was serialised from scratch.
+After:  the base context and upstream outputs are frozen once per
+evaluation; the three merged contexts share them and reuse their memoised
+JSON fragments.
+
+Run:
+    python -m backend.benchmarks.bench_context_builder
+"""
+import copy
+import json
+import os
+import statistics
+import time
+
+from backend.orchestrator.autogen_context_builder import (
+    build_autogen_context,
+    dumps_context,
+    freeze,
+)
+
+ITERATIONS = int(os.environ.get("BENCH_ITERATIONS", "300"))
+
+ADVANCED_UPSTREAM = {
+    "risk": ("financial", "market", "competition"),
+    "longevity": ("validator", "financial", "market", "competition"),
+    "investor_fit": ("validator", "financial", "market", "competition"),
+}
+
+
+def _payload():
+    """A large submission plus verbose upstream outputs."""
+    paragraph = "Freelancers wait sixty days to get paid by enterprise clients. " * 40
+    base = {
+        "startup_context": {"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                            "description": paragraph[:400]},
+        "financial_input": {"revenue": 50000, "cogs": 10000, "operating_expenses": 60000,
+                            "cash_balance": 400000, "monthly_burn_rate": 20000, "currency": "USD"},
+        "qualitative": {f"field_{i}": paragraph for i in range(14)},
+        "metadata": {"version": "2.0"},
+    }
+    verbose = {
+        "reasoning": paragraph * 2,
+        "items": [{"name": f"item {i}", "description": paragraph[:300]} for i in range(15)],
+        "confidence_score": 0.8,
+        "_meta": {"agent": "x", "started_at": "t0", "completed_at": "t1"},
+    }
+    outputs = {name: copy.deepcopy(verbose) for name in ("validator", "financial", "market", "competition")}
+    return base, outputs
+
+
+def _legacy_build(base_context, additional_outputs):
+    """The previous deepcopy-based implementation, kept for comparison."""
+    merged = copy.deepcopy(base_context)
+    upstream = merged.get("upstream_outputs", {})
+    for key, value in additional_outputs.items():
+        if isinstance(value, dict) and value.get("error"):
+            upstream[key] = {"error": True, "message": value.get("message", "upstream failure")}
+        else:
+            upstream[key] = copy.deepcopy(value)
+    merged["upstream_outputs"] = upstream
+    return merged
+
+
+def _summarize(label: str, samples_ms):
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{label:<34} mean={statistics.mean(samples_ms):8.3f} ms  "
+        f"p50={statistics.median(samples_ms):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def _bench(run):
+    samples = []
+    for _ in range(ITERATIONS):
+        base, outputs = _payload()
+        started = time.perf_counter()
+        run(base, outputs)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def legacy_build_only(base, outputs):
+    for deps in ADVANCED_UPSTREAM.values():
+        _legacy_build(base, {d: outputs[d] for d in deps})
+
+
+def frozen_build_only(base, outputs):
+    base_view = freeze(base)
+    views = {name: freeze(output) for name, output in outputs.items()}
+    for deps in ADVANCED_UPSTREAM.values():
+        build_autogen_context(base_view, {d: views[d] for d in deps})
+
+
+def legacy_build_and_serialise(base, outputs):
+    for deps in ADVANCED_UPSTREAM.values():
+        json.dumps(_legacy_build(base, {d: outputs[d] for d in deps}), indent=2, default=str)
+
+
+def frozen_build_and_serialise(base, outputs):
+    base_view = freeze(base)
+    views = {name: freeze(output) for name, output in outputs.items()}
+    for deps in ADVANCED_UPSTREAM.values():
+        dumps_context(build_autogen_context(base_view, {d: views[d] for d in deps}), indent=2)
+
+
+def main():
+    print(f"Risk + Longevity + Investor Fit contexts per evaluation ({ITERATIONS} iterations)")
+    _summarize("before: deepcopy build", _bench(legacy_build_only))
+    _summarize("after:  frozen views build", _bench(frozen_build_only))
+    _summarize("before: deepcopy build + dumps", _bench(legacy_build_and_serialise))
+    _summarize("after:  frozen build + shared JSON", _bench(frozen_build_and_serialise))
+
+
+if __name__ == "__main__":
+    main()
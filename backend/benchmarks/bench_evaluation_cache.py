@@ -0,0 +1,152 @@
+"""
+Benchmark: repeated reads of stored evaluations, with and without the read cache.
+
+Before: every EvaluationRepository.get_evaluation selected the full row,
+report_json included, from Supabase.
+After:  reads go through EvaluationCache. The file tier is shared by
+--workers repositories, like uvicorn workers on one host.
+
+Reads are spread over --startups startups (Zipf-like: a few are hot) and a
+--save-every fraction of operations saves a new evaluation, which invalidates
+the startup in every worker. The Supabase stand-in's execute() blocks for
+--read-latency seconds and returns a --report-kb report.
+
+Run:
+    python -m backend.benchmarks.bench_evaluation_cache --reads 1000 --startups 50 --workers 4
+No network calls are made.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.load_test import _summary
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_cache import EvaluationCache
+from backend.scoring.evaluation_repository import EvaluationRepository
+
+
+class _SlowSupabase:
+    """Sync PostgREST stand-in: selects block for `latency` seconds and count themselves."""
+
+    def __init__(self, latency: float, report_kb: int):
+        self.latency = latency
+        self.report_json = json.dumps({"agent_results": {"market": {"notes": "x" * report_kb * 1024}}})
+        self.selects = 0
+
+    def table(self, name: str):
+        return SimpleNamespace(select=lambda *args: _Select(self), insert=_Insert)
+
+
+class _Select:
+    def __init__(self, supabase: _SlowSupabase):
+        self.supabase = supabase
+
+    def eq(self, column: str, value: str):
+        self.startup_id = value
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n: int):
+        return self
+
+    def execute(self):
+        self.supabase.selects += 1
+        time.sleep(self.supabase.latency)
+        return SimpleNamespace(data=[{
+            "id": f"eval-{self.startup_id}", "startup_id": self.startup_id,
+            "final_score": 7.0, "report_json": self.supabase.report_json,
+        }])
+
+
+class _Insert:
+    def __init__(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+async def _scenario(cached: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    supabase = _SlowSupabase(args.read_latency, args.report_kb)
+    executor = DBExecutor(max_workers=args.workers)
+    path = os.path.join(tempfile.mkdtemp(), "evaluation_cache.db")
+    caches = [EvaluationCache(sqlite_path=path) if cached else None for _ in range(args.workers)]
+    repositories = [EvaluationRepository(supabase, executor=executor, cache=cache) for cache in caches]
+    weights = [1 / (rank + 1) for rank in range(args.startups)]
+    rng = random.Random(7)
+    read_ms: List[float] = []
+
+    started = time.perf_counter()
+    for _ in range(args.reads):
+        repository = rng.choice(repositories)
+        startup_id = f"s{rng.choices(range(args.startups), weights)[0]}"
+        if rng.random() < args.save_every:
+            await repository.save_evaluation({"startup_id": startup_id, "final_score": 8.0})
+            continue
+        t0 = time.perf_counter()
+        await repository.get_evaluation(startup_id)
+        read_ms.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - started
+
+    stats = [cache.stats() for cache in caches if cache is not None]
+    for cache in caches:
+        if cache is not None:
+            cache.close()
+    executor.shutdown()
+    hits = sum(s["hits"] for s in stats)
+    lookups = hits + sum(s["misses"] for s in stats)
+    return {
+        "wall_seconds": round(wall, 3),
+        "read_ms": _summary(read_ms),
+        "supabase_selects": supabase.selects,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "disk_hits": sum(s["disk_hits"] for s in stats),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "uncached": asyncio.run(_scenario(False, args)),
+        "cached": asyncio.run(_scenario(True, args)),
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+    }
+
+
+def _print(report: Dict[str, Any]) -> None:
+    for label in ("uncached", "cached"):
+        entry = report[label]
+        read = entry["read_ms"]
+        print(f"{label:<9} read p50={read['p50']:7.2f} ms p95={read['p95']:7.2f} ms  "
+              f"selects={entry['supabase_selects']:<5} hit_rate={entry['hit_rate']:<6} "
+              f"disk_hits={entry['disk_hits']:<5} wall={entry['wall_seconds']} s")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reads", type=int, default=1000, help="operations (reads + saves)")
+    parser.add_argument("--startups", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4, help="repositories sharing the file tier")
+    parser.add_argument("--save-every", type=float, default=0.02, help="fraction of operations that save")
+    parser.add_argument("--read-latency", type=float, default=0.02, help="seconds per Supabase select")
+    parser.add_argument("--report-kb", type=int, default=32, help="size of report_json")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: event loop lag of concurrent SSE streams while reports are saved.
+
+Before: EvaluationRepository called supabase-py's synchronous `.execute()`
+inside async methods, so every write held the event loop for a full
+round-trip and all open streams stalled behind it (SUPABASE_IO_THREADS=0
+reproduces this).
+After:  writes run on the bounded DBExecutor thread pool.
+
+Each simulated stream sends an event every --event-interval seconds; the
+benchmark records how late each event goes out while --writes reports are
+saved through a Supabase stand-in whose execute() blocks for --write-latency.
+
+Run:
+    python -m backend.benchmarks.bench_persistence_lag --streams 50 --writes 40
+No network calls are made.
+"""
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.load_test import _LagProbe, _summary
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_repository import EvaluationRepository
+
+
+class _BlockingSupabase:
+    """Sync PostgREST stand-in: execute() blocks its thread for `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def table(self, name: str):
+        def insert(rows):
+            def execute():
+                time.sleep(self.latency)
+                return SimpleNamespace(data=rows if isinstance(rows, list) else [rows])
+            return SimpleNamespace(execute=execute)
+        return SimpleNamespace(insert=insert)
+
+
+async def _stream(events: int, interval: float, late_ms: List[float]) -> None:
+    """One SSE stream: an event is due every `interval` seconds."""
+    due = time.perf_counter()
+    for _ in range(events):
+        due += interval
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        late_ms.append(max(0.0, (time.perf_counter() - due) * 1000))
+
+
+async def _scenario(threads: int, args: argparse.Namespace) -> Dict[str, Any]:
+    executor = DBExecutor(max_workers=threads)
+    repository = EvaluationRepository(_BlockingSupabase(args.write_latency), executor=executor)
+    report = {"startup_id": "bench", "final_score": 7.0, "agent_results": {"market": {"tam": 1}}}
+    late_ms: List[float] = []
+    write_ms: List[float] = []
+    probe = _LagProbe(args.lag_interval)
+    probe_task = asyncio.ensure_future(probe.run())
+
+    async def writer(index: int) -> None:
+        # Spread the writes over the streaming window
+        await asyncio.sleep(index * args.events * args.event_interval / max(1, args.writes))
+        started = time.perf_counter()
+        await repository.save_evaluation(report, user_id=f"user-{index}")
+        write_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_stream(args.events, args.event_interval, late_ms) for _ in range(args.streams)),
+        *(writer(i) for i in range(args.writes)),
+    )
+    wall = time.perf_counter() - started
+    probe.stop()
+    await probe_task
+    executor.shutdown()
+    return {
+        "threads": threads,
+        "wall_seconds": round(wall, 3),
+        "event_late_ms": _summary(late_ms),
+        "event_loop_lag_ms": _summary(probe.samples_ms),
+        "write_ms": _summary(write_ms),
+        "executor": executor.stats(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "blocking": asyncio.run(_scenario(0, args)),
+        "offloaded": asyncio.run(_scenario(args.threads, args)),
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+    }
+
+
+def _print(report: Dict[str, Any]) -> None:
+    for label in ("blocking", "offloaded"):
+        entry = report[label]
+        late, lag, write = entry["event_late_ms"], entry["event_loop_lag_ms"], entry["write_ms"]
+        print(f"{label:<10} threads={entry['threads']:<3} wall={entry['wall_seconds']:6.2f} s")
+        print(f"{'  SSE event delay':<20} p50={late['p50']:8.2f} ms  p99={late['p99']:8.2f} ms  max={late['max']:8.2f} ms")
+        print(f"{'  event loop lag':<20} p50={lag['p50']:8.2f} ms  p99={lag['p99']:8.2f} ms  max={lag['max']:8.2f} ms")
+        print(f"{'  write latency':<20} p50={write['p50']:8.2f} ms  p99={write['p99']:8.2f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--streams", type=int, default=50, help="concurrent SSE streams")
+    parser.add_argument("--events", type=int, default=100, help="events per stream")
+    parser.add_argument("--event-interval", type=float, default=0.02)
+    parser.add_argument("--writes", type=int, default=40)
+    parser.add_argument("--write-latency", type=float, default=0.05,
+                        help="seconds one Supabase round-trip blocks its thread")
+    parser.add_argument("--threads", type=int, default=8, help="DBExecutor threads of the offloaded run")
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
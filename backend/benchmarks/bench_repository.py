@@ -0,0 +1,141 @@
+"""
+Benchmark: bulk insert and query paths of the local SQLite backend against dry-run.
+
+Before: without Supabase, EvaluationRepository ran in dry-run mode. Saves
+returned the record and stored nothing, and reads returned nothing.
+After:  PERSISTENCE_BACKEND=sqlite stores everything in a local WAL file.
+
+The dry-run numbers are the floor: building records with nothing stored.
+The SQLite numbers are what real storage costs on top. Reports carry a
+--report-kb report_json, like stored evaluations.
+
+Run:
+    python -m backend.benchmarks.bench_repository --evaluations 5000 --batch-size 50
+No network calls are made.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from backend.benchmarks.load_test import _summary
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_repository import BaseEvaluationRepository, EvaluationRepository
+from backend.scoring.sqlite_repository import SQLiteEvaluationRepository
+
+
+def _report(index: int, startups: int, report_kb: int) -> Dict[str, Any]:
+    return {
+        "startup_id": f"s{index % startups}",
+        "final_score": round(random.uniform(3, 9), 2),
+        "risk_label": "MODERATE_RISK",
+        "agent_results": {"market": {"notes": "x" * report_kb * 1024}},
+        "usage": {"prompt_tokens": 4000, "completion_tokens": 600, "cost_usd": 0.0012,
+                  "by_agent": {"market": {"prompt_tokens": 4000, "completion_tokens": 600}}},
+    }
+
+
+async def _timed(samples: List[float], coro) -> Any:
+    started = time.perf_counter()
+    result = await coro
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+async def _scenario(repository: BaseEvaluationRepository, args: argparse.Namespace) -> Dict[str, Any]:
+    random.seed(7)
+    batches = [
+        [(_report(i, args.startups, args.report_kb), f"u{i % args.users}")
+         for i in range(start, min(start + args.batch_size, args.evaluations))]
+        for start in range(0, args.evaluations, args.batch_size)
+    ]
+    batch_ms: List[float] = []
+    started = time.perf_counter()
+    for batch in batches:
+        await _timed(batch_ms, repository.save_evaluations(batch))
+    insert_seconds = time.perf_counter() - started
+
+    single_ms: List[float] = []
+    for i in range(args.queries):
+        await _timed(single_ms, repository.save_evaluation(*batches[0][i % len(batches[0])]))
+
+    latest_ms: List[float] = []
+    found = 0
+    for i in range(args.queries):
+        found += bool(await _timed(latest_ms, repository.get_evaluation(f"s{i % args.startups}")))
+
+    since = (datetime.now(timezone.utc) - timedelta(days=6)).date().isoformat()
+    usage_ms: List[float] = []
+    usage_rows = 0
+    for i in range(args.usage_queries):
+        usage_rows += len(await _timed(usage_ms, repository.get_usage_rows(since, f"u{i % args.users}")))
+
+    return {
+        "bulk_insert_rows_per_second": round(args.evaluations / insert_seconds, 1),
+        "bulk_insert_batch_ms": _summary(batch_ms),
+        "single_insert_ms": _summary(single_ms),
+        "get_evaluation_ms": _summary(latest_ms),
+        "get_evaluation_found": found,
+        "usage_query_ms": _summary(usage_ms),
+        "usage_rows_per_query": round(usage_rows / args.usage_queries, 1) if args.usage_queries else 0,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # SQLite calls run on the DBExecutor as in the API; the thread hop is
+    # part of the measured cost
+    executor = DBExecutor(max_workers=4)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    sqlite = SQLiteEvaluationRepository(path, executor=executor)
+    try:
+        report = {
+            "dry_run": asyncio.run(_scenario(EvaluationRepository(None, executor=executor), args)),
+            "sqlite": asyncio.run(_scenario(sqlite, args)),
+        }
+    finally:
+        sqlite.close()
+        executor.shutdown()
+    report["sqlite"]["file_mb"] = round(os.path.getsize(path) / 1e6, 1)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    return report
+
+
+def _print(report: Dict[str, Any]) -> None:
+    for label in ("dry_run", "sqlite"):
+        entry = report[label]
+        print(f"{label:<8} bulk {entry['bulk_insert_rows_per_second']:>9} rows/s "
+              f"(batch p50={entry['bulk_insert_batch_ms']['p50']:6.2f} ms)  "
+              f"single p50={entry['single_insert_ms']['p50']:5.2f} ms  "
+              f"get_evaluation p50={entry['get_evaluation_ms']['p50']:5.2f} ms "
+              f"found={entry['get_evaluation_found']:<4} "
+              f"usage p50={entry['usage_query_ms']['p50']:5.2f} ms "
+              f"({entry['usage_rows_per_query']} rows)")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--evaluations", type=int, default=5000, help="rows bulk inserted")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per save_evaluations call")
+    parser.add_argument("--startups", type=int, default=500)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=500, help="single inserts and get_evaluation calls")
+    parser.add_argument("--usage-queries", type=int, default=50)
+    parser.add_argument("--report-kb", type=int, default=8, help="size of report_json")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark: per-request cost of authenticated Supabase clients.
+
+Before: every request with a bearer token called create_client(url, key)
+and postgrest.auth(token). Each new client built its own HTTP connection
+pool, so every request also opened a new connection.
+Shared transport: create_client per request on one keep-alive pool.
+After:  SupabaseClientPool reuses one client per token on the shared pool.
+
+Requests go to a local PostgREST stand-in over real HTTP. The benchmark
+reports client setup time, request latency and the number of TCP
+connections the server accepted.
+
+Run:
+    python -m backend.benchmarks.bench_supabase_clients --requests 400 --users 20 --concurrency 8
+No network calls leave the machine.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from supabase import ClientOptions, create_client
+
+from backend.benchmarks.load_test import _summary
+from backend.scoring.db_executor import build_supabase_http_client
+from backend.scoring.supabase_clients import SupabaseClientPool
+
+ANON_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.bench"
+
+
+class _PostgrestStandIn(BaseHTTPRequestHandler):
+    """Answers every GET with an empty JSON array over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _PostgrestStandIn)
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+def _scenario(server: _Server, client_for: Callable[[str], Any], args: argparse.Namespace) -> Dict[str, Any]:
+    tokens = [f"user-token-{i}" for i in range(args.users)]
+    setup_ms: List[float] = []
+    request_ms: List[float] = []
+
+    def one(index: int) -> None:
+        started = time.perf_counter()
+        client = client_for(tokens[index % len(tokens)])
+        built = time.perf_counter()
+        client.table("startup_evaluations").select("id").limit(1).execute()
+        setup_ms.append((built - started) * 1000)
+        request_ms.append((time.perf_counter() - built) * 1000)
+
+    server.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - started
+    return {
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(args.requests / wall, 1),
+        "client_setup_ms": _summary(setup_ms),
+        "request_ms": _summary(request_ms),
+        "connections_opened": server.connections,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = _Server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # A fresh keep-alive pool per scenario, so connection counts are comparable
+    transports = {label: build_supabase_http_client() for label in ("shared_transport", "token_pool")}
+
+    def per_request(token: str):
+        client = create_client(server.url, ANON_KEY)
+        client.postgrest.auth(token)
+        return client
+
+    def on_transport(label: str) -> Callable[[str], Any]:
+        def factory(token: str):
+            client = create_client(server.url, ANON_KEY, options=ClientOptions(httpx_client=transports[label]))
+            client.postgrest.auth(token)
+            return client
+        return factory
+
+    token_pool = SupabaseClientPool(on_transport("token_pool"), max_clients=args.pool_size)
+    try:
+        report = {
+            "per_request": _scenario(server, per_request, args),
+            "shared_transport": _scenario(server, on_transport("shared_transport"), args),
+            "token_pool": _scenario(server, token_pool.get, args),
+        }
+    finally:
+        for transport in transports.values():
+            transport.close()
+        server.shutdown()
+        server.server_close()
+    report["token_pool"]["pool"] = token_pool.stats()
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    return report
+
+
+def _print(report: Dict[str, Any]) -> None:
+    for label in ("per_request", "shared_transport", "token_pool"):
+        entry = report[label]
+        setup, request = entry["client_setup_ms"], entry["request_ms"]
+        print(f"{label:<18} setup p50={setup['p50']:8.3f} ms p95={setup['p95']:8.3f} ms  "
+              f"request p50={request['p50']:7.2f} ms p95={request['p95']:7.2f} ms  "
+              f"connections={entry['connections_opened']:<5} {entry['throughput_rps']} req/s")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--users", type=int, default=20, help="distinct bearer tokens")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="threads issuing requests (the API uses SUPABASE_IO_THREADS)")
+    parser.add_argument("--pool-size", type=int, default=256, help="SupabaseClientPool max_clients")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Load test: /evaluate and /evaluate-stream end to end, fully offline.
+
+Starts a FakeLLMServer (OpenAI-compatible, configurable latency / errors /
+429s), points the agents at it through GROQ_BASE_URL, serves backend.main:app
+with uvicorn on a background thread and drives it over real HTTP at a fixed
+concurrency. Persistence runs in dry-run mode (Supabase env is cleared).
+
+Reports throughput, p50/p95/p99 request latency (and time to first event
+for streams), errors, and the server event loop's lag, measured by a probe
+task running on uvicorn's loop.
+
+Run:
+    python -m backend.benchmarks.load_test --requests 200 --concurrency 20 \\
+        --endpoint both --latency lognormal:0.3,0.5 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.testing.fake_llm_server import FakeLLMServer
+
+ENDPOINTS = {"evaluate": "/evaluate", "stream": "/evaluate-stream"}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def _summary(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(statistics.mean(samples_ms), 2) if samples_ms else 0.0,
+        "p50": round(_percentile(samples_ms, 50), 2),
+        "p95": round(_percentile(samples_ms, 95), 2),
+        "p99": round(_percentile(samples_ms, 99), 2),
+        "max": round(max(samples_ms), 2) if samples_ms else 0.0,
+    }
+
+
+def _payload(index: int, cache: str) -> Dict[str, Any]:
+    """A valid request; the index keeps contexts distinct so runs are not coalesced."""
+    return {
+        "startup_context": {
+            "name": f"LoadTest {index}",
+            "industry": "Fintech",
+            "stage": "Seed",
+            "description": f"Invoice financing for freelancers, cohort {index}",
+        },
+        "financial_raw_input": {
+            "period_start": "2025-01-01T00:00:00",
+            "period_end": "2025-12-31T00:00:00",
+            "revenue": 120000 + index,
+            "cogs": 24000,
+            "operating_expenses": 180000,
+            "cash_balance": 600000,
+            "monthly_burn_rate": 7000,
+        },
+        "qualitative": {"problem_description": "Late invoices strain freelancer cash flow"},
+        "metadata": {"source": "load_test"},
+        "cache": cache,
+    }
+
+
+# ── Server side ──────────────────────────────────────────────
+
+class _LagProbe:
+    """Sleeps `interval` on the server loop and records how late it wakes up."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples_ms: List[float] = []
+        self._running = True
+
+    async def run(self) -> None:
+        while self._running:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples_ms.append(max(0.0, (time.perf_counter() - started - self.interval) * 1000))
+
+    def stop(self) -> None:
+        self._running = False
+
+
+class _AppServer:
+    """backend.main:app under uvicorn on its own thread and event loop."""
+
+    def __init__(self, probe: _LagProbe):
+        import uvicorn
+        from backend.main import app
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        )
+        self.probe = probe
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(self.probe.run())
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self) -> None:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.probe.stop()
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+# ── Client side ──────────────────────────────────────────────
+
+async def _evaluate(client: httpx.AsyncClient, body: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await client.post(ENDPOINTS["evaluate"], json=body)
+    elapsed = (time.perf_counter() - started) * 1000
+    return {"ok": response.status_code == 200, "latency_ms": elapsed,
+            "error": None if response.status_code == 200 else f"HTTP {response.status_code}"}
+
+
+async def _evaluate_stream(client: httpx.AsyncClient, body: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    first_event_ms: Optional[float] = None
+    event, error, got_result = None, None, False
+    async with client.stream("POST", ENDPOINTS["stream"], json=body) as response:
+        if response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+                if first_event_ms is None:
+                    first_event_ms = (time.perf_counter() - started) * 1000
+            elif line.startswith("data:") and event == "result":
+                got_result = True
+            elif line.startswith("data:") and event == "error":
+                error = json.loads(line[5:]).get("detail", "error event")
+    elapsed = (time.perf_counter() - started) * 1000
+    return {"ok": got_result and error is None, "latency_ms": elapsed,
+            "first_event_ms": first_event_ms, "error": error if not got_result else None}
+
+
+async def drive(base_url: str, endpoint: str, requests: int, concurrency: int,
+                cache: str, timeout: float) -> Dict[str, Any]:
+    """Send `requests` evaluations with `concurrency` in flight; endpoint 'both' alternates."""
+    kinds = ["evaluate", "stream"] if endpoint == "both" else [endpoint]
+    results: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in kinds}
+    next_index = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        async def worker():
+            for index in next_index:
+                kind = kinds[index % len(kinds)]
+                call = _evaluate if kind == "evaluate" else _evaluate_stream
+                try:
+                    results[kind].append(await call(client, _payload(index, cache)))
+                except httpx.HTTPError as e:
+                    results[kind].append({"ok": False, "latency_ms": None, "error": type(e).__name__})
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    report: Dict[str, Any] = {"wall_seconds": round(wall, 3), "throughput_rps": round(requests / wall, 2)}
+    for kind, rows in results.items():
+        ok = [r for r in rows if r["ok"]]
+        errors: Dict[str, int] = {}
+        for r in rows:
+            if not r["ok"]:
+                errors[r["error"] or "no result"] = errors.get(r["error"] or "no result", 0) + 1
+        entry = {
+            "requests": len(rows),
+            "succeeded": len(ok),
+            "errors": errors,
+            "latency_ms": _summary([r["latency_ms"] for r in ok]),
+        }
+        if kind == "stream":
+            entry["first_event_ms"] = _summary([r["first_event_ms"] for r in ok if r["first_event_ms"] is not None])
+        report[ENDPOINTS[kind]] = entry
+    return report
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    for name in ("NEXT_PUBLIC_SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_ANON_KEY"):
+        os.environ.pop(name, None)   # dry-run persistence
+    os.environ.setdefault("GROQ_API_KEY", "load-test")
+    os.environ.setdefault("JOB_WORKERS", "0")
+    # The client-side limiter defaults to Groq's free tier; lift it unless asked
+    os.environ["LLM_RATE_LIMIT_RPM"] = str(args.client_rpm)
+    os.environ["LLM_RATE_LIMIT_TPM"] = str(args.client_tpm)
+
+    fake = FakeLLMServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        requests_per_window=args.llm_rpm,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    ).start()
+    os.environ["GROQ_BASE_URL"] = fake.base_url
+
+    probe = _LagProbe(args.lag_interval)
+    app_server = _AppServer(probe)
+    app_server.start()
+    try:
+        report = asyncio.run(drive(
+            app_server.base_url, args.endpoint, args.requests, args.concurrency, args.cache, args.timeout
+        ))
+    finally:
+        app_server.stop()
+        fake.stop()
+
+    report["event_loop_lag_ms"] = _summary(probe.samples_ms)
+    report["fake_llm"] = fake.stats()
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    return report
+
+
+def _print(report: Dict[str, Any]) -> None:
+    print(f"wall={report['wall_seconds']} s  throughput={report['throughput_rps']} req/s")
+    for path in ENDPOINTS.values():
+        entry = report.get(path)
+        if not entry:
+            continue
+        lat = entry["latency_ms"]
+        print(f"{path:<18} ok={entry['succeeded']}/{entry['requests']}  "
+              f"p50={lat['p50']:9.1f} ms  p95={lat['p95']:9.1f} ms  p99={lat['p99']:9.1f} ms")
+        if "first_event_ms" in entry:
+            first = entry["first_event_ms"]
+            print(f"{'  first event':<18} p50={first['p50']:9.1f} ms  p95={first['p95']:9.1f} ms")
+        if entry["errors"]:
+            print(f"{'  errors':<18} {entry['errors']}")
+    lag = report["event_loop_lag_ms"]
+    print(f"{'event loop lag':<18} mean={lag['mean']:7.2f} ms  p99={lag['p99']:7.2f} ms  max={lag['max']:7.2f} ms")
+    llm = report["fake_llm"]
+    print(f"{'fake LLM':<18} requests={llm['requests']}  rate_limited={llm['rate_limited']}  errors={llm['errors']}")
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--endpoint", choices=["evaluate", "stream", "both"], default="both")
+    parser.add_argument("--cache", choices=["use", "bypass"], default="bypass",
+                        help="'bypass' makes every request reach the fake LLM")
+    parser.add_argument("--latency", default="uniform:0.05,0.2",
+                        help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA | none")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-rpm", type=int, default=None,
+                        help="fake provider limit per 60 s window (429 beyond it)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--client-rpm", type=int, default=1_000_000,
+                        help="LLM_RATE_LIMIT_RPM of the app (default: effectively unlimited)")
+    parser.add_argument("--client-tpm", type=int, default=1_000_000_000,
+                        help="LLM_RATE_LIMIT_TPM of the app (default: effectively unlimited)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
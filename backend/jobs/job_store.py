@@ -0,0 +1,266 @@
+"""
+Durable Evaluation Job Store
+SQLite-backed queue of evaluation jobs plus per-agent checkpoints.
+
+A job is claimed with a lease; the worker renews it while running. If a
+worker dies, its lease expires and another worker reclaims the job, reusing
+every checkpointed agent output instead of paying for those LLM calls again.
+Checkpoints are dropped once the job completes: the stored report carries
+every agent output.
+
+The methods are blocking SQLite calls; async callers run them on the
+DBExecutor.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_JOBS_PATH = os.path.join(tempfile.gettempdir(), "ideaevaluator_jobs.db")
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class JobStore:
+    """
+    Queue + checkpoint tables in one SQLite file (WAL mode, so several
+    worker processes on the same host can share it).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_JOBS_PATH,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite file path (":memory:" for tests).
+            lease_seconds: How long a claimed job stays owned without a heartbeat.
+            max_attempts: Claims allowed before a job is marked failed.
+            clock: Time source (seconds), injectable for tests.
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evaluation_jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, request_json TEXT NOT NULL,"
+            " result_json TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker_id TEXT, lease_expires_at REAL,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, user_id TEXT)"
+        )
+        # Files written by earlier versions have no owner column
+        columns = [row["name"] for row in self._db.execute("PRAGMA table_info(evaluation_jobs)")]
+        if "user_id" not in columns:
+            self._db.execute("ALTER TABLE evaluation_jobs ADD COLUMN user_id TEXT")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_status"
+            " ON evaluation_jobs(status, created_at)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS evaluation_job_checkpoints ("
+            " job_id TEXT NOT NULL, step TEXT NOT NULL, output_json TEXT NOT NULL,"
+            " created_at REAL NOT NULL, PRIMARY KEY (job_id, step))"
+        )
+
+    # ── Queue ────────────────────────────────────────────────
+
+    def submit(self, request: Dict[str, Any], user_id: Optional[str] = None) -> str:
+        """
+        Enqueue an evaluation request and return its job id.
+
+        Args:
+            request: The evaluation request payload.
+            user_id: Verified user who submitted it (owns the job and its rows).
+        """
+        job_id = str(uuid.uuid4())
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO evaluation_jobs (id, status, request_json, user_id, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request, default=str), user_id, now, now),
+            )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued job, or a running job whose lease expired.
+
+        Returns:
+            {"id", "request", "user_id", "attempts"} or None when there is nothing to do.
+        """
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs that crashed too often are given up on
+                self._db.execute(
+                    "UPDATE evaluation_jobs SET status = ?, error = ?, updated_at = ?"
+                    " WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                    (FAILED, "Worker lease expired too many times.", now,
+                     RUNNING, now, self.max_attempts),
+                )
+                row = self._db.execute(
+                    "SELECT id, request_json, user_id, attempts FROM evaluation_jobs"
+                    " WHERE status = ? OR (status = ? AND lease_expires_at < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return None
+                self._db.execute(
+                    "UPDATE evaluation_jobs SET status = ?, worker_id = ?, lease_expires_at = ?,"
+                    " attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return {
+            "id": row["id"],
+            "request": json.loads(row["request_json"]),
+            "user_id": row["user_id"],
+            "attempts": row["attempts"] + 1,
+        }
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease. Returns False if the job is no longer ours."""
+        now = self._clock()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE evaluation_jobs SET lease_expires_at = ?, updated_at = ?"
+                " WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + self.lease_seconds, now, job_id, worker_id, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Store the result and drop the job's checkpoints (nothing will resume it)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE evaluation_jobs SET status = ?, result_json = ?, error = NULL,"
+                    " lease_expires_at = NULL, updated_at = ? WHERE id = ?",
+                    (COMPLETED, json.dumps(result, default=str), self._clock(), job_id),
+                )
+                self._db.execute("DELETE FROM evaluation_job_checkpoints WHERE job_id = ?", (job_id,))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed, or put it back in the queue if it has attempts left."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE evaluation_jobs SET status = ?, error = ?, worker_id = NULL,"
+                " lease_expires_at = NULL, updated_at = ? WHERE id = ? AND attempts < ?",
+                (QUEUED, error, self._clock(), job_id, self.max_attempts),
+            )
+            if cursor.rowcount == 1:
+                return
+            self._db.execute(
+                "UPDATE evaluation_jobs SET status = ?, error = ?, lease_expires_at = NULL,"
+                " updated_at = ? WHERE id = ?",
+                (FAILED, error, self._clock(), job_id),
+            )
+
+    # ── Checkpoints ──────────────────────────────────────────
+
+    def save_checkpoint(self, job_id: str, step: str, output: Dict[str, Any]) -> None:
+        """Persist one agent's output as soon as it is available."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO evaluation_job_checkpoints (job_id, step, output_json, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (job_id, step, json.dumps(output, default=str), self._clock()),
+            )
+
+    def load_checkpoints(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT step, output_json FROM evaluation_job_checkpoints"
+                " WHERE job_id = ? ORDER BY created_at",
+                (job_id,),
+            ).fetchall()
+        return {row["step"]: json.loads(row["output_json"]) for row in rows}
+
+    # ── Status ───────────────────────────────────────────────
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status, partial agent outputs and (when done) the result."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, result_json, error, attempts, user_id, created_at, updated_at"
+                " FROM evaluation_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row["result_json"]) if row["result_json"] else None
+        if row["status"] == COMPLETED:
+            checkpoints = (result or {}).get("agent_results") or {}
+        else:
+            checkpoints = self.load_checkpoints(job_id)
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "user_id": row["user_id"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "completed_steps": list(checkpoints),
+            "agent_outputs": checkpoints,
+            "result": result,
+            "error": row["error"],
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) AS n FROM evaluation_jobs GROUP BY status"
+            ).fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared_store: Optional[JobStore] = None
+
+
+def get_shared_job_store() -> JobStore:
+    """Returns the process-wide JobStore configured from the environment."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = JobStore(
+            path=os.environ.get("JOBS_SQLITE_PATH") or DEFAULT_JOBS_PATH,
+            lease_seconds=float(os.environ.get("JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)),
+            max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+        )
+    return _shared_store
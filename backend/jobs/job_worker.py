@@ -0,0 +1,164 @@
+"""
+Evaluation Job Workers
+Pulls jobs from the JobStore and runs them with a bounded number of workers.
+
+Jobs are run by standalone workers against the shared SQLite file:
+
+    python -m backend.jobs.job_worker
+
+The API process runs a pool of its own only when JOB_WORKERS is set, so
+background evaluations do not compete with requests by default. Queue
+calls run on the DBExecutor, never on the event loop.
+"""
+import asyncio
+import os
+import socket
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.jobs.job_store import JobStore
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+
+
+DEFAULT_JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+DEFAULT_POLL_INTERVAL = 1.0
+
+# run_job(job, store) -> result dict; raising fails (or requeues) the job
+RunJob = Callable[[Dict[str, Any], JobStore], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    Fixed set of asyncio workers. Each claims a job, keeps its lease alive
+    with a heartbeat while running, then records the result or the error.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run_job: RunJob,
+        concurrency: int = DEFAULT_JOB_WORKERS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        executor: Optional[DBExecutor] = None,
+    ):
+        """
+        Args:
+            store: Queue the workers claim from.
+            run_job: Coroutine that executes one job and returns its result.
+            concurrency: Jobs processed at once by this pool.
+            poll_interval: Seconds between queue polls when idle.
+            executor: Runs the store calls; defaults to the shared DBExecutor.
+        """
+        self.store = store
+        self.run_job = run_job
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.executor = executor
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.ensure_future(self._worker(f"{self._prefix}:{n}"))
+            for n in range(self.concurrency)
+        ]
+        print(f"✅ Job workers started ({self.concurrency})")
+
+    async def stop(self) -> None:
+        """Cancel the workers. Interrupted jobs are picked up again once their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a submit instead of waiting for the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _worker(self, worker_id: str) -> None:
+        while True:
+            job = await self._store(self.store.claim, worker_id)
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process(job, worker_id)
+
+    async def process(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Run one claimed job to completion, heartbeating its lease meanwhile."""
+        self._running += 1
+        run = asyncio.ensure_future(self.run_job(job, self.store))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job["id"], worker_id, run))
+        try:
+            result = await run
+            await self._store(self.store.complete, job["id"], result)
+            self._completed += 1
+            print(f"✅ Job {job['id']} completed (attempt {job['attempts']})")
+        except asyncio.CancelledError:
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise  # the pool is stopping; leave the lease to expire
+            print(f"⚠️ Job {job['id']} lost its lease; another worker owns it now")
+        except Exception as e:
+            await self._store(self.store.fail, job["id"], str(e))
+            self._failed += 1
+            print(f"❌ Job {job['id']} failed (attempt {job['attempts']}): {e}")
+        finally:
+            heartbeat.cancel()
+            run.cancel()
+            self._running -= 1
+
+    async def _heartbeat(self, job_id: str, worker_id: str, run: asyncio.Task) -> None:
+        """Renew the lease; returns (after cancelling `run`) only if the lease was lost."""
+        interval = max(0.1, self.store.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not await self._store(self.store.heartbeat, job_id, worker_id):
+                run.cancel()
+                return
+
+    async def _store(self, fn, *args) -> Any:
+        return await (self.executor or get_shared_db_executor()).run(fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "queue": self.store.stats(),
+        }
+
+
+async def _main() -> None:
+    from backend.jobs.job_store import get_shared_job_store
+    from backend.main import build_outbox_flusher, run_evaluation_job
+
+    pool = JobWorkerPool(get_shared_job_store(), run_evaluation_job)
+    pool.start()
+    # Reports are queued in the persistence outbox; flush them from here too
+    flusher = build_outbox_flusher()
+    if flusher:
+        flusher.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        if flusher:
+            await flusher.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -1,10 +1,13 @@
+import json
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional
 from groq import Groq
 
 class GroqConfig:
     """Centralized configuration for Groq LLM usage."""
     MODEL_NAME = "llama-3.3-70b-versatile"
+    BASE_URL = "https://api.groq.com/openai/v1"
     TEMPERATURE = 0.2
     MAX_TOKENS = 4096
     
@@ -15,6 +18,156 @@ class GroqConfig:
             raise ValueError("GROQ_API_KEY environment variable is not set.")
         return key
 
+    @staticmethod
+    def get_base_url() -> str:
+        """OpenAI-compatible endpoint; GROQ_BASE_URL points agents elsewhere (e.g. a fake server)."""
+        return os.environ.get("GROQ_BASE_URL") or GroqConfig.BASE_URL
+
 def get_groq_client() -> Groq:
     """Returns an authenticated Groq client."""
     return Groq(api_key=GroqConfig.get_api_key())
+
+
+# ── Tiered model routing ─────────────────────────────────────
+
+# Model tiers, cheapest first. The last tier is the one every agent used
+# before routing existed; agents fall back to it when no other tier is built.
+MODEL_TIERS: Dict[str, str] = {
+    "small": "llama-3.1-8b-instant",
+    "large": GroqConfig.MODEL_NAME,
+}
+DEFAULT_TIER = "large"
+
+# Per-agent routing. Tiers are tried in order; a reply escalates to the next
+# tier when its confidence_score is below min_confidence, a required field is
+# missing, or no valid JSON came back. The "default" entry applies to all agents.
+AGENT_MODEL_ROUTING: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "tiers": ["small", "large"],
+        "min_confidence": 0.6,
+        "required_fields": ["confidence_score"],
+    },
+    "evaluator_validator": {
+        "required_fields": [
+            "data_consistency_score", "completeness_score", "suspicion_flags", "confidence_score",
+        ],
+    },
+    "evaluator_financial": {"required_fields": ["metrics", "score", "confidence_score"]},
+    "evaluator_market": {"required_fields": ["tam", "sam", "som", "confidence_score"]},
+    "evaluator_competition": {
+        "required_fields": ["competitor_risk_score", "novelty_score", "confidence_score"],
+    },
+    # Risk and investor fit weigh every upstream output; a wrong answer is costly
+    "evaluator_risk": {"min_confidence": 0.7, "required_fields": ["risks", "score", "confidence_score"]},
+    "evaluator_longevity": {
+        "required_fields": ["survival_probability_3yr", "survival_probability_5yr", "confidence_score"],
+    },
+    "evaluator_investor_fit": {
+        "min_confidence": 0.7,
+        "required_fields": ["recommended_investor_type", "recommended_stage", "confidence_score"],
+    },
+}
+
+
+@lru_cache(maxsize=8)
+def _parse_json_object(raw: str, name: str) -> Dict[str, Any]:
+    value = json.loads(raw)
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be a JSON object.")
+    return value
+
+
+def get_model_tiers() -> Dict[str, str]:
+    """Tier -> model name, with MODEL_TIERS env (JSON) overrides."""
+    tiers = dict(MODEL_TIERS)
+    raw = os.environ.get("MODEL_TIERS")
+    if raw:
+        tiers.update(_parse_json_object(raw, "MODEL_TIERS"))
+    return tiers
+
+
+def get_agent_route(agent_name: str) -> Dict[str, Any]:
+    """
+    Resolve the routing of one agent:
+    AGENT_MODEL_ROUTING["default"] <- AGENT_MODEL_ROUTING[agent] <- AGENT_MODEL_ROUTING env.
+
+    MODEL_ROUTING=0 pins every agent to DEFAULT_TIER.
+
+    Returns:
+        New dict with "tiers", "min_confidence" and "required_fields".
+    """
+    route = dict(AGENT_MODEL_ROUTING["default"])
+    route.update(AGENT_MODEL_ROUTING.get(agent_name, {}))
+
+    raw = os.environ.get("AGENT_MODEL_ROUTING")
+    if raw:
+        overrides = _parse_json_object(raw, "AGENT_MODEL_ROUTING")
+        route.update(overrides.get("default", {}))
+        route.update(overrides.get(agent_name, {}))
+
+    if os.environ.get("MODEL_ROUTING", "1") == "0":
+        route["tiers"] = [DEFAULT_TIER]
+    return route
+
+
+# ── Provider rate limits ─────────────────────────────────────
+
+# Requests and tokens per minute per model (Groq free tier); every model gets
+# its own limiter. Models missing here get the "default" entry; 0 disables a bucket.
+MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "default": {"requests_per_minute": 30, "tokens_per_minute": 12000},
+    "llama-3.3-70b-versatile": {"requests_per_minute": 30, "tokens_per_minute": 12000},
+    "llama-3.1-8b-instant": {"requests_per_minute": 30, "tokens_per_minute": 6000},
+}
+
+
+def get_model_rate_limits(model: Optional[str]) -> Dict[str, int]:
+    """
+    Resolve the rate limits of one model:
+    MODEL_RATE_LIMITS["default"] <- MODEL_RATE_LIMITS[model]
+    <- LLM_RATE_LIMIT_RPM / LLM_RATE_LIMIT_TPM env (all models)
+    <- MODEL_RATE_LIMITS env ("default", then the model).
+
+    Returns:
+        New dict with "requests_per_minute" and "tokens_per_minute".
+    """
+    limits = dict(MODEL_RATE_LIMITS["default"])
+    limits.update(MODEL_RATE_LIMITS.get(model or "", {}))
+    if os.environ.get("LLM_RATE_LIMIT_RPM"):
+        limits["requests_per_minute"] = int(os.environ["LLM_RATE_LIMIT_RPM"])
+    if os.environ.get("LLM_RATE_LIMIT_TPM"):
+        limits["tokens_per_minute"] = int(os.environ["LLM_RATE_LIMIT_TPM"])
+
+    raw = os.environ.get("MODEL_RATE_LIMITS")
+    if raw:
+        overrides = _parse_json_object(raw, "MODEL_RATE_LIMITS")
+        limits.update(overrides.get("default", {}))
+        limits.update(overrides.get(model or "", {}))
+    return limits
+
+
+# ── Token pricing ────────────────────────────────────────────
+
+# USD per million tokens (Groq on-demand list prices). Models missing here
+# are accounted in tokens only (cost 0).
+MODEL_PRICING: Dict[str, Dict[str, float]] = {
+    "llama-3.3-70b-versatile": {"prompt": 0.59, "completion": 0.79},
+    "llama-3.1-8b-instant": {"prompt": 0.05, "completion": 0.08},
+}
+
+
+def get_model_pricing(model: Optional[str]) -> Optional[Dict[str, float]]:
+    """Per-million-token prices of `model`, with MODEL_PRICING env (JSON) overrides."""
+    pricing = dict(MODEL_PRICING)
+    raw = os.environ.get("MODEL_PRICING")
+    if raw:
+        pricing.update(_parse_json_object(raw, "MODEL_PRICING"))
+    return pricing.get(model) if model else None
+
+
+def estimate_cost_usd(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """Cost of one model's token usage in USD (0.0 for unpriced models)."""
+    price = get_model_pricing(model)
+    if not price:
+        return 0.0
+    return (prompt_tokens * price.get("prompt", 0.0) + completion_tokens * price.get("completion", 0.0)) / 1_000_000
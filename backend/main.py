@@ -1,10 +1,13 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Literal, Optional
 import os
 import json
 import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from dotenv import load_dotenv
 
@@ -13,10 +16,90 @@ load_dotenv()  # Load .env file if present
 # Import our backend services
 from backend.scoring.evaluation_service import EvaluationService
 from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
-from backend.agents.autogen_registry import initialize_agents
+from backend.agents.autogen_registry import get_shared_registry, close_shared_registry
+from backend.agents.autogen_rate_limiter import rate_limiter_stats
+from backend.agents.autogen_circuit_breaker import circuit_stats
+from backend import metrics
+from backend.orchestrator.autogen_response_cache import get_shared_response_cache
+from backend.orchestrator.autogen_cancellation import (
+    EvaluationCancelled,
+    get_shared_cancellation_stats,
+    resolve_disconnect_policy,
+)
+from backend.orchestrator.autogen_single_flight import (
+    Flight,
+    IdempotencyConflict,
+    evaluation_key,
+    get_shared_single_flight,
+)
+from backend.orchestrator.autogen_validator_gate import get_shared_gate_stats
+from backend.orchestrator.autogen_usage import (
+    USAGE_RETENTION_DAYS,
+    BudgetExceeded,
+    UsageLedger,
+    add_usage,
+    empty_usage,
+    get_shared_usage_ledger,
+)
+from backend.scoring.evaluation_repository import EvaluationRepository
+from backend.scoring.db_executor import (
+    close_shared_db_executor,
+    get_shared_db_executor,
+    get_shared_supabase_http_client,
+)
+from backend.scoring.supabase_auth import AuthenticatedUser, TokenVerifier
+from backend.scoring.supabase_clients import SupabaseClientPool
+from backend.scoring.evaluation_cache import get_shared_evaluation_cache
+from backend.scoring.sqlite_repository import get_local_repository
+from backend.scoring.persistence_outbox import (
+    OutboxFlusher,
+    PersistenceOutbox,
+    get_persistence_mode,
+    get_shared_outbox,
+    latest_per_key,
+)
+from backend.jobs.job_store import get_shared_job_store
+from backend.jobs.job_worker import JobWorkerPool
 from backend.models import StartupContext, FinancialRawInput  # Pydantic models
 
-app = FastAPI(title="IdeaEvaluator API", version="1.0.0")
+
+# In-process workers for POST /jobs (only with JOB_WORKERS > 0; otherwise standalone workers run them)
+job_pool: Optional[JobWorkerPool] = None
+# Drains the write-behind persistence outbox into Supabase
+outbox_flusher: Optional[OutboxFlusher] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared agent registry once per process and close it on shutdown."""
+    global job_pool, outbox_flusher
+    try:
+        get_shared_registry()
+        print("✅ Agent registry initialized")
+    except Exception as e:
+        # Requests will retry lazily and surface the error per call
+        print(f"⚠️ Agent registry init failed: {e}")
+    job_workers = int(os.environ.get("JOB_WORKERS", "0"))
+    if job_workers > 0:
+        job_pool = JobWorkerPool(get_shared_job_store(), run_evaluation_job, concurrency=job_workers)
+        job_pool.start()
+    else:
+        print("ℹ️ No in-process job workers; run `python -m backend.jobs.job_worker` for POST /jobs")
+    outbox_flusher = build_outbox_flusher()
+    if outbox_flusher:
+        outbox_flusher.start()
+    yield
+    if job_pool:
+        await job_pool.stop()
+        job_pool = None
+    if outbox_flusher:
+        await outbox_flusher.stop()
+        outbox_flusher = None
+    await close_shared_registry()
+    close_shared_db_executor()
+
+
+app = FastAPI(title="IdeaEvaluator API", version="1.0.0", lifespan=lifespan)
 
 # Allow CORS for local dev
 app.add_middleware(
@@ -32,7 +115,13 @@ app.add_middleware(
 # For now, we instantiate them globally or per request
 # Note: EvaluationService requires Supabase client.
 # We'll initialize it inside the endpoint or dependency injection.
-from supabase import create_client, Client
+from supabase import ClientOptions, create_client, Client
+
+
+def _supabase_options() -> ClientOptions:
+    """Every Supabase client shares one keep-alive connection pool."""
+    return ClientOptions(httpx_client=get_shared_supabase_http_client())
+
 
 # Initialize Supabase
 url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
@@ -41,20 +130,213 @@ key = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 supabase: Client = None
 if url and key:
     try:
-        supabase = create_client(url, key)
+        supabase = create_client(url, key, options=_supabase_options())
         print("✅ Supabase client initialized")
     except Exception as e:
         print(f"⚠️ Supabase init failed: {e}")
-else:
+elif get_local_repository() is None:
     print("⚠️  Supabase credentials missing. Persistence will run in dry-run mode.")
 
+# Write-behind rows are flushed with the service-role key, so the outbox
+# never has to store a user's token
+service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+service_supabase: Client = None
+if url and service_key:
+    try:
+        service_supabase = create_client(url, service_key, options=_supabase_options())
+    except Exception as e:
+        print(f"⚠️ Supabase service client init failed: {e}")
+
+if get_local_repository() is not None:
+    print(f"💾 Persistence uses the local SQLite database {get_local_repository().path}")
+
 
 class EvaluationRequest(BaseModel):
     startup_context: Dict[str, Any]
     financial_raw_input: Dict[str, Any]
     qualitative: Dict[str, Any]
     metadata: Dict[str, Any]
-    user_id: str = None  # authenticated user's ID
+    user_id: str = None  # ignored: replaced by the verified user of the bearer token
+    cache: Optional[Literal["use", "bypass"]] = None  # "bypass" forces fresh LLM calls
+    on_disconnect: Optional[Literal["abort", "finish"]] = None  # /evaluate-stream only
+
+
+# ── Request helpers (shared by /evaluate, /evaluate-stream, /evaluate-batch) ──
+
+def _request_token(raw_request: Request) -> Optional[str]:
+    """The user's JWT from the Authorization header, if any."""
+    auth_header = raw_request.headers.get("Authorization")
+    return auth_header.split(" ")[1] if auth_header and "Bearer" in auth_header else None
+
+
+def _user_supabase(token: str):
+    """New Supabase client that sends `token` (built on a pool miss)."""
+    # supabase-py doesn't support cloning with new auth, so build a client
+    # for this user and set the auth header on postgrest
+    user_supabase = create_client(url, key, options=_supabase_options())
+    user_supabase.postgrest.auth(token)
+    print("🔐 Supabase client authenticated with user token")
+    return user_supabase
+
+
+# Authenticated clients are reused per token instead of built per request
+supabase_clients = SupabaseClientPool(_user_supabase)
+
+
+def _supabase_for_token(token: Optional[str]):
+    """
+    Supabase client acting as the token's user so RLS policies apply; the
+    global (anon) client without a token. None when Supabase is not configured.
+    """
+    if token and supabase:
+        return supabase_clients.get(token)
+    return supabase
+
+
+def _request_supabase(raw_request: Request):
+    """Supabase client for this request (see _supabase_for_token)."""
+    return _supabase_for_token(_request_token(raw_request))
+
+
+# Bearer tokens are verified once and remembered until they expire
+token_verifier = TokenVerifier(jwt_secret=os.environ.get("SUPABASE_JWT_SECRET"), supabase_client=supabase)
+
+
+async def _request_user(raw_request: Request) -> Optional[AuthenticatedUser]:
+    """The verified user of the request's bearer token (None if anonymous or invalid)."""
+    return await token_verifier.verify(_request_token(raw_request))
+
+
+def _bind_user(request: EvaluationRequest, user: Optional[AuthenticatedUser]) -> EvaluationRequest:
+    """
+    Replace the body's user_id claim with the verified user (None when
+    anonymous), so budgets, usage and saved rows can't be charged to anyone else.
+    """
+    request.user_id = user.id if user else None
+    return request
+
+
+def _outbox() -> Optional[PersistenceOutbox]:
+    """
+    The write-behind outbox, unless PERSISTENCE_MODE=sync, Supabase or its
+    service-role key (SUPABASE_SERVICE_ROLE_KEY) is not configured, or
+    evaluations are stored locally (PERSISTENCE_BACKEND=sqlite).
+    """
+    if service_supabase is None or get_persistence_mode() != "write_behind" or get_local_repository():
+        return None
+    return get_shared_outbox()
+
+
+def build_outbox_flusher() -> Optional[OutboxFlusher]:
+    """Flusher for this process's outbox (None when writes are not queued)."""
+    outbox = _outbox()
+    if outbox is None:
+        return None
+    return OutboxFlusher(
+        outbox,
+        service_supabase,
+        batch_size=int(os.environ.get("OUTBOX_BATCH_SIZE", "50")),
+        interval=float(os.environ.get("OUTBOX_FLUSH_INTERVAL", "1.0")),
+    )
+
+
+def _evaluation_service(
+    request_supabase, auth_token: Optional[str] = None, user_id: Optional[str] = None
+) -> EvaluationService:
+    """
+    EvaluationService that reads through the evaluation cache and queues its
+    saves when write-behind persistence is on; with PERSISTENCE_BACKEND=sqlite,
+    one that stores evaluations in the local database.
+
+    Only saves of a verified user (`user_id`) are queued: the flusher writes
+    with the service key, so RLS cannot reject them later. Anonymous saves go
+    inline through the request's client.
+    """
+    local = get_local_repository()
+    if local is not None:
+        return EvaluationService(repository=local)
+    if request_supabase is None:
+        return EvaluationService(supabase_client=None)
+    options: Dict[str, Any] = {"auth_token": auth_token, "cache": get_shared_evaluation_cache()}
+    outbox = _outbox() if user_id else None
+    if outbox is not None:
+        options.update(outbox=outbox, owner_id=user_id)
+    return EvaluationService(supabase_client=request_supabase, **options)
+
+
+async def _save_startup_rows(
+    request_supabase, rows, auth_token: Optional[str] = None, user_id: Optional[str] = None
+) -> str:
+    """
+    Upsert rows into `startups` (queued in the outbox when write-behind is on
+    and `user_id` is a verified user, see _evaluation_service).
+
+    Returns:
+        "queued", "saved" or "dry_run".
+    """
+    repository = get_local_repository() or EvaluationRepository(
+        request_supabase, outbox=_outbox() if user_id else None, auth_token=auth_token, owner_id=user_id
+    )
+    return await repository.save_startups(rows)
+
+
+async def _check_budget(user_id: Optional[str], request_supabase=None) -> None:
+    """
+    Enforce the user's daily budget against today's persisted usage (local
+    database, or Supabase via the service key or the caller's client), so a
+    restart or another worker doesn't hand out a fresh budget.
+
+    Raises:
+        BudgetExceeded: the user has used up a daily token/cost budget.
+    """
+    client = service_supabase or request_supabase
+    repository = get_local_repository() or (EvaluationRepository(client) if client else None)
+    await get_shared_usage_ledger().check_persisted_budget(user_id, repository)
+
+
+def _validate_request(request: EvaluationRequest):
+    """Validate basics with Pydantic models (raises on invalid input)."""
+    startup_ctx = StartupContext(**request.startup_context)
+    financial_input = FinancialRawInput(
+        startup_id=startup_ctx.startup_id,
+        **request.financial_raw_input
+    )
+    return startup_ctx, financial_input
+
+
+def _startup_row(request: EvaluationRequest, startup_ctx: StartupContext) -> Dict[str, Any]:
+    """Row for the `startups` table, so the startup appears on the Discover page."""
+    qualitative = request.qualitative or {}
+    startup_row = {
+        "id": str(startup_ctx.startup_id),
+        "name": startup_ctx.name,
+        "industry": startup_ctx.industry,
+        "stage": startup_ctx.stage,
+        "description": startup_ctx.description,
+        "website": startup_ctx.website,
+        # Map to Discover page columns
+        "tagline": startup_ctx.description,  # tagline = short description
+        "sector": startup_ctx.industry,       # sector mirrors industry
+        "about": qualitative.get("problem_description", startup_ctx.description),
+        "product": qualitative.get("product_description", ""),
+        "trending": False,
+    }
+    # Add founder_id if user_id provided
+    if request.user_id:
+        startup_row["founder_id"] = request.user_id
+    return startup_row
+
+
+def _full_context(
+    request: EvaluationRequest, startup_ctx: StartupContext, financial_input: FinancialRawInput
+) -> Dict[str, Any]:
+    """The full context dictionary expected by agents."""
+    return {
+        "startup_context": startup_ctx.model_dump(mode="json"),
+        "financial_input": financial_input.model_dump(mode="json"),
+        "qualitative": request.qualitative,
+        "metadata": request.metadata
+    }
 
 
 @app.get("/")
@@ -62,7 +344,49 @@ async def root():
     return {"status": "ok", "service": "IdeaEvaluator Backend"}
 
 
-from fastapi import FastAPI, HTTPException, Body, Request
+@app.get("/agents/pool")
+async def agent_pool_stats():
+    """Utilisation of the process-wide agent pool."""
+    return get_shared_registry().stats()
+
+
+@app.get("/rate-limit/stats")
+async def rate_limit_stats():
+    """Queue depth, wait time and adaptive rate of the LLM rate limiter of each model."""
+    return rate_limiter_stats()
+
+
+@app.get("/db/stats")
+async def db_executor_stats():
+    """Supabase calls run off the event loop (threads busy, queue waits, errors) and the per-user client pool."""
+    return {**get_shared_db_executor().stats(), "client_pool": supabase_clients.stats()}
+
+
+@app.get("/outbox/stats")
+async def outbox_stats():
+    """Write-behind persistence: outbox depth, retries, dead rows and flush latency."""
+    executor = get_shared_db_executor()
+    if outbox_flusher is not None:
+        return {"mode": "write_behind", **await executor.run(outbox_flusher.stats)}
+    outbox = _outbox()
+    return {"mode": "write_behind" if outbox else get_persistence_mode(),
+            "running": False, "outbox": await executor.run(outbox.stats) if outbox else None}
+
+
+@app.get("/cache/stats")
+async def response_cache_stats():
+    """Hit/miss counters of the agent response cache."""
+    cache = get_shared_response_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@app.get("/evaluation-cache/stats")
+async def evaluation_cache_stats():
+    """Hit/miss counters of the read cache in front of stored evaluations."""
+    cache = get_shared_evaluation_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
 from backend.extraction_service import ExtractionService
 
 # ... imports ...
@@ -85,6 +409,182 @@ async def extract_info(payload: Dict[str, str] = Body(...)):
         print(f"❌ Extraction service failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _prior_outputs(
+    evaluation_service: EvaluationService,
+    request: EvaluationRequest,
+    startup_ctx: StartupContext,
+) -> Dict[str, Any]:
+    """
+    Outputs of the startup's previous evaluation, for agents whose inputs may
+    be unchanged. Only re-evaluations (client-supplied startup_id) qualify,
+    and "cache": "bypass" forces every agent to run.
+    """
+    if request.cache == "bypass" or not request.startup_context.get("startup_id"):
+        return {}
+    try:
+        return await evaluation_service.load_prior_outputs(str(startup_ctx.startup_id))
+    except Exception as e:
+        print(f"⚠️ Could not load previous evaluation: {e}")
+        return {}
+
+
+async def _run_evaluation(
+    flight: Flight,
+    request: EvaluationRequest,
+    startup_ctx: StartupContext,
+    financial_input: FinancialRawInput,
+    request_supabase,
+    auth_token: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    One evaluation run, shared by every caller coalesced onto `flight`.
+    `user_id` is the verified user of `auth_token`.
+    Progress, token deltas and completed fields are published to the flight
+    so each SSE subscriber sees the same stream.
+    """
+    # ── Persist startup to `startups` table ──────────────────
+    # So the startup appears on the Discover page
+    try:
+        # Upsert: insert or update if name already exists
+        status = await _save_startup_rows(
+            request_supabase, [_startup_row(request, startup_ctx)], auth_token, user_id
+        )
+        if status != "dry_run":
+            print(f"✅ Startup '{startup_ctx.name}' {status} for the startups table")
+    except Exception as e:
+        print(f"⚠️ Failed to save startup to startups table: {e}")
+        # Non-fatal: continue with evaluation even if this fails
+
+    async def on_progress(step: str, status: str):
+        flight.publish({"step": step, "status": status})
+
+    async def on_delta(step: str, delta: Dict[str, Any]):
+        agent = f"evaluator_{step}"
+        flight.publish({
+            "event": "delta", "step": step, "agent": agent,
+            "attempt": delta["attempt"], "text": delta["text"],
+        })
+        for field, value in delta["fields"].items():
+            flight.publish({
+                "event": "field", "step": step, "agent": agent,
+                "field": field, "value": value,
+            })
+
+    evaluation_service = _evaluation_service(request_supabase, auth_token, user_id)
+    prior_outputs = await _prior_outputs(evaluation_service, request, startup_ctx)
+
+    # Run Orchestration (Layer 5) on a pooled agent set
+    print(f"🚀 Starting evaluation for: {startup_ctx.name}")
+    async with get_shared_registry().acquire() as agents:
+        orchestrator = AutoGenEvaluationOrchestrator(
+            agents=agents, cache=get_shared_response_cache()
+        )
+        orchestration_result = await orchestrator.run_full_evaluation(
+            startup_context=_full_context(request, startup_ctx, financial_input),
+            progress_callback=on_progress,
+            cache_mode=request.cache,
+            cancellation_token=flight.cancellation_token,
+            delta_callback=on_delta,
+            prior_outputs=prior_outputs,
+        )
+
+    if flight.cancellation_token.is_cancelled():
+        # Every client is gone: skip scoring and persistence
+        cancellation = orchestration_result["_meta"]["cancellation"]
+        get_shared_cancellation_stats().record_cancelled_run(cancellation)
+        print(f"🛑 Evaluation for '{startup_ctx.name}' aborted: "
+              f"{len(cancellation['skipped'])} LLM calls skipped, "
+              f"{len(cancellation['interrupted'])} interrupted")
+        raise EvaluationCancelled("Evaluation cancelled: client disconnected.")
+
+    if "error" in orchestration_result:
+        raise RuntimeError(orchestration_result["error"])
+
+    reuse = orchestration_result["_meta"]["reuse"]
+    if reuse["reused"]:
+        print(f"♻️ Reused {reuse['reused']} from the previous evaluation; "
+              f"recomputed {reuse['recomputed']}")
+
+    if orchestration_result["_meta"]["degraded"]:
+        print(f"🔌 LLM circuit open; served fallbacks for {orchestration_result['_meta']['degraded']}")
+
+    gate = orchestration_result["_meta"]["gate"]
+    if gate["passed"] is False:
+        verb = "Skipped" if gate["mode"] == "enforce" else "Gate would skip"
+        print(f"🚧 {verb} {len(gate['skipped'])} agents: {'; '.join(gate['reasons'])}")
+
+    usage = orchestration_result["usage"]
+    print(f"💰 {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens "
+          f"in {usage['llm_calls']} LLM calls (~${usage['cost_usd']:.4f})")
+
+    # Run Post-Processing Pipeline (Layers 6, 7, 8)
+    flight.publish({"step": "scoring", "status": "running"})
+    final_report = await evaluation_service.evaluate(
+        startup_id=str(startup_ctx.startup_id),
+        orchestration_output=orchestration_result,
+        startup_name=startup_ctx.name,
+        user_id=request.user_id
+    )
+    flight.publish({"step": "scoring", "status": "completed"})
+    return final_report
+
+
+async def _join_evaluation(
+    request: EvaluationRequest,
+    raw_request: Request,
+    startup_ctx: StartupContext,
+    financial_input: FinancialRawInput,
+):
+    """
+    Attach to an identical in-flight evaluation or start one.
+    `request.user_id` must already be the verified user (see _bind_user).
+
+    Returns:
+        (flight, None) to wait on, or (None, report) when the request's
+        Idempotency-Key already has a stored report.
+
+    Raises:
+        IdempotencyConflict: the key was used with a different payload.
+        BudgetExceeded: the user has used up a daily token/cost budget.
+    """
+    single_flight = get_shared_single_flight()
+    key = evaluation_key(request.model_dump(mode="json"))
+
+    idempotency_key = raw_request.headers.get("Idempotency-Key")
+    if idempotency_key:
+        # Keys are scoped per user so two accounts can't collide
+        idempotency_key = f"{request.user_id or '-'}:{idempotency_key}"
+        report = await single_flight.replay(idempotency_key, key)
+        if report is not None:
+            print(f"♻️ Idempotency-Key replay for '{startup_ctx.name}'")
+            return None, report
+
+    try:
+        await _check_budget(request.user_id, _request_supabase(raw_request))
+        flight, started = single_flight.start(
+            key,
+            lambda flight: _run_evaluation(
+                flight, request, startup_ctx, financial_input,
+                _request_supabase(raw_request), _request_token(raw_request), request.user_id,
+            ),
+        )
+    except BaseException:
+        # Nothing will complete the key replay() registered; a retry must be able to run
+        if idempotency_key:
+            await single_flight.release(idempotency_key, key)
+        raise
+    if not started:
+        print(f"🔗 Duplicate evaluation for '{startup_ctx.name}' joined the run in flight")
+    return flight, None
+
+
+@app.get("/single-flight/stats")
+async def single_flight_stats():
+    """Evaluations in flight, duplicates coalesced and Idempotency-Key replays."""
+    return await get_shared_single_flight().stats()
+
+
 @app.post("/evaluate")
 async def evaluate_startup(request: EvaluationRequest, raw_request: Request):
     """
@@ -92,106 +592,34 @@ async def evaluate_startup(request: EvaluationRequest, raw_request: Request):
     1. Orchestrate agents (Validator -> Parallel -> Risk -> Longevity -> InvestorFit)
     2. Score & Report (Layer 6-7)
     3. Persist (Layer 8)
+
+    Identical concurrent requests share one run; send an Idempotency-Key
+    header to get the stored report back when retrying.
     """
+    _bind_user(request, await _request_user(raw_request))
     try:
-        # 0. Setup Authenticated Supabase Client
-        # We need to forward the user's JWT to Supabase to pass RLS policies.
-        auth_header = raw_request.headers.get("Authorization")
-        token = auth_header.split(" ")[1] if auth_header and "Bearer" in auth_header else None
-        
-        request_supabase = supabase  # Default to global (anon)
-        if token and supabase:
-            # Create a shallow copy or just auth the existing one?
-            # supabase-py doesn't support easy cloning with new auth.
-            # We'll create a new client instance for this request context if possible,
-            # OR we simply set the auth header on the postgrest client.
-            
-            # Using the client factory is safer
-            request_supabase = create_client(url, key)
-            request_supabase.postgrest.auth(token)
-            print("🔐 Supabase client authenticated with user token")
-
-        # 1. Initialize Orchestrator
-        # ...
-        
-        # ... validation ...
-
         # Validate basics with Pydantic models (fails fast if invalid)
         try:
-            startup_ctx = StartupContext(**request.startup_context)
-            financial_input = FinancialRawInput(
-                startup_id=startup_ctx.startup_id,
-                **request.financial_raw_input
-            )
+            startup_ctx, financial_input = _validate_request(request)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Input validation failed: {str(e)}")
 
-        # ── Persist startup to `startups` table ──────────────────
-        # So the startup appears on the Discover page
-        if request_supabase:
-            try:
-                # ... (rest of logic uses request_supabase instead of supabase)
-                qualitative = request.qualitative or {}
-                startup_row = {
-                    "id": str(startup_ctx.startup_id),
-                    "name": startup_ctx.name,
-                    "industry": startup_ctx.industry,
-                    "stage": startup_ctx.stage,
-                    "description": startup_ctx.description,
-                    "website": startup_ctx.website,
-                    # Map to Discover page columns
-                    "tagline": startup_ctx.description,  # tagline = short description
-                    "sector": startup_ctx.industry,       # sector mirrors industry
-                    "about": qualitative.get("problem_description", startup_ctx.description),
-                    "product": qualitative.get("product_description", ""),
-                    "trending": False,
-                }
-                # Add founder_id if user_id provided
-                if request.user_id:
-                    startup_row["founder_id"] = request.user_id
-                # Upsert: insert or update if name already exists
-                request_supabase.table("startups").upsert(
-                    startup_row, on_conflict="id"
-                ).execute()
-                print(f"✅ Startup '{startup_ctx.name}' saved to startups table")
-            except Exception as e:
-                print(f"⚠️ Failed to save startup to startups table: {e}")
-                # Non-fatal: continue with evaluation even if this fails
-
-        # Initialize agents and orchestrator
-        agents = initialize_agents()
-        orchestrator = AutoGenEvaluationOrchestrator(agents=agents)
-
-        # Construct the full context dictionary expected by agents
-        full_context = {
-            "startup_context": startup_ctx.model_dump(mode="json"),
-            "financial_input": financial_input.model_dump(mode="json"),
-            "qualitative": request.qualitative,
-            "metadata": request.metadata
-        }
-
-        # Run Orchestration (Layer 5)
-        print(f"🚀 Starting evaluation for: {startup_ctx.name}")
-        orchestration_result = await orchestrator.run_full_evaluation(
-            startup_context=full_context
-        )
-
-        if "error" in orchestration_result:
-             raise HTTPException(status_code=500, detail=orchestration_result["error"])
-
-        # Run Post-Processing Pipeline (Layers 6, 7, 8)
-        # Use the authenticated client
-        evaluation_service = EvaluationService(supabase_client=request_supabase)
-
-        final_report = await evaluation_service.evaluate(
-            startup_id=str(startup_ctx.startup_id),
-            orchestration_output=orchestration_result,
-            startup_name=startup_ctx.name,
-            user_id=request.user_id
-        )
+        try:
+            flight, report = await _join_evaluation(request, raw_request, startup_ctx, financial_input)
+        except IdempotencyConflict as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except BudgetExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        if report is not None:
+            return report
 
-        return final_report
+        try:
+            return await flight.result()
+        finally:
+            flight.leave()
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -206,141 +634,155 @@ if __name__ == "__main__":
 from fastapi.responses import StreamingResponse
 import asyncio as _asyncio
 
+# How often an idle stream checks whether its client is still there
+DISCONNECT_POLL_SECONDS = float(os.environ.get("STREAM_DISCONNECT_POLL_SECONDS", "1.0"))
+
+@app.get("/usage")
+async def usage_report(raw_request: Request, user_id: Optional[str] = None, days: int = 7):
+    """
+    Rolling token usage and estimated cost per UTC day, with totals per agent
+    (most expensive first). With user_id, also that user's daily budget and
+    today's spend; without it, a per-user breakdown.
+
+    Callers see their own usage; another user's, or the per-user breakdown,
+    needs the admin role (app_metadata.role). Only when tokens cannot be
+    verified at all (no Supabase, no SUPABASE_JWT_SECRET) is it open.
+
+    Reads the persisted usage columns when evaluations are stored (Supabase
+    or the local database), otherwise the evaluations this process ran.
+    """
+    if token_verifier.enabled:
+        user = await _request_user(raw_request)
+        if user is None:
+            raise HTTPException(status_code=401, detail="A valid bearer token is required.")
+        if not user.is_admin:
+            if user_id not in (None, user.id):
+                raise HTTPException(status_code=403, detail="Only admins can see other users' usage.")
+            user_id = user.id
+    days = max(1, min(days, USAGE_RETENTION_DAYS))
+    request_supabase = _request_supabase(raw_request)
+    repository = get_local_repository() or (EvaluationRepository(request_supabase) if request_supabase else None)
+    if repository is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date().isoformat()
+        rows = await repository.get_usage_rows(since, user_id)
+        ledger, source = UsageLedger.from_rows(rows, retention_days=days), "database"
+    else:
+        ledger, source = get_shared_usage_ledger(), "process"
+    return {"source": source, **ledger.summary(user_id=user_id, days=days)}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Agent, stage, scoring and persistence histograms plus failure/retry/token counters (Prometheus text format)."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/circuit/stats")
+async def circuit_breaker_stats():
+    """State of the LLM circuit breaker of each model (closed, open or half_open)."""
+    return circuit_stats()
+
+
+@app.get("/cancellation/stats")
+async def cancellation_stats():
+    """Client disconnects on /evaluate-stream and the LLM calls they saved."""
+    return get_shared_cancellation_stats().stats()
+
+
+@app.get("/gate/stats")
+async def gate_stats():
+    """Validator gate decisions and the LLM calls they saved (or would save, in shadow mode)."""
+    return get_shared_gate_stats().stats()
+
+
+async def _next_progress(getter: _asyncio.Future, raw_request: Request):
+    """Wait for the next progress item; returns `getter` unresolved if the client left."""
+    while not getter.done():
+        await _asyncio.wait({getter}, timeout=DISCONNECT_POLL_SECONDS)
+        if not getter.done() and await raw_request.is_disconnected():
+            break
+    return getter
+
 
 @app.post("/evaluate-stream")
 async def evaluate_startup_stream(request: EvaluationRequest, raw_request: Request):
     """
     SSE streaming version of /evaluate.
     Streams real-time agent progress events, then the final report.
+
+    While an agent generates, its output is forwarded as `delta` events
+    ({"step", "agent", "attempt", "text"}), and each top-level JSON field is
+    sent as a `field` event ({"step", "agent", "field", "value"}) as soon as
+    its value closes.
+
+    If the client disconnects, the evaluation is aborted (agents in flight
+    are cancelled, pending ones never call the LLM, nothing is persisted)
+    or, with on_disconnect="finish", completed and persisted anyway. A run
+    shared with other (coalesced) callers is never aborted while they wait.
     """
+    disconnect_policy = resolve_disconnect_policy(request.on_disconnect)
+    _bind_user(request, await _request_user(raw_request))
+
     async def event_generator():
+        flight = None
         try:
-            # 0. Setup Authenticated Supabase Client
-            auth_header = raw_request.headers.get("Authorization")
-            token = auth_header.split(" ")[1] if auth_header and "Bearer" in auth_header else None
-
-            request_supabase = supabase
-            if token and supabase:
-                request_supabase = create_client(url, key)
-                request_supabase.postgrest.auth(token)
-
             # Validate input
             try:
-                startup_ctx = StartupContext(**request.startup_context)
-                financial_input = FinancialRawInput(
-                    startup_id=startup_ctx.startup_id,
-                    **request.financial_raw_input
-                )
+                startup_ctx, financial_input = _validate_request(request)
             except Exception as e:
                 yield f"event: error\ndata: {json.dumps({'detail': f'Input validation failed: {str(e)}'})}\n\n"
                 return
 
-            # Persist startup
-            if request_supabase:
-                try:
-                    qualitative = request.qualitative or {}
-                    startup_row = {
-                        "id": str(startup_ctx.startup_id),
-                        "name": startup_ctx.name,
-                        "industry": startup_ctx.industry,
-                        "stage": startup_ctx.stage,
-                        "description": startup_ctx.description,
-                        "website": startup_ctx.website,
-                        "tagline": startup_ctx.description,
-                        "sector": startup_ctx.industry,
-                        "about": qualitative.get("problem_description", startup_ctx.description),
-                        "product": qualitative.get("product_description", ""),
-                        "trending": False,
-                    }
-                    if request.user_id:
-                        startup_row["founder_id"] = request.user_id
-                    request_supabase.table("startups").upsert(
-                        startup_row, on_conflict="id"
-                    ).execute()
-                except Exception as e:
-                    print(f"Warning: Failed to save startup: {e}")
-
-            # Progress callback for SSE
-            async def on_progress(agent_name: str, status: str):
-                data = json.dumps({"step": agent_name, "status": status})
-                yield_str = f"event: progress\ndata: {data}\n\n"
-                progress_events.append(yield_str)
-
-            progress_events = []
-
-            # Initialize agents and orchestrator
-            agents = initialize_agents()
-            orchestrator = AutoGenEvaluationOrchestrator(agents=agents)
-
-            full_context = {
-                "startup_context": startup_ctx.model_dump(mode="json"),
-                "financial_input": financial_input.model_dump(mode="json"),
-                "qualitative": request.qualitative,
-                "metadata": request.metadata
-            }
+            try:
+                flight, report = await _join_evaluation(request, raw_request, startup_ctx, financial_input)
+            except (IdempotencyConflict, BudgetExceeded) as e:
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+                return
+            if report is not None:
+                yield f"event: result\ndata: {json.dumps(report, default=str)}\n\n"
+                return
 
-            # We need a different approach since we can't yield from a nested callback.
-            # Use an asyncio.Queue to bridge the orchestrator callback with the generator.
-            progress_queue = _asyncio.Queue()
-
-            async def queue_progress(agent_name: str, status: str):
-                await progress_queue.put({"step": agent_name, "status": status})
-
-            # Run orchestration in a background task
-            result_holder = {}
-
-            async def run_orchestration():
-                try:
-                    result = await orchestrator.run_full_evaluation(
-                        startup_context=full_context,
-                        progress_callback=queue_progress
-                    )
-
-                    if "error" in result:
-                        result_holder["error"] = result["error"]
-                    else:
-                        # Post-processing
-                        await progress_queue.put({"step": "scoring", "status": "running"})
-                        evaluation_service = EvaluationService(supabase_client=request_supabase)
-                        final_report = await evaluation_service.evaluate(
-                            startup_id=str(startup_ctx.startup_id),
-                            orchestration_output=result,
-                            startup_name=startup_ctx.name,
-                            user_id=request.user_id
-                        )
-                        await progress_queue.put({"step": "scoring", "status": "completed"})
-                        result_holder["report"] = final_report
-                except Exception as e:
-                    import traceback
-                    traceback.print_exc()
-                    result_holder["error"] = str(e)
-                finally:
-                    await progress_queue.put(None)  # Signal completion
-
-            # Start orchestration as background task
-            task = _asyncio.create_task(run_orchestration())
+            # The run publishes to the flight; duplicates replay it from the start
+            events = flight.subscribe()
 
             # Yield progress events as they arrive
             while True:
-                item = await progress_queue.get()
+                getter = await _next_progress(_asyncio.ensure_future(events.get()), raw_request)
+                if not getter.done():
+                    getter.cancel()
+                    return  # client disconnected; the finally block applies the policy
+                item = getter.result()
                 if item is None:
                     break
-                data = json.dumps(item)
-                yield f"event: progress\ndata: {data}\n\n"
-
-            # Wait for task to fully complete
-            await task
+                item = dict(item)
+                event = item.pop("event", "progress")
+                data = json.dumps(item, default=str)
+                yield f"event: {event}\ndata: {data}\n\n"
 
             # Yield final result or error
-            if "error" in result_holder:
-                yield f"event: error\ndata: {json.dumps({'detail': result_holder['error']})}\n\n"
-            elif "report" in result_holder:
-                yield f"event: result\ndata: {json.dumps(result_holder['report'], default=str)}\n\n"
+            try:
+                final_report = await flight.result()
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            else:
+                yield f"event: result\ndata: {json.dumps(final_report, default=str)}\n\n"
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            if flight is not None:
+                remaining = flight.leave()
+                # Still running means the client went away (or the stream was closed).
+                # The run is only aborted once nobody else is waiting on it.
+                if not flight.done:
+                    abort = disconnect_policy == "abort" and remaining == 0
+                    get_shared_cancellation_stats().record_disconnect("abort" if abort else "finish")
+                    print(f"🔌 Client disconnected from /evaluate-stream "
+                          f"(policy: {disconnect_policy}, other callers: {remaining})")
+                    if abort:
+                        flight.cancel()
 
     return StreamingResponse(
         event_generator(),
@@ -351,3 +793,296 @@ async def evaluate_startup_stream(request: EvaluationRequest, raw_request: Reque
             "X-Accel-Buffering": "no",
         }
     )
+
+
+# ── Batch Evaluation Endpoint ──────────────────────────────
+import time
+from backend.orchestrator.autogen_batch_scheduler import get_shared_batch_scheduler
+
+# Reports (and startup rows) are persisted in multi-row writes of this size
+BATCH_WRITE_SIZE = int(os.environ.get("BATCH_WRITE_SIZE", "25"))
+
+
+async def _iter_list(items):
+    for item in items:
+        yield item
+
+
+async def _iter_jsonl(raw_request: Request):
+    """Yield one raw line per startup as the JSONL upload streams in."""
+    buffer = b""
+    async for chunk in raw_request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+@app.post("/evaluate-batch")
+async def evaluate_batch(raw_request: Request):
+    """
+    Evaluate many startups in one call.
+
+    Body: a JSON array of EvaluationRequest objects (or {"items": [...]}), or
+    JSONL / NDJSON (Content-Type application/x-ndjson) with one per line.
+
+    Streams NDJSON: one "result" line per startup as it finishes, a
+    "persisted" line per batched write, and a final "summary" line.
+    All batches share one scheduler (BATCH_MAX_CONCURRENCY evaluations at once).
+    """
+    content_type = raw_request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        # Split into lines while the upload arrives (the streaming response
+        # listens on the same receive channel, so it can't be read later).
+        # Each line is parsed by its own worker, so a bad line fails alone.
+        source = _iter_list([line async for line in _iter_jsonl(raw_request)])
+    else:
+        try:
+            body = await raw_request.json()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+        items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of evaluation requests.")
+        source = _iter_list(items)
+
+    auth_token = _request_token(raw_request)
+    request_supabase = _supabase_for_token(auth_token)
+    user = await token_verifier.verify(auth_token)
+    user_id = user.id if user else None
+    evaluation_service = _evaluation_service(request_supabase, auth_token, user_id)
+    scheduler = get_shared_batch_scheduler()
+
+    async def evaluate_item(index: int, raw_item):
+        payload = json.loads(raw_item) if isinstance(raw_item, (bytes, str)) else raw_item
+        request = _bind_user(EvaluationRequest(**payload), user)
+        try:
+            startup_ctx, financial_input = _validate_request(request)
+        except Exception as e:
+            raise ValueError(f"Input validation failed: {str(e)}")
+        await _check_budget(request.user_id, request_supabase)
+
+        async with get_shared_registry().acquire() as agents:
+            orchestrator = AutoGenEvaluationOrchestrator(
+                agents=agents, cache=get_shared_response_cache()
+            )
+            result = await orchestrator.run_full_evaluation(
+                startup_context=_full_context(request, startup_ctx, financial_input),
+                cache_mode=request.cache,
+            )
+
+        report = evaluation_service.build_report(
+            str(startup_ctx.startup_id), result, startup_name=startup_ctx.name
+        )
+        # Counted now, not at the next flush, so the budget check of the
+        # following items already sees it
+        evaluation_service.usage_ledger.record(request.user_id, result.get("usage"))
+        return request, startup_ctx, report, result.get("usage")
+
+    async def event_generator():
+        started = time.perf_counter()
+        totals = {"total": 0, "completed": 0, "failed": 0, "saved": 0, "queued": 0, "save_failed": 0}
+        usage = empty_usage()
+        pending_writes = []
+
+        async def flush():
+            batch = pending_writes[:]
+            pending_writes.clear()
+            try:
+                # A startup listed twice in one write would make Postgres reject the upsert
+                startup_rows = latest_per_key([row for row, _, _ in batch])
+                await _save_startup_rows(request_supabase, startup_rows, auth_token, user_id)
+            except Exception as e:
+                print(f"⚠️ Failed to save batch startups: {e}")
+            results = await evaluation_service.save_reports(
+                [(report, user_id) for _, report, user_id in batch], record_usage=False
+            )
+            failed = sum(1 for r in results if r.get("error"))
+            queued = sum(1 for r in results if r.get("_queued"))
+            saved = len(results) - failed - queued
+            totals["saved"] += saved
+            totals["queued"] += queued
+            totals["save_failed"] += failed
+            line = {
+                "type": "persisted",
+                "startup_ids": [report["startup_id"] for _, report, _ in batch],
+                "saved": saved,
+                "queued": queued,
+                "failed": failed,
+            }
+            return json.dumps(line) + "\n"
+
+        async for index, outcome in scheduler.map_unordered(source, evaluate_item):
+            totals["total"] += 1
+            if isinstance(outcome, Exception):
+                totals["failed"] += 1
+                line = {"type": "result", "index": index, "status": "failed", "error": str(outcome)}
+                yield json.dumps(line) + "\n"
+                continue
+
+            request, startup_ctx, report, item_usage = outcome
+            totals["completed"] += 1
+            add_usage(usage, item_usage)
+            line = {
+                "type": "result",
+                "index": index,
+                "status": "completed",
+                "startup_id": str(startup_ctx.startup_id),
+                "startup_name": startup_ctx.name,
+                "final_score": report.get("final_score"),
+                "risk_label": report.get("risk_label"),
+                "report": report,
+            }
+            yield json.dumps(line, default=str) + "\n"
+
+            pending_writes.append((_startup_row(request, startup_ctx), report, request.user_id))
+            if len(pending_writes) >= BATCH_WRITE_SIZE:
+                yield await flush()
+
+        if pending_writes:
+            yield await flush()
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "type": "summary",
+            **totals,
+            "usage": usage,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_minute": round(totals["completed"] * 60 / elapsed, 2) if elapsed else 0.0,
+            "scheduler": scheduler.stats(),
+        }
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ── Durable Evaluation Jobs ────────────────────────────────
+from fastapi.responses import JSONResponse
+
+
+async def run_evaluation_job(job: Dict[str, Any], store) -> Dict[str, Any]:
+    """
+    Execute one queued evaluation. Each agent output is checkpointed as it
+    finishes, so a job resumed after a crash only runs the agents it lacks.
+
+    The submitter's JWT is not stored in the queue, so jobs persist with the
+    service-role client (the anonymous one when there is no service key) and
+    own their rows through the verified user stored with the job.
+    """
+    request = EvaluationRequest(**job["request"])
+    # The verified submitter stored with the job, never the payload's claim
+    request.user_id = job.get("user_id")
+    startup_ctx, financial_input = _validate_request(request)
+    job_supabase = service_supabase or supabase
+
+    # Failed and degraded (fallback) agents are re-run; everything else is reused as-is
+    executor = get_shared_db_executor()
+    checkpoints = await executor.run(store.load_checkpoints, job["id"])
+    completed = {
+        step: output for step, output in checkpoints.items()
+        if not output.get("error") and not output.get("degraded")
+    }
+    if completed:
+        print(f"♻️ Job {job['id']} resuming with {len(completed)} checkpointed agents")
+
+    async def checkpoint(step: str, output: Dict[str, Any]):
+        await executor.run(store.save_checkpoint, job["id"], step, output)
+
+    try:
+        await _save_startup_rows(job_supabase, [_startup_row(request, startup_ctx)], user_id=request.user_id)
+    except Exception as e:
+        print(f"⚠️ Failed to save startup to startups table: {e}")
+
+    async with get_shared_registry().acquire() as agents:
+        orchestrator = AutoGenEvaluationOrchestrator(
+            agents=agents, cache=get_shared_response_cache()
+        )
+        orchestration_result = await orchestrator.run_full_evaluation(
+            startup_context=_full_context(request, startup_ctx, financial_input),
+            cache_mode=request.cache,
+            completed_outputs=completed,
+            on_step_complete=checkpoint,
+        )
+
+    if "error" in orchestration_result:
+        raise RuntimeError(orchestration_result["error"])
+
+    evaluation_service = _evaluation_service(job_supabase, user_id=request.user_id)
+    return await evaluation_service.evaluate(
+        startup_id=str(startup_ctx.startup_id),
+        orchestration_output=orchestration_result,
+        startup_name=startup_ctx.name,
+        user_id=request.user_id
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def submit_evaluation_job(request: EvaluationRequest, raw_request: Request):
+    """
+    Queue an evaluation and return immediately with a job id.
+    Poll GET /jobs/{job_id} for status, partial agent outputs and the report.
+    The job stores the verified user id, not the submitter's token.
+    """
+    _bind_user(request, await _request_user(raw_request))
+    try:
+        startup_ctx, _ = _validate_request(request)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Input validation failed: {str(e)}")
+    try:
+        await _check_budget(request.user_id, _request_supabase(raw_request))
+    except BudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    # Pin the startup id so every attempt of this job writes the same startup
+    payload = request.model_dump(mode="json", exclude_none=True)
+    payload["startup_context"] = {
+        **payload["startup_context"], "startup_id": str(startup_ctx.startup_id)
+    }
+    job_id = await get_shared_db_executor().run(get_shared_job_store().submit, payload, request.user_id)
+    if job_pool:
+        job_pool.notify()
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "startup_id": str(startup_ctx.startup_id),
+            "status": "queued",
+            "status_url": f"/jobs/{job_id}",
+        },
+    )
+
+
+@app.get("/jobs/stats")
+async def job_queue_stats():
+    """Queue depth by status plus this process's worker counters."""
+    if job_pool:
+        return await get_shared_db_executor().run(job_pool.stats)
+    return {"workers": 0, "queue": await get_shared_db_executor().run(get_shared_job_store().stats)}
+
+
+@app.get("/jobs/{job_id}")
+async def get_evaluation_job(job_id: str, raw_request: Request):
+    """
+    Job status; agent_outputs fills in as each agent finishes.
+
+    A verified user's job is only returned to that user (or an admin);
+    anyone else gets 404. A job submitted anonymously is readable by whoever
+    holds its id.
+    """
+    job = await get_shared_db_executor().run(get_shared_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["user_id"] and token_verifier.enabled:
+        user = await _request_user(raw_request)
+        if user is None:
+            raise HTTPException(status_code=401, detail="A valid bearer token is required.")
+        if user.id != job["user_id"] and not user.is_admin:
+            raise HTTPException(status_code=404, detail="Job not found")
+    return job
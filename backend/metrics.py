@@ -0,0 +1,291 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+
+A small, dependency-free registry of counters, gauges and histograms. Every
+update is a dict lookup plus a few additions under a lock, so instrumenting
+the hot path costs well under a microsecond. Durations come from the
+monotonic clock (time.perf_counter), never from wall-clock timestamps.
+
+Served by GET /metrics; scrape it with Prometheus or read it by hand.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NAMESPACE = "ideaevaluator"
+
+# Seconds. LLM-bound work spans milliseconds (cache, fallbacks) to minutes
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+# Seconds. CPU-bound steps (JSON extraction, scoring, report building)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self._samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # An unlabelled metric is exported as 0 before its first update
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. work in flight)."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # An unlabelled metric is exported as 0 before its first update
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets (plus _sum and _count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = SLOW_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process; render() produces the /metrics body."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{NAMESPACE}_{name}", documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(f"{NAMESPACE}_{name}", documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = SLOW_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{NAMESPACE}_{name}", documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name) or self._metrics.get(f"{NAMESPACE}_{name}")
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ── Pipeline metrics ─────────────────────────────────────────
+
+AGENT_CALL_SECONDS = REGISTRY.histogram(
+    "agent_call_seconds",
+    "Duration of one agent call including retries and backoff (cache hits excluded).",
+    ("agent", "outcome"),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "orchestrator_stage_seconds",
+    "Duration of orchestrator stages: context (per agent), agents (whole DAG), aggregate, evaluation.",
+    ("stage",),
+)
+JSON_EXTRACTION_SECONDS = REGISTRY.histogram(
+    "json_extraction_seconds",
+    "Time to extract (and if needed repair) the JSON object of an agent reply.",
+    ("outcome",),
+    buckets=FAST_BUCKETS,
+)
+SCORING_SECONDS = REGISTRY.histogram(
+    "scoring_seconds", "Time spent in the deterministic scoring engine.", buckets=FAST_BUCKETS,
+)
+REPORT_BUILD_SECONDS = REGISTRY.histogram(
+    "report_build_seconds", "Time spent assembling the final report.", buckets=FAST_BUCKETS,
+)
+SUPABASE_WRITE_SECONDS = REGISTRY.histogram(
+    "supabase_write_seconds",
+    "Duration of Supabase writes (dry-run saves are not recorded).",
+    ("operation", "outcome"),
+)
+OUTBOX_FLUSH_SECONDS = REGISTRY.histogram(
+    "outbox_flush_seconds",
+    "Duration of one write-behind upsert batch from the persistence outbox.",
+    ("table", "outcome"),
+)
+OUTBOX_DELAY_SECONDS = REGISTRY.histogram(
+    "outbox_delay_seconds",
+    "Time from queueing a row to saving it (wall clock: rows survive restarts).",
+    ("table",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+AGENT_FAILURES = REGISTRY.counter(
+    "agent_failures_total",
+    "Agent calls that ended in an error output, by reason.",
+    ("agent", "reason"),
+)
+AGENT_RETRIES = REGISTRY.counter(
+    "agent_retries_total", "Extra attempts made after a transient agent failure.", ("agent",),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the model, by agent and kind (prompt/completion).",
+    ("agent", "kind"),
+)
+EVALUATION_CACHE_LOOKUPS = REGISTRY.counter(
+    "evaluation_cache_lookups_total",
+    "Evaluation read cache lookups by result (hit, negative_hit, miss).",
+    ("result",),
+)
+
+EVALUATIONS_IN_FLIGHT = REGISTRY.gauge(
+    "evaluations_in_flight", "Evaluations currently running in the orchestrator.",
+)
+OUTBOX_DEPTH = REGISTRY.gauge(
+    "outbox_depth", "Rows waiting in the persistence outbox (dead rows excluded).",
+)
+
+
+def render() -> str:
+    """Body of GET /metrics."""
+    return REGISTRY.render()
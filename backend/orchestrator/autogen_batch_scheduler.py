@@ -0,0 +1,121 @@
+"""
+Module 11: Batch Scheduler
+Runs many evaluations through one process-wide concurrency bound.
+
+Every batch shares the same BatchScheduler, so two analysts uploading
+portfolios at once split the slots instead of each flooding the agent pool
+and the LLM quota. Within a batch, inputs are pulled lazily (an item is only
+parsed and validated once a slot is free) and results are yielded as they
+finish.
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+
+DEFAULT_BATCH_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "4"))
+
+
+class BatchScheduler:
+    """
+    Bounded, shared executor for batch evaluations.
+
+    Usage:
+        async for index, outcome in scheduler.map_unordered(items, worker):
+            ...   # outcome is the worker's return value or the exception it raised
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY):
+        """
+        Args:
+            max_concurrency: Evaluations running at once across all batches.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        # Created lazily so the scheduler binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def map_unordered(
+        self,
+        items: AsyncIterable[Any],
+        worker: Callable[[int, Any], Awaitable[Any]],
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Apply `worker(index, item)` to every item, yielding (index, outcome)
+        in completion order. Exceptions are yielded, not raised, so one bad
+        item never aborts the batch. Closing the iterator cancels work in flight.
+        """
+        iterator = items.__aiter__()
+        pending: Dict[asyncio.Task, int] = {}
+        exhausted = False
+        index = 0
+
+        try:
+            while True:
+                # Keep at most max_concurrency of this batch's items in flight
+                while not exhausted and len(pending) < self.max_concurrency:
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.ensure_future(self._run(worker, index, item))
+                    pending[task] = index
+                    index += 1
+
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item_index = pending.pop(task)
+                    error = task.exception()
+                    yield item_index, (error if error is not None else task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run(self, worker, index: int, item: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            result = await worker(index, item)
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+
+_shared_scheduler: Optional[BatchScheduler] = None
+
+
+def get_shared_batch_scheduler() -> BatchScheduler:
+    """Returns the process-wide BatchScheduler (BATCH_MAX_CONCURRENCY slots)."""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        _shared_scheduler = BatchScheduler()
+    return _shared_scheduler
@@ -0,0 +1,86 @@
+"""
+Module 12: Evaluation Cancellation
+Shared cancellation for one evaluation, plus counters of LLM calls saved.
+
+One autogen CancellationToken is created per evaluation and threaded through
+the orchestrator into every agent call. Cancelling it (e.g. when an SSE client
+disconnects) interrupts the calls in flight and stops agents that have not
+started yet from calling the LLM at all.
+
+What happens on disconnect is a policy:
+  "abort"  — cancel the evaluation; nothing is scored or persisted.
+  "finish" — let it run to completion and persist the report anyway.
+"""
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from autogen_core import CancellationToken
+
+
+DISCONNECT_POLICIES = ("abort", "finish")
+DEFAULT_DISCONNECT_POLICY = os.environ.get("STREAM_DISCONNECT_POLICY", "abort")
+
+
+class EvaluationCancelled(Exception):
+    """Raised inside an agent call when the evaluation's token is cancelled."""
+
+
+def resolve_disconnect_policy(requested: Optional[str] = None) -> str:
+    """Per-request choice, else STREAM_DISCONNECT_POLICY, else "abort"."""
+    for policy in (requested, DEFAULT_DISCONNECT_POLICY):
+        if policy in DISCONNECT_POLICIES:
+            return policy
+    return "abort"
+
+
+def linked_token(parent: Optional[CancellationToken]) -> CancellationToken:
+    """A fresh token that is cancelled whenever `parent` is."""
+    token = CancellationToken()
+    if parent is not None:
+        parent.add_callback(token.cancel)
+    return token
+
+
+def is_cancelled(token: Optional[CancellationToken]) -> bool:
+    return token is not None and token.is_cancelled()
+
+
+class CancellationStats:
+    """Process-wide counters of client disconnects and the LLM calls they saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            "disconnects": 0,
+            "aborted": 0,
+            "finished_anyway": 0,
+            "llm_calls_saved": 0,
+            "llm_calls_interrupted": 0,
+        }
+
+    def record_disconnect(self, policy: str) -> None:
+        with self._lock:
+            self._counts["disconnects"] += 1
+            self._counts["aborted" if policy == "abort" else "finished_anyway"] += 1
+
+    def record_cancelled_run(self, cancellation: Dict[str, Any]) -> None:
+        """Add an aborted run's `_meta.cancellation` block to the totals."""
+        with self._lock:
+            self._counts["llm_calls_saved"] += len(cancellation.get("skipped", []))
+            self._counts["llm_calls_interrupted"] += len(cancellation.get("interrupted", []))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"policy": resolve_disconnect_policy(), **self._counts}
+
+
+_shared_stats: Optional[CancellationStats] = None
+
+
+def get_shared_cancellation_stats() -> CancellationStats:
+    """Returns the process-wide CancellationStats."""
+    global _shared_stats
+    if _shared_stats is None:
+        _shared_stats = CancellationStats()
+    return _shared_stats
@@ -1,39 +1,174 @@
 """
 Module 3: Context Packaging Helper
 Merges startup context with upstream agent outputs without mutation.
+
+Contexts are immutable views (FrozenContext) rather than deep copies: the
+base context and each upstream output are frozen once per evaluation and
+shared by every downstream agent, and each frozen node memoises its JSON so
+shared fragments are serialised only once.
 """
-import copy
-from typing import Any, Dict
+import json
+from typing import Any, Dict, Mapping
+
+
+class FrozenContext(dict):
+    """
+    Read-only, structurally shared dict.
+
+    Being a real dict subclass, it works everywhere a dict does (json.dumps,
+    isinstance checks, ** unpacking) — but every mutating method raises
+    TypeError. Nested dicts/lists are wrapped lazily on first access, so
+    freezing is O(top-level keys) instead of a deep copy.
+    """
+
+    __slots__ = ("_json", "_composite")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._json: Dict[Any, str] = {}
+        # Composite views (built by build_autogen_context) serialise by
+        # stitching together the memoised JSON of their children
+        self._composite = False
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenContext is read-only; build a new context instead.")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (dict, list)) and not isinstance(value, FrozenContext):
+            value = freeze(value)
+            dict.__setitem__(self, key, value)  # memoise the view; content is unchanged
+        return value
+
+    def __iter__(self):
+        # Defining __iter__ also stops dict(view) / {**view} from copying raw children
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def copy(self):
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenContext, (dict(self),))
+
+    def to_json(self, indent: int | None = None) -> str:
+        """
+        JSON text of this node, memoised per indent.
+
+        Compact form uses (",", ":") separators; indented form matches
+        json.dumps(..., indent=indent). Non-ASCII is kept as-is.
+        """
+        cached = self._json.get(indent)
+        if cached is None:
+            if self._composite:
+                cached = _encode_object(self.items(), indent)
+            else:
+                cached = json.dumps(
+                    self, indent=indent, separators=(",", ":") if indent is None else None,
+                    ensure_ascii=False, default=str,
+                )
+            self._json[indent] = cached
+        return cached
+
+
+def freeze(value: Any) -> Any:
+    """
+    Return a read-only view of `value`: dicts become FrozenContext (nested
+    levels are wrapped lazily), lists become tuples. Already-frozen nodes are
+    returned as-is, which is what makes repeated merges cheap.
+    """
+    if isinstance(value, FrozenContext):
+        return value
+    if isinstance(value, dict):
+        return FrozenContext(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def dumps_context(value: Any, indent: int | None = None) -> str:
+    """
+    Serialise a context, reusing the memoised JSON of frozen sub-trees.
+    Plain dicts around them (e.g. a projection) are stitched together here.
+    """
+    if isinstance(value, FrozenContext):
+        return value.to_json(indent)
+    if isinstance(value, Mapping):
+        return _encode_object(value.items(), indent)
+    return json.dumps(
+        value, indent=indent, separators=(",", ":") if indent is None else None,
+        ensure_ascii=False, default=str,
+    )
+
+
+def _encode_object(items, indent: int | None) -> str:
+    parts = [
+        (json.dumps(str(k), ensure_ascii=False), dumps_context(v, indent))
+        for k, v in items
+    ]
+    if not parts:
+        return "{}"
+    if indent is None:
+        return "{" + ",".join(f"{k}:{v}" for k, v in parts) + "}"
+    newline = "\n" + " " * indent
+    # Child fragments are rendered at depth 0; shift them one level right
+    body = ("," + newline).join(f"{k}: {v.replace(chr(10), newline)}" for k, v in parts)
+    return "{" + newline + body + "\n}"
+
+
+def _composite(*args, **kwargs) -> FrozenContext:
+    view = FrozenContext(*args, **kwargs)
+    view._composite = True
+    return view
 
 
 def build_autogen_context(
     base_context: Dict[str, Any],
     additional_outputs: Dict[str, Any] | None = None
-) -> Dict[str, Any]:
+) -> FrozenContext:
     """
     Merge startup context with upstream agent outputs.
 
     Args:
-        base_context: The original startup context dict.
+        base_context: The original startup context dict (or a FrozenContext).
         additional_outputs: Dictionary of upstream agent outputs to merge.
 
     Returns:
-        New merged dictionary. Never mutates the originals.
+        New read-only merged view. Never mutates the originals; frozen inputs
+        are shared rather than copied.
     """
-    # Deep copy to prevent mutation of original context
-    merged = copy.deepcopy(base_context)
+    base = freeze(base_context)
+    if not additional_outputs:
+        return base
 
-    if additional_outputs:
-        # Store upstream outputs under a dedicated key
-        upstream = merged.get("upstream_outputs", {})
-
-        for key, value in additional_outputs.items():
-            # Skip error outputs — don't propagate broken data downstream
-            if isinstance(value, dict) and value.get("error"):
-                upstream[key] = {"error": True, "message": value.get("message", "upstream failure")}
-            else:
-                upstream[key] = copy.deepcopy(value)
+    # Store upstream outputs under a dedicated key
+    upstream = dict((base.get("upstream_outputs") or {}).items())
 
-        merged["upstream_outputs"] = upstream
+    for key, value in additional_outputs.items():
+        # Skip error outputs — don't propagate broken data downstream
+        if isinstance(value, dict) and value.get("error"):
+            upstream[key] = FrozenContext(
+                error=True, message=value.get("message", "upstream failure")
+            )
+        else:
+            upstream[key] = freeze(value)
 
-    return merged
\ No newline at end of file
+    # Share the base's (already wrapped) children rather than copying them
+    return _composite(base.items(), upstream_outputs=_composite(upstream))
@@ -0,0 +1,213 @@
+"""
+Module 10: Per-Agent Context Projection
+Sends each agent only the fields it actually reasons about.
+
+PROJECTION_SPECS maps a pipeline step to the fields it needs from every
+context section. Fields may be dotted paths into nested objects
+("metrics.runway_months"); "*" keeps a whole section. Sections that are not
+listed (e.g. "metadata") are dropped, as are upstream `_meta` blocks and
+free-text reasoning. Steps without a spec receive the full context.
+
+Deployments can override specs with the CONTEXT_PROJECTION env var, e.g.
+    {"market": {"startup_context": "*", "qualitative": "*"}, "risk": "*"}
+where a bare "*" disables projection for that step.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional
+
+from backend.orchestrator.autogen_context_builder import dumps_context
+
+
+ALL = "*"
+
+_STARTUP_CORE = ["name", "industry", "stage"]
+_FINANCIAL_RAW = [
+    "period_start", "period_end", "revenue", "cogs", "operating_expenses",
+    "cash_balance", "monthly_burn_rate", "currency",
+]
+_VALIDATOR_SIGNALS = [
+    "data_consistency_score", "completeness_score", "suspicion_flags",
+    "requires_manual_review", "confidence_score",
+]
+_COMPETITION_SIGNALS = ["competitor_risk_score", "novelty_score", "confidence_score"]
+
+
+PROJECTION_SPECS: Dict[str, Dict[str, Any]] = {
+    # Checks completeness and consistency, so it sees the whole submission
+    "validator": {
+        "startup_context": _STARTUP_CORE + ["description", "website", "founded_date"],
+        "financial_input": _FINANCIAL_RAW,
+        "qualitative": ALL,
+    },
+    "financial": {
+        "startup_context": _STARTUP_CORE,
+        "financial_input": _FINANCIAL_RAW,
+        "qualitative": ["users_count", "retention_metrics"],
+    },
+    "market": {
+        "startup_context": _STARTUP_CORE + ["description"],
+        "qualitative": [
+            "problem_description", "target_customer_persona", "current_alternatives",
+            "why_now", "product_description", "users_count",
+        ],
+    },
+    "competition": {
+        "startup_context": _STARTUP_CORE + ["description", "website"],
+        "qualitative": [
+            "product_description", "current_alternatives", "competitors",
+            "differentiation", "why_you_win",
+        ],
+    },
+    "risk": {
+        "startup_context": _STARTUP_CORE,
+        "upstream_outputs": {
+            "financial": ["metrics", "score", "anomalies", "confidence_score"],
+            "market": ["tam", "sam", "som", "growth_rate", "market_trends", "confidence_score"],
+            "competition": _COMPETITION_SIGNALS + ["competitors"],
+        },
+    },
+    "longevity": {
+        "startup_context": _STARTUP_CORE,
+        "upstream_outputs": {
+            "validator": _VALIDATOR_SIGNALS,
+            "financial": [
+                "metrics.runway_months", "metrics.burn_rate", "metrics.revenue",
+                "score", "anomalies", "confidence_score",
+            ],
+            "market": ["tam", "som", "growth_rate", "confidence_score"],
+            "competition": _COMPETITION_SIGNALS,
+        },
+    },
+    "investor_fit": {
+        "startup_context": _STARTUP_CORE + ["description"],
+        "financial_input": ["revenue", "cash_balance", "monthly_burn_rate", "currency"],
+        "qualitative": ["users_count", "retention_metrics", "founder_background"],
+        "upstream_outputs": {
+            "validator": _VALIDATOR_SIGNALS,
+            "financial": ["metrics", "score", "anomalies", "confidence_score"],
+            "market": ["tam", "sam", "som", "growth_rate", "confidence_score"],
+            "competition": _COMPETITION_SIGNALS,
+        },
+    },
+}
+
+
+@lru_cache(maxsize=4)
+def _parse_projection_overrides(raw: str) -> Dict[str, Any]:
+    overrides = json.loads(raw)
+    if not isinstance(overrides, dict):
+        raise ValueError("CONTEXT_PROJECTION must be a JSON object.")
+    return overrides
+
+
+def get_projection_spec(step: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve the projection spec of a pipeline step.
+
+    Returns:
+        The spec, or None when the step should receive the full context.
+    """
+    spec = PROJECTION_SPECS.get(step)
+    raw = os.environ.get("CONTEXT_PROJECTION")
+    if raw:
+        spec = _parse_projection_overrides(raw).get(step, spec)
+    return None if spec in (None, ALL) else spec
+
+
+def project_context(step: str, context: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Build the context an agent actually receives.
+
+    Args:
+        step: Pipeline step name (e.g. "risk").
+        context: Full context from build_autogen_context (or the base context).
+
+    Returns:
+        New dictionary holding only the fields listed in the step's spec.
+        Missing fields are omitted rather than sent as null.
+    """
+    spec = get_projection_spec(step)
+    # Contexts that don't follow the sectioned layout are passed through unchanged
+    if spec is None or not any(section in context for section in spec):
+        return dict(context)
+
+    projected: Dict[str, Any] = {}
+    for section, fields in spec.items():
+        value = context.get(section)
+        if value is None:
+            continue
+        if section == "upstream_outputs":
+            value = _project_upstream(value, fields)
+        else:
+            value = _select(value, fields)
+        if value:
+            projected[section] = value
+    return projected
+
+
+def _project_upstream(upstream: Mapping[str, Any], spec: Any) -> Dict[str, Any]:
+    if spec == ALL:
+        return {name: _select(output, ALL) for name, output in upstream.items()}
+
+    projected = {}
+    for name, fields in spec.items():
+        output = upstream.get(name)
+        if not isinstance(output, Mapping):
+            continue
+        if output.get("error"):
+            # Keep failures visible so the agent can lower its confidence
+            projected[name] = {"error": True, "message": output.get("message", "upstream failure")}
+        else:
+            projected[name] = _select(output, fields)
+    return projected
+
+
+def _select(value: Any, fields: Any) -> Any:
+    """Pick (possibly dotted) fields out of a mapping; always drops `_meta`."""
+    if not isinstance(value, Mapping):
+        return value
+    if fields == ALL:
+        return {k: v for k, v in value.items() if k != "_meta"}
+
+    selected: Dict[str, Any] = {}
+    for path in fields:
+        head, _, rest = path.partition(".")
+        if head not in value:
+            continue
+        if rest:
+            if isinstance(value[head], Mapping):
+                nested = _select(value[head], [rest])
+                if nested:
+                    selected.setdefault(head, {}).update(nested)
+        else:
+            selected[head] = value[head]
+    return selected
+
+
+def serialize_context(context: Any) -> str:
+    """
+    Compact JSON sent to the model — no indentation, no spaces after separators.
+    Frozen sub-trees shared between agents reuse their memoised JSON.
+    """
+    return dumps_context(context)
+
+
+def estimate_tokens(text: str) -> int:
+    """Same ~4 characters per token heuristic the rate limiter budgets with."""
+    return len(text) // 4
+
+
+def context_token_report(full_context: Any, projected_context: Any) -> Dict[str, Any]:
+    """
+    Compare the projected prompt with what the agent used to receive
+    (the whole context, pretty-printed).
+    """
+    unprojected = estimate_tokens(dumps_context(full_context, indent=2))
+    projected = estimate_tokens(serialize_context(projected_context))
+    return {
+        "projected": projected,
+        "unprojected": unprojected,
+        "reduction_pct": round(100.0 * (1 - projected / unprojected), 1) if unprojected else 0.0,
+    }
@@ -0,0 +1,154 @@
+"""
+Module 6: Dependency-Graph Scheduler
+Runs pipeline steps as soon as their upstream outputs are ready.
+
+The pipeline is declared as a DAG of logical step name -> upstream steps.
+Each step starts the instant its dependencies complete, so wall-clock time is
+the longest dependency chain rather than the sum of stage maxima.
+"""
+import asyncio
+import json
+import os
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Mapping, Sequence, Tuple
+
+
+# Logical step -> upstream steps whose outputs it consumes.
+# Agent for a step is looked up as f"evaluator_{step}".
+DEFAULT_PIPELINE_DAG: Dict[str, Tuple[str, ...]] = {
+    "validator": (),
+    "financial": (),
+    "market": (),
+    "competition": (),
+    "risk": ("financial", "market", "competition"),
+    "longevity": ("validator", "financial", "market", "competition"),
+    "investor_fit": ("validator", "financial", "market", "competition"),
+}
+
+
+def validate_dag(dag: Mapping[str, Sequence[str]]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Check that every dependency is declared and the graph is acyclic.
+
+    Args:
+        dag: Mapping of step -> upstream steps.
+
+    Returns:
+        Normalised DAG (step -> tuple of upstream steps), preserving step order.
+
+    Raises:
+        ValueError: On unknown dependencies, self-dependencies or cycles.
+    """
+    if not dag:
+        raise ValueError("Pipeline DAG must declare at least one step.")
+
+    normalised = {step: tuple(deps or ()) for step, deps in dag.items()}
+
+    for step, deps in normalised.items():
+        unknown = [d for d in deps if d not in normalised]
+        if unknown:
+            raise ValueError(f"Step '{step}' depends on undeclared steps: {unknown}")
+        if step in deps:
+            raise ValueError(f"Step '{step}' depends on itself.")
+
+    # Kahn's algorithm — anything left unvisited sits on a cycle
+    remaining = {step: set(deps) for step, deps in normalised.items()}
+    ready = [step for step, deps in remaining.items() if not deps]
+    visited = 0
+    while ready:
+        step = ready.pop()
+        visited += 1
+        for other, deps in remaining.items():
+            if step in deps:
+                deps.discard(step)
+                if not deps:
+                    ready.append(other)
+    if visited != len(normalised):
+        cyclic = sorted(step for step, deps in remaining.items() if deps)
+        raise ValueError(f"Pipeline DAG contains a cycle through: {cyclic}")
+
+    return normalised
+
+
+@lru_cache(maxsize=8)
+def _parse_dag_spec(raw: str) -> Dict[str, Tuple[str, ...]]:
+    spec = raw.strip()
+    if not spec.startswith("{"):
+        # Treat as a path to a JSON file
+        with open(spec, "r", encoding="utf-8") as f:
+            spec = f.read()
+    return validate_dag(json.loads(spec))
+
+
+def load_pipeline_dag(raw: str | None = None) -> Dict[str, Tuple[str, ...]]:
+    """
+    Resolve the pipeline DAG for this deployment.
+
+    Args:
+        raw: JSON object string or path to a JSON file. Defaults to the
+             PIPELINE_DAG environment variable; falls back to DEFAULT_PIPELINE_DAG.
+
+    Returns:
+        Validated DAG mapping step -> tuple of upstream steps.
+    """
+    if raw is None:
+        raw = os.environ.get("PIPELINE_DAG")
+    if not raw:
+        return dict(DEFAULT_PIPELINE_DAG)
+    return dict(_parse_dag_spec(raw))
+
+
+async def run_dag(
+    dag: Mapping[str, Sequence[str]],
+    run_step: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    completed: Mapping[str, Dict[str, Any]] | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute every step of the DAG with maximal concurrency.
+
+    Args:
+        dag: Validated mapping of step -> upstream steps.
+        run_step: Async callable(step, upstream_outputs) returning the step output.
+                  upstream_outputs maps each dependency to its output.
+        completed: Outputs of steps that already ran (e.g. restored from a
+                   checkpoint). They are not run again but still feed dependents.
+
+    Returns:
+        Dictionary of step -> output, in DAG declaration order. A step that
+        raises is converted into a structured error object instead of
+        cancelling its siblings.
+    """
+    outputs: Dict[str, Dict[str, Any]] = {
+        step: output for step, output in (completed or {}).items() if step in dag
+    }
+    pending = {step: deps for step, deps in dag.items() if step not in outputs}
+    running: Dict[asyncio.Task, str] = {}
+
+    def _start_ready():
+        for step, deps in list(pending.items()):
+            if all(d in outputs for d in deps):
+                del pending[step]
+                upstream = {d: outputs[d] for d in deps}
+                running[asyncio.ensure_future(run_step(step, upstream))] = step
+
+    try:
+        _start_ready()
+        while running:
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step = running.pop(task)
+                if task.exception() is not None:
+                    outputs[step] = {
+                        "error": True,
+                        "agent": step,
+                        "message": str(task.exception()),
+                    }
+                else:
+                    outputs[step] = task.result()
+            _start_ready()
+    finally:
+        # Only non-empty if we were cancelled — don't leave orphaned LLM calls
+        for task in running:
+            task.cancel()
+
+    return {step: outputs[step] for step in dag}
@@ -0,0 +1,168 @@
+"""
+Module 8: Per-Agent Execution Policy
+Deadlines, hedging, retries and latency statistics for single-agent LLM calls.
+
+Policies resolve as DEFAULT_POLICY <- AGENT_POLICIES[agent] <- AGENT_EXECUTION_POLICY env.
+The env var holds JSON such as:
+    {"default": {"hard_timeout_seconds": 30}, "evaluator_market": {"hedge": true}}
+"""
+import json
+import os
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional
+
+
+DEFAULT_POLICY: Dict[str, Any] = {
+    # Past the soft timeout the call is flagged (and hedged if no p90 is known yet)
+    "soft_timeout_seconds": 15.0,
+    # Past the hard timeout the call is cancelled and reported as an error
+    "hard_timeout_seconds": 45.0,
+    # Fire a duplicate request once the agent is slower than its p-th percentile
+    "hedge": os.environ.get("AGENT_HEDGING", "0").lower() in ("1", "true", "yes"),
+    "hedge_percentile": 0.90,
+    "hedge_min_samples": 20,
+    # Retries for transient provider errors and unparseable replies
+    "max_attempts": 3,
+    "retry_base_delay_seconds": 0.5,
+    "retry_max_delay_seconds": 8.0,
+    # Fraction of each backoff delay that is randomised (0 = no jitter)
+    "retry_jitter": 0.5,
+    # Try to fix malformed JSON locally before spending another request
+    "json_repair": True,
+}
+
+# Static per-agent overrides (keyed by AutoGen agent name)
+AGENT_POLICIES: Dict[str, Dict[str, Any]] = {
+    # Downstream agents read upstream outputs and produce longer answers
+    "evaluator_risk": {"soft_timeout_seconds": 20.0},
+    "evaluator_longevity": {"soft_timeout_seconds": 20.0},
+    "evaluator_investor_fit": {"soft_timeout_seconds": 20.0},
+}
+
+
+@lru_cache(maxsize=4)
+def _parse_policy_overrides(raw: str) -> Dict[str, Dict[str, Any]]:
+    overrides = json.loads(raw)
+    if not isinstance(overrides, dict):
+        raise ValueError("AGENT_EXECUTION_POLICY must be a JSON object.")
+    return overrides
+
+
+def get_agent_policy(agent_name: str) -> Dict[str, Any]:
+    """
+    Resolve the effective execution policy for an agent.
+
+    Args:
+        agent_name: AutoGen agent name (e.g. "evaluator_market").
+
+    Returns:
+        New policy dictionary (safe to mutate).
+    """
+    policy = dict(DEFAULT_POLICY)
+    policy.update(AGENT_POLICIES.get(agent_name, {}))
+
+    raw = os.environ.get("AGENT_EXECUTION_POLICY")
+    if raw:
+        overrides = _parse_policy_overrides(raw)
+        policy.update(overrides.get("default", {}))
+        policy.update(overrides.get(agent_name, {}))
+
+    return policy
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """
+    Rolling latency statistics per agent, plus process-wide hedging counters.
+
+    `primary` samples are how long the first request took — or, when a hedge
+    won and the primary was cancelled, how long it had run by then. That makes
+    the reported p99 improvement a conservative lower bound.
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._per_agent: Dict[str, Deque[float]] = {}
+        self._effective: Deque[float] = deque(maxlen=window)
+        self._primary: Deque[float] = deque(maxlen=window)
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._soft_timeouts = 0
+        self._hard_timeouts = 0
+
+    def percentile(self, agent_name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Return the q-th latency percentile of an agent, or None without enough data."""
+        with self._lock:
+            samples = list(self._per_agent.get(agent_name, ()))
+        if len(samples) < min_samples:
+            return None
+        return _percentile(samples, q)
+
+    def record(
+        self,
+        agent_name: str,
+        effective_seconds: float,
+        primary_seconds: float,
+        hedged: bool = False,
+        hedge_won: bool = False,
+        soft_timeout: bool = False,
+    ) -> None:
+        """Record one completed agent call."""
+        with self._lock:
+            self._per_agent.setdefault(agent_name, deque(maxlen=self.window)).append(effective_seconds)
+            self._effective.append(effective_seconds)
+            self._primary.append(primary_seconds)
+            self._calls += 1
+            self._hedged += int(hedged)
+            self._hedge_wins += int(hedge_won)
+            self._soft_timeouts += int(soft_timeout)
+
+    def record_hard_timeout(self, agent_name: str, hedged: bool = False) -> None:
+        with self._lock:
+            self._calls += 1
+            self._hedged += int(hedged)
+            self._hard_timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            effective = list(self._effective)
+            primary = list(self._primary)
+            calls, hedged, wins = self._calls, self._hedged, self._hedge_wins
+            soft, hard = self._soft_timeouts, self._hard_timeouts
+
+        p99_effective = _percentile(effective, 0.99)
+        p99_primary = _percentile(primary, 0.99)
+        improvement = (
+            round(max(0.0, p99_primary - p99_effective), 4)
+            if p99_effective is not None and p99_primary is not None else None
+        )
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_rate": round(hedged / calls, 4) if calls else 0.0,
+            "soft_timeouts": soft,
+            "hard_timeouts": hard,
+            "p99_seconds": round(p99_effective, 4) if p99_effective is not None else None,
+            "p99_without_hedging_seconds": round(p99_primary, 4) if p99_primary is not None else None,
+            "p99_improvement_seconds": improvement,
+        }
+
+
+_shared_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Returns the process-wide LatencyTracker."""
+    return _shared_tracker
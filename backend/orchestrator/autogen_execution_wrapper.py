@@ -4,63 +4,141 @@ Single-agent async executor with error isolation and timestamp metadata.
 """
 import json
 import asyncio
+import inspect
+import random
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict
 
-
-from autogen_agentchat.messages import TextMessage
+import openai
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
 from autogen_core import CancellationToken
+from autogen_core.models import RequestUsage
+
+from backend.agents.autogen_circuit_breaker import CircuitOpenError
+from backend.agents.autogen_rate_limiter import QueueClock, queue_clock
+from backend.agents.autogen_registry import clone_agent
+from backend.metrics import (
+    AGENT_CALL_SECONDS,
+    AGENT_FAILURES,
+    AGENT_RETRIES,
+    JSON_EXTRACTION_SECONDS,
+    LLM_TOKENS,
+)
+from backend.orchestrator.autogen_cancellation import EvaluationCancelled, is_cancelled, linked_token
+from backend.orchestrator.autogen_context_projection import serialize_context
+from backend.orchestrator.autogen_execution_policy import get_agent_policy, get_latency_tracker
+from backend.orchestrator.autogen_json_repair import repair_json
+from backend.orchestrator.autogen_response_cache import cache_key
+from backend.orchestrator.autogen_usage import empty_usage
+
+
+# Errors that are worth another attempt. ValueError covers empty and
+# unparseable replies; openai.APIConnectionError includes request timeouts.
+_TRANSIENT_ERRORS = (
+    ValueError,
+    ConnectionError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    openai.RateLimitError,
+)
+
 
-async def execute_autogen_agent(agent, context: Dict[str, Any]) -> Dict[str, Any]:
+async def execute_autogen_agent(
+    agent,
+    context: Dict[str, Any],
+    cache=None,
+    bypass_cache: bool = False,
+    policy: Dict[str, Any] | None = None,
+    tracker=None,
+    cancellation_token: CancellationToken | None = None,
+    on_delta: Callable[[str, int], Awaitable[None]] | None = None,
+) -> Dict[str, Any]:
     """
     Execute a single AutoGen agent with the given context.
     
     Args:
         agent: AutoGen AssistantAgent instance.
         context: Dictionary of data to send to the agent.
+        cache: Optional AgentResponseCache consulted before calling the LLM.
+        bypass_cache: Skip the cache lookup (a fresh result still refreshes the cache).
+        policy: Optional execution policy (timeouts, hedging, retries).
+                Defaults to get_agent_policy(agent.name).
+        tracker: Optional LatencyTracker. Defaults to the process-wide tracker.
+        cancellation_token: Optional token shared by the whole evaluation.
+                            Cancelling it aborts the call (no retries).
+        on_delta: Optional async callable(text, attempt). When given, the
+                  reply is streamed (on_messages_stream) and every chunk is
+                  forwarded as it arrives. A new attempt number means a retry
+                  restarted the reply from scratch.
         
     Returns:
         Parsed JSON output from the agent, or a structured error object.
     """
     agent_name = getattr(agent, "name", "unknown_agent")
     started_at = datetime.now(timezone.utc).isoformat()
+    policy = policy or get_agent_policy(agent_name)
+    tracker = tracker or get_latency_tracker()
+    timing: Dict[str, Any] = {}
+
+    key = None
+    if cache is not None:
+        key = cache_key(agent, context)
+        if not bypass_cache:
+            cached = await cache.lookup(key)
+            if cached is not None:
+                # Keep the original _meta (when it was computed) and flag the hit
+                cached["_meta"] = {
+                    **cached.get("_meta", {}),
+                    "cache_hit": True,
+                    "served_at": started_at,
+                }
+                return cached
+
+    call_started = time.perf_counter()
+    retry: Dict[str, Any] = {
+        "attempts": 0,
+        "json_repairs": [],
+        "retry_errors": [],
+        "retry_wait_seconds": 0.0,
+        "time_lost_seconds": 0.0,
+        # Tokens of every reply received, failed attempts included
+        "usage": empty_usage(),
+    }
 
     try:
-        # Convert context dict to a JSON string message
-        context_message = json.dumps(context, indent=2, default=str)
+        # Convert context dict to a compact JSON string message
+        context_message = serialize_context(context)
 
         # Build the message list for the agent (v0.7 API)
         messages = [
             TextMessage(content=context_message, source="user")
         ]
 
-        # Call the agent asynchronously using on_messages (v0.7 API)
-        response = await agent.on_messages(messages, CancellationToken())
-
-        # Extract the text content from the response
-        # response is a Response object containing chat_message
-        if not response or not response.chat_message:
-             raise ValueError("Agent returned empty response.")
-
-        # Extract string content
-        raw_text = response.chat_message.content
-        if not isinstance(raw_text, str):
-            raw_text = str(raw_text)
-
-        # Parse JSON from the response
-        parsed = _extract_json(raw_text)
+        parsed = await _call_with_retries(
+            agent, messages, policy, tracker, timing, retry, cancellation_token, on_delta
+        )
 
         # Add execution metadata
         parsed["_meta"] = {
             "agent": agent_name,
             "started_at": started_at,
             "completed_at": datetime.now(timezone.utc).isoformat(),
+            "cache_hit": False,
+            **timing,
+            **retry,
         }
 
+        # Only successful outputs are cached — errors always retry
+        if key is not None:
+            await cache.store(key, parsed)
+
+        AGENT_CALL_SECONDS.observe(time.perf_counter() - call_started, agent=agent_name, outcome="ok")
         return parsed
 
     except Exception as e:
-        return {
+        error = {
             "error": True,
             "agent": agent_name,
             "message": str(e),
@@ -68,8 +146,345 @@ async def execute_autogen_agent(agent, context: Dict[str, Any]) -> Dict[str, Any
                 "agent": agent_name,
                 "started_at": started_at,
                 "completed_at": datetime.now(timezone.utc).isoformat(),
+                **timing,
+                **retry,
             }
         }
+        if isinstance(e, EvaluationCancelled):
+            error["cancelled"] = True
+        if isinstance(e, CircuitOpenError):
+            error["circuit_open"] = True
+        reason = _failure_reason(e)
+        AGENT_CALL_SECONDS.observe(time.perf_counter() - call_started, agent=agent_name, outcome=reason)
+        AGENT_FAILURES.inc(agent=agent_name, reason=reason)
+        return error
+
+
+def _failure_reason(error: Exception) -> str:
+    """Low-cardinality label for an agent failure."""
+    if isinstance(error, EvaluationCancelled):
+        return "cancelled"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, ValueError):
+        return "invalid_reply"
+    return "error"
+
+
+async def _call_with_retries(
+    agent,
+    messages,
+    policy: Dict[str, Any],
+    tracker,
+    timing: Dict[str, Any],
+    retry: Dict[str, Any],
+    cancellation_token: CancellationToken | None = None,
+    on_delta: Callable[[str, int], Awaitable[None]] | None = None,
+) -> Dict[str, Any]:
+    """
+    Call the agent and parse its reply, retrying with exponential backoff.
+
+    An unparseable reply first goes through the local JSON repair pass; only
+    if that fails (or a transient provider error occurs) is another request
+    made. Hard timeouts and other errors are raised immediately.
+
+    Fills `retry` with attempts, repairs, time lost and token usage for the _meta block.
+    """
+    agent_name = getattr(agent, "name", "unknown_agent")
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    max_attempts = max(1, int(policy.get("max_attempts", 1)))
+
+    while True:
+        retry["attempts"] += 1
+        # Everything before the final attempt (failed calls + backoff) is time lost
+        retry["time_lost_seconds"] = round(loop.time() - started, 4)
+        stream_to = None
+        if on_delta is not None:
+            async def stream_to(text: str, attempt: int = retry["attempts"]):
+                await on_delta(text, attempt)
+        try:
+            # Call the agent asynchronously using on_messages (v0.7 API),
+            # bounded by the policy's deadlines and optionally hedged
+            response = await _call_with_deadlines(
+                agent, messages, policy, tracker, timing, cancellation_token, stream_to
+            )
+
+            # response is a Response object containing chat_message
+            if not response or not response.chat_message:
+                raise ValueError("Agent returned empty response.")
+
+            usage = getattr(response.chat_message, "models_usage", None)
+            if isinstance(usage, RequestUsage):
+                retry["usage"]["prompt_tokens"] += usage.prompt_tokens or 0
+                retry["usage"]["completion_tokens"] += usage.completion_tokens or 0
+                retry["usage"]["llm_calls"] += 1
+                LLM_TOKENS.inc(usage.prompt_tokens or 0, agent=agent_name, kind="prompt")
+                LLM_TOKENS.inc(usage.completion_tokens or 0, agent=agent_name, kind="completion")
+
+            # Extract string content
+            raw_text = response.chat_message.content
+            if not isinstance(raw_text, str):
+                raw_text = str(raw_text)
+
+            return _parse_reply(raw_text, policy, retry)
+
+        except Exception as e:
+            if (
+                retry["attempts"] >= max_attempts
+                or not _is_retryable(e)
+                or is_cancelled(cancellation_token)
+            ):
+                raise
+            delay = _backoff_delay(retry["attempts"], policy)
+            retry["retry_errors"].append(f"{type(e).__name__}: {str(e)[:200]}")
+            AGENT_RETRIES.inc(agent=agent_name)
+            print(f"🔁 {agent_name} attempt {retry['attempts']} failed "
+                  f"({type(e).__name__}); retrying in {delay:.2f}s")
+
+            # Start the next attempt from a clean conversation history
+            await _reset_agent(agent)
+            await asyncio.sleep(delay)
+            retry["retry_wait_seconds"] = round(retry["retry_wait_seconds"] + delay, 4)
+
+
+def _parse_reply(raw_text: str, policy: Dict[str, Any], retry: Dict[str, Any]) -> Dict[str, Any]:
+    """Strict parse first, then the local repair pass when enabled."""
+    started = time.perf_counter()
+    try:
+        parsed = _extract_json(raw_text)
+        JSON_EXTRACTION_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+        return parsed
+    except ValueError:
+        if not policy.get("json_repair", True):
+            JSON_EXTRACTION_SECONDS.observe(time.perf_counter() - started, outcome="failed")
+            raise
+    try:
+        parsed, repairs = repair_json(raw_text)
+    except ValueError:
+        JSON_EXTRACTION_SECONDS.observe(time.perf_counter() - started, outcome="failed")
+        raise
+    JSON_EXTRACTION_SECONDS.observe(time.perf_counter() - started, outcome="repaired")
+    retry["json_repairs"] = repairs
+    return parsed
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Transient provider failures and invalid replies are worth another attempt.
+    Hard timeouts are not: the deadline already bounds how long the agent may take.
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return False
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+def _backoff_delay(attempt: int, policy: Dict[str, Any]) -> float:
+    """Exponential backoff where `retry_jitter` of the delay is randomised."""
+    base = float(policy.get("retry_base_delay_seconds", 0.5))
+    cap = float(policy.get("retry_max_delay_seconds", 8.0))
+    jitter = min(1.0, max(0.0, float(policy.get("retry_jitter", 0.5))))
+    delay = min(cap, base * (2 ** (attempt - 1)))
+    return delay * (1.0 - jitter * random.random())
+
+
+async def _reset_agent(agent) -> None:
+    """Clear the agent's history; fakes without on_reset are left alone."""
+    reset = getattr(agent, "on_reset", None)
+    if reset is None:
+        return
+    result = reset(CancellationToken())
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _call_with_deadlines(
+    agent,
+    messages,
+    policy: Dict[str, Any],
+    tracker,
+    timing: Dict[str, Any],
+    cancellation_token: CancellationToken | None = None,
+    on_delta: Callable[[str], Awaitable[None]] | None = None,
+):
+    """
+    Run agent.on_messages under the policy's soft/hard timeouts.
+
+    With hedging enabled, a duplicate request is sent to a fresh copy of the
+    agent once the call outlives the agent's p90 latency (or the soft timeout
+    while there is not enough history). The first successful answer wins and
+    the loser is cancelled through its CancellationToken.
+
+    Each request's token is linked to the evaluation's `cancellation_token`;
+    cancelling that interrupts every request and raises EvaluationCancelled.
+    Only the primary request streams to `on_delta`; a hedge answers in one piece.
+
+    The deadlines and the hedge timer only run while the primary is not queued
+    in the rate limiter: a call waiting for its turn has not been slow yet, and
+    hedging it would only reserve more of the shared budget. Queue time is
+    reported separately as `queue_wait_seconds` (summed over attempts).
+
+    Fills `timing` with latency/hedging metadata for the caller's _meta block.
+    """
+    agent_name = getattr(agent, "name", "unknown_agent")
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    # Wakes the wait loop below when the primary joins or leaves the limiter queue
+    queue_changed = loop.create_future()
+
+    def _on_queue_change():
+        if not queue_changed.done():
+            queue_changed.set_result(None)
+
+    queue = QueueClock(clock=loop.time, on_change=_on_queue_change)
+
+    soft = policy.get("soft_timeout_seconds")
+    hard = policy.get("hard_timeout_seconds")
+    hedge_at = None
+    if policy.get("hedge"):
+        hedge_at = tracker.percentile(
+            agent_name, policy.get("hedge_percentile", 0.9), policy.get("hedge_min_samples", 20)
+        )
+        if hedge_at is None:
+            hedge_at = soft
+
+    if is_cancelled(cancellation_token):
+        raise EvaluationCancelled(f"{agent_name} cancelled before calling the LLM.")
+
+    # Resolves when the evaluation is cancelled, waking the wait loop below
+    cancelled = loop.create_future()
+    if cancellation_token is not None:
+        cancellation_token.link_future(cancelled)
+
+    primary_token = linked_token(cancellation_token)
+    primary = asyncio.ensure_future(_send(agent, messages, primary_token, on_delta, queue))
+    tokens = {primary: primary_token}
+    hedge = None
+    primary_seconds = None
+    last_error: Exception | None = None
+
+    timing.update({"hedged": False, "hedge_won": False, "soft_timeout_exceeded": False})
+    timing.setdefault("queue_wait_seconds", 0.0)
+    queue_wait_before = timing["queue_wait_seconds"]
+
+    def _elapsed() -> float:
+        # Time the call has been with the provider (queue time excluded)
+        return loop.time() - started - queue.queued_seconds()
+
+    try:
+        while tokens:
+            if queue_changed.done():
+                queue_changed = loop.create_future()
+            now = _elapsed()
+            deadlines = []
+            if not (primary in tokens and queue.queued):
+                if hard is not None:
+                    deadlines.append(hard - now)
+                if hedge_at is not None and hedge is None:
+                    deadlines.append(hedge_at - now)
+                if soft is not None and not timing["soft_timeout_exceeded"]:
+                    deadlines.append(soft - now)
+            wait_for = max(0.0, min(deadlines)) if deadlines else None
+
+            done, _ = await asyncio.wait(
+                [*tokens.keys(), cancelled, queue_changed],
+                timeout=wait_for,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            done.discard(queue_changed)
+            elapsed = _elapsed()
+
+            if cancelled.done():
+                timing["latency_seconds"] = round(elapsed, 4)
+                raise EvaluationCancelled(f"{agent_name} cancelled after {elapsed:.2f}s.")
+
+            for task in done:
+                tokens.pop(task)
+                if task is primary:
+                    primary_seconds = elapsed
+                if task.cancelled():
+                    last_error = EvaluationCancelled(f"{agent_name} request was cancelled.")
+                    continue
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+
+                # Winner — cancel whoever is still running
+                for loser, token in tokens.items():
+                    token.cancel()
+                    loser.cancel()
+                    if loser is primary:
+                        primary_seconds = elapsed  # lower bound: primary was still running
+                tokens.clear()
+
+                timing["latency_seconds"] = round(elapsed, 4)
+                timing["hedge_won"] = task is hedge
+                tracker.record(
+                    agent_name,
+                    effective_seconds=elapsed,
+                    primary_seconds=primary_seconds if primary_seconds is not None else elapsed,
+                    hedged=timing["hedged"],
+                    hedge_won=timing["hedge_won"],
+                    soft_timeout=timing["soft_timeout_exceeded"],
+                )
+                return task.result()
+
+            if done or (primary in tokens and queue.queued):
+                continue  # a request failed, or the primary is still queued
+
+            if soft is not None and elapsed >= soft and not timing["soft_timeout_exceeded"]:
+                timing["soft_timeout_exceeded"] = True
+                print(f"⚠️ {agent_name} exceeded soft timeout ({soft}s)")
+
+            if hard is not None and elapsed >= hard:
+                tracker.record_hard_timeout(agent_name, hedged=timing["hedged"])
+                timing["timed_out"] = True
+                raise asyncio.TimeoutError(f"{agent_name} exceeded hard timeout of {hard}s")
+
+            if hedge_at is not None and hedge is None and elapsed >= hedge_at:
+                hedge_token = linked_token(cancellation_token)
+                hedge = asyncio.ensure_future(
+                    clone_agent(agent).on_messages(messages, hedge_token)
+                )
+                tokens[hedge] = hedge_token
+                timing["hedged"] = True
+
+        raise last_error or RuntimeError(f"{agent_name} produced no response.")
+    finally:
+        timing["queue_wait_seconds"] = round(queue_wait_before + queue.queued_seconds(), 4)
+        cancelled.cancel()
+        queue_changed.cancel()
+        for task, token in tokens.items():
+            token.cancel()
+            task.cancel()
+
+
+async def _send(agent, messages, token: CancellationToken, on_delta=None, queue: QueueClock | None = None):
+    """
+    agent.on_messages, or — when a delta callback is given and the agent can
+    stream — on_messages_stream with every model chunk forwarded to it.
+
+    Runs as its own task, so `queue` (told when the call waits in the rate
+    limiter) is installed for this request only.
+    """
+    if queue is not None:
+        queue_clock.set(queue)
+    stream = getattr(agent, "on_messages_stream", None)
+    if on_delta is None or stream is None:
+        return await agent.on_messages(messages, token)
+
+    response = None
+    async for event in stream(messages, token):
+        if isinstance(event, ModelClientStreamingChunkEvent):
+            await on_delta(event.content)
+        elif isinstance(event, Response):
+            response = event
+    return response
 
 
 def _extract_json(text: str) -> Dict[str, Any]:
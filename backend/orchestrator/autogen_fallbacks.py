@@ -0,0 +1,241 @@
+"""
+Module 17: Degraded-Mode Fallbacks
+Deterministic stand-ins for agents while the LLM circuit breaker is open.
+
+Served only when an agent's call was rejected by an open circuit, so a
+provider incident costs milliseconds instead of a full timeout per agent.
+Every fallback output carries "degraded": true and _meta.fallback, and its
+confidence_score is deliberately low.
+
+  financial — FinancialEngine.run_analysis() + runway/margin health rules
+  validator — field-presence completeness + basic consistency checks
+  risk      — severity rules over upstream financial/competition/market outputs
+  longevity — runway-driven 3-year and novelty-adjusted 5-year survival
+
+Market, competition and investor fit have no deterministic equivalent; they
+keep their error output and are scored with defaults.
+"""
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from backend.finance_engine import FinancialEngine
+from backend.models import FinancialRawInput
+
+
+FALLBACK_CONFIDENCE = 0.3
+
+_REQUIRED_STARTUP = ("name", "industry", "stage", "description")
+_REQUIRED_FINANCIAL = ("revenue", "cogs", "operating_expenses", "cash_balance", "monthly_burn_rate")
+_EXPECTED_QUALITATIVE = (
+    "problem_description", "product_description", "target_customer_persona",
+    "competitors", "differentiation",
+)
+_SEVERITY = {"High": 0.8, "Medium": 0.5, "Low": 0.2}
+
+
+def _section(context: Mapping[str, Any], key: str) -> Mapping[str, Any]:
+    value = context.get(key)
+    return value if isinstance(value, Mapping) else {}
+
+
+def _upstream(context: Mapping[str, Any], step: str) -> Mapping[str, Any]:
+    output = _section(_section(context, "upstream_outputs"), step)
+    return {} if output.get("error") else output
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _runway_months(context: Mapping[str, Any]) -> Optional[float]:
+    """Runway from the upstream financial output, else cash / reported burn."""
+    runway = _number(_section(_upstream(context, "financial"), "metrics").get("runway_months"))
+    if runway is not None:
+        return runway
+    financial = _section(context, "financial_input")
+    cash, burn = _number(financial.get("cash_balance")), _number(financial.get("monthly_burn_rate"))
+    if cash is None or burn is None:
+        return None
+    return 999.0 if burn <= 0 else cash / burn
+
+
+# ── Agents ───────────────────────────────────────────────────
+
+def financial_fallback(context: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        raw = FinancialRawInput(**dict(_section(context, "financial_input")))
+    except Exception:
+        return None
+    calc = FinancialEngine(raw).run_analysis()
+
+    if calc.burn_rate_monthly <= 0:
+        health = 0.85
+    elif calc.runway_months >= 18:
+        health = 0.7
+    elif calc.runway_months >= 12:
+        health = 0.55
+    elif calc.runway_months >= 6:
+        health = 0.4
+    else:
+        health = 0.2
+    if calc.gross_margin_percent >= 50:
+        health = min(1.0, health + 0.1)
+
+    anomalies = []
+    if calc.runway_months < 6:
+        anomalies.append(f"Runway of {calc.runway_months:.1f} months is below 6 months")
+    if calc.gross_margin_percent < 0:
+        anomalies.append("Negative gross margin")
+    if raw.monthly_burn_rate and abs(raw.monthly_burn_rate - calc.burn_rate_monthly) > 0.5 * raw.monthly_burn_rate:
+        anomalies.append("Reported monthly burn differs from calculated burn by more than 50%")
+
+    return {
+        "metrics": {
+            "ebitda": calc.ebitda,
+            "burn_rate": calc.burn_rate_monthly,
+            "runway_months": calc.runway_months,
+            "revenue": raw.revenue,
+            "expenses": raw.cogs + raw.operating_expenses,
+            "gross_margin": calc.gross_margin_percent,
+            "net_margin": calc.net_margin_percent,
+        },
+        "arr": calc.arr,
+        "break_even_months": calc.break_even_months,
+        "score": round(health * 100),
+        "financial_health_score": round(health, 4),
+        "anomalies": anomalies,
+        "reasoning": "Deterministic metrics from FinancialEngine; LLM analysis unavailable.",
+        "confidence_score": FALLBACK_CONFIDENCE,
+    }
+
+
+def validator_fallback(context: Mapping[str, Any]) -> Dict[str, Any]:
+    startup = _section(context, "startup_context")
+    financial = _section(context, "financial_input")
+    qualitative = _section(context, "qualitative")
+
+    present = (
+        [bool(startup.get(f)) for f in _REQUIRED_STARTUP]
+        + [financial.get(f) is not None for f in _REQUIRED_FINANCIAL]
+        + [bool(qualitative.get(f)) for f in _EXPECTED_QUALITATIVE]
+    )
+    completeness = sum(present) / len(present)
+
+    flags: List[str] = []
+    if len(str(startup.get("description") or "")) < 20:
+        flags.append("Description is missing or too short to assess")
+    period_start, period_end = financial.get("period_start"), financial.get("period_end")
+    if period_start and period_end and str(period_end) <= str(period_start):
+        flags.append("Financial period ends before it starts")
+    if (_number(financial.get("cash_balance")) or 0) < 0:
+        flags.append("Negative cash balance")
+    revenue = _number(financial.get("revenue")) or 0
+    stage = str(startup.get("stage") or "").lower()
+    if stage in ("idea", "pre-seed", "pre seed") and revenue > 1_000_000:
+        flags.append(f"Revenue of {revenue:,.0f} is unusual for stage '{startup.get('stage')}'")
+
+    return {
+        "data_consistency_score": round(max(0.0, 1.0 - 0.25 * len(flags)), 4),
+        "completeness_score": round(completeness, 4),
+        "suspicion_flags": flags,
+        "requires_manual_review": len(flags) >= 2,
+        "confidence_score": FALLBACK_CONFIDENCE,
+    }
+
+
+def risk_fallback(context: Mapping[str, Any]) -> Dict[str, Any]:
+    risks = []
+    runway = _runway_months(context)
+    if runway is None:
+        risks.append(("Financial", "Runway could not be determined", "Medium"))
+    elif runway < 6:
+        risks.append(("Financial", f"Runway of {runway:.1f} months", "High"))
+    elif runway < 12:
+        risks.append(("Financial", f"Runway of {runway:.1f} months", "Medium"))
+
+    competition = _upstream(context, "competition")
+    competitor_risk = _number(competition.get("competitor_risk_score"))
+    if competitor_risk is not None and competitor_risk >= 0.7:
+        risks.append(("Competition", "Dense competitive landscape", "High"))
+    elif competitor_risk is None:
+        risks.append(("Competition", "Competitive landscape not assessed", "Medium"))
+
+    if not _upstream(context, "market"):
+        risks.append(("Market", "Market size not assessed", "Medium"))
+
+    severity = (
+        sum(_SEVERITY[level] for *_, level in risks) / len(risks) if risks else _SEVERITY["Low"]
+    )
+    return {
+        "risks": [
+            {"category": category, "description": description, "severity": level}
+            for category, description, level in risks
+        ],
+        "score": round((1.0 - severity) * 100),
+        "risk_severity_score": round(severity, 4),
+        "mitigation": "Rule-based assessment; re-run the evaluation once the LLM provider recovers.",
+        "confidence_score": FALLBACK_CONFIDENCE,
+    }
+
+
+def longevity_fallback(context: Mapping[str, Any]) -> Dict[str, Any]:
+    runway = _runway_months(context)
+    if runway is None:
+        survival_3yr = 0.4
+    elif runway >= 24:
+        survival_3yr = 0.7
+    elif runway >= 12:
+        survival_3yr = 0.55
+    elif runway >= 6:
+        survival_3yr = 0.4
+    else:
+        survival_3yr = 0.2
+
+    competition = _upstream(context, "competition")
+    factor = 0.75
+    if (_number(competition.get("novelty_score")) or 0) > 0.6:
+        factor += 0.1
+    if (_number(competition.get("competitor_risk_score")) or 0) > 0.7:
+        factor -= 0.15
+
+    return {
+        "survival_probability_3yr": survival_3yr,
+        "survival_probability_5yr": round(min(survival_3yr, survival_3yr * factor), 4),
+        "reasoning": "Runway-driven 3-year estimate, adjusted by novelty and competition for 5 years.",
+        "confidence_score": FALLBACK_CONFIDENCE,
+    }
+
+
+FALLBACKS: Dict[str, Callable[[Mapping[str, Any]], Optional[Dict[str, Any]]]] = {
+    "financial": financial_fallback,
+    "validator": validator_fallback,
+    "risk": risk_fallback,
+    "longevity": longevity_fallback,
+}
+
+
+def fallback_output(step: str, context: Mapping[str, Any], reason: str) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic output for `step`, marked degraded, or None when the step
+    has no fallback (or its inputs are unusable).
+
+    Args:
+        step: Logical pipeline step (e.g. "financial").
+        context: The step's full (unprojected) context.
+        reason: Why the LLM was not used, recorded in _meta.
+    """
+    build = FALLBACKS.get(step)
+    output = build(context) if build else None
+    if output is None:
+        return None
+    output["degraded"] = True
+    output["_meta"] = {
+        "agent": f"evaluator_{step}",
+        "degraded": True,
+        "fallback": "financial_engine" if step == "financial" else "rule_based",
+        "degraded_reason": reason,
+        "cache_hit": False,
+    }
+    return output
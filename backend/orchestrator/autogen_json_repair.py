@@ -0,0 +1,164 @@
+"""
+Module 9: Local JSON Repair
+Recovers slightly malformed agent replies without another LLM round-trip.
+
+Handles the mistakes LLMs make most often when asked for a JSON object:
+prose around the object, single-quoted strings, Python literals
+(True/False/None), trailing commas and output truncated mid-object.
+"""
+import json
+from typing import Any, Dict, List, Tuple
+
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def repair_json(text: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Parse the first JSON object in `text`, repairing it if necessary.
+
+    Args:
+        text: Raw agent reply.
+
+    Returns:
+        (parsed object, names of the repairs that were applied).
+
+    Raises:
+        ValueError: If no object can be recovered.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in agent response.")
+
+    repairs: List[str] = []
+    parts, stack, commas, end, scan_repairs = _scan(text, start)
+    repairs.extend(scan_repairs)
+    if text[:start].strip() or text[end:].strip():
+        repairs.append("stray_prose")
+
+    if not stack:
+        return _loads("".join(parts)), repairs
+
+    # Truncated reply: close what is open; if the tail is a half-written
+    # field, drop back to the last complete one and try again.
+    repairs.append("truncated")
+    cuts = [(len(parts), tuple(stack))] + list(reversed(commas))
+    for cut, open_stack in cuts:
+        candidate = "".join(parts[:cut]).rstrip()
+        if candidate.endswith(","):
+            candidate = candidate[:-1]
+        elif candidate.endswith(":"):
+            candidate += "null"
+        closing = "".join(_CLOSERS[ch] for ch in reversed(open_stack))
+        try:
+            return _loads(candidate + closing), repairs
+        except ValueError:
+            continue
+
+    raise ValueError("Could not repair truncated JSON in agent response.")
+
+
+def _loads(text: str) -> Dict[str, Any]:
+    try:
+        # strict=False tolerates raw newlines/tabs inside strings
+        value = json.loads(text, strict=False)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Repaired JSON is still invalid: {e}") from e
+    if not isinstance(value, dict):
+        raise ValueError("Agent response is not a JSON object.")
+    return value
+
+
+def _scan(text: str, start: int):
+    """
+    Walk the text from the first '{' and rewrite it into valid JSON tokens.
+
+    Returns:
+        (rewritten tokens, open brackets, [(comma token index, open brackets)],
+         index where scanning stopped, repairs applied)
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    commas: List[Tuple[int, Tuple[str, ...]]] = []
+    repairs: List[str] = []
+    i, n = start, len(text)
+
+    def note(name: str) -> None:
+        if name not in repairs:
+            repairs.append(name)
+
+    while i < n:
+        ch = text[i]
+
+        if ch in "\"'":
+            literal, i, closed = _read_string(text, i)
+            if ch == "'":
+                note("single_quotes")
+            if not closed:
+                note("unterminated_string")
+            out.append(literal)
+            continue
+
+        if ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if stack and _CLOSERS[stack[-1]] == ch:
+                stack.pop()
+            out.append(ch)
+            i += 1
+            if not stack:
+                break  # the top-level object is complete; ignore what follows
+            continue
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                note("trailing_commas")
+                i += 1
+                continue
+            commas.append((len(out), tuple(stack)))
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            if word in _PY_LITERALS:
+                note("python_literals")
+                word = _PY_LITERALS[word]
+            out.append(word)
+            i = j
+            continue
+
+        out.append(ch)
+        i += 1
+
+    return out, stack, commas, i, repairs
+
+
+def _read_string(text: str, i: int) -> Tuple[str, int, bool]:
+    """Read a quoted string starting at text[i] and return it double-quoted."""
+    quote = text[i]
+    buf = ['"']
+    j, n = i + 1, len(text)
+    while j < n:
+        c = text[j]
+        if c == "\\" and j + 1 < n:
+            nxt = text[j + 1]
+            # \' is not a valid JSON escape
+            buf.append("'" if nxt == "'" else c + nxt)
+            j += 2
+            continue
+        if c == quote:
+            buf.append('"')
+            return "".join(buf), j + 1, True
+        if c == '"':
+            buf.append('\\"')  # only reachable inside a single-quoted string
+        else:
+            buf.append(c)
+        j += 1
+    if buf[-1].endswith("\\"):
+        buf.pop()
+    buf.append('"')
+    return "".join(buf), n, False
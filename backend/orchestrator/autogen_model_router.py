@@ -0,0 +1,115 @@
+"""
+Module 16: Tiered Model Routing
+Runs an agent on a small, fast model first and escalates to the large one
+only when the answer is not good enough.
+
+The route of each agent (tiers in order, min_confidence, required_fields)
+lives in backend.llm_config. A reply escalates to the next tier when:
+  - no valid JSON came back (the call ended in an error),
+  - a required field is missing, or
+  - its confidence_score is below min_confidence.
+
+The tier that answered is recorded in the output's _meta, so latency and
+quality can be compared per tier. _meta.usage covers every tier that was
+called, priced per model.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from backend.agents.autogen_registry import tier_agent_name
+from backend.llm_config import DEFAULT_TIER, get_agent_route, get_model_tiers
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_usage import add_usage, empty_usage, price_usage, spent_usage
+
+
+def escalation_reason(output: Mapping[str, Any], route: Mapping[str, Any]) -> Optional[str]:
+    """Why this output should go to the next tier, or None if it is good enough."""
+    if output.get("error"):
+        return "error"
+
+    missing = [f for f in route.get("required_fields", ()) if output.get(f) is None]
+    if missing:
+        return f"missing_fields: {', '.join(missing)}"
+
+    try:
+        confidence = float(output.get("confidence_score"))
+    except (TypeError, ValueError):
+        return "invalid confidence_score"
+    if confidence < route.get("min_confidence", 0.0):
+        return f"low_confidence: {confidence} < {route['min_confidence']}"
+    return None
+
+
+def available_tiers(agents: Mapping[str, Any], agent_name: str, route: Mapping[str, Any]) -> List[str]:
+    """Tiers of the route that have an agent built; never empty."""
+    tiers = [t for t in route.get("tiers", ()) if tier_agent_name(agent_name, t) in agents]
+    return tiers or [DEFAULT_TIER]
+
+
+async def execute_routed_agent(
+    agents: Mapping[str, Any],
+    agent_name: str,
+    context: Dict[str, Any],
+    route: Dict[str, Any] | None = None,
+    on_delta: Callable[[str, int], Awaitable[None]] | None = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    execute_autogen_agent() across the agent's model tiers.
+
+    Args:
+        agents: Agent set from the registry ("evaluator_x" plus "evaluator_x@tier"
+                variants). Tiers without an agent are skipped, so plain agent
+                sets run on DEFAULT_TIER exactly as before.
+        agent_name: e.g. "evaluator_market".
+        context: Projected context sent to the agent.
+        route: Optional routing; defaults to get_agent_route(agent_name).
+        on_delta: Optional async callable(text, attempt). Attempt numbers keep
+                  counting across tiers, so an escalation restarts the reply
+                  like a retry does.
+        **kwargs: Passed through to execute_autogen_agent (cache, tracker, ...).
+
+    Returns:
+        The accepted output. Its _meta gains "model_tier", "model",
+        "escalations" ([{"tier", "reason"}] for every tier that was passed over)
+        and "usage" summed over all tiers called.
+        If the last tier fails outright, the best earlier answer is kept.
+    """
+    route = route or get_agent_route(agent_name)
+    tiers = available_tiers(agents, agent_name, route)
+    escalations: List[Dict[str, str]] = []
+    fallback = None
+    attempt_offset = 0
+    usage = empty_usage()
+
+    for index, tier in enumerate(tiers):
+        tier_delta = None
+        if on_delta is not None:
+            async def tier_delta(text: str, attempt: int, offset: int = attempt_offset):
+                await on_delta(text, attempt + offset)
+
+        output = await execute_autogen_agent(
+            agents[tier_agent_name(agent_name, tier)], context, on_delta=tier_delta, **kwargs
+        )
+        meta = output.setdefault("_meta", {})
+        meta.update({"model_tier": tier, "model": get_model_tiers().get(tier)})
+        tier_usage = spent_usage(output)
+        if tier_usage is not None:
+            add_usage(usage, price_usage(dict(tier_usage), meta["model"]))
+        attempt_offset += meta.get("attempts", 1)
+
+        reason = escalation_reason(output, route)
+        if reason is None or output.get("cancelled") or index == len(tiers) - 1:
+            break
+        escalations.append({"tier": tier, "reason": reason})
+        if not output.get("error"):
+            fallback = output
+        print(f"⬆️ {agent_name} escalating from {tier} ({reason})")
+
+    if output.get("error") and fallback is not None and not output.get("cancelled"):
+        output = fallback
+        output["_meta"]["escalation_failed"] = True
+
+    output["_meta"]["escalations"] = escalations
+    if not output["_meta"].get("cache_hit"):
+        output["_meta"]["usage"] = usage
+    return output
@@ -2,20 +2,49 @@
 Module 5: Main AutoGen Evaluation Orchestrator
 Deterministic multi-agent pipeline using controlled single-agent calls.
 
-Pipeline:
-  Step 1: Validator
-  Step 2: Financial + Market + Competition (parallel)
-  Step 3: Risk (depends on Step 2)
-  Step 4: Longevity (depends on Step 3)
-  Step 5: Investor Fit (depends on Step 4)
+Pipeline (DEFAULT_PIPELINE_DAG, overridable per deployment via PIPELINE_DAG):
+  Validator, Financial, Market, Competition   (no upstream dependencies)
+  Risk          <- Financial + Market + Competition
+  Longevity     <- Validator + Financial + Market + Competition
+  Investor Fit  <- Validator + Financial + Market + Competition
+
+Each agent starts as soon as its own upstream outputs are ready, and receives
+only the fields listed in its projection spec (Module 10).
+
+Each agent answers on the cheapest model tier its route allows and escalates
+to a larger model only when the reply is not good enough (Module 16).
+
+While the LLM circuit breaker is open, agents with a deterministic fallback
+(Module 17) answer from it and are marked degraded.
+
+With the validator gate enforced (Module 15), every root agent waits for the
+Validator, and a submission that fails the gate skips the rest of the pipeline.
 """
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Sequence
+from uuid import uuid4
 
-from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
-from backend.orchestrator.autogen_parallel_executor import run_autogen_parallel
-from backend.orchestrator.autogen_context_builder import build_autogen_context
+from backend.agents.autogen_rate_limiter import rate_limit_key
+from backend.metrics import EVALUATIONS_IN_FLIGHT, STAGE_SECONDS
+
+from backend.orchestrator.autogen_cancellation import is_cancelled
+from backend.orchestrator.autogen_context_builder import build_autogen_context, freeze
+from backend.orchestrator.autogen_context_projection import context_token_report, project_context
+from backend.orchestrator.autogen_dag_scheduler import load_pipeline_dag, run_dag, validate_dag
+from backend.orchestrator.autogen_execution_policy import get_latency_tracker
+from backend.orchestrator.autogen_fallbacks import fallback_output
+from backend.orchestrator.autogen_model_router import execute_routed_agent
+from backend.orchestrator.autogen_response_cache import cache_key
 from backend.orchestrator.autogen_result_aggregator import build_orchestration_result
+from backend.orchestrator.autogen_stream_parser import IncrementalJSONParser
+from backend.orchestrator.autogen_validator_gate import (
+    GATE_STEP,
+    evaluate_gate,
+    gated_dag,
+    get_gate_policy,
+    get_shared_gate_stats,
+)
 
 
 class AutoGenEvaluationOrchestrator:
@@ -24,33 +53,55 @@ class AutoGenEvaluationOrchestrator:
     Uses controlled single-agent calls (no GroupChat).
     """
 
-    def __init__(self, agents: Dict[str, Any]):
+    def __init__(
+        self,
+        agents: Dict[str, Any],
+        dag: Mapping[str, Sequence[str]] | None = None,
+        cache=None,
+        tracker=None,
+        gate_policy: Mapping[str, Any] | None = None,
+        gate_stats=None,
+    ):
         """
         Args:
             agents: Dictionary from initialize_agents().
-                    Must contain keys: evaluator_validator, evaluator_financial,
+                    Must contain an "evaluator_<step>" agent for every DAG step
+                    (by default: evaluator_validator, evaluator_financial,
                     evaluator_market, evaluator_competition, evaluator_risk,
-                    evaluator_longevity, evaluator_investor_fit.
+                    evaluator_longevity, evaluator_investor_fit).
+            dag: Optional step -> upstream steps mapping.
+                 Defaults to load_pipeline_dag().
+            cache: Optional AgentResponseCache shared across evaluations.
+            tracker: Optional LatencyTracker (defaults to the process-wide one).
+            gate_policy: Optional overrides of the validator gate policy
+                         (e.g. {"mode": "enforce"}); see get_gate_policy().
+            gate_stats: Optional GateStats (defaults to the process-wide one).
         """
         self.agents = agents
+        self.cache = cache
+        self.tracker = tracker or get_latency_tracker()
+        self.dag = validate_dag(dag) if dag is not None else load_pipeline_dag()
+        self.gate_policy = get_gate_policy(gate_policy)
+        self.gate_stats = gate_stats or get_shared_gate_stats()
 
         # Validate required agents exist
-        required = [
-            "evaluator_validator",
-            "evaluator_financial",
-            "evaluator_market",
-            "evaluator_competition",
-            "evaluator_risk",
-            "evaluator_longevity",
-            "evaluator_investor_fit",
-        ]
+        required = [f"evaluator_{step}" for step in self.dag]
         missing = [name for name in required if name not in agents]
         if missing:
             raise ValueError(f"Missing required agents: {missing}")
 
+        # Steps whose outputs feed other steps (frozen once, shared by dependents)
+        self._downstream_steps = {dep for deps in self.dag.values() for dep in deps}
+
     async def run_full_evaluation(
         self, startup_context: Dict[str, Any],
-        progress_callback=None
+        progress_callback=None,
+        cache_mode: str | None = None,
+        completed_outputs: Dict[str, Any] | None = None,
+        on_step_complete=None,
+        cancellation_token=None,
+        delta_callback=None,
+        prior_outputs: Dict[str, Dict[str, Any]] | None = None,
     ) -> Dict[str, Any]:
         """
         Execute the full evaluation pipeline.
@@ -59,7 +110,25 @@ class AutoGenEvaluationOrchestrator:
             startup_context: Dictionary containing startup data
                              (StartupContext + FinancialRawInput serialized).
             progress_callback: Optional async callable(agent_name, status).
-                               Called at each step boundary for real-time progress.
+                               Called when each agent starts and completes.
+            cache_mode: "bypass" forces fresh LLM calls for this evaluation.
+            completed_outputs: Optional step -> output of agents that already
+                               ran (e.g. a job checkpoint); they are not re-run.
+            on_step_complete: Optional async callable(step, output), awaited
+                              after each agent finishes (used for checkpoints).
+            cancellation_token: Optional autogen CancellationToken. Cancelling
+                                it interrupts agents in flight; agents that
+                                have not started are skipped without an LLM call.
+            delta_callback: Optional async callable(step, delta). When given,
+                            agents stream their replies; each delta is
+                            {"text", "attempt", "fields"} where fields holds the
+                            top-level JSON fields that closed in this chunk.
+            prior_outputs: Optional step -> {"fingerprint", "output"} from an
+                           earlier evaluation of the same startup. An agent
+                           whose input fingerprint still matches reuses that
+                           output instead of calling the LLM; since
+                           fingerprints cover upstream outputs, a recomputed
+                           agent invalidates exactly its dependents.
 
         Returns:
             Final orchestration result with all agent outputs.
@@ -68,94 +137,212 @@ class AutoGenEvaluationOrchestrator:
             if progress_callback:
                 await progress_callback(agent, status)
 
+        bypass_cache = cache_mode == "bypass"
+
+        # Freeze the inputs once; every agent context below shares these views
+        base_view = freeze(startup_context)
+        output_views: Dict[str, Any] = {}
+
+        # Validator gate decision; "passed" stays None until the validator is done
+        gate_mode = self.gate_policy["mode"] if GATE_STEP in self.dag else "off"
+        gate: Dict[str, Any] = {"mode": gate_mode, "passed": None, "reasons": [], "skipped": []}
+
+        def _check_gate(validator_output: Dict[str, Any]):
+            if gate_mode != "off" and gate["passed"] is None:
+                gate.update(evaluate_gate(validator_output, self.gate_policy))
+
+        if GATE_STEP in (completed_outputs or {}):
+            _check_gate(completed_outputs[GATE_STEP])
+
+        def _delta_forwarder(step: str):
+            # One parser per attempt: a retry restarts the reply from scratch
+            state = {"attempt": None, "parser": None}
+
+            async def _on_delta(text: str, attempt: int):
+                if attempt != state["attempt"]:
+                    state.update(attempt=attempt, parser=IncrementalJSONParser())
+                fields = dict(state["parser"].feed(text))
+                await delta_callback(step, {"text": text, "attempt": attempt, "fields": fields})
+
+            return _on_delta
+
+        async def _run_step(step: str, upstream: Dict[str, Any]) -> Dict[str, Any]:
+            if is_cancelled(cancellation_token):
+                return {
+                    "error": True,
+                    "cancelled": True,
+                    "agent": f"evaluator_{step}",
+                    "message": "Evaluation cancelled before this agent started.",
+                    "_meta": {"skipped": True},
+                }
+            if gate_mode == "enforce" and gate["passed"] is False:
+                await _notify(step, "skipped")
+                return {
+                    "error": True,
+                    "gated": True,
+                    "agent": f"evaluator_{step}",
+                    "message": "Skipped: submission failed the validator gate.",
+                    "_meta": {"gated": True},
+                }
+            await _notify(step, "running")
+            with STAGE_SECONDS.time(stage="context"):
+                # Root agents see the base data; dependents also get upstream outputs
+                full_context = (
+                    build_autogen_context(
+                        base_view, {name: output_views.get(name, output) for name, output in upstream.items()}
+                    )
+                    if upstream else base_view
+                )
+                context = project_context(step, full_context)
+            agent = self.agents[f"evaluator_{step}"]
+            # Fingerprint of exactly what the agent sees (prompt, model, projected input)
+            fingerprint = cache_key(agent, context)
+
+            prior = (prior_outputs or {}).get(step)
+            if (
+                prior and prior.get("fingerprint") == fingerprint
+                and not prior["output"].get("error") and not prior["output"].get("degraded")
+            ):
+                output = {
+                    **prior["output"],
+                    "_meta": {**prior["output"].get("_meta", {}), "cache_hit": False, "reused": True},
+                }
+            else:
+                output = await execute_routed_agent(
+                    self.agents, f"evaluator_{step}", context,
+                    cache=self.cache, bypass_cache=bypass_cache,
+                    tracker=self.tracker, cancellation_token=cancellation_token,
+                    on_delta=_delta_forwarder(step) if delta_callback else None,
+                )
+                if output.get("circuit_open"):
+                    # Provider degraded: answer deterministically instead of failing
+                    output = fallback_output(step, full_context, output.get("message", "")) or output
+            meta = output.setdefault("_meta", {})
+            meta["input_fingerprint"] = fingerprint
+            meta["context_tokens"] = context_token_report(full_context, context)
+            if step == GATE_STEP:
+                _check_gate(output)
+            if step in self._downstream_steps:
+                output_views[step] = freeze(output)
+            if on_step_complete:
+                await on_step_complete(step, output)
+            await _notify(step, "completed")
+            return output
+
         started_at = datetime.now(timezone.utc).isoformat()
-        agent_outputs: Dict[str, Any] = {}
+        evaluation_started = time.perf_counter()
 
-        # ── Step 1: Validator ─────────────────────────────────
-        await _notify("validator", "running")
-        validator_output = await execute_autogen_agent(
-            self.agents["evaluator_validator"],
-            startup_context
-        )
-        agent_outputs["validator"] = validator_output
-        await _notify("validator", "completed")
-
-        # ── Step 2: Parallel Core Agents ──────────────────────
-        await _notify("financial", "running")
-        await _notify("market", "running")
-        await _notify("competition", "running")
-
-        parallel_results = await run_autogen_parallel([
-            execute_autogen_agent(
-                self.agents["evaluator_financial"],
-                startup_context
-            ),
-            execute_autogen_agent(
-                self.agents["evaluator_market"],
-                startup_context
-            ),
-            execute_autogen_agent(
-                self.agents["evaluator_competition"],
-                startup_context
-            ),
-        ])
-
-        financial_output = parallel_results[0]
-        market_output = parallel_results[1]
-        competition_output = parallel_results[2]
-
-        agent_outputs["financial"] = financial_output
-        agent_outputs["market"] = market_output
-        agent_outputs["competition"] = competition_output
-
-        await _notify("financial", "completed")
-        await _notify("market", "completed")
-        await _notify("competition", "completed")
-
-        # ── Step 3: Parallel Advanced Agents (Risk, Longevity, Investor) ──────
-        # Optimized: These now run in parallel, using only the base data.
-        # This trades off a bit of "coherence" (Investor seeing Risk output) for speed.
-        
-        # Risk Context
-        risk_ctx = build_autogen_context(startup_context, {
-            "financial": financial_output,
-            "market": market_output,
-            "competition": competition_output,
-        })
-
-        # Longevity Context (Removed dependency on Risk)
-        longevity_ctx = build_autogen_context(startup_context, {
-            "validator": validator_output,
-            "financial": financial_output,
-            "market": market_output,
-            "competition": competition_output,
-        })
-        
-        # Investor Context (Removed dependency on Risk/Longevity)
-        investor_ctx = build_autogen_context(startup_context, {
-            "validator": validator_output,
-            "financial": financial_output,
-            "market": market_output,
-            "competition": competition_output,
-        })
-
-        await _notify("risk", "running")
-        await _notify("longevity", "running")
-        await _notify("investor_fit", "running")
-
-        advanced_results = await run_autogen_parallel([
-            execute_autogen_agent(self.agents["evaluator_risk"], risk_ctx),
-            execute_autogen_agent(self.agents["evaluator_longevity"], longevity_ctx),
-            execute_autogen_agent(self.agents["evaluator_investor_fit"], investor_ctx),
-        ])
-
-        agent_outputs["risk"] = advanced_results[0]
-        agent_outputs["longevity"] = advanced_results[1]
-        agent_outputs["investor_fit"] = advanced_results[2]
-
-        await _notify("risk", "completed")
-        await _notify("longevity", "completed")
-        await _notify("investor_fit", "completed")
+        # All LLM calls of this evaluation share one fair-queue slot in the rate limiter
+        key_token = rate_limit_key.set(f"evaluation:{uuid4()}")
+        EVALUATIONS_IN_FLIGHT.inc()
+        try:
+            dag = gated_dag(self.dag) if gate_mode == "enforce" else self.dag
+            with STAGE_SECONDS.time(stage="agents"):
+                agent_outputs = await run_dag(dag, _run_step, completed=completed_outputs)
+        finally:
+            EVALUATIONS_IN_FLIGHT.dec()
+            rate_limit_key.reset(key_token)
+
+        aggregate_started = time.perf_counter()
+
+        if gate["passed"] is False:
+            if gate_mode == "enforce":
+                gate["skipped"] = [s for s, o in agent_outputs.items() if o.get("gated")]
+            else:
+                # Shadow: the calls enforcing the gate would have saved
+                gate["skipped"] = [
+                    s for s, o in agent_outputs.items()
+                    if s != GATE_STEP and not o.get("_meta", {}).get("reused")
+                    and not o.get("_meta", {}).get("cache_hit")
+                    and not o.get("_meta", {}).get("skipped")
+                ]
+        self.gate_stats.record(gate)
 
         # ── Aggregate ─────────────────────────────────────────
-        return build_orchestration_result(agent_outputs, started_at)
+        result = build_orchestration_result(
+            agent_outputs, started_at,
+            meta=self._build_meta(
+                agent_outputs, cancelled=is_cancelled(cancellation_token), gate=gate
+            ),
+        )
+        finished = time.perf_counter()
+        STAGE_SECONDS.observe(finished - aggregate_started, stage="aggregate")
+        STAGE_SECONDS.observe(finished - evaluation_started, stage="evaluation")
+        return result
+
+    def _build_meta(
+        self, agent_outputs: Dict[str, Any], cancelled: bool = False,
+        gate: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        """Per-run latency/hedging summary plus the process-wide tail stats."""
+        def _flagged(flag: str):
+            return [
+                step for step, output in agent_outputs.items()
+                if isinstance(output, dict) and output.get("_meta", {}).get(flag)
+            ]
+
+        hedged = _flagged("hedged")
+        reports = [
+            output["_meta"]["context_tokens"] for output in agent_outputs.values()
+            if isinstance(output, dict) and "context_tokens" in output.get("_meta", {})
+        ]
+        projected = sum(r["projected"] for r in reports)
+        unprojected = sum(r["unprojected"] for r in reports)
+        return {
+            "context_tokens": {
+                "projected": projected,
+                "unprojected": unprojected,
+                "reduction_pct": round(100.0 * (1 - projected / unprojected), 1) if unprojected else 0.0,
+            },
+            "hedging": {
+                "agents_hedged": hedged,
+                "hedge_wins": _flagged("hedge_won"),
+                "hedge_rate": round(len(hedged) / len(agent_outputs), 4) if agent_outputs else 0.0,
+                "process": self.tracker.stats(),
+            },
+            "timeouts": {
+                "soft": _flagged("soft_timeout_exceeded"),
+                "hard": _flagged("timed_out"),
+            },
+            "reuse": {
+                # Reused from the startup's previous evaluation (matching fingerprint)
+                "reused": _flagged("reused"),
+                "recomputed": [
+                    step for step, output in agent_outputs.items()
+                    if isinstance(output, dict) and not output.get("_meta", {}).get("reused")
+                    and not output.get("_meta", {}).get("skipped")
+                    and not output.get("_meta", {}).get("gated")
+                ],
+                "fingerprints": {
+                    step: output["_meta"]["input_fingerprint"]
+                    for step, output in agent_outputs.items()
+                    if isinstance(output, dict) and "input_fingerprint" in output.get("_meta", {})
+                },
+            },
+            "cancellation": {
+                "cancelled": cancelled,
+                # Skipped agents never called the LLM; interrupted ones were cut off mid-call
+                "skipped": _flagged("skipped"),
+                "interrupted": [
+                    step for step, output in agent_outputs.items()
+                    if isinstance(output, dict) and output.get("cancelled")
+                    and not output.get("_meta", {}).get("skipped")
+                ],
+            },
+            "model_tiers": {
+                # Tier whose answer was used, per agent that called the LLM
+                "answered_by": {
+                    step: output["_meta"]["model_tier"]
+                    for step, output in agent_outputs.items()
+                    if isinstance(output, dict) and "model_tier" in output.get("_meta", {})
+                },
+                "escalated": [
+                    step for step, output in agent_outputs.items()
+                    if isinstance(output, dict) and output.get("_meta", {}).get("escalations")
+                ],
+            },
+            # Deterministic fallbacks served while the LLM circuit was open
+            "degraded": _flagged("degraded"),
+            # {"mode", "passed", "reasons", "skipped"}; passed is None when not evaluated
+            "gate": gate or {"mode": "off", "passed": None, "reasons": [], "skipped": []},
+        }
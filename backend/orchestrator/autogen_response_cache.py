@@ -0,0 +1,315 @@
+"""
+Module 7: Content-Addressed Agent Response Cache
+Skips repeat LLM calls when an agent sees exactly the same input again.
+
+Key = SHA-256 of (agent name, system prompt, model, temperature, canonical context JSON).
+Tiers: in-memory LRU (always) + optional on-disk SQLite (survives restarts,
+shared by workers on the same host). Both tiers honour a TTL and a size bound.
+
+The cache is opt-in (AGENT_CACHE_ENABLED=1): a replayed output is not a fresh
+judgement, so deployments choose it explicitly. The execution wrapper uses
+lookup()/store(), which run the SQLite tier on the DBExecutor; get()/set()
+are the blocking equivalents for scripts and tests.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from backend.agents.autogen_circuit_breaker import CircuitBreakingChatCompletionClient
+from backend.agents.autogen_rate_limiter import RateLimitedChatCompletionClient
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_DISK_MAX_ENTRIES = 10000
+
+
+def _strip_meta(value: Any) -> Any:
+    """Drop `_meta` blocks (timestamps, cache flags) so they never affect the key."""
+    if isinstance(value, dict):
+        return {k: _strip_meta(v) for k, v in value.items() if k != "_meta"}
+    if isinstance(value, (list, tuple)):
+        return [_strip_meta(v) for v in value]
+    return value
+
+
+def canonical_json(context: Any) -> str:
+    """Order-independent, whitespace-free JSON used for hashing."""
+    return json.dumps(
+        _strip_meta(context), sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+def describe_agent(agent) -> Dict[str, Any]:
+    """
+    Extract the parts of an agent that influence its output.
+    Works with AssistantAgent; falls back to None for fakes/mocks.
+    """
+    system_messages = getattr(agent, "_system_messages", None) or []
+    system_prompt = getattr(system_messages[0], "content", None) if system_messages else None
+    client = getattr(agent, "_model_client", None)
+    # Unwrap the circuit breaker / rate limiter decorators
+    while isinstance(client, (CircuitBreakingChatCompletionClient, RateLimitedChatCompletionClient)):
+        client = client.wrapped
+    create_args = getattr(client, "_create_args", None) or {}
+    return {
+        "agent": getattr(agent, "name", "unknown_agent"),
+        "system_prompt": system_prompt if isinstance(system_prompt, str) else None,
+        "model": create_args.get("model"),
+        "temperature": create_args.get("temperature"),
+    }
+
+
+def cache_key(agent, context: Any) -> str:
+    """SHA-256 over the agent description and the canonicalised context."""
+    payload = json.dumps(describe_agent(agent), sort_keys=True) + "\n" + canonical_json(context)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AgentResponseCache:
+    """
+    Two-tier TTL cache of successful agent outputs.
+    Values are stored as JSON strings so callers always get a private copy.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        sqlite_path: Optional[str] = None,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+        executor: Optional[DBExecutor] = None,
+    ):
+        """
+        Args:
+            max_entries: LRU bound of the in-memory tier.
+            ttl_seconds: Lifetime of an entry in both tiers.
+            sqlite_path: Optional path to an SQLite file for the disk tier.
+            disk_max_entries: Row bound of the disk tier (least recently used evicted).
+            clock: Time source (seconds), injectable for tests.
+            executor: Runs the disk tier for lookup()/store(); defaults to
+                      the shared DBExecutor.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self.executor = executor
+        self._clock = clock
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        # Memory tier and counters; the disk tier has its own lock so a slow
+        # file never holds up memory hits
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS agent_response_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_agent_response_cache_access"
+                " ON agent_response_cache(last_access)"
+            )
+            self._db.commit()
+
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    # ── Public API ───────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached output, or None on miss/expiry."""
+        now = self._clock()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            value = self._promote(key, self._disk_get(key, now))
+        return self._count_miss() if value is None else value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store an agent output under `key` in every tier."""
+        expires_at, payload = self._memory_set(key, value)
+        self._disk_put(key, expires_at, payload)
+
+    async def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """get() with the disk tier read on the DBExecutor."""
+        now = self._clock()
+        value = self._memory_get(key, now)
+        if value is None and self._db is not None:
+            try:
+                value = self._promote(key, await self._run(self._disk_get, key, now))
+            except Exception as e:
+                print(f"⚠️ Response cache read failed: {e}")
+        return self._count_miss() if value is None else value
+
+    async def store(self, key: str, value: Dict[str, Any]) -> None:
+        """set() with the disk tier written on the DBExecutor."""
+        expires_at, payload = self._memory_set(key, value)
+        if self._db is None:
+            return
+        try:
+            await self._run(self._disk_put, key, expires_at, payload)
+        except Exception as e:
+            # The output is still served from memory; only the disk copy is lost
+            print(f"⚠️ Response cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM agent_response_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None,
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    # ── Tiers ────────────────────────────────────────────────
+
+    def _memory_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return json.loads(payload)
+            del self._memory[key]
+            self._counters["expirations"] += 1
+            return None
+
+    def _memory_set(self, key: str, value: Dict[str, Any]) -> tuple:
+        payload = json.dumps(value, default=str)
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._memory_put(key, expires_at, payload)
+            self._counters["sets"] += 1
+        return expires_at, payload
+
+    def _promote(self, key: str, found: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        """Copy a disk hit into memory and count it."""
+        if found is None:
+            return None
+        expires_at, payload = found
+        with self._lock:
+            self._memory_put(key, expires_at, payload)
+            self._counters["hits"] += 1
+            self._counters["disk_hits"] += 1
+        return json.loads(payload)
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    async def _run(self, fn, *args) -> Any:
+        return await (self.executor or get_shared_db_executor()).run(fn, *args)
+
+    def _memory_put(self, key: str, expires_at: float, payload: str) -> None:
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        """(expires_at, payload) from the SQLite tier, or None."""
+        with self._db_lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires_at FROM agent_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM agent_response_cache WHERE key = ?", (key,))
+                self._db.commit()
+                expired = True
+            else:
+                self._db.execute(
+                    "UPDATE agent_response_cache SET last_access = ? WHERE key = ?", (now, key)
+                )
+                self._db.commit()
+                expired = False
+        if expired:
+            with self._lock:
+                self._counters["expirations"] += 1
+            return None
+        return expires_at, value
+
+    def _disk_put(self, key: str, expires_at: float, payload: str) -> None:
+        now = self._clock()
+        with self._db_lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO agent_response_cache (key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            evicted = self._db.execute(
+                "DELETE FROM agent_response_cache WHERE key IN ("
+                " SELECT key FROM agent_response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            ).rowcount
+            self._db.commit()
+        with self._lock:
+            self._counters["evictions"] += max(evicted, 0)
+
+
+_shared_cache: Optional[AgentResponseCache] = None
+
+
+def get_shared_response_cache() -> Optional[AgentResponseCache]:
+    """
+    Returns the process-wide response cache configured from the environment,
+    or None unless AGENT_CACHE_ENABLED is "1"/"true" (the cache is opt-in).
+    """
+    global _shared_cache
+    if os.environ.get("AGENT_CACHE_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+    if _shared_cache is None:
+        _shared_cache = AgentResponseCache(
+            max_entries=int(os.environ.get("AGENT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            ttl_seconds=float(os.environ.get("AGENT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            sqlite_path=os.environ.get("AGENT_CACHE_SQLITE_PATH") or None,
+            disk_max_entries=int(os.environ.get("AGENT_CACHE_DISK_MAX_ENTRIES", DEFAULT_DISK_MAX_ENTRIES)),
+        )
+    return _shared_cache
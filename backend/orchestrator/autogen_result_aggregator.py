@@ -5,10 +5,13 @@ Packages all agent outputs into a final orchestration result object.
 from datetime import datetime, timezone
 from typing import Any, Dict
 
+from backend.orchestrator.autogen_usage import summarize_usage
+
 
 def build_orchestration_result(
     agent_outputs: Dict[str, Dict[str, Any]],
-    started_at: str
+    started_at: str,
+    meta: Dict[str, Any] | None = None,
 ) -> Dict[str, Any]:
     """
     Aggregate all agent outputs into a final result object.
@@ -16,9 +19,11 @@ def build_orchestration_result(
     Args:
         agent_outputs: Dictionary mapping agent_name -> agent output dict.
         started_at: ISO timestamp of when the orchestration started.
+        meta: Optional orchestration-level metadata, returned under "_meta".
 
     Returns:
-        Final orchestration result dictionary.
+        Final orchestration result dictionary, with token usage and cost
+        per agent under "usage".
     """
     completed_at = datetime.now(timezone.utc).isoformat()
 
@@ -28,7 +33,7 @@ def build_orchestration_result(
         if isinstance(v, dict) and v.get("error")
     )
 
-    return {
+    result = {
         "started_at": started_at,
         "completed_at": completed_at,
         "agents": agent_outputs,
@@ -36,5 +41,9 @@ def build_orchestration_result(
             "total_agents": len(agent_outputs),
             "successful": len(agent_outputs) - error_count,
             "failed": error_count,
-        }
+        },
+        "usage": summarize_usage(agent_outputs),
     }
+    if meta is not None:
+        result["_meta"] = meta
+    return result
@@ -0,0 +1,353 @@
+"""
+Module 14: Single-Flight Evaluations
+Coalesces concurrent identical evaluations onto one run.
+
+A double-clicked submit or a frontend retry used to start a second
+seven-agent pipeline and write a second report row. Runs are now keyed on
+startup_id + a hash of the request payload: a duplicate that arrives while
+the first is running attaches to it, SSE subscribers receive the same
+progress stream (replayed from the start for late joiners), and only one
+report is persisted.
+
+An optional Idempotency-Key extends this past completion: a retry carrying
+the same key within IDEMPOTENCY_TTL_SECONDS gets the stored report back
+instead of starting a new run. Reusing a key with a different payload is
+rejected. Keys live in a shared SQLite file (IDEMPOTENCY_SQLITE_PATH), so a
+retry that lands on another worker process, or on this one after a restart,
+is still replayed. The file is read and written on the DBExecutor.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from autogen_core import CancellationToken
+
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+
+
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "1024"))
+DEFAULT_IDEMPOTENCY_PATH = os.path.join(tempfile.gettempdir(), "ideaevaluator_idempotency.db")
+
+# Request fields that change how a caller listens, not what is evaluated.
+# `metadata` is client bookkeeping (the form stamps submitted_at on every
+# submit) and no agent sees it, so a double-click still coalesces.
+_NON_IDENTITY_FIELDS = ("on_disconnect", "metadata")
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused with a different request payload."""
+
+
+def evaluation_key(payload: Dict[str, Any]) -> str:
+    """startup_id (when the client sent one) + SHA-256 of the canonical payload."""
+    identity = {k: v for k, v in payload.items() if k not in _NON_IDENTITY_FIELDS}
+    canonical = json.dumps(identity, sort_keys=True, separators=(",", ":"), default=str)
+    startup_id = (payload.get("startup_context") or {}).get("startup_id") or "-"
+    return f"{startup_id}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class Flight:
+    """
+    One in-flight evaluation and everyone waiting on it.
+
+    Events published by the run are kept, so a subscriber that attaches late
+    still sees the stream from the beginning.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.cancellation_token = CancellationToken()
+        self.task: Optional[asyncio.Task] = None
+        self.members = 0
+        self._events: List[Dict[str, Any]] = []
+        self._queues: List[asyncio.Queue] = []
+        self._closed = False
+
+    @property
+    def done(self) -> bool:
+        return self.task is not None and self.task.done()
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        self._events.append(event)
+        for queue in self._queues:
+            queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of every event so far and all that follow; None marks the end."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._events:
+            queue.put_nowait(event)
+        if self._closed:
+            queue.put_nowait(None)
+        else:
+            self._queues.append(queue)
+        return queue
+
+    def leave(self) -> int:
+        """Drop one member; returns how many are still waiting."""
+        self.members = max(0, self.members - 1)
+        return self.members
+
+    def cancel(self) -> None:
+        self.cancellation_token.cancel()
+
+    async def result(self) -> Any:
+        # Shielded: one caller going away must not cancel the shared run
+        return await asyncio.shield(self.task)
+
+    def _close(self) -> None:
+        self._closed = True
+        for queue in self._queues:
+            queue.put_nowait(None)
+        self._queues.clear()
+
+
+class IdempotencyStore:
+    """
+    Idempotency keys in one SQLite file (WAL mode, shared by worker
+    processes). A key is pending (report NULL) while its run is in flight and
+    holds the report once it completes; both expire after the TTL, so a key
+    left pending by a crashed process frees itself.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_IDEMPOTENCY_PATH,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite file path (":memory:" for tests).
+            ttl_seconds: Seconds a key is remembered after it is claimed or completed.
+            max_entries: Bound on remembered keys (oldest dropped first).
+            clock: Time source (epoch seconds, compared across processes).
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            " idempotency_key TEXT PRIMARY KEY, evaluation_key TEXT NOT NULL,"
+            " report_json TEXT, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_evaluation"
+            " ON idempotency_keys(evaluation_key)"
+        )
+
+    def claim(self, idempotency_key: str, key: str) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        The evaluation key and report stored for `idempotency_key`; registers
+        it as pending for `key` (and returns (key, None)) when it is new.
+        """
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+                row = self._db.execute(
+                    "SELECT evaluation_key, report_json FROM idempotency_keys WHERE idempotency_key = ?",
+                    (idempotency_key,),
+                ).fetchone()
+                if row is None:
+                    self._db.execute(
+                        "INSERT INTO idempotency_keys (idempotency_key, evaluation_key, expires_at, created_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (idempotency_key, key, now + self.ttl_seconds, now),
+                    )
+                    self._db.execute(
+                        "DELETE FROM idempotency_keys WHERE idempotency_key IN ("
+                        " SELECT idempotency_key FROM idempotency_keys"
+                        " ORDER BY created_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return key, None
+        return row[0], json.loads(row[1]) if row[1] is not None else None
+
+    def complete(self, key: str, report: Any) -> None:
+        """Store `report` for every key pending on the evaluation `key`."""
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "UPDATE idempotency_keys SET report_json = ?, expires_at = ?"
+                " WHERE evaluation_key = ? AND report_json IS NULL",
+                (json.dumps(report, default=str), now + self.ttl_seconds, key),
+            )
+
+    def forget(self, key: str, idempotency_key: Optional[str] = None) -> None:
+        """Drop the keys still pending on `key` (only `idempotency_key`, when given)."""
+        query = "DELETE FROM idempotency_keys WHERE evaluation_key = ? AND report_json IS NULL"
+        params: Tuple[Any, ...] = (key,)
+        if idempotency_key is not None:
+            query += " AND idempotency_key = ?"
+            params += (idempotency_key,)
+        with self._lock:
+            self._db.execute(query, params)
+
+    def count(self) -> int:
+        now = self._clock()
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM idempotency_keys WHERE expires_at > ?", (now,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SingleFlight:
+    """
+    Usage:
+        flight, started = single_flight.start(key, run)   # run(flight) -> report
+        try:
+            report = await flight.result()
+        finally:
+            flight.leave()
+    """
+
+    def __init__(
+        self,
+        idempotency_ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        max_idempotency_keys: int = IDEMPOTENCY_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+        store: Optional[IdempotencyStore] = None,
+        executor: Optional[DBExecutor] = None,
+    ):
+        """
+        Args:
+            idempotency_ttl: Seconds a completed report is replayed for its key.
+            max_idempotency_keys: Bound on remembered keys (oldest dropped first).
+            clock: Time source, injectable for tests.
+            store: Where idempotency keys live; defaults to a private
+                   in-memory store (the shared instance uses a file).
+            executor: Runs the store calls; defaults to the shared DBExecutor.
+        """
+        self.store = store or IdempotencyStore(
+            ":memory:", ttl_seconds=idempotency_ttl, max_entries=max_idempotency_keys, clock=clock
+        )
+        self.executor = executor
+        self._inflight: Dict[str, Flight] = {}
+        self._started = 0
+        self._coalesced = 0
+        self._replays = 0
+        self._conflicts = 0
+
+    def start(self, key: str, run: Callable[[Flight], Awaitable[Any]]) -> Tuple[Flight, bool]:
+        """
+        Attach to the run for `key`, starting it with `run(flight)` if none is
+        in flight. The caller is counted as a member until it calls leave().
+
+        Returns:
+            (flight, started) — started is False when the caller was coalesced.
+        """
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self._coalesced += 1
+            flight.members += 1
+            return flight, False
+
+        flight = Flight(key)
+        flight.members = 1
+        self._inflight[key] = flight
+        flight.task = asyncio.ensure_future(self._run(flight, run))
+        self._started += 1
+        return flight, True
+
+    async def _run(self, flight: Flight, run) -> Any:
+        try:
+            report = await run(flight)
+        except BaseException:
+            # A failed run is not remembered; the client may retry with the same key
+            await self._store_call(self.store.forget, flight.key)
+            raise
+        else:
+            await self._store_call(self.store.complete, flight.key, report)
+            return report
+        finally:
+            self._inflight.pop(flight.key, None)
+            flight._close()
+
+    # ── Idempotency-Key ──────────────────────────────────────
+
+    async def replay(self, idempotency_key: str, key: str) -> Optional[Any]:
+        """
+        Stored report for this idempotency key, or None if the caller should
+        run (or attach to) the evaluation. Registers the key when it is new;
+        a caller that then does not start or join the run must release() it.
+
+        Raises:
+            IdempotencyConflict: the key was used with a different payload.
+        """
+        stored_key, report = await self._run_store(self.store.claim, idempotency_key, key)
+        if stored_key != key:
+            self._conflicts += 1
+            raise IdempotencyConflict(
+                "Idempotency-Key was already used with a different request payload."
+            )
+        if report is not None:
+            self._replays += 1
+        return report
+
+    async def release(self, idempotency_key: str, key: str) -> None:
+        """Forget a key registered by replay() whose run never started."""
+        await self._store_call(self.store.forget, key, idempotency_key)
+
+    async def _run_store(self, fn, *args) -> Any:
+        return await (self.executor or get_shared_db_executor()).run(fn, *args)
+
+    async def _store_call(self, fn, *args) -> None:
+        # Losing an idempotency record only costs a duplicate run on retry
+        try:
+            await self._run_store(fn, *args)
+        except Exception as e:
+            print(f"⚠️ Idempotency store update failed: {e}")
+
+    # ── Introspection ────────────────────────────────────────
+
+    async def drain(self) -> None:
+        """Wait for every run currently in flight (used on shutdown and in tests)."""
+        tasks = [flight.task for flight in self._inflight.values()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "waiting_callers": sum(f.members for f in self._inflight.values()),
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "idempotent_replays": self._replays,
+            "idempotent_conflicts": self._conflicts,
+            "idempotency_keys": await self._run_store(self.store.count),
+        }
+
+
+_shared_single_flight: Optional[SingleFlight] = None
+
+
+def get_shared_single_flight() -> SingleFlight:
+    """Returns the process-wide SingleFlight."""
+    global _shared_single_flight
+    if _shared_single_flight is None:
+        path = os.environ.get("IDEMPOTENCY_SQLITE_PATH") or DEFAULT_IDEMPOTENCY_PATH
+        _shared_single_flight = SingleFlight(store=IdempotencyStore(path))
+    return _shared_single_flight
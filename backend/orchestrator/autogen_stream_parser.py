@@ -0,0 +1,130 @@
+"""
+Module 13: Incremental JSON Field Parser
+Surfaces top-level fields of an agent's JSON reply while it is still streaming.
+
+Agents answer with one JSON object. Feeding the streamed text chunk by chunk
+into IncrementalJSONParser returns each top-level field as soon as its value
+closes — a string at its closing quote, an object/array at its closing
+bracket, a number or literal at the next comma or the final brace — so a
+client can render `market_growth_score` long before the agent finishes.
+
+Prose or code fences before the first "{" are skipped. A value that is not
+valid JSON (e.g. single-quoted) is silently dropped here; the final reply
+still goes through the strict parse + local repair pass (Module 9).
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Usage:
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0           # next character to scan
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        self._expecting = "key"  # key -> colon -> value (at depth 1)
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume the next chunk; returns the (key, value) pairs it completed."""
+        fields: List[Tuple[str, Any]] = []
+        if self._done:
+            return fields
+        self._buffer += chunk
+
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting == "key" and self._key_start is not None:
+                        self._key = self._decode(buffer[self._key_start:i + 1])
+                        self._expecting = "colon"
+                    elif self._depth == 1 and self._value_start is not None:
+                        self._emit(buffer[self._value_start:i + 1], fields)
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._expecting = "key"
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expecting == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._expecting == "value":
+                    self._value_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._expecting == "value":
+                    self._value_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(buffer[self._value_start:i + 1], fields)
+                elif self._depth == 0:
+                    self._flush_scalar(buffer, i, fields)
+                    self._done = True
+                    break
+            elif c == ":" and self._depth == 1 and self._expecting == "colon":
+                self._expecting = "value"
+                self._value_start = None
+            elif c == "," and self._depth == 1:
+                self._flush_scalar(buffer, i, fields)
+                self._expecting = "key"
+                self._key_start = None
+            elif (
+                self._depth == 1 and self._expecting == "value"
+                and self._value_start is None and not c.isspace()
+            ):
+                self._value_start = i  # number / true / false / null
+
+        self._pos = len(buffer)
+        return fields
+
+    def _flush_scalar(self, buffer: str, end: int, fields: List[Tuple[str, Any]]) -> None:
+        if self._expecting == "value" and self._value_start is not None:
+            self._emit(buffer[self._value_start:end], fields)
+
+    def _emit(self, text: str, fields: List[Tuple[str, Any]]) -> None:
+        key = self._key
+        self._expecting = "done"  # value closed; wait for "," or "}"
+        self._value_start = None
+        if key is None:
+            return
+        try:
+            fields.append((key, json.loads(text.strip(), strict=False)))
+        except ValueError:
+            pass
+
+    @staticmethod
+    def _decode(text: str) -> Optional[str]:
+        try:
+            return json.loads(text, strict=False)
+        except ValueError:
+            return None
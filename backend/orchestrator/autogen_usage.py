@@ -0,0 +1,325 @@
+"""
+Module 18: Token Usage & Cost Accounting
+Prompt/completion tokens and estimated cost per agent, per evaluation and
+per user and day.
+
+  - execute_autogen_agent records each call's models_usage in _meta.usage
+  - execute_routed_agent sums it across model tiers and prices it per model
+  - build_orchestration_result summarises it per evaluation (result["usage"])
+  - UsageLedger keeps rolling per-user / per-day totals for GET /usage and
+    enforces the daily budgets of USAGE_BUDGET (against the persisted totals
+    when evaluations are stored, so restarts and other workers count too)
+
+Outputs served from the response cache or reused from a previous evaluation
+spent nothing in this run and are not counted.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from backend.llm_config import estimate_cost_usd
+
+
+USAGE_RETENTION_DAYS = int(os.environ.get("USAGE_RETENTION_DAYS", "30"))
+# How long a user's persisted spend for today is reused by budget checks
+USAGE_BUDGET_CACHE_SECONDS = float(os.environ.get("USAGE_BUDGET_CACHE_SECONDS", "10"))
+ANONYMOUS_USER = "anonymous"
+
+# Daily limits per user; None = unlimited. USAGE_BUDGET (JSON) overrides them,
+# keyed by "default" or a user id, e.g. {"default": {"daily_cost_usd": 1.0}}
+DEFAULT_USAGE_BUDGET: Dict[str, Optional[float]] = {
+    "daily_cost_usd": None,
+    "daily_tokens": None,
+}
+
+
+class BudgetExceeded(Exception):
+    """The user has used up a daily budget; no new evaluation is started."""
+
+
+# ── Per call / per evaluation ────────────────────────────────
+
+def empty_usage() -> Dict[str, Any]:
+    return {"prompt_tokens": 0, "completion_tokens": 0, "llm_calls": 0, "cost_usd": 0.0}
+
+
+def add_usage(total: Dict[str, Any], usage: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Add `usage` into `total` in place and return `total`."""
+    if usage:
+        for field in ("prompt_tokens", "completion_tokens", "llm_calls"):
+            total[field] = total.get(field, 0) + int(usage.get(field) or 0)
+        total["cost_usd"] = round(total.get("cost_usd", 0.0) + float(usage.get("cost_usd") or 0.0), 8)
+    return total
+
+
+def price_usage(usage: Dict[str, Any], model: Optional[str]) -> Dict[str, Any]:
+    """Set usage["cost_usd"] from the model's token prices."""
+    usage["cost_usd"] = round(
+        estimate_cost_usd(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)), 8
+    )
+    return usage
+
+
+def spent_usage(output: Any) -> Optional[Dict[str, Any]]:
+    """Usage this output cost in the current run (None for cache hits, reuse and fallbacks)."""
+    if not isinstance(output, dict):
+        return None
+    meta = output.get("_meta", {})
+    if meta.get("cache_hit") or meta.get("reused"):
+        return None
+    return meta.get("usage")
+
+
+def summarize_usage(agent_outputs: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Evaluation totals plus a per-agent breakdown.
+
+    Returns:
+        {"prompt_tokens", "completion_tokens", "total_tokens", "llm_calls",
+         "cost_usd", "by_agent": {step: {...same fields...}}}
+    """
+    total = empty_usage()
+    by_agent = {}
+    for step, output in agent_outputs.items():
+        usage = spent_usage(output)
+        if usage is None:
+            continue
+        agent_total = add_usage(empty_usage(), usage)
+        agent_total["total_tokens"] = agent_total["prompt_tokens"] + agent_total["completion_tokens"]
+        by_agent[step] = agent_total
+        add_usage(total, usage)
+    total["total_tokens"] = total["prompt_tokens"] + total["completion_tokens"]
+    total["by_agent"] = by_agent
+    return total
+
+
+# ── Budgets ──────────────────────────────────────────────────
+
+@lru_cache(maxsize=8)
+def _parse_budget_overrides(raw: str) -> Dict[str, Dict[str, Any]]:
+    value = json.loads(raw)
+    if not isinstance(value, dict):
+        raise ValueError("USAGE_BUDGET must be a JSON object.")
+    return value
+
+
+def get_usage_budget(user_id: Optional[str]) -> Dict[str, Optional[float]]:
+    """DEFAULT_USAGE_BUDGET <- USAGE_BUDGET["default"] <- USAGE_BUDGET[user_id]."""
+    budget = dict(DEFAULT_USAGE_BUDGET)
+    raw = os.environ.get("USAGE_BUDGET")
+    if raw:
+        overrides = _parse_budget_overrides(raw)
+        budget.update(overrides.get("default", {}))
+        budget.update(overrides.get(user_id or ANONYMOUS_USER, {}))
+    return budget
+
+
+# ── Rolling per-user / per-day ledger ────────────────────────
+
+def _day(at: datetime) -> str:
+    return at.astimezone(timezone.utc).date().isoformat()
+
+
+def _bucket() -> Dict[str, Any]:
+    return {**empty_usage(), "evaluations": 0, "by_agent": {}}
+
+
+def _enforce_budget(budget: Mapping[str, Optional[float]], spent: Mapping[str, Any]) -> None:
+    tokens = spent["prompt_tokens"] + spent["completion_tokens"]
+    if budget.get("daily_cost_usd") is not None and spent["cost_usd"] >= budget["daily_cost_usd"]:
+        raise BudgetExceeded(
+            f"Daily cost budget of ${budget['daily_cost_usd']} reached "
+            f"(${spent['cost_usd']:.4f} spent today)."
+        )
+    if budget.get("daily_tokens") is not None and tokens >= budget["daily_tokens"]:
+        raise BudgetExceeded(
+            f"Daily token budget of {int(budget['daily_tokens'])} reached ({tokens} used today)."
+        )
+
+
+class UsageLedger:
+    """
+    Per-user, per-UTC-day token and cost totals of finished evaluations,
+    kept for `retention_days`.
+
+    The process-wide ledger only sees evaluations this process ran; with
+    Supabase configured, GET /usage rebuilds one from the persisted columns.
+    """
+
+    def __init__(self, retention_days: int = USAGE_RETENTION_DAYS, clock=time.time):
+        self.retention_days = retention_days
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (user_id, "YYYY-MM-DD") -> bucket
+        self._buckets: Dict[tuple, Dict[str, Any]] = {}
+        # (user_id, "YYYY-MM-DD") -> (expires_at, persisted spend)
+        self._persisted: Dict[tuple, tuple] = {}
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), tz=timezone.utc)
+
+    def record(self, user_id: Optional[str], usage: Optional[Mapping[str, Any]],
+               at: Optional[datetime] = None) -> None:
+        """Add one evaluation's usage summary (see summarize_usage)."""
+        if not usage:
+            return
+        key = (user_id or ANONYMOUS_USER, _day(at or self._now()))
+        cutoff = _day(self._now() - timedelta(days=self.retention_days))
+        with self._lock:
+            bucket = self._buckets.setdefault(key, _bucket())
+            add_usage(bucket, usage)
+            bucket["evaluations"] += 1
+            for step, agent_usage in (usage.get("by_agent") or {}).items():
+                add_usage(bucket["by_agent"].setdefault(step, empty_usage()), agent_usage)
+            for stale in [k for k in self._buckets if k[1] < cutoff]:
+                del self._buckets[stale]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], **kwargs) -> "UsageLedger":
+        """Ledger built from persisted startup_evaluations usage columns."""
+        ledger = cls(**kwargs)
+        for row in rows:
+            agent_usage = row.get("agent_usage") or {}
+            if isinstance(agent_usage, str):
+                agent_usage = json.loads(agent_usage)
+            created_at = row.get("created_at")
+            ledger.record(
+                row.get("user_id"),
+                {
+                    "prompt_tokens": row.get("prompt_tokens") or 0,
+                    "completion_tokens": row.get("completion_tokens") or 0,
+                    "llm_calls": sum(int(u.get("llm_calls") or 0) for u in agent_usage.values()),
+                    "cost_usd": float(row.get("cost_usd") or 0.0),
+                    "by_agent": agent_usage,
+                },
+                at=datetime.fromisoformat(str(created_at).replace("Z", "+00:00")) if created_at else None,
+            )
+        return ledger
+
+    def spent_today(self, user_id: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            bucket = self._buckets.get((user_id or ANONYMOUS_USER, _day(self._now())))
+            return json.loads(json.dumps(bucket)) if bucket else _bucket()
+
+    def check_budget(self, user_id: Optional[str]) -> None:
+        """
+        Raises:
+            BudgetExceeded: today's spend in this process has reached one of
+                            the user's daily limits.
+        """
+        budget = get_usage_budget(user_id)
+        if budget.get("daily_cost_usd") is None and budget.get("daily_tokens") is None:
+            return
+        _enforce_budget(budget, self.spent_today(user_id))
+
+    async def check_persisted_budget(self, user_id: Optional[str], repository=None) -> None:
+        """
+        check_budget against everything persisted today, not just this process.
+
+        Today's rows are read through `repository.get_usage_rows` and cached
+        for USAGE_BUDGET_CACHE_SECONDS per user; the larger of the persisted
+        and in-process totals is enforced, so evaluations finished here but
+        not yet written (or newer than the cached read) still count.
+        Anonymous callers and runs without a repository use check_budget.
+
+        Raises:
+            BudgetExceeded: today's spend has reached one of the user's daily limits.
+        """
+        budget = get_usage_budget(user_id)
+        if budget.get("daily_cost_usd") is None and budget.get("daily_tokens") is None:
+            return
+        spent = self.spent_today(user_id)
+        if repository is not None and user_id is not None:
+            persisted = await self._persisted_today(user_id, repository)
+            spent = {
+                field: max(spent[field], persisted[field])
+                for field in ("prompt_tokens", "completion_tokens", "cost_usd")
+            }
+        _enforce_budget(budget, spent)
+
+    async def _persisted_today(self, user_id: str, repository) -> Dict[str, Any]:
+        today = _day(self._now())
+        key = (user_id, today)
+        with self._lock:
+            cached = self._persisted.get(key)
+        if cached and cached[0] > self._clock():
+            return cached[1]
+        rows = await repository.get_usage_rows(today, user_id)
+        spent = UsageLedger.from_rows(rows, clock=self._clock).spent_today(user_id)
+        with self._lock:
+            # Only today's entries are ever read again
+            self._persisted = {k: v for k, v in self._persisted.items() if k[1] == today}
+            self._persisted[key] = (self._clock() + USAGE_BUDGET_CACHE_SECONDS, spent)
+        return spent
+
+    def summary(self, user_id: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
+        """
+        Rolling usage over the last `days` UTC days, newest first.
+
+        Args:
+            user_id: Only this user's evaluations; None aggregates every user
+                     (and adds a "by_user" breakdown).
+            days: Window length, including today.
+        """
+        first_day = _day(self._now() - timedelta(days=max(1, days) - 1))
+        daily: Dict[str, Dict[str, Any]] = {}
+        by_user: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (user, day), bucket in self._buckets.items():
+                if day < first_day or (user_id is not None and user != user_id):
+                    continue
+                target = daily.setdefault(day, _bucket())
+                add_usage(target, bucket)
+                target["evaluations"] += bucket["evaluations"]
+                for step, agent_usage in bucket["by_agent"].items():
+                    add_usage(target["by_agent"].setdefault(step, empty_usage()), agent_usage)
+                user_total = by_user.setdefault(user, {**empty_usage(), "evaluations": 0})
+                add_usage(user_total, bucket)
+                user_total["evaluations"] += bucket["evaluations"]
+
+        total = _bucket()
+        for bucket in daily.values():
+            add_usage(total, bucket)
+            total["evaluations"] += bucket["evaluations"]
+            for step, agent_usage in bucket["by_agent"].items():
+                add_usage(total["by_agent"].setdefault(step, empty_usage()), agent_usage)
+
+        result = {
+            "user_id": user_id,
+            "days": days,
+            "daily": [{"date": day, **daily[day]} for day in sorted(daily, reverse=True)],
+            "total": total,
+            # Most expensive agents first (tokens break ties for unpriced models)
+            "top_agents": sorted(
+                total["by_agent"],
+                key=lambda s: (total["by_agent"][s]["cost_usd"],
+                               total["by_agent"][s]["prompt_tokens"] + total["by_agent"][s]["completion_tokens"]),
+                reverse=True,
+            ),
+        }
+        if user_id is None:
+            result["by_user"] = by_user
+        else:
+            budget = get_usage_budget(user_id)
+            spent = self.spent_today(user_id)
+            result["budget"] = {
+                **budget,
+                "spent_today_usd": spent["cost_usd"],
+                "tokens_today": spent["prompt_tokens"] + spent["completion_tokens"],
+            }
+        return result
+
+
+_shared_ledger: Optional[UsageLedger] = None
+
+
+def get_shared_usage_ledger() -> UsageLedger:
+    """Process-wide usage ledger (created on first use)."""
+    global _shared_ledger
+    if _shared_ledger is None:
+        _shared_ledger = UsageLedger()
+    return _shared_ledger
@@ -0,0 +1,178 @@
+"""
+Module 15: Validator Gate
+Stops an evaluation early when the validator says the submission is junk.
+
+The validator scores completeness and consistency and raises suspicion flags.
+With the gate enforced, every other agent waits for the validator; if its
+output falls below the policy thresholds, the remaining agents are skipped
+without an LLM call and the report is labelled INSUFFICIENT_DATA.
+
+Policies resolve as DEFAULT_GATE_POLICY <- VALIDATOR_GATE env (the mode)
+<- VALIDATOR_GATE_POLICY env (JSON), both read on every call, e.g.
+    {"mode": "enforce", "min_completeness_score": 0.4, "max_suspicion_flags": 2}
+
+Modes:
+  "off"     — the validator runs alongside the other root agents (default).
+  "shadow"  — same scheduling, but the gate is evaluated and counted, so the
+              calls it would save can be measured on real traffic first.
+  "enforce" — validator first; a failed gate skips the rest of the pipeline.
+              Passing submissions pay the validator's latency up front.
+
+A validator that errored never trips the gate (fail open).
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+
+GATE_MODES = ("off", "shadow", "enforce")
+GATE_STEP = "validator"
+
+DEFAULT_GATE_POLICY: Dict[str, Any] = {
+    "mode": "off",
+    # Gate when completeness (0-1) is below this
+    "min_completeness_score": 0.3,
+    # Gate when data consistency (0-1) is below this
+    "min_consistency_score": 0.2,
+    # Gate when the validator raises more suspicion flags than this
+    "max_suspicion_flags": 3,
+    # Also gate whenever the validator asks for manual review
+    "gate_on_manual_review": False,
+}
+
+
+@lru_cache(maxsize=4)
+def _parse_gate_overrides(raw: str) -> Dict[str, Any]:
+    overrides = json.loads(raw)
+    if not isinstance(overrides, dict):
+        raise ValueError("VALIDATOR_GATE_POLICY must be a JSON object.")
+    return overrides
+
+
+def get_gate_policy(overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve the effective gate policy.
+
+    Args:
+        overrides: Optional per-orchestrator overrides, applied last.
+
+    Returns:
+        New policy dictionary (safe to mutate). Unknown modes fall back to "off".
+    """
+    policy = dict(DEFAULT_GATE_POLICY)
+    policy["mode"] = os.environ.get("VALIDATOR_GATE", policy["mode"])
+    raw = os.environ.get("VALIDATOR_GATE_POLICY")
+    if raw:
+        policy.update(_parse_gate_overrides(raw))
+    policy.update(overrides or {})
+    if policy["mode"] not in GATE_MODES:
+        policy["mode"] = "off"
+    return policy
+
+
+def gated_dag(dag: Mapping[str, Sequence[str]]) -> Dict[str, Tuple[str, ...]]:
+    """The DAG with every root step made to wait for the validator."""
+    if GATE_STEP not in dag:
+        return dict(dag)
+    return {
+        step: deps if step == GATE_STEP or deps else (GATE_STEP,)
+        for step, deps in dag.items()
+    }
+
+
+def evaluate_gate(validator_output: Mapping[str, Any], policy: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Check a validator output against the policy thresholds.
+
+    Returns:
+        {"passed": bool, "reasons": [str]} — reasons is empty when it passed.
+    """
+    if not isinstance(validator_output, Mapping) or validator_output.get("error"):
+        return {"passed": True, "reasons": []}
+
+    def _number(field: str) -> Optional[float]:
+        try:
+            return float(validator_output[field])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    reasons = []
+    completeness = _number("completeness_score")
+    if completeness is not None and completeness < policy["min_completeness_score"]:
+        reasons.append(
+            f"completeness_score {completeness} < {policy['min_completeness_score']}"
+        )
+    consistency = _number("data_consistency_score")
+    if consistency is not None and consistency < policy["min_consistency_score"]:
+        reasons.append(
+            f"data_consistency_score {consistency} < {policy['min_consistency_score']}"
+        )
+    flags = validator_output.get("suspicion_flags") or []
+    if isinstance(flags, list) and len(flags) > policy["max_suspicion_flags"]:
+        reasons.append(f"{len(flags)} suspicion_flags > {policy['max_suspicion_flags']}")
+    if policy["gate_on_manual_review"] and validator_output.get("requires_manual_review") is True:
+        reasons.append("requires_manual_review")
+
+    return {"passed": not reasons, "reasons": reasons}
+
+
+# Counters of each counted mode: (gated, LLM calls saved); shadow counts
+# what enforcing the gate would have done
+_MODE_COUNTERS = {
+    "shadow": ("would_gate", "llm_calls_would_save"),
+    "enforce": ("gated", "llm_calls_saved"),
+}
+
+
+class GateStats:
+    """
+    Process-wide counters of gate decisions and the LLM calls they saved,
+    kept per mode so a mode change doesn't mix shadow and enforced decisions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {
+            mode: {"evaluations": 0, gated: 0, saved: 0}
+            for mode, (gated, saved) in _MODE_COUNTERS.items()
+        }
+
+    def record(self, gate: Mapping[str, Any]) -> None:
+        """Add an evaluation's `_meta.gate` block to the totals of its mode."""
+        mode = gate.get("mode", "off")
+        if mode not in _MODE_COUNTERS or gate.get("passed") is None:
+            return
+        gated, saved = _MODE_COUNTERS[mode]
+        with self._lock:
+            counts = self._counts[mode]
+            counts["evaluations"] += 1
+            if not gate["passed"]:
+                counts[gated] += 1
+                counts[saved] += len(gate.get("skipped", []))
+
+    def stats(self) -> Dict[str, Any]:
+        """The current mode's counters, plus every mode's under "by_mode"."""
+        with self._lock:
+            by_mode = {mode: dict(counts) for mode, counts in self._counts.items()}
+        for mode, counts in by_mode.items():
+            gated = counts[_MODE_COUNTERS[mode][0]]
+            counts["gate_rate"] = round(gated / counts["evaluations"], 4) if counts["evaluations"] else 0.0
+        mode = get_gate_policy()["mode"]
+        return {
+            "mode": mode,
+            **by_mode.get(mode, {"evaluations": 0, "gate_rate": 0.0}),
+            "by_mode": by_mode,
+        }
+
+
+_shared_stats: Optional[GateStats] = None
+
+
+def get_shared_gate_stats() -> GateStats:
+    """Returns the process-wide GateStats."""
+    global _shared_stats
+    if _shared_stats is None:
+        _shared_stats = GateStats()
+    return _shared_stats
@@ -0,0 +1,173 @@
+"""
+Layer 8: Non-blocking database I/O
+supabase-py's PostgREST builders are synchronous: `.execute()` holds the
+calling thread for a full network round-trip. Called from an async endpoint,
+that stalls every other evaluation and SSE stream on the event loop.
+
+DBExecutor runs those calls on a small, bounded thread pool instead, so the
+loop keeps serving while a write is in flight. Builders of the async client
+(supabase.acreate_client) are awaited directly. All Supabase clients share
+one keep-alive HTTP connection pool (build_supabase_http_client).
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+
+# Threads for blocking Supabase calls; 0 runs them inline on the event loop
+SUPABASE_IO_THREADS = int(os.environ.get("SUPABASE_IO_THREADS", "8"))
+
+# Connection pool limits shared by every Supabase client of the process. Fewer
+# keep-alive slots than IO threads makes busy threads reconnect on every call
+SUPABASE_HTTP_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_HTTP_MAX_CONNECTIONS", "16"))
+SUPABASE_HTTP_MAX_KEEPALIVE = int(
+    os.environ.get("SUPABASE_HTTP_MAX_KEEPALIVE", str(max(8, SUPABASE_IO_THREADS)))
+)
+SUPABASE_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_HTTP_KEEPALIVE_EXPIRY", "120"))
+
+
+def build_supabase_http_client() -> httpx.Client:
+    """
+    httpx.Client with a bounded keep-alive pool for PostgREST calls.
+    Pass it as ClientOptions(httpx_client=...); auth headers are sent per
+    request, so clients of different users can share it.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        follow_redirects=True,
+    )
+
+
+class DBExecutor:
+    """
+    Runs blocking database calls off the event loop on at most `max_workers`
+    threads. Further calls wait for a free thread (the wait is reported in
+    stats()), which bounds the number of concurrent Supabase connections.
+    """
+
+    def __init__(self, max_workers: int = SUPABASE_IO_THREADS):
+        self.max_workers = max_workers
+        self._pool = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="supabase-io")
+            if max_workers > 0 else None
+        )
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0, "offloaded": 0, "awaited": 0, "inline": 0, "errors": 0,
+            "in_flight": 0, "max_in_flight": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+        }
+
+    def _count(self, **deltas: float) -> None:
+        with self._lock:
+            for field, delta in deltas.items():
+                self._stats[field] += delta
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._stats["in_flight"])
+
+    def _timed(self, fn: Callable[..., Any], submitted: float) -> Any:
+        started = time.perf_counter()
+        wait_ms = (started - submitted) * 1000
+        self._count(in_flight=1, total_wait_ms=wait_ms)
+        with self._lock:
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+        try:
+            return fn()
+        finally:
+            self._count(in_flight=-1, total_run_ms=(time.perf_counter() - started) * 1000)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn(*args, **kwargs) on the pool (inline when max_workers is 0)."""
+        call = functools.partial(fn, *args, **kwargs)
+        self._count(calls=1)
+        try:
+            if self._pool is None:
+                self._count(inline=1)
+                return self._timed(call, time.perf_counter())
+            self._count(offloaded=1)
+            # Keep contextvars (e.g. tracing) visible inside the worker thread
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool, context.run, self._timed, call, time.perf_counter()
+            )
+        except Exception:
+            self._count(errors=1)
+            raise
+
+    async def execute(self, query: Any) -> Any:
+        """
+        Execute a PostgREST request builder without blocking the loop.
+
+        Returns:
+            The builder's APIResponse (`.data`, `.count`).
+        """
+        if inspect.iscoroutinefunction(query.execute):
+            self._count(calls=1, awaited=1)
+            try:
+                return await query.execute()
+            except Exception:
+                self._count(errors=1)
+                raise
+        return await self.run(query.execute)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        waited = stats["offloaded"] + stats["inline"]
+        stats["max_workers"] = self.max_workers
+        stats["avg_wait_ms"] = round(stats["total_wait_ms"] / waited, 3) if waited else 0.0
+        for field in ("total_wait_ms", "max_wait_ms", "total_run_ms"):
+            stats[field] = round(stats[field], 3)
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+
+
+_shared_executor: Optional[DBExecutor] = None
+_shared_http_client: Optional[httpx.Client] = None
+
+
+def get_shared_db_executor() -> DBExecutor:
+    """Process-wide executor for Supabase calls (created on first use)."""
+    global _shared_executor
+    if _shared_executor is None:
+        _shared_executor = DBExecutor()
+    return _shared_executor
+
+
+def get_shared_supabase_http_client() -> httpx.Client:
+    """Process-wide keep-alive pool for Supabase clients (created on first use)."""
+    global _shared_http_client
+    if _shared_http_client is None:
+        _shared_http_client = build_supabase_http_client()
+    return _shared_http_client
+
+
+async def execute_query(query: Any) -> Any:
+    """Execute a PostgREST builder on the shared executor."""
+    return await get_shared_db_executor().execute(query)
+
+
+def close_shared_db_executor() -> None:
+    """
+    Finish in-flight writes and release the threads. The HTTP pool stays
+    open: module-level Supabase clients keep a reference to it.
+    """
+    global _shared_executor
+    if _shared_executor is not None:
+        _shared_executor.shutdown(wait=True)
+        _shared_executor = None
@@ -0,0 +1,327 @@
+"""
+Layer 8: Evaluation Read Cache
+Read-through cache in front of EvaluationRepository.get_evaluation.
+
+Repeated reads of the same startup (re-evaluations loading prior agent
+outputs) used to select the full row, report_json included, from Supabase
+every time. Entries are keyed by (startup_id, scope), where the scope is a
+fingerprint of the caller's token: RLS decides which rows a user can see, so
+users never share entries. "No evaluation yet" is cached too, for a shorter
+negative TTL.
+
+Tiers: in-memory LRU (always) + optional SQLite file shared by the uvicorn
+workers of a host. Saves bump a per-startup generation: entries read under an
+older generation are dropped, and a fill that raced with a save is not stored.
+With the file tier the generation lives in the file, so a save in one worker
+also invalidates the memory tier of the others.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from backend.metrics import EVALUATION_CACHE_LOOKUPS
+
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 30.0
+DEFAULT_DISK_MAX_ENTRIES = 10000
+
+ANONYMOUS_SCOPE = "anon"
+
+
+def token_scope(token: Optional[str]) -> str:
+    """Cache scope of a bearer token (a hash, so tokens are never stored)."""
+    if not token:
+        return ANONYMOUS_SCOPE
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+class CacheLookup(NamedTuple):
+    """Result of EvaluationCache.get; pass `generation` back to put()."""
+    hit: bool
+    record: Optional[Dict[str, Any]]
+    generation: int
+
+
+class EvaluationCache:
+    """
+    Two-tier TTL cache of the latest evaluation row per startup and scope.
+    Rows are stored as JSON strings so callers always get a private copy.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        sqlite_path: Optional[str] = None,
+        disk_max_entries: int = DEFAULT_DISK_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_entries: LRU bound of the in-memory tier.
+            ttl_seconds: Lifetime of a cached row in both tiers.
+            negative_ttl_seconds: Lifetime of a cached "no evaluation".
+            sqlite_path: Optional SQLite file for the tier shared by workers.
+            disk_max_entries: Row bound of the file tier (least recently used evicted).
+            clock: Time source (seconds), injectable for tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (startup_id, scope) -> (expires_at, generation, payload or None)
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, int, Optional[str]]]" = OrderedDict()
+        # Generations of startups saved by this process (memory-only mode)
+        self._generations: Dict[str, int] = {}
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluation_cache ("
+                " startup_id TEXT NOT NULL, scope TEXT NOT NULL, value TEXT,"
+                " generation INTEGER NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (startup_id, scope))"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_evaluation_cache_access"
+                " ON evaluation_cache(last_access)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluation_cache_generation ("
+                " startup_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "invalidations": 0,
+            "stale_fills": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    # ── Public API ───────────────────────────────────────────
+
+    def get(self, startup_id: str, scope: str = ANONYMOUS_SCOPE) -> CacheLookup:
+        """
+        Cached row for the startup. `hit` with a None record means the startup
+        is known to have no evaluation.
+        """
+        key = (startup_id, scope)
+        now = self._clock()
+        with self._lock:
+            generation = self._generation(startup_id)
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, entry_generation, payload = entry
+                if expires_at > now and entry_generation == generation:
+                    self._memory.move_to_end(key)
+                    return self._hit(payload, generation, "memory")
+                del self._memory[key]
+                self._counters["expirations"] += 1
+
+            row = self._disk_get(key, generation, now)
+            if row is not None:
+                expires_at, payload = row
+                self._memory_put(key, expires_at, generation, payload)
+                return self._hit(payload, generation, "disk")
+
+            self._counters["misses"] += 1
+        EVALUATION_CACHE_LOOKUPS.inc(result="miss")
+        return CacheLookup(False, None, generation)
+
+    def put(
+        self,
+        startup_id: str,
+        scope: str,
+        record: Optional[Dict[str, Any]],
+        generation: int,
+    ) -> bool:
+        """
+        Store the row read for a startup (None = no evaluation). Skipped when
+        the startup was saved since `generation` was read, because the row
+        may predate that save.
+
+        Returns:
+            Whether the row was stored.
+        """
+        payload = None if record is None else json.dumps(record, default=str)
+        ttl = self.ttl_seconds if record is not None else self.negative_ttl_seconds
+        now = self._clock()
+        with self._lock:
+            if self._generation(startup_id) != generation:
+                self._counters["stale_fills"] += 1
+                return False
+            key = (startup_id, scope)
+            self._memory_put(key, now + ttl, generation, payload)
+            self._disk_put(key, now + ttl, generation, payload, now)
+            self._counters["sets"] += 1
+            return True
+
+    def invalidate(self, startup_id: str) -> int:
+        """
+        Drop every scope's entry for the startup (call on save).
+
+        Returns:
+            The new generation; put() with it caches the saved row.
+        """
+        with self._lock:
+            for key in [key for key in self._memory if key[0] == startup_id]:
+                del self._memory[key]
+            self._counters["invalidations"] += 1
+            if self._db is None:
+                self._generations[startup_id] = self._generations.get(startup_id, 0) + 1
+                return self._generations[startup_id]
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO evaluation_cache_generation (startup_id, generation) VALUES (?, 1)"
+                    " ON CONFLICT(startup_id) DO UPDATE SET generation = generation + 1",
+                    (startup_id,),
+                )
+                self._db.execute("DELETE FROM evaluation_cache WHERE startup_id = ?", (startup_id,))
+                generation = self._generation(startup_id)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM evaluation_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+                "disk_enabled": self._db is not None,
+            }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ── Tiers ────────────────────────────────────────────────
+
+    def _hit(self, payload: Optional[str], generation: int, tier: str) -> CacheLookup:
+        self._counters["hits"] += 1
+        self._counters[f"{tier}_hits"] += 1
+        if payload is None:
+            self._counters["negative_hits"] += 1
+        EVALUATION_CACHE_LOOKUPS.inc(result="hit" if payload is not None else "negative_hit")
+        return CacheLookup(True, None if payload is None else json.loads(payload), generation)
+
+    def _generation(self, startup_id: str) -> int:
+        if self._db is None:
+            return self._generations.get(startup_id, 0)
+        row = self._db.execute(
+            "SELECT generation FROM evaluation_cache_generation WHERE startup_id = ?", (startup_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _memory_put(self, key: Tuple[str, str], expires_at: float, generation: int,
+                    payload: Optional[str]) -> None:
+        self._memory[key] = (expires_at, generation, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: Tuple[str, str], generation: int, now: float) -> Optional[tuple]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, generation, expires_at FROM evaluation_cache"
+            " WHERE startup_id = ? AND scope = ?", key,
+        ).fetchone()
+        if row is None:
+            return None
+        value, row_generation, expires_at = row
+        if expires_at <= now or row_generation != generation:
+            self._db.execute("DELETE FROM evaluation_cache WHERE startup_id = ? AND scope = ?", key)
+            self._counters["expirations"] += 1
+            return None
+        self._db.execute(
+            "UPDATE evaluation_cache SET last_access = ? WHERE startup_id = ? AND scope = ?",
+            (now, *key),
+        )
+        return expires_at, value
+
+    def _disk_put(self, key: Tuple[str, str], expires_at: float, generation: int,
+                  payload: Optional[str], now: float) -> None:
+        if self._db is None:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have saved the startup since our check
+            if self._generation(key[0]) != generation:
+                self._db.execute("ROLLBACK")
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO evaluation_cache"
+                " (startup_id, scope, value, generation, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, payload, generation, expires_at, now),
+            )
+            evicted = self._db.execute(
+                "DELETE FROM evaluation_cache WHERE rowid IN ("
+                " SELECT rowid FROM evaluation_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,),
+            ).rowcount
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        self._counters["evictions"] += max(evicted, 0)
+
+
+_shared_cache: Optional[EvaluationCache] = None
+
+
+def get_shared_evaluation_cache() -> Optional[EvaluationCache]:
+    """
+    Returns the process-wide evaluation read cache configured from the
+    environment, or None when EVALUATION_CACHE_ENABLED is "0"/"false".
+    """
+    global _shared_cache
+    if os.environ.get("EVALUATION_CACHE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    if _shared_cache is None:
+        _shared_cache = EvaluationCache(
+            max_entries=int(os.environ.get("EVALUATION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            ttl_seconds=float(os.environ.get("EVALUATION_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            negative_ttl_seconds=float(
+                os.environ.get("EVALUATION_CACHE_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS)
+            ),
+            sqlite_path=os.environ.get("EVALUATION_CACHE_SQLITE_PATH") or None,
+            disk_max_entries=int(
+                os.environ.get("EVALUATION_CACHE_DISK_MAX_ENTRIES", DEFAULT_DISK_MAX_ENTRIES)
+            ),
+        )
+    return _shared_cache
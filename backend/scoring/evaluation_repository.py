@@ -1,26 +1,140 @@
 """
 Layer 8: Persistence Layer
 Stores evaluation results into database (Supabase/Postgres).
-Supports async DB calls.
+Supports async DB calls: blocking supabase-py requests run on the DBExecutor
+thread pool, so they never stall the event loop. With an outbox, saves are
+queued for the write-behind flusher instead (see persistence_outbox).
+Reads go through an optional EvaluationCache, which saves keep current.
+
+BaseEvaluationRepository is the interface the service layer depends on;
+sqlite_repository implements it on a local file for offline runs.
 """
 import json
+import time
+import uuid
+from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.metrics import SUPABASE_WRITE_SECONDS
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+from backend.scoring.evaluation_cache import EvaluationCache, token_scope
+from backend.scoring.persistence_outbox import PersistenceOutbox
 
 
-class EvaluationRepository:
+class BaseEvaluationRepository(ABC):
+    """
+    Storage interface for evaluations and the `startups` rows they belong to.
+    EvaluationRepository stores them in Supabase, SQLiteEvaluationRepository
+    (sqlite_repository) in a local file; PERSISTENCE_BACKEND selects one.
+    """
+
+    @abstractmethod
+    async def save_evaluation(self, report: Dict[str, Any], user_id: str = None) -> Dict[str, Any]:
+        """Save one report; returns the stored record or an error dict."""
+
+    @abstractmethod
+    async def save_evaluations(
+        self, items: List[Tuple[Dict[str, Any], Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """Save (report, user_id) pairs in one write; one result per item, in order."""
+
+    @abstractmethod
+    async def save_startups(self, rows: List[Dict[str, Any]]) -> str:
+        """Upsert `startups` rows by id; returns "saved", "queued" or "dry_run"."""
+
+    @abstractmethod
+    async def get_evaluation(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        """The startup's latest evaluation record, or None."""
+
+    @abstractmethod
+    async def get_usage_rows(
+        self, since: str, user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Usage columns of evaluations created at or after `since`."""
+
+    async def get_prior_agent_outputs(
+        self, startup_id: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Agent outputs and input fingerprints from the latest evaluation.
+
+        Args:
+            startup_id: The unique startup identifier.
+
+        Returns:
+            step -> {"fingerprint", "output"}; empty when there is no earlier
+            evaluation or it predates fingerprinting.
+        """
+        record = await self.get_evaluation(startup_id)
+        if not record:
+            return {}
+
+        report = record.get("report_json") or {}
+        if isinstance(report, str):
+            try:
+                report = json.loads(report)
+            except ValueError:
+                return {}
+
+        fingerprints = report.get("agent_fingerprints") or {}
+        outputs = report.get("agent_results") or {}
+        return {
+            step: {"fingerprint": fingerprint, "output": outputs[step]}
+            for step, fingerprint in fingerprints.items()
+            if isinstance(outputs.get(step), dict) and not outputs[step].get("error")
+        }
+
+    def _build_record(self, report: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+        usage = report.get("usage") or {}
+        return {
+            "startup_id": report.get("startup_id", "unknown"),
+            "user_id": user_id,
+            "final_score": report.get("final_score", 0.0),
+            "risk_label": report.get("risk_label", "HIGH_RISK"),
+            "report_json": json.dumps(report, default=str),
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "cost_usd": usage.get("cost_usd", 0.0),
+            "agent_usage": usage.get("by_agent", {}),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+class EvaluationRepository(BaseEvaluationRepository):
     """
     Async repository for storing evaluation results.
     Uses Supabase client for persistence.
     """
 
-    def __init__(self, supabase_client=None):
+    def __init__(
+        self,
+        supabase_client=None,
+        executor: Optional[DBExecutor] = None,
+        outbox: Optional[PersistenceOutbox] = None,
+        auth_token: Optional[str] = None,
+        cache: Optional[EvaluationCache] = None,
+        owner_id: Optional[str] = None,
+    ):
         """
         Args:
-            supabase_client: Initialized Supabase client.
+            supabase_client: Initialized Supabase client (sync or async).
                              If None, operates in dry-run mode (returns data without saving).
+            executor: Runs the blocking calls; defaults to the shared DBExecutor.
+            outbox: If set, saves are queued for the write-behind flusher.
+            auth_token: User token of `supabase_client`; scopes cached reads,
+                        since RLS decides what it sees.
+            cache: Read-through cache for get_evaluation.
+            owner_id: Verified user id of the token. The flusher writes with
+                      the service key, so queued rows are stamped with it
+                      (user_id / founder_id) instead of the request's claim.
         """
         self.client = supabase_client
+        self.executor = executor
+        self.outbox = outbox
+        self.auth_token = auth_token
+        self.cache = cache
+        self.owner_id = owner_id
         self.table_name = "startup_evaluations"
 
     async def save_evaluation(
@@ -36,36 +150,161 @@ class EvaluationRepository:
         Returns:
             The saved record dict (with id if available).
         """
-        record = {
-            "startup_id": report.get("startup_id", "unknown"),
-            "user_id": user_id,
-            "final_score": report.get("final_score", 0.0),
-            "risk_label": report.get("risk_label", "HIGH_RISK"),
-            "report_json": json.dumps(report, default=str),
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+        record = self._build_record(report, user_id)
 
         if self.client is None:
             # Dry-run mode — return the record without DB call
             record["_dry_run"] = True
             return record
 
+        if self.outbox is not None:
+            queued = await self._queue([record])
+            self._cache_saved(queued)
+            return queued[0]
+
+        started = time.perf_counter()
         try:
-            result = self.client.table(self.table_name).insert(record).execute()
+            result = await self._execute(self.client.table(self.table_name).insert(record))
             saved = result.data[0] if result.data else record
+            SUPABASE_WRITE_SECONDS.observe(time.perf_counter() - started, operation="insert", outcome="ok")
+            self._cache_saved([saved])
             return saved
         except Exception as e:
+            SUPABASE_WRITE_SECONDS.observe(time.perf_counter() - started, operation="insert", outcome="error")
             return {
                 "error": True,
                 "message": f"Database save failed: {str(e)}",
                 "record": record,
             }
 
+    async def save_evaluations(
+        self, items: List[Tuple[Dict[str, Any], Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Save many evaluation reports with a single multi-row insert.
+
+        Args:
+            items: (report, user_id) pairs.
+
+        Returns:
+            One saved record (or error dict) per item, in input order. A
+            record the insert did not return (e.g. hidden by RLS) is an
+            error dict, never the unsaved input.
+        """
+        records = [self._build_record(report, user_id) for report, user_id in items]
+        if not records:
+            return []
+
+        if self.client is None:
+            return [{**record, "_dry_run": True} for record in records]
+
+        if self.outbox is not None:
+            queued = await self._queue(records)
+            self._cache_saved(queued)
+            return queued
+
+        # Ids are set here so each returned row can be matched to its item
+        records = [{**record, "id": str(uuid.uuid4())} for record in records]
+        started = time.perf_counter()
+        try:
+            result = await self._execute(self.client.table(self.table_name).insert(records))
+            returned = {row.get("id"): row for row in result.data or []}
+            SUPABASE_WRITE_SECONDS.observe(
+                time.perf_counter() - started, operation="insert_batch", outcome="ok"
+            )
+            saved = [returned[record["id"]] for record in records if record["id"] in returned]
+            self._cache_saved(saved)
+            if len(saved) != len(records):
+                print(f"⚠️ Batch insert returned {len(saved)} of {len(records)} rows")
+            return [
+                returned.get(record["id"]) or {
+                    "error": True,
+                    "message": "Database save failed: the insert did not return this row",
+                    "record": record,
+                }
+                for record in records
+            ]
+        except Exception as e:
+            SUPABASE_WRITE_SECONDS.observe(
+                time.perf_counter() - started, operation="insert_batch", outcome="error"
+            )
+            return [
+                {
+                    "error": True,
+                    "message": f"Database save failed: {str(e)}",
+                    "record": record,
+                }
+                for record in records
+            ]
+
+    async def save_startups(self, rows: List[Dict[str, Any]]) -> str:
+        """
+        Upsert rows into `startups` (queued in the outbox when one is set).
+
+        Returns:
+            "queued", "saved" or "dry_run".
+        """
+        if self.client is None:
+            return "dry_run"
+        if self.outbox is not None:
+            await self._run(
+                self.outbox.enqueue,
+                "startups", [{**row, "founder_id": self.owner_id} for row in rows], "id",
+            )
+            return "queued"
+        await self._execute(self.client.table("startups").upsert(rows, on_conflict="id"))
+        return "saved"
+
+    async def _queue(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Put records in the outbox. Each gets its primary key now, so a
+        retried flush upserts the same row instead of adding another.
+        """
+        records = [{**record, "id": str(uuid.uuid4()), "user_id": self.owner_id} for record in records]
+        try:
+            ids = await self._run(self.outbox.enqueue, self.table_name, records, "id")
+        except Exception as e:
+            return [
+                {"error": True, "message": f"Outbox enqueue failed: {str(e)}", "record": record}
+                for record in records
+            ]
+        return [
+            {**record, "_queued": True, "_outbox_id": outbox_id}
+            for record, outbox_id in zip(records, ids)
+        ]
+
+    def _cache_saved(self, saved: List[Dict[str, Any]]) -> None:
+        """
+        A save makes every cached read of its startup stale: drop them all and
+        cache the new row for this scope. Queued rows count too, otherwise a
+        read before the flush would cache the previous evaluation.
+        """
+        if self.cache is None:
+            return
+        latest: Dict[str, Dict[str, Any]] = {}
+        for record in saved:
+            if not record.get("error"):
+                latest[record.get("startup_id")] = record   # the last one wins
+        for startup_id, record in latest.items():
+            generation = self.cache.invalidate(startup_id)
+            row = {k: v for k, v in record.items() if not k.startswith("_")}
+            self.cache.put(startup_id, token_scope(self.auth_token), row, generation)
+
+    async def _execute(self, query: Any) -> Any:
+        """Run a PostgREST builder off the event loop."""
+        return await (self.executor or get_shared_db_executor()).execute(query)
+
+    async def _run(self, fn, *args) -> Any:
+        """Run a blocking call (the outbox's SQLite writes) off the event loop."""
+        return await (self.executor or get_shared_db_executor()).run(fn, *args)
+
     async def get_evaluation(
         self, startup_id: str
     ) -> Optional[Dict[str, Any]]:
         """
         Retrieve an evaluation by startup_id.
+        Read through the cache when one is set; "not found" is cached too,
+        errors are not.
 
         Args:
             startup_id: The unique startup identifier.
@@ -76,15 +315,52 @@ class EvaluationRepository:
         if self.client is None:
             return None
 
+        scope = token_scope(self.auth_token)
+        if self.cache is not None:
+            cached = self.cache.get(startup_id, scope)
+            if cached.hit:
+                return cached.record
+
         try:
-            result = (
+            result = await self._execute(
                 self.client.table(self.table_name)
                 .select("*")
                 .eq("startup_id", startup_id)
                 .order("created_at", desc=True)
                 .limit(1)
-                .execute()
             )
-            return result.data[0] if result.data else None
         except Exception:
             return None
+        record = result.data[0] if result.data else None
+        if self.cache is not None:
+            self.cache.put(startup_id, scope, record, cached.generation)
+        return record
+
+    async def get_usage_rows(
+        self, since: str, user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Usage columns of evaluations created at or after `since`.
+
+        Args:
+            since: ISO timestamp (inclusive).
+            user_id: Only this user's evaluations (None = all users).
+
+        Returns:
+            Rows with user_id, created_at, prompt_tokens, completion_tokens,
+            cost_usd and agent_usage; empty in dry-run mode or on error.
+        """
+        if self.client is None:
+            return []
+
+        try:
+            query = (
+                self.client.table(self.table_name)
+                .select("user_id,created_at,prompt_tokens,completion_tokens,cost_usd,agent_usage")
+                .gte("created_at", since)
+            )
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            return (await self._execute(query)).data or []
+        except Exception:
+            return []
@@ -3,23 +3,66 @@ Service Integration Layer
 Connects Scoring Engine, Report Builder, and Persistence.
 Single entry point for post-orchestration processing.
 """
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
+from backend.metrics import REPORT_BUILD_SECONDS, SCORING_SECONDS
+from backend.orchestrator.autogen_usage import get_shared_usage_ledger
 from backend.scoring.scoring_engine import ScoringEngine
 from backend.scoring.report_builder import ReportBuilder
 from backend.scoring.evaluation_repository import EvaluationRepository
 
 
+def persistence_status(save_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    report["_persistence"] for a save result. status is "saved", "queued"
+    (in the write-behind outbox), "failed" or "dry_run".
+    """
+    if save_result.get("error"):
+        status = "failed"
+    elif save_result.get("_dry_run"):
+        status = "dry_run"
+    elif save_result.get("_queued"):
+        status = "queued"
+    else:
+        status = "saved"
+    persistence = {
+        "status": status,
+        "saved": status in ("saved", "dry_run"),
+        "queued": status == "queued",
+        "dry_run": status == "dry_run",
+    }
+    if status == "queued":
+        persistence["evaluation_id"] = save_result["id"]
+    return persistence
+
+
 class EvaluationService:
     """
     Connects Layers 6–8 into a single flow.
     Receives orchestration output → scores → builds report → persists.
     """
 
-    def __init__(self, supabase_client=None):
+    def __init__(self, supabase_client=None, usage_ledger=None, outbox=None, auth_token=None, cache=None,
+                 owner_id=None, repository=None):
+        """
+        Args:
+            supabase_client: Supabase client; None runs persistence dry.
+            usage_ledger: Per-user token ledger (defaults to the shared one).
+            outbox: Queue saves for the write-behind flusher instead of
+                    writing them before the report is returned.
+            auth_token: User token of `supabase_client` (scopes cached reads).
+            cache: EvaluationCache for reads of earlier evaluations.
+            owner_id: Verified user id stamped on queued rows.
+            repository: Storage to use instead of a Supabase EvaluationRepository
+                        (e.g. SQLiteEvaluationRepository); the other
+                        persistence arguments are then ignored.
+        """
         self.scoring_engine = ScoringEngine()
         self.report_builder = ReportBuilder()
-        self.repository = EvaluationRepository(supabase_client)
+        self.repository = repository or EvaluationRepository(
+            supabase_client, outbox=outbox, auth_token=auth_token, cache=cache, owner_id=owner_id
+        )
+        self.usage_ledger = usage_ledger or get_shared_usage_ledger()
 
     async def evaluate(
         self,
@@ -39,26 +82,80 @@ class EvaluationService:
         Returns:
             The final evaluation report (also persisted to DB).
         """
+        report = self.build_report(startup_id, orchestration_output, startup_name)
+
+        # Layer 8: Persist
+        print(f"DEBUG: Attempting to save report for {startup_id}...")
+        save_result = await self.repository.save_evaluation(report, user_id=user_id)
+        print(f"DEBUG: Save result: {save_result}")
+        # The tokens were spent whether or not the save succeeded
+        self.usage_ledger.record(user_id, report.get("usage"))
+
+        # Attach persistence status to report
+        report["_persistence"] = persistence_status(save_result)
+
+        return report
+
+    def build_report(
+        self,
+        startup_id: str,
+        orchestration_output: Dict[str, Any],
+        startup_name: str = "Unknown Startup",
+    ) -> Dict[str, Any]:
+        """
+        Layers 6-7 only: score and build the report without persisting it.
+        Batch evaluations use this and save many reports in one write.
+        """
         agent_outputs = orchestration_output.get("agents", {})
 
         # Layer 6: Score
-        scoring_result = self.scoring_engine.calculate_final_score(agent_outputs)
+        with SCORING_SECONDS.time():
+            scoring_result = self.scoring_engine.calculate_final_score(agent_outputs)
 
         # Layer 7: Report
-        report = self.report_builder.build_final_report(
-            startup_id, agent_outputs, scoring_result
-        )
+        with REPORT_BUILD_SECONDS.time():
+            report = self.report_builder.build_final_report(
+                startup_id, agent_outputs, scoring_result
+            )
         report["startup_name"] = startup_name  # Inject name
 
-        # Layer 8: Persist
-        print(f"DEBUG: Attempting to save report for {startup_id}...")
-        save_result = await self.repository.save_evaluation(report, user_id=user_id)
-        print(f"DEBUG: Save result: {save_result}")
+        # Input fingerprints let the next evaluation of this startup reuse
+        # every agent whose inputs did not change
+        reuse = orchestration_output.get("_meta", {}).get("reuse")
+        if reuse:
+            report["agent_fingerprints"] = reuse["fingerprints"]
+            report["reuse"] = {"reused": reuse["reused"], "recomputed": reuse["recomputed"]}
 
-        # Attach persistence status to report
-        report["_persistence"] = {
-            "saved": not save_result.get("error", False),
-            "dry_run": save_result.get("_dry_run", False),
-        }
-        
+        # Tokens and estimated cost of this run, per agent
+        if "usage" in orchestration_output:
+            report["usage"] = orchestration_output["usage"]
+
+        # Why the validator gate stopped (or, in shadow mode, would have stopped) the run
+        gate = orchestration_output.get("_meta", {}).get("gate")
+        if gate and gate["passed"] is not None:
+            report["validator_gate"] = gate
         return report
+
+    async def load_prior_outputs(self, startup_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Agent outputs + input fingerprints of the startup's latest evaluation,
+        in the shape AutoGenEvaluationOrchestrator expects as prior_outputs.
+        """
+        return await self.repository.get_prior_agent_outputs(startup_id)
+
+    async def save_reports(
+        self, items: List[Tuple[Dict[str, Any], Optional[str]]], record_usage: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Layer 8 for a batch: persist (report, user_id) pairs in one write and
+        attach the persistence status to each report.
+
+        record_usage=False when the caller already recorded each report's
+        usage as its evaluation finished.
+        """
+        results = await self.repository.save_evaluations(items)
+        for (report, user_id), save_result in zip(items, results):
+            if record_usage:
+                self.usage_ledger.record(user_id, report.get("usage"))
+            report["_persistence"] = persistence_status(save_result)
+        return results
@@ -0,0 +1,416 @@
+"""
+Layer 8: Write-behind persistence
+Reports and startup rows go into a local SQLite outbox instead of straight to
+Supabase, so a response no longer waits on (or is lost to) a database
+round-trip. OutboxFlusher drains the outbox in the background: rows for the
+same table are sent as one multi-row upsert (the newest row per key; older
+ones are acked with it), and failed batches are retried with exponential
+backoff until they succeed or run out of attempts ("dead" rows stay in the
+file for inspection).
+
+Every row carries its primary key (evaluations get a UUID when queued), so
+a retry after a lost response overwrites instead of duplicating.
+
+No credentials are stored: rows are flushed with the server's service-role
+client and carry their owner explicitly (`user_id` / `founder_id`, from the
+verified token), so the file never holds a bearer token.
+
+PersistenceOutbox methods are blocking SQLite calls on a file the job
+workers write too; async callers (the repository, the flusher) run them on
+the DBExecutor, so a locked file never stalls the event loop.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.metrics import OUTBOX_DELAY_SECONDS, OUTBOX_DEPTH, OUTBOX_FLUSH_SECONDS
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+
+
+DEFAULT_OUTBOX_PATH = os.path.join(tempfile.gettempdir(), "ideaevaluator_outbox.db")
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_RETRY_BASE_SECONDS = 1.0
+DEFAULT_RETRY_MAX_SECONDS = 300.0
+DEFAULT_FLUSH_INTERVAL = 1.0
+# A claimed batch is retried by another flusher if it is not acked in time
+DEFAULT_CLAIM_SECONDS = 120.0
+
+# Row statuses
+PENDING = "pending"
+DEAD = "dead"
+
+PERSISTENCE_MODES = ("write_behind", "sync")
+
+
+def get_persistence_mode() -> str:
+    """PERSISTENCE_MODE: "write_behind" (default) queues writes, "sync" saves inline."""
+    mode = os.environ.get("PERSISTENCE_MODE", "write_behind")
+    if mode not in PERSISTENCE_MODES:
+        raise ValueError(f"PERSISTENCE_MODE must be one of {PERSISTENCE_MODES}, got {mode!r}")
+    return mode
+
+
+class PersistenceOutbox:
+    """
+    Durable queue of pending Supabase upserts in one SQLite file (WAL mode,
+    so the API process and standalone job workers can share it).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_OUTBOX_PATH,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base_seconds: float = DEFAULT_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = DEFAULT_RETRY_MAX_SECONDS,
+        claim_seconds: float = DEFAULT_CLAIM_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite file path (":memory:" for tests).
+            max_attempts: Failed flushes before a row is marked dead.
+            retry_base_seconds / retry_max_seconds: Exponential backoff bounds.
+            claim_seconds: How long a claimed row is hidden from other flushers.
+            clock: Time source (seconds), injectable for tests.
+        """
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.claim_seconds = claim_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Called after every enqueue (flushers wake up instead of polling)
+        self.listeners: List[Callable[[], None]] = []
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS persistence_outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT NOT NULL,"
+            " on_conflict TEXT NOT NULL, record_json TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT,"
+            " next_attempt_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_persistence_outbox_due"
+            " ON persistence_outbox(status, next_attempt_at)"
+        )
+        # Files written by earlier versions stored bearer tokens with the rows
+        columns = [row["name"] for row in self._db.execute("PRAGMA table_info(persistence_outbox)")]
+        if "auth_token" in columns:
+            self._db.execute("UPDATE persistence_outbox SET auth_token = NULL WHERE auth_token IS NOT NULL")
+
+    def enqueue(
+        self,
+        table: str,
+        records: List[Dict[str, Any]],
+        on_conflict: str = "id",
+    ) -> List[int]:
+        """Queue rows for an upsert into `table`; returns their outbox ids."""
+        now = self._clock()
+        ids = []
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for record in records:
+                    cursor = self._db.execute(
+                        "INSERT INTO persistence_outbox (table_name, on_conflict, record_json,"
+                        " status, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (table, on_conflict, json.dumps(record, default=str), PENDING, now, now),
+                    )
+                    ids.append(cursor.lastrowid)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        for listener in self.listeners:
+            listener()
+        return ids
+
+    def claim(self, limit: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        Take up to `limit` due rows, oldest first, and hide them for
+        claim_seconds. Returns [{"id", "table", "on_conflict", "record",
+        "attempts", "created_at"}].
+        """
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT * FROM persistence_outbox WHERE status = ? AND next_attempt_at <= ?"
+                    " ORDER BY id LIMIT ?",
+                    (PENDING, now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE persistence_outbox SET next_attempt_at = ? WHERE id = ?",
+                    [(now + self.claim_seconds, row["id"]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return [
+            {
+                "id": row["id"],
+                "table": row["table_name"],
+                "on_conflict": row["on_conflict"],
+                "record": json.loads(row["record_json"]),
+                "attempts": row["attempts"],
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ]
+
+    def ack(self, ids: List[int]) -> None:
+        """Rows were saved: remove them."""
+        with self._lock:
+            self._db.executemany("DELETE FROM persistence_outbox WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, ids: List[int], error: str) -> int:
+        """
+        Reschedule failed rows with exponential backoff; rows out of
+        attempts are marked dead. Returns the number of rows that died.
+        """
+        now = self._clock()
+        dead = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for row_id in ids:
+                    row = self._db.execute(
+                        "SELECT attempts FROM persistence_outbox WHERE id = ?", (row_id,)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    attempts = row["attempts"] + 1
+                    if attempts >= self.max_attempts:
+                        dead += 1
+                        self._db.execute(
+                            "UPDATE persistence_outbox SET status = ?, attempts = ?, last_error = ?"
+                            " WHERE id = ?",
+                            (DEAD, attempts, error, row_id),
+                        )
+                        continue
+                    delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+                    self._db.execute(
+                        "UPDATE persistence_outbox SET attempts = ?, last_error = ?, next_attempt_at = ?"
+                        " WHERE id = ?",
+                        (attempts, error, now + delay, row_id),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return dead
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) AS n, MIN(created_at) AS oldest FROM persistence_outbox"
+                " GROUP BY status"
+            ).fetchall()
+            retrying = self._db.execute(
+                "SELECT COUNT(*) FROM persistence_outbox WHERE status = ? AND attempts > 0", (PENDING,)
+            ).fetchone()[0]
+        by_status = {row["status"]: row for row in rows}
+        pending = by_status.get(PENDING)
+        depth = pending["n"] if pending else 0
+        OUTBOX_DEPTH.set(depth)
+        return {
+            "depth": depth,
+            "retrying": retrying,
+            "dead": by_status[DEAD]["n"] if DEAD in by_status else 0,
+            "oldest_pending_seconds": round(now - pending["oldest"], 3) if pending else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def latest_per_key(records: List[Dict[str, Any]], on_conflict: str = "id") -> List[Dict[str, Any]]:
+    """
+    The last record for each conflict key, in first-seen order. Postgres
+    rejects an upsert that touches the same row twice ("ON CONFLICT DO UPDATE
+    command cannot affect row a second time"), and the later row is the
+    newer state anyway.
+    """
+    columns = on_conflict.split(",")
+    latest: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for record in records:
+        latest[tuple(record.get(column.strip()) for column in columns)] = record
+    return list(latest.values())
+
+
+class OutboxFlusher:
+    """
+    Background task that drains the outbox into Supabase. It wakes on
+    notify() after an enqueue, or every `interval` seconds to pick up
+    retries and rows queued by other processes.
+    """
+
+    def __init__(
+        self,
+        outbox: PersistenceOutbox,
+        client: Any,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        interval: float = DEFAULT_FLUSH_INTERVAL,
+        executor: Optional[DBExecutor] = None,
+    ):
+        """
+        Args:
+            outbox: Queue to drain.
+            client: Service-role Supabase client the rows are written with
+                    (None when Supabase is not configured: rows wait).
+            batch_size: Rows claimed per flush (split into one upsert per table).
+            interval: Seconds between polls when idle.
+            executor: Runs the blocking upserts; defaults to the shared DBExecutor.
+        """
+        self.outbox = outbox
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.executor = executor
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"flushes": 0, "saved": 0, "superseded": 0, "failed": 0, "dead": 0, "last_error": None,
+                       "last_flush_ms": 0.0, "max_flush_ms": 0.0}
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.ensure_future(self._run())
+        self.outbox.listeners.append(self.notify)
+        print("✅ Persistence outbox flusher started")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Stop polling, then try once more to save what is due (rows left behind stay queued)."""
+        if self._task is None:
+            return
+        self.outbox.listeners.remove(self.notify)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        try:
+            await asyncio.wait_for(self.flush_once(), timeout=drain_timeout)
+        except Exception as e:
+            print(f"⚠️ Outbox drain on shutdown incomplete: {e}")
+
+    def notify(self) -> None:
+        """Flush now instead of at the next poll (callable from any thread)."""
+        if self._wake is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._wake.set()
+            return
+        try:
+            # enqueue() runs on a DBExecutor thread
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # the loop is closed; the rows wait for the next flusher
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                flushed = await self.flush_once()
+            except Exception as e:
+                # The outbox file itself failed; keep the loop alive
+                print(f"⚠️ Outbox flush failed: {e}")
+                flushed = 0
+            if flushed:
+                continue  # more may be due
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def flush_once(self) -> int:
+        """Claim one batch and upsert it. Returns the number of rows saved."""
+        rows = await self._call(self.outbox.claim, self.batch_size)
+        if not rows:
+            await self._call(self.outbox.stats)
+            return 0
+
+        # One upsert per (table, conflict key), in queue order, so a
+        # startup row is written before the evaluations that follow it
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault((row["table"], row["on_conflict"]), []).append(row)
+
+        saved = 0
+        for (table, on_conflict), group in groups.items():
+            started = time.perf_counter()
+            try:
+                if self.client is None:
+                    raise RuntimeError("Supabase is not configured")
+                records = latest_per_key([row["record"] for row in group], on_conflict)
+                self._stats["superseded"] += len(group) - len(records)
+                query = self.client.table(table).upsert(records, on_conflict=on_conflict)
+                await self._executor().execute(query)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                OUTBOX_FLUSH_SECONDS.observe(elapsed, table=table, outcome="error")
+                dead = await self._call(self.outbox.retry, [row["id"] for row in group], str(e))
+                self._stats["failed"] += len(group)
+                self._stats["dead"] += dead
+                self._stats["last_error"] = str(e)
+                print(f"⚠️ Outbox flush of {len(group)} {table} rows failed ({dead} dead): {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            OUTBOX_FLUSH_SECONDS.observe(elapsed, table=table, outcome="ok")
+            await self._call(self.outbox.ack, [row["id"] for row in group])
+            now = time.time()
+            for row in group:
+                OUTBOX_DELAY_SECONDS.observe(max(0.0, now - row["created_at"]), table=table)
+            saved += len(group)
+            self._stats["last_flush_ms"] = round(elapsed * 1000, 3)
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], self._stats["last_flush_ms"])
+
+        self._stats["flushes"] += 1
+        self._stats["saved"] += saved
+        await self._call(self.outbox.stats)   # refreshes the depth gauge
+        return saved
+
+    def _executor(self) -> DBExecutor:
+        return self.executor or get_shared_db_executor()
+
+    async def _call(self, fn, *args) -> Any:
+        return await self._executor().run(fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the outbox's (blocking; the API runs it on the DBExecutor)."""
+        return {"running": self._task is not None, **self._stats, "outbox": self.outbox.stats()}
+
+
+_shared_outbox: Optional[PersistenceOutbox] = None
+
+
+def get_shared_outbox() -> PersistenceOutbox:
+    """Returns the process-wide outbox configured from the environment."""
+    global _shared_outbox
+    if _shared_outbox is None:
+        _shared_outbox = PersistenceOutbox(
+            path=os.environ.get("PERSISTENCE_OUTBOX_PATH") or DEFAULT_OUTBOX_PATH,
+            max_attempts=int(os.environ.get("OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+            retry_base_seconds=float(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", DEFAULT_RETRY_BASE_SECONDS)),
+            retry_max_seconds=float(os.environ.get("OUTBOX_RETRY_MAX_SECONDS", DEFAULT_RETRY_MAX_SECONDS)),
+        )
+    return _shared_outbox
@@ -6,6 +6,8 @@ NO LLM — pure data transformation.
 from datetime import datetime, timezone
 from typing import Any, Dict
 
+from backend.scoring.scoring_engine import INSUFFICIENT_DATA
+
 
 # Risk label thresholds
 RISK_THRESHOLDS = {
@@ -38,14 +40,23 @@ class ReportBuilder:
             Structured evaluation report dictionary.
         """
         final_score = scoring_result.get("final_score", 0.0)
+        # A gated run is a partial report, not a high-risk verdict
+        risk_label = (
+            INSUFFICIENT_DATA
+            if scoring_result.get("status") == INSUFFICIENT_DATA
+            else ReportBuilder._get_risk_label(final_score)
+        )
 
         return {
             "startup_id": startup_id,
             "final_score": final_score,
-            "risk_label": ReportBuilder._get_risk_label(final_score),
+            "risk_label": risk_label,
             "evaluation_timestamp": datetime.now(timezone.utc).isoformat(),
             "component_scores": scoring_result.get("component_scores", {}),
             "weights_used": scoring_result.get("weights_used", {}),
+            "degraded": any(
+                isinstance(data, dict) and data.get("degraded") for data in agent_outputs.values()
+            ),
             "agent_results": agent_outputs,
             "summary": ReportBuilder._build_summary(final_score, agent_outputs),
         }
@@ -67,12 +78,40 @@ class ReportBuilder:
         """Build a quick summary from key agent outputs."""
         error_agents = [
             name for name, data in agent_outputs.items()
-            if isinstance(data, dict) and data.get("error")
+            if isinstance(data, dict) and data.get("error") and not data.get("gated")
+        ]
+
+        # Agents whose output was served from the response cache
+        cached_agents = [
+            name for name, data in agent_outputs.items()
+            if isinstance(data, dict) and data.get("_meta", {}).get("cache_hit")
+        ]
+
+        # Agents whose inputs were unchanged since the previous evaluation
+        reused_agents = [
+            name for name, data in agent_outputs.items()
+            if isinstance(data, dict) and data.get("_meta", {}).get("reused")
+        ]
+
+        # Agents answered by a deterministic fallback while the LLM was degraded
+        degraded_agents = [
+            name for name, data in agent_outputs.items()
+            if isinstance(data, dict) and data.get("degraded")
+        ]
+
+        # Agents skipped because the submission failed the validator gate
+        gated_agents = [
+            name for name, data in agent_outputs.items()
+            if isinstance(data, dict) and data.get("gated")
         ]
 
         return {
-            "agents_succeeded": len(agent_outputs) - len(error_agents),
+            "agents_succeeded": len(agent_outputs) - len(error_agents) - len(gated_agents),
             "agents_failed": len(error_agents),
             "failed_agents": error_agents,
+            "cached_agents": cached_agents,
+            "reused_agents": reused_agents,
+            "gated_agents": gated_agents,
+            "degraded_agents": degraded_agents,
             "final_score": final_score,
         }
@@ -14,6 +14,9 @@ DEFAULT_WEIGHTS = {
     "validator": 0.20,
 }
 
+# Status of a run the validator gate stopped early (only the validator ran)
+INSUFFICIENT_DATA = "INSUFFICIENT_DATA"
+
 
 class ScoringEngine:
     """
@@ -39,7 +42,25 @@ class ScoringEngine:
               "component_scores": { name: score },
               "weights_used": { name: weight }
             }
+            Gated runs also carry "status": INSUFFICIENT_DATA and
+            "gated_agents"; their final score is 0.0 and only the validator
+            component is reported.
         """
+        gated_agents = [
+            name for name, data in agent_outputs.items()
+            if isinstance(data, dict) and data.get("gated")
+        ]
+        if gated_agents:
+            consistency = self._safe_get(agent_outputs, "validator", "data_consistency_score")
+            completeness = self._safe_get(agent_outputs, "validator", "completeness_score")
+            return {
+                "final_score": 0.0,
+                "component_scores": {"validator": round((consistency + completeness) / 2.0, 4)},
+                "weights_used": self.weights,
+                "status": INSUFFICIENT_DATA,
+                "gated_agents": gated_agents,
+            }
+
         component_scores = {}
 
         # Financial: direct score
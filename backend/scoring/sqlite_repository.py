@@ -0,0 +1,240 @@
+"""
+Layer 8: Local persistence backend
+SQLiteEvaluationRepository keeps `startups` and `startup_evaluations` in one
+SQLite file (WAL mode) with the columns and indexes of supabase_migration.sql.
+With PERSISTENCE_BACKEND=sqlite the whole service, the job workers, the
+batch endpoint and the benchmarks persist offline, without a Supabase
+project and without falling back to dry-run.
+
+Records come back in the shape PostgREST returns them: report_json as the
+JSON string it was saved as, agent_usage decoded. There is no RLS, so reads
+are not scoped to a user. Calls run on the DBExecutor like Supabase calls,
+so a busy file (another worker writing) never stalls the event loop.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+from backend.scoring.evaluation_repository import BaseEvaluationRepository
+
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "ideaevaluator.db")
+PERSISTENCE_BACKENDS = ("supabase", "sqlite")
+
+_EVALUATION_COLUMNS = (
+    "id", "startup_id", "user_id", "final_score", "risk_label", "report_json",
+    "prompt_tokens", "completion_tokens", "cost_usd", "agent_usage", "created_at",
+)
+_USAGE_COLUMNS = ("user_id", "created_at", "prompt_tokens", "completion_tokens", "cost_usd", "agent_usage")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS startups ("
+    " id TEXT PRIMARY KEY, founder_id TEXT, name TEXT NOT NULL, industry TEXT, logo_url TEXT,"
+    " tagline TEXT, sector TEXT, stage TEXT, raise_amount TEXT, description TEXT, about TEXT,"
+    " product TEXT, website TEXT, trending INTEGER DEFAULT 0, founded_date TEXT,"
+    " created_at TEXT NOT NULL, updated_at TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_startups_founder_id ON startups(founder_id)",
+    "CREATE INDEX IF NOT EXISTS idx_startups_sector ON startups(sector)",
+    "CREATE INDEX IF NOT EXISTS idx_startups_stage ON startups(stage)",
+    "CREATE TABLE IF NOT EXISTS startup_evaluations ("
+    " id TEXT PRIMARY KEY, startup_id TEXT NOT NULL, user_id TEXT, final_score REAL,"
+    " risk_label TEXT, report_json TEXT, prompt_tokens INTEGER DEFAULT 0,"
+    " completion_tokens INTEGER DEFAULT 0, cost_usd REAL DEFAULT 0,"
+    " agent_usage TEXT DEFAULT '{}', created_at TEXT NOT NULL)",
+    # Latest evaluation of a startup (get_evaluation)
+    "CREATE INDEX IF NOT EXISTS idx_startup_evaluations_startup_created"
+    " ON startup_evaluations(startup_id, created_at)",
+    # Usage windows, per user and for everyone (get_usage_rows)
+    "CREATE INDEX IF NOT EXISTS idx_startup_evaluations_user_created"
+    " ON startup_evaluations(user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_startup_evaluations_created"
+    " ON startup_evaluations(created_at)",
+)
+
+
+def get_persistence_backend() -> str:
+    """PERSISTENCE_BACKEND: "supabase" (default) or "sqlite" (local file)."""
+    backend = os.environ.get("PERSISTENCE_BACKEND", "supabase")
+    if backend not in PERSISTENCE_BACKENDS:
+        raise ValueError(f"PERSISTENCE_BACKEND must be one of {PERSISTENCE_BACKENDS}, got {backend!r}")
+    return backend
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SQLiteEvaluationRepository(BaseEvaluationRepository):
+    """Evaluations and startups in a local SQLite file."""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, executor: Optional[DBExecutor] = None):
+        """
+        Args:
+            path: SQLite file path (":memory:" for tests).
+            executor: Runs the SQLite calls; defaults to the shared DBExecutor.
+        """
+        self.path = path
+        self.executor = executor
+        self.table_name = "startup_evaluations"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a commit is durable against a crashed process, and
+        # only an OS crash can lose the last transactions
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+
+    # ── Writes ───────────────────────────────────────────────
+
+    async def save_evaluation(
+        self, report: Dict[str, Any], user_id: str = None
+    ) -> Dict[str, Any]:
+        return (await self.save_evaluations([(report, user_id)]))[0]
+
+    async def save_evaluations(
+        self, items: List[Tuple[Dict[str, Any], Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        records = [
+            {"id": str(uuid.uuid4()), **self._build_record(report, user_id)}
+            for report, user_id in items
+        ]
+        if not records:
+            return []
+        try:
+            await self._run(self._insert_evaluations, records)
+        except Exception as e:
+            return [
+                {"error": True, "message": f"Database save failed: {str(e)}", "record": record}
+                for record in records
+            ]
+        return records
+
+    async def save_startups(self, rows: List[Dict[str, Any]]) -> str:
+        rows = [row if row.get("id") else {**row, "id": str(uuid.uuid4())} for row in rows]
+        if rows:
+            await self._run(self._upsert_startups, rows)
+        return "saved"
+
+    def _insert_evaluations(self, records: List[Dict[str, Any]]) -> None:
+        placeholders = ", ".join("?" for _ in _EVALUATION_COLUMNS)
+        values = [
+            tuple(
+                json.dumps(record[column]) if column == "agent_usage" else record[column]
+                for column in _EVALUATION_COLUMNS
+            )
+            for record in records
+        ]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    f"INSERT INTO startup_evaluations ({', '.join(_EVALUATION_COLUMNS)})"
+                    f" VALUES ({placeholders})",
+                    values,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _upsert_startups(self, rows: List[Dict[str, Any]]) -> None:
+        now = _now()
+        # Rows may carry different columns (founder_id is optional): one
+        # statement per column set, all in one transaction
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for columns, group in groups.items():
+                    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+                    self._db.executemany(
+                        f"INSERT INTO startups ({', '.join(columns)}, created_at, updated_at)"
+                        f" VALUES ({', '.join('?' for _ in columns)}, ?, ?)"
+                        f" ON CONFLICT(id) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+                        [tuple(row[c] for c in columns) + (now, now) for row in group],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    # ── Reads ────────────────────────────────────────────────
+
+    async def get_evaluation(
+        self, startup_id: str
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            rows = await self._run(
+                self._select,
+                "SELECT * FROM startup_evaluations WHERE startup_id = ?"
+                " ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                (startup_id,),
+            )
+        except Exception:
+            return None
+        return rows[0] if rows else None
+
+    async def get_usage_rows(
+        self, since: str, user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        query = f"SELECT {', '.join(_USAGE_COLUMNS)} FROM startup_evaluations WHERE created_at >= ?"
+        params: Tuple[Any, ...] = (since,)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params += (user_id,)
+        try:
+            return await self._run(self._select, query, params)
+        except Exception:
+            return []
+
+    def get_startup(self, startup_id: str) -> Optional[Dict[str, Any]]:
+        """A `startups` row (for tooling and tests; the API only writes them)."""
+        rows = self._select("SELECT * FROM startups WHERE id = ?", (startup_id,))
+        return rows[0] if rows else None
+
+    def _select(self, query: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        records = [dict(row) for row in rows]
+        for record in records:
+            if isinstance(record.get("agent_usage"), str):
+                record["agent_usage"] = json.loads(record["agent_usage"])
+        return records
+
+    # ── Lifecycle ────────────────────────────────────────────
+
+    async def _run(self, fn, *args) -> Any:
+        return await (self.executor or get_shared_db_executor()).run(fn, *args)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared_repository: Optional[SQLiteEvaluationRepository] = None
+
+
+def get_local_repository() -> Optional[SQLiteEvaluationRepository]:
+    """
+    Returns the process-wide SQLite repository when PERSISTENCE_BACKEND is
+    "sqlite", otherwise None (evaluations go to Supabase).
+    """
+    global _shared_repository
+    if get_persistence_backend() != "sqlite":
+        return None
+    if _shared_repository is None:
+        _shared_repository = SQLiteEvaluationRepository(
+            path=os.environ.get("PERSISTENCE_SQLITE_PATH") or DEFAULT_SQLITE_PATH,
+        )
+    return _shared_repository
@@ -0,0 +1,123 @@
+"""
+Layer 8: Verified callers
+The bearer token is the only trustworthy statement of who a caller is.
+Where RLS does not check it for us (write-behind rows are flushed later with
+the service-role key; budgets and usage reports are keyed on the user), the
+user id is taken from the verified token, never from the request body.
+
+A token is verified locally against SUPABASE_JWT_SECRET (the project's HS256
+secret) when it is set, otherwise by Supabase Auth (auth.get_user). Verified
+tokens are remembered until their `exp`, at most AUTH_CACHE_TTL_SECONDS, so
+the Auth round-trip is paid once per token rather than once per request.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import jwt
+
+from backend.scoring.db_executor import DBExecutor, get_shared_db_executor
+from backend.scoring.supabase_clients import token_expiry
+
+
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_CACHE_TTL_SECONDS", "300"))
+# app_metadata.role that may read every user's usage
+ADMIN_ROLE = os.environ.get("AUTH_ADMIN_ROLE", "admin")
+
+
+class AuthenticatedUser(NamedTuple):
+    """The user a verified token belongs to."""
+    id: str
+    role: Optional[str] = None   # app_metadata.role (only the service role can set it)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == ADMIN_ROLE
+
+
+class TokenVerifier:
+    """Verifies bearer tokens and caches the result until the token expires."""
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        supabase_client=None,
+        max_entries: int = AUTH_CACHE_SIZE,
+        ttl_seconds: float = AUTH_CACHE_TTL_SECONDS,
+        executor: Optional[DBExecutor] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            jwt_secret: Project JWT secret; tokens are then verified locally.
+            supabase_client: Client whose auth.get_user verifies tokens
+                             when there is no secret.
+            max_entries: Verified tokens remembered (least recently used dropped).
+            ttl_seconds: Longest a verification is reused.
+            executor: Runs auth.get_user; defaults to the shared DBExecutor.
+            clock: Epoch seconds (compared with `exp`), injectable for tests.
+        """
+        self.jwt_secret = jwt_secret
+        self.client = supabase_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.executor = executor
+        self._clock = clock
+        self._lock = threading.Lock()
+        # token -> (user, expires_at)
+        self._users: "OrderedDict[str, Tuple[AuthenticatedUser, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether tokens can be verified at all (a secret or a Supabase client is set)."""
+        return bool(self.jwt_secret) or self.client is not None
+
+    async def verify(self, token: Optional[str]) -> Optional[AuthenticatedUser]:
+        """The token's user, or None if there is no token or it does not verify."""
+        if not token:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._users.get(token)
+            if entry is not None:
+                if entry[1] > now:
+                    self._users.move_to_end(token)
+                    return entry[0]
+                del self._users[token]
+
+        try:
+            if self.jwt_secret:
+                user = self._decode(token)
+            elif self.client is not None:
+                user = await (self.executor or get_shared_db_executor()).run(self._fetch, token)
+            else:
+                return None
+        except Exception as e:
+            print(f"⚠️ Bearer token rejected: {e}")
+            return None
+
+        expires_at = now + self.ttl_seconds
+        exp = token_expiry(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._users[token] = (user, expires_at)
+            self._users.move_to_end(token)
+            while len(self._users) > self.max_entries:
+                self._users.popitem(last=False)
+        return user
+
+    def _decode(self, token: str) -> AuthenticatedUser:
+        claims = jwt.decode(token, self.jwt_secret, algorithms=["HS256"], audience="authenticated")
+        return AuthenticatedUser(claims["sub"], (claims.get("app_metadata") or {}).get("role"))
+
+    def _fetch(self, token: str) -> AuthenticatedUser:
+        user = self.client.auth.get_user(token).user
+        return AuthenticatedUser(str(user.id), (user.app_metadata or {}).get("role"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
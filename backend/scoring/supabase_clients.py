@@ -0,0 +1,105 @@
+"""
+Layer 8: Per-user Supabase clients
+Requests with a bearer token need a client that sends the user's JWT so RLS
+policies apply. Building one per request (create_client + postgrest.auth)
+constructs fresh auth/storage/functions sub-clients every time.
+
+SupabaseClientPool keeps a small LRU of clients keyed by token instead. A
+client is dropped after SUPABASE_CLIENT_TTL_SECONDS or when its token's
+`exp` claim passes, whichever is first. All clients share one keep-alive
+HTTP transport (db_executor.get_shared_supabase_http_client), so
+connections are reused across users as well.
+"""
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+SUPABASE_CLIENT_POOL_SIZE = int(os.environ.get("SUPABASE_CLIENT_POOL_SIZE", "256"))
+SUPABASE_CLIENT_TTL_SECONDS = float(os.environ.get("SUPABASE_CLIENT_TTL_SECONDS", "300"))
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """
+    The JWT's `exp` claim (epoch seconds), or None if it has none or is not
+    a JWT. The signature is not checked: this only bounds how long the
+    client is cached, Supabase still validates the token on every request.
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class SupabaseClientPool:
+    """LRU of authenticated Supabase clients, one per bearer token, with expiry."""
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_clients: int = SUPABASE_CLIENT_POOL_SIZE,
+        ttl_seconds: float = SUPABASE_CLIENT_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            factory: Builds the client for a token (create_client + postgrest.auth).
+            max_clients: Clients kept; the least recently used is dropped beyond it.
+            ttl_seconds: Longest a client is reused.
+            clock: Epoch seconds (compared with `exp`), injectable for tests.
+        """
+        self.factory = factory
+        self.max_clients = max_clients
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # token -> (client, expires_at)
+        self._clients: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def get(self, token: str) -> Any:
+        """The cached client for `token`, or a new one."""
+        now = self._clock()
+        with self._lock:
+            entry = self._clients.get(token)
+            if entry is not None:
+                if entry[1] > now:
+                    self._clients.move_to_end(token)
+                    self._stats["hits"] += 1
+                    return entry[0]
+                del self._clients[token]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+
+        # Built outside the lock; a concurrent miss on the same token just
+        # builds a second client and the last one is kept
+        client = self.factory(token)
+        expires_at = now + self.ttl_seconds
+        exp = token_expiry(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        with self._lock:
+            self._clients[token] = (client, expires_at)
+            self._clients.move_to_end(token)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self._stats["evicted"] += 1
+        return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"size": len(self._clients), "max_clients": self.max_clients, **self._stats}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,366 @@
+"""
+Offline OpenAI-compatible fake LLM server.
+Serves POST /v1/chat/completions from a background thread using only the
+standard library, so tests and load tests can drive the real HTTP client
+path without Groq.
+
+Behaviour is configurable per server:
+  - latency      — "fixed:S", "uniform:LO,HI" or "lognormal:MEDIAN,SIGMA" seconds
+                   before the first byte (or any callable(random.Random) -> seconds)
+  - error_rate   — share of admitted requests answered with HTTP 500
+  - 429s         — an optional request limit per sliding window, plus a random
+                   rate_limit_rate; both answer with a `retry-after` header
+  - responses    — canned JSON per agent; the agent is recognised by its system
+                   prompt (see AGENT_RESPONSES)
+
+Streaming requests ("stream": true) are answered with chat.completion.chunk
+server-sent events, like the real provider.
+"""
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+
+DEFAULT_CONTENT = {"confidence_score": 0.8}
+
+# Canned replies that satisfy each agent's routing requirements
+# (backend.llm_config.AGENT_MODEL_ROUTING), so no request escalates.
+AGENT_RESPONSES: Dict[str, Dict[str, Any]] = {
+    "evaluator_validator": {
+        "data_consistency_score": 0.85,
+        "completeness_score": 0.8,
+        "suspicion_flags": [],
+        "requires_manual_review": False,
+        "confidence_score": 0.9,
+    },
+    "evaluator_financial": {
+        "metrics": {"ebitda": -38000, "burn_rate": 4000, "runway_months": 25, "gross_margin": 80},
+        "score": 62,
+        "financial_health_score": 0.62,
+        "anomalies": [],
+        "reasoning": "Healthy margins with two years of runway.",
+        "confidence_score": 0.85,
+    },
+    "evaluator_market": {
+        "tam": 12000000000,
+        "sam": 1500000000,
+        "som": 30000000,
+        "market_growth_score": 0.7,
+        "reasoning": "Large and growing market for the segment.",
+        "confidence_score": 0.8,
+    },
+    "evaluator_competition": {
+        "competitors": [{"name": "Incumbent Co", "threat": "Medium"}],
+        "competitor_risk_score": 0.45,
+        "novelty_score": 0.65,
+        "confidence_score": 0.8,
+    },
+    "evaluator_risk": {
+        "risks": [{"category": "Market", "description": "Adoption speed", "severity": "Medium"}],
+        "score": 60,
+        "risk_severity_score": 0.4,
+        "mitigation": "Stage go-to-market by segment.",
+        "confidence_score": 0.8,
+    },
+    "evaluator_longevity": {
+        "survival_probability_3yr": 0.6,
+        "survival_probability_5yr": 0.45,
+        "reasoning": "Runway covers the next two funding milestones.",
+        "confidence_score": 0.8,
+    },
+    "evaluator_investor_fit": {
+        "recommended_investor_type": "Seed VC",
+        "recommended_stage": "Seed",
+        "reasoning": "Traction fits a seed round.",
+        "confidence_score": 0.85,
+    },
+}
+
+LatencySpec = Union[None, float, str, Callable[[random.Random], float]]
+
+
+def latency_sampler(spec: LatencySpec) -> Callable[[random.Random], float]:
+    """
+    Turn a latency spec into a sampler(rng) -> seconds.
+
+    Specs: None / "none", a number or "fixed:S", "uniform:LO,HI",
+    "lognormal:MEDIAN,SIGMA", or a callable taking a random.Random.
+    """
+    if callable(spec):
+        return spec
+    if spec is None or spec == "none":
+        return lambda rng: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+
+    kind, _, raw = str(spec).partition(":")
+    try:
+        params = [float(p) for p in raw.split(",")] if raw else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec {spec!r}") from None
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "lognormal" and len(params) == 2:
+        mu = math.log(params[0])
+        return lambda rng: rng.lognormvariate(mu, params[1])
+    raise ValueError(
+        f"Invalid latency spec {spec!r}; use fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA"
+    )
+
+
+@lru_cache(maxsize=1)
+def _agents_by_prompt() -> Dict[str, str]:
+    """System prompt text -> agent name, for every agent in the registry."""
+    from backend.agents.autogen_registry import AGENT_SPECS
+    from backend.agents.autogen_utils import load_system_prompt
+
+    return {load_system_prompt(spec["prompt"]).strip(): spec["name"] for spec in AGENT_SPECS}
+
+
+def identify_agent(messages: List[Mapping[str, Any]]) -> Optional[str]:
+    """Name of the evaluator whose system prompt opens `messages`, if any."""
+    for message in messages:
+        if message.get("role") == "system":
+            return _agents_by_prompt().get(str(message.get("content", "")).strip())
+    return None
+
+
+class FakeLLMServer:
+    """
+    Usage:
+        with FakeLLMServer(requests_per_window=5, window_seconds=1.0) as server:
+            client = OpenAIChatCompletionClient(base_url=server.base_url, ...)
+
+        with FakeLLMServer(latency="lognormal:0.8,0.5", error_rate=0.02, seed=7) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url   # route the app to it
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        requests_per_window: Optional[int] = None,
+        window_seconds: float = 60.0,
+        retry_after: float = 1.0,
+        content: Optional[Dict[str, Any]] = None,
+        responses: Optional[Dict[str, Dict[str, Any]]] = None,
+        latency: LatencySpec = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        stream_chunk_chars: int = 16,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            host: Interface to bind.
+            port: Port to bind (0 picks a free port).
+            requests_per_window: Accepted requests per sliding window (None = unlimited).
+            window_seconds: Length of the sliding window.
+            retry_after: Value of the retry-after header on 429 responses.
+            content: JSON object returned when the agent is not recognised.
+            responses: Agent name -> JSON object, merged over AGENT_RESPONSES.
+            latency: Delay before the response (see latency_sampler).
+            error_rate: Share of admitted requests answered with HTTP 500.
+            rate_limit_rate: Share of admitted requests answered with HTTP 429.
+            stream_chunk_chars: Characters per chunk of a streamed reply.
+            seed: Seed for latency and error sampling (reproducible runs).
+        """
+        self.requests_per_window = requests_per_window
+        self.window_seconds = window_seconds
+        self.retry_after = retry_after
+        self.content = content or DEFAULT_CONTENT
+        self.responses = {**AGENT_RESPONSES, **(responses or {})}
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+
+        self._latency = latency_sampler(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._accepted_at = deque()
+        self._counters = {"requests": 0, "completed": 0, "rate_limited": 0, "errors": 0, "streamed": 0}
+        self._by_agent: Counter = Counter()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "by_agent": dict(self._by_agent)}
+
+    # ── Request handling ─────────────────────────────────────
+
+    def _admit(self) -> bool:
+        """Sliding-window limit check; records the request if admitted."""
+        now = time.monotonic()
+        with self._lock:
+            self._counters["requests"] += 1
+            while self._accepted_at and now - self._accepted_at[0] >= self.window_seconds:
+                self._accepted_at.popleft()
+            if self.requests_per_window is not None and len(self._accepted_at) >= self.requests_per_window:
+                self._counters["rate_limited"] += 1
+                return False
+            self._accepted_at.append(now)
+            return True
+
+    def _draw(self) -> tuple:
+        """(latency seconds, outcome) for one admitted request: "ok", "error" or "rate_limited"."""
+        with self._lock:
+            delay = max(0.0, self._latency(self._rng))
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self._counters["rate_limited"] += 1
+                return delay, "rate_limited"
+            if roll < self.rate_limit_rate + self.error_rate:
+                self._counters["errors"] += 1
+                return delay, "error"
+            return delay, "ok"
+
+    def _reply(self, request: Dict[str, Any]) -> str:
+        agent = identify_agent(request.get("messages", []))
+        with self._lock:
+            self._counters["completed"] += 1
+            self._by_agent[agent or "unknown"] += 1
+        return json.dumps(self.responses.get(agent, self.content))
+
+    @staticmethod
+    def _usage(request: Dict[str, Any], content: str) -> Dict[str, int]:
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", []))
+        return {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_chars // 4 + len(content) // 4,
+        }
+
+    def _completion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        content = self._reply(request)
+        return {
+            "id": f"chatcmpl-fake-{self._counters['completed']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(request, content),
+        }
+
+    def _chunks(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """chat.completion.chunk events of a streamed reply."""
+        content = self._reply(request)
+        with self._lock:
+            self._counters["streamed"] += 1
+        base = {
+            "id": f"chatcmpl-fake-{self._counters['completed']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+        }
+        size = self.stream_chunk_chars
+        chunks = [
+            {**base, "choices": [{
+                "index": 0,
+                "delta": {"role": "assistant", "content": content[i:i + size]} if i == 0
+                else {"content": content[i:i + size]},
+                "finish_reason": None,
+            }]}
+            for i in range(0, len(content), size)
+        ]
+        chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            chunks.append({**base, "choices": [], "usage": self._usage(request, content)})
+        return chunks
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):  # keep test output quiet
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_events(self, events: List[Dict[str, Any]]):
+                # No Content-Length: the stream ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                for event in events:
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _rate_limited(self):
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                    {"retry-after": str(server.retry_after)},
+                )
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                if not server._admit():
+                    self._rate_limited()
+                    return
+
+                delay, outcome = server._draw()
+                if delay:
+                    time.sleep(delay)
+                if outcome == "rate_limited":
+                    self._rate_limited()
+                elif outcome == "error":
+                    self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                elif request.get("stream"):
+                    self._send_events(server._chunks(request))
+                else:
+                    self._send_json(200, server._completion(request))
+
+        return Handler
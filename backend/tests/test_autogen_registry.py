@@ -3,8 +3,14 @@ Unit test for AutoGen agent initialization.
 Verifies all 7 agents load with correct system prompts.
 """
 import unittest
+import asyncio
 from unittest.mock import patch, MagicMock
-from backend.agents.autogen_registry import initialize_agents, AGENT_SPECS
+from backend.agents.autogen_registry import initialize_agents, AgentRegistry, AGENT_SPECS
+from backend.agents.autogen_utils import get_model_client
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
 
 
 class TestAutoGenRegistry(unittest.TestCase):
@@ -64,5 +70,77 @@ class TestAutoGenRegistry(unittest.TestCase):
             initialize_agents()
 
 
+class TestAgentRegistryPool(unittest.TestCase):
+
+    def setUp(self):
+        with patch('backend.agents.autogen_utils.os.environ.get', return_value="test_api_key"):
+            self.client = get_model_client()
+
+    def test_agent_sets_share_one_model_client(self):
+        registry = AgentRegistry(model_client=self.client, pool_size=2)
+
+        async def scenario():
+            async with registry.acquire() as first:
+                async with registry.acquire() as second:
+                    return first, second
+
+        first, second = _run(scenario())
+
+        self.assertIsNot(first["evaluator_market"], second["evaluator_market"])
+        self.assertIs(first["evaluator_market"]._model_client, self.client)
+        self.assertIs(second["evaluator_market"]._model_client, self.client)
+
+    def test_released_sets_are_reused(self):
+        registry = AgentRegistry(model_client=self.client, pool_size=2)
+
+        async def scenario():
+            for _ in range(5):
+                async with registry.acquire():
+                    pass
+
+        _run(scenario())
+        stats = registry.stats()
+
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["checkouts"], 5)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["idle"], 1)
+
+    def test_pool_is_bounded(self):
+        registry = AgentRegistry(model_client=self.client, pool_size=1)
+        peak = {"in_use": 0}
+
+        async def worker():
+            async with registry.acquire():
+                peak["in_use"] = max(peak["in_use"], registry.stats()["in_use"])
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            await asyncio.gather(worker(), worker(), worker())
+
+        _run(scenario())
+        stats = registry.stats()
+
+        self.assertEqual(peak["in_use"], 1)
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["waits"], 2)
+
+    def test_release_resets_agent_history(self):
+        registry = AgentRegistry(model_client=self.client, pool_size=1)
+
+        async def scenario():
+            async with registry.acquire() as agents:
+                agents["evaluator_risk"].on_reset = MagicMock(wraps=agents["evaluator_risk"].on_reset)
+                spy = agents["evaluator_risk"].on_reset
+            return spy
+
+        spy = _run(scenario())
+        spy.assert_called_once()
+
+    def test_invalid_pool_size_raises(self):
+        with self.assertRaises(ValueError):
+            AgentRegistry(model_client=self.client, pool_size=0)
+
+
 if __name__ == '__main__':
     unittest.main()
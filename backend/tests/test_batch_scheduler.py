@@ -0,0 +1,266 @@
+"""
+Unit tests for the shared batch scheduler (Module 11) and /evaluate-batch.
+"""
+import unittest
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from autogen_core.models import RequestUsage
+from fastapi.testclient import TestClient
+
+from backend.orchestrator.autogen_batch_scheduler import BatchScheduler
+from backend.scoring.evaluation_repository import EvaluationRepository
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(scheduler, items, worker):
+    return [pair async for pair in scheduler.map_unordered(_aiter(items), worker)]
+
+
+class TestBatchScheduler(unittest.TestCase):
+
+    def test_results_arrive_in_completion_order(self):
+        scheduler = BatchScheduler(max_concurrency=3)
+
+        async def worker(index, delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        results = _run(_collect(scheduler, [0.06, 0.01, 0.03], worker))
+
+        self.assertEqual([index for index, _ in results], [1, 2, 0])
+
+    def test_concurrency_is_bounded_across_batches(self):
+        scheduler = BatchScheduler(max_concurrency=2)
+        running = {"now": 0, "peak": 0}
+
+        async def worker(index, item):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return item
+
+        async def two_batches():
+            return await asyncio.gather(
+                _collect(scheduler, range(5), worker),
+                _collect(scheduler, range(5), worker),
+            )
+
+        first, second = _run(two_batches())
+
+        self.assertEqual(len(first) + len(second), 10)
+        self.assertEqual(running["peak"], 2)
+        self.assertEqual(scheduler.stats()["completed"], 10)
+
+    def test_exceptions_are_yielded_not_raised(self):
+        scheduler = BatchScheduler(max_concurrency=2)
+
+        async def worker(index, item):
+            if item == "bad":
+                raise ValueError("invalid startup")
+            return item
+
+        results = dict(_run(_collect(scheduler, ["ok", "bad", "ok"], worker)))
+
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[0], "ok")
+        self.assertEqual(scheduler.stats()["failed"], 1)
+
+    def test_input_is_not_read_ahead(self):
+        scheduler = BatchScheduler(max_concurrency=2)
+        pulled = []
+
+        async def source():
+            for i in range(6):
+                pulled.append(i)
+                yield i
+
+        async def scenario():
+            async def worker(index, item):
+                await asyncio.sleep(0.01)
+                return item
+
+            stream = scheduler.map_unordered(source(), worker)
+            await stream.__anext__()
+            seen = len(pulled)
+            await stream.aclose()
+            return seen
+
+        self.assertLessEqual(_run(scenario()), 3)
+
+
+class TestBatchedWrites(unittest.TestCase):
+
+    def test_save_evaluations_uses_one_insert(self):
+        inserts = []
+
+        class _Table:
+            def insert(self, rows):
+                inserts.append(rows)
+                return SimpleNamespace(execute=lambda: SimpleNamespace(data=rows))
+
+        client = SimpleNamespace(table=lambda name: _Table())
+        repo = EvaluationRepository(client)
+
+        results = _run(repo.save_evaluations([
+            ({"startup_id": "a", "final_score": 0.5}, "u1"),
+            ({"startup_id": "b", "final_score": 0.7}, None),
+        ]))
+
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual([r["startup_id"] for r in inserts[0]], ["a", "b"])
+        self.assertEqual(len(results), 2)
+
+    def test_rows_missing_from_the_insert_result_are_errors(self):
+        class _Table:
+            def insert(self, rows):
+                # As when RLS hides a row from the insert's RETURNING
+                return SimpleNamespace(execute=lambda: SimpleNamespace(data=rows[1:]))
+
+        repo = EvaluationRepository(SimpleNamespace(table=lambda name: _Table()))
+
+        missing, saved = _run(repo.save_evaluations([
+            ({"startup_id": "a", "final_score": 0.5}, "u1"),
+            ({"startup_id": "b", "final_score": 0.7}, "u1"),
+        ]))
+
+        self.assertTrue(missing["error"])
+        self.assertEqual(missing["record"]["startup_id"], "a")
+        self.assertEqual(saved["startup_id"], "b")
+        self.assertIn("id", saved)
+
+    def test_dry_run_marks_every_record(self):
+        results = _run(EvaluationRepository().save_evaluations([({"startup_id": "a"}, None)]))
+        self.assertTrue(results[0]["_dry_run"])
+
+
+# ── /evaluate-batch ──────────────────────────────────────────
+
+def _request(name, revenue=50000):
+    return {
+        "startup_context": {"name": name, "industry": "Fintech", "stage": "Seed",
+                            "description": f"{name} does payments"},
+        "financial_raw_input": {
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": revenue, "cogs": 1000, "operating_expenses": 5000,
+            "cash_balance": 100000, "monthly_burn_rate": 4000,
+        },
+        "qualitative": {},
+        "metadata": {},
+    }
+
+
+class _FakeAgent:
+    def __init__(self, name):
+        self.name = name
+
+    async def on_messages(self, messages, cancellation_token):
+        return SimpleNamespace(chat_message=SimpleNamespace(
+            content='{"score": 60, "confidence_score": 0.7}',
+            models_usage=RequestUsage(prompt_tokens=100, completion_tokens=20),
+        ))
+
+
+class _FakeRegistry:
+    @asynccontextmanager
+    async def acquire(self):
+        yield {
+            f"evaluator_{step}": _FakeAgent(f"evaluator_{step}")
+            for step in ("validator", "financial", "market", "competition",
+                         "risk", "longevity", "investor_fit")
+        }
+
+
+class TestEvaluateBatchEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        import backend.main as main
+        self.main = main
+        patches = [
+            patch.object(main, "get_shared_registry", lambda: _FakeRegistry()),
+            patch.object(main, "get_shared_response_cache", lambda: None),
+            patch.object(main, "get_shared_batch_scheduler", lambda: BatchScheduler(max_concurrency=2)),
+            patch.object(main, "BATCH_WRITE_SIZE", 2),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = TestClient(main.app)
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    def test_json_array_streams_results_and_summary(self):
+        body = [_request("Acme"), _request("Beta"), {"startup_context": {}}]
+
+        response = self.client.post("/evaluate-batch", json=body)
+
+        self.assertEqual(response.status_code, 200)
+        lines = self._lines(response)
+        results = [l for l in lines if l["type"] == "result"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(r["status"] for r in results), ["completed", "completed", "failed"])
+
+        persisted = [l for l in lines if l["type"] == "persisted"]
+        self.assertEqual(len(persisted), 1)  # two reports, one batched write
+        self.assertEqual(len(persisted[0]["startup_ids"]), 2)
+
+        summary = lines[-1]
+        self.assertEqual(summary["type"], "summary")
+        self.assertEqual((summary["total"], summary["completed"], summary["failed"]), (3, 2, 1))
+        # Actual usage of the completed reports, not a prompt-size estimate
+        reports = [r["report"]["usage"] for r in results if r["status"] == "completed"]
+        self.assertGreater(summary["usage"]["completion_tokens"], 0)
+        for field in ("prompt_tokens", "completion_tokens", "llm_calls"):
+            self.assertEqual(summary["usage"][field], sum(u[field] for u in reports))
+
+    def test_jsonl_upload(self):
+        body = "\n".join(json.dumps(_request(name)) for name in ("A", "B", "C")) + "\n"
+
+        response = self.client.post(
+            "/evaluate-batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        lines = self._lines(response)
+        self.assertEqual(lines[-1]["completed"], 3)
+        self.assertEqual(sum(l["saved"] for l in lines if l["type"] == "persisted"), 3)
+
+    def test_budget_sees_usage_of_items_not_yet_flushed(self):
+        import backend.scoring.evaluation_service as evaluation_service
+        from backend.orchestrator.autogen_usage import UsageLedger
+
+        ledger = UsageLedger()
+        budget = json.dumps({"anonymous": {"daily_tokens": 1}})
+        body = [_request(name) for name in ("A", "B", "C")]
+        with patch.object(self.main, "get_shared_usage_ledger", lambda: ledger), \
+                patch.object(evaluation_service, "get_shared_usage_ledger", lambda: ledger), \
+                patch.object(self.main, "get_shared_batch_scheduler", lambda: BatchScheduler(max_concurrency=1)), \
+                patch.object(self.main, "BATCH_WRITE_SIZE", 10), \
+                patch.dict("os.environ", {"USAGE_BUDGET": budget}):
+            response = self.client.post("/evaluate-batch", json=body)
+
+        lines = self._lines(response)
+        self.assertEqual((lines[-1]["completed"], lines[-1]["failed"]), (1, 2))
+        self.assertIn("Daily token budget", [l for l in lines if l["type"] == "result"][-1]["error"])
+        # Recorded once, when the item finished (not again by the flush)
+        self.assertEqual(ledger.spent_today(None)["evaluations"], 1)
+
+    def test_invalid_body_is_rejected(self):
+        response = self.client.post("/evaluate-batch", json={"not": "a list"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Unit tests for evaluation cancellation (Module 12) and SSE disconnect handling.
+"""
+import unittest
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from autogen_core import CancellationToken
+
+from backend.orchestrator.autogen_cancellation import CancellationStats, resolve_disconnect_policy
+from backend.orchestrator.autogen_execution_policy import get_agent_policy
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.orchestrator.autogen_single_flight import SingleFlight
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _SlowAgent:
+    """Replies after `delay` seconds unless its token is cancelled first."""
+
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+        self.tokens = []
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        self.tokens.append(cancellation_token)
+        await cancellation_token.link_future(asyncio.ensure_future(asyncio.sleep(self.delay)))
+        return SimpleNamespace(chat_message=SimpleNamespace(content='{"score": 60, "confidence_score": 0.7}'))
+
+
+def _agents(delays=None):
+    delays = delays or {}
+    return {f"evaluator_{s}": _SlowAgent(f"evaluator_{s}", delays.get(s, 0.0)) for s in STEPS}
+
+
+class TestDisconnectPolicy(unittest.TestCase):
+
+    def test_request_overrides_default(self):
+        self.assertEqual(resolve_disconnect_policy("finish"), "finish")
+        self.assertEqual(resolve_disconnect_policy(None), "abort")
+        self.assertEqual(resolve_disconnect_policy("bogus"), "abort")
+
+    def test_stats_count_saved_calls(self):
+        stats = CancellationStats()
+        stats.record_disconnect("abort")
+        stats.record_cancelled_run({"skipped": ["risk", "longevity"], "interrupted": ["market"]})
+
+        counts = stats.stats()
+        self.assertEqual((counts["disconnects"], counts["aborted"]), (1, 1))
+        self.assertEqual((counts["llm_calls_saved"], counts["llm_calls_interrupted"]), (2, 1))
+
+
+class TestCancelledAgentCall(unittest.TestCase):
+
+    def test_cancel_interrupts_the_call_without_retrying(self):
+        agent = _SlowAgent("evaluator_market", delay=5)
+        token = CancellationToken()
+        policy = {**get_agent_policy(agent.name), "max_attempts": 3}
+
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.05, token.cancel)
+            return await execute_autogen_agent(agent, {"x": 1}, policy=policy, cancellation_token=token)
+
+        output = _run(scenario())
+
+        self.assertTrue(output["error"] and output["cancelled"])
+        self.assertEqual(agent.calls, 1)
+        self.assertTrue(agent.tokens[0].is_cancelled())  # propagated into on_messages
+
+    def test_already_cancelled_never_calls_the_llm(self):
+        agent = _SlowAgent("evaluator_market")
+        token = CancellationToken()
+        token.cancel()
+
+        output = _run(execute_autogen_agent(agent, {"x": 1}, cancellation_token=token))
+
+        self.assertTrue(output["cancelled"])
+        self.assertEqual(agent.calls, 0)
+
+
+class TestCancelledEvaluation(unittest.TestCase):
+
+    def test_pending_agents_are_skipped(self):
+        agents = _agents({"market": 5})
+        token = CancellationToken()
+
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.05, token.cancel)
+            return await AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+                {"startup_context": {"name": "Acme"}}, cancellation_token=token
+            )
+
+        result = _run(scenario())
+        cancellation = result["_meta"]["cancellation"]
+
+        self.assertTrue(cancellation["cancelled"])
+        self.assertEqual(cancellation["interrupted"], ["market"])
+        self.assertEqual(sorted(cancellation["skipped"]), ["investor_fit", "longevity", "risk"])
+        for step in ("risk", "longevity", "investor_fit"):
+            self.assertEqual(agents[f"evaluator_{step}"].calls, 0)
+
+
+# ── /evaluate-stream ─────────────────────────────────────────
+
+class _FakeRegistry:
+    def __init__(self, agents):
+        self.agents = agents
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.agents
+
+
+class _DisconnectingRequest:
+    """Stands in for the Starlette Request; the client leaves after the first event."""
+
+    headers = {}
+
+    def __init__(self):
+        self.gone = False
+
+    async def is_disconnected(self):
+        return self.gone
+
+
+def _request():
+    from backend.main import EvaluationRequest
+    return EvaluationRequest(
+        startup_context={"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                         "description": "Acme does payments"},
+        financial_raw_input={
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": 50000, "cogs": 1000, "operating_expenses": 5000,
+            "cash_balance": 100000, "monthly_burn_rate": 4000,
+        },
+        qualitative={},
+        metadata={},
+    )
+
+
+class TestStreamDisconnect(unittest.TestCase):
+
+    def setUp(self):
+        import backend.main as main
+        self.main = main
+        self.agents = _agents({"market": 0.3})
+        self.stats = CancellationStats()
+        self.single_flight = SingleFlight()
+        self.saved = []
+        service = SimpleNamespace(evaluate=self._evaluate)
+        patches = [
+            patch.object(main, "get_shared_registry", lambda: _FakeRegistry(self.agents)),
+            patch.object(main, "get_shared_response_cache", lambda: None),
+            patch.object(main, "get_shared_cancellation_stats", lambda: self.stats),
+            patch.object(main, "get_shared_single_flight", lambda: self.single_flight),
+            patch.object(main, "EvaluationService", lambda supabase_client: service),
+            patch.object(main, "DISCONNECT_POLL_SECONDS", 0.01),
+            patch.object(main, "supabase", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def _evaluate(self, **kwargs):
+        self.saved.append(kwargs["startup_id"])
+        return {"startup_id": kwargs["startup_id"]}
+
+    def _disconnect_after_first_event(self, request):
+        async def scenario():
+            raw = _DisconnectingRequest()
+            response = await self.main.evaluate_startup_stream(request, raw)
+            events = []
+            async for chunk in response.body_iterator:
+                events.append(chunk)
+                raw.gone = True
+            await self.single_flight.drain()
+            return events
+
+        return _run(scenario())
+
+    def test_abort_skips_remaining_agents_and_persistence(self):
+        events = self._disconnect_after_first_event(_request())
+
+        self.assertFalse(any("event: result" in e for e in events))
+        self.assertEqual(self.saved, [])
+        self.assertEqual(self.agents["evaluator_risk"].calls, 0)
+        counts = self.stats.stats()
+        self.assertEqual(counts["aborted"], 1)
+        self.assertEqual(counts["llm_calls_saved"], 3)  # risk, longevity, investor_fit
+
+    def test_finish_policy_persists_anyway(self):
+        request = _request()
+        request.on_disconnect = "finish"
+
+        self._disconnect_after_first_event(request)
+
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(self.agents["evaluator_risk"].calls, 1)
+        self.assertEqual(self.stats.stats()["finished_anyway"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
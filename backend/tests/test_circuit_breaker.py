@@ -0,0 +1,238 @@
+"""
+Unit tests for the LLM circuit breaker and the degraded-mode fallbacks (Module 17).
+"""
+import unittest
+import asyncio
+from types import SimpleNamespace
+
+from backend.agents.autogen_circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakingChatCompletionClient,
+    CircuitOpenError,
+)
+from backend.agents.autogen_rate_limiter import AdaptiveRateLimiter, RateLimitedChatCompletionClient
+from backend.orchestrator.autogen_fallbacks import (
+    financial_fallback,
+    fallback_output,
+    risk_fallback,
+    validator_fallback,
+)
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.scoring.evaluation_service import EvaluationService
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _context(cash=100000, burn=4000):
+    return {
+        "startup_context": {"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                            "description": "Invoice financing for freelancers"},
+        "financial_input": {
+            "startup_id": "00000000-0000-0000-0000-000000000001",
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": 50000, "cogs": 10000, "operating_expenses": 88000,
+            "cash_balance": cash, "monthly_burn_rate": burn,
+        },
+        "qualitative": {"problem_description": "Late invoices"},
+        "metadata": {},
+    }
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.breaker = CircuitBreaker(
+            "test", window=10, min_calls=4, error_rate=0.5,
+            slow_call_seconds=5, slow_rate=0.75, open_seconds=30, clock=self.clock,
+        )
+
+    def test_trips_on_error_rate(self):
+        for failed in (False, True, False, True):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(0.1, failed=failed)
+
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_trips_on_slow_calls(self):
+        for seconds in (6, 7, 8, 0.5):
+            self.breaker.record(seconds, failed=False)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertIn("slow-call", self.breaker.stats()["last_trip_reason"])
+
+    def test_half_open_probe(self):
+        for _ in range(4):
+            self.breaker.record(0.1, failed=True)
+        self.clock.now += 31
+
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())  # one probe at a time
+        self.breaker.record(0.1, failed=True)
+        self.assertEqual(self.breaker.state, "open")
+
+        self.clock.now += 31
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(0.1, failed=False)
+        self.assertEqual(self.breaker.state, "closed")
+
+
+class _FlakyClient:
+    def __init__(self, fail=True):
+        self.fail = fail
+        self.calls = 0
+
+    async def create(self, messages, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("provider down")
+        return "ok"
+
+
+class _QuickClient:
+    async def create(self, messages, **kwargs):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(content="ok", usage=None)
+
+    async def create_stream(self, messages, **kwargs):
+        yield await self.create(messages)
+
+
+def _busy_limiter():
+    # One request per 0.2s, and the first one is already taken
+    limiter = AdaptiveRateLimiter(requests_per_minute=300, tokens_per_minute=0, burst_seconds=0.2)
+    _run(limiter.acquire())
+    return limiter
+
+
+class TestCircuitBreakingClient(unittest.TestCase):
+
+    def test_open_circuit_skips_the_provider(self):
+        wrapped = _FlakyClient()
+        breaker = CircuitBreaker("test", window=4, min_calls=2, error_rate=0.5)
+        client = CircuitBreakingChatCompletionClient(wrapped, breaker)
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                _run(client.create([]))
+        with self.assertRaises(CircuitOpenError):
+            _run(client.create([]))
+
+        self.assertEqual(wrapped.calls, 2)
+
+    def test_limiter_queue_time_is_not_provider_latency(self):
+        breaker = CircuitBreaker("test", window=4, min_calls=1, slow_call_seconds=0.1, slow_rate=1.0)
+        client = CircuitBreakingChatCompletionClient(
+            RateLimitedChatCompletionClient(_QuickClient(), _busy_limiter()), breaker
+        )
+
+        _run(client.create([]))   # ~0.2s queued, 0.01s at the provider
+
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.stats()["window_slow_rate"], 0.0)
+
+    def test_probe_cancelled_while_queued_is_released(self):
+        breaker = CircuitBreaker("test", window=4, min_calls=1, error_rate=0.5, open_seconds=0)
+        breaker.record(0.1, failed=True)
+        client = CircuitBreakingChatCompletionClient(
+            RateLimitedChatCompletionClient(_QuickClient(), _busy_limiter()), breaker
+        )
+
+        async def scenario():
+            probe = asyncio.ensure_future(client.create([]))
+            await asyncio.sleep(0.05)
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+
+        _run(scenario())
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(breaker.allow())   # the probe slot is free again
+
+
+class TestFallbacks(unittest.TestCase):
+
+    def test_financial_fallback_uses_financial_engine(self):
+        output = financial_fallback(_context())
+
+        self.assertEqual(output["metrics"]["ebitda"], 50000 - 10000 - 88000)
+        self.assertEqual(output["metrics"]["burn_rate"], 48000)
+        self.assertLess(output["financial_health_score"], 0.5)  # ~2 months of runway
+        self.assertTrue(output["anomalies"])
+
+    def test_financial_fallback_needs_financials(self):
+        self.assertIsNone(financial_fallback({"financial_input": {"revenue": "n/a"}}))
+
+    def test_validator_fallback_scores_completeness(self):
+        output = validator_fallback(_context())
+        self.assertGreater(output["completeness_score"], 0.5)
+        self.assertEqual(output["suspicion_flags"], [])
+
+        empty = validator_fallback({"startup_context": {"name": "X"}})
+        self.assertLess(empty["completeness_score"], 0.2)
+        self.assertIn("Description is missing or too short to assess", empty["suspicion_flags"])
+
+    def test_risk_fallback_reads_upstream(self):
+        context = {**_context(), "upstream_outputs": {
+            "financial": {"metrics": {"runway_months": 3}},
+            "competition": {"competitor_risk_score": 0.9},
+            "market": {"tam": 1e9},
+        }}
+        output = risk_fallback(context)
+
+        self.assertEqual({r["severity"] for r in output["risks"]}, {"High"})
+        self.assertEqual(output["risk_severity_score"], 0.8)
+
+    def test_outputs_are_marked_degraded(self):
+        output = fallback_output("validator", _context(), "circuit open")
+        self.assertTrue(output["degraded"])
+        self.assertEqual(output["_meta"]["fallback"], "rule_based")
+        self.assertIsNone(fallback_output("market", _context(), "circuit open"))
+
+
+class _OpenCircuitAgent:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        raise CircuitOpenError("Circuit 'llama' is open; LLM call skipped.")
+
+
+class TestDegradedEvaluation(unittest.TestCase):
+
+    def test_open_circuit_serves_fallbacks(self):
+        agents = {f"evaluator_{s}": _OpenCircuitAgent(f"evaluator_{s}") for s in STEPS}
+
+        result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(_context()))
+
+        self.assertEqual(sorted(result["_meta"]["degraded"]),
+                         ["financial", "longevity", "risk", "validator"])
+        self.assertTrue(result["agents"]["market"]["circuit_open"])
+        self.assertEqual(agents["evaluator_financial"].calls, 1)  # rejected, not retried
+
+        report = EvaluationService().build_report("s1", result, "Acme")
+        self.assertTrue(report["degraded"])
+        self.assertEqual(sorted(report["summary"]["degraded_agents"]),
+                         ["financial", "longevity", "risk", "validator"])
+        self.assertEqual(report["component_scores"]["financial"],
+                         result["agents"]["financial"]["financial_health_score"])
+
+
+if __name__ == "__main__":
+    unittest.main()
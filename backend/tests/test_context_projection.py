@@ -0,0 +1,164 @@
+"""
+Unit tests for per-agent context projection (Module 10).
+"""
+import unittest
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.orchestrator.autogen_context_builder import build_autogen_context
+from backend.orchestrator.autogen_context_projection import (
+    context_token_report,
+    project_context,
+    serialize_context,
+)
+from backend.orchestrator.autogen_execution_policy import LatencyTracker
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+BASE_CONTEXT = {
+    "startup_context": {
+        "startup_id": "0b6f6a4e-0000-0000-0000-000000000001",
+        "name": "Acme",
+        "industry": "Fintech",
+        "stage": "Seed",
+        "description": "Payments for freelancers",
+        "website": "https://acme.test",
+        "founded_date": None,
+        "schema_version": "1.0.0",
+        "created_at": "2026-01-01T00:00:00",
+    },
+    "financial_input": {
+        "startup_id": "0b6f6a4e-0000-0000-0000-000000000001",
+        "revenue": 50000,
+        "cogs": 10000,
+        "operating_expenses": 60000,
+        "cash_balance": 400000,
+        "monthly_burn_rate": 20000,
+        "currency": "USD",
+    },
+    "qualitative": {
+        "problem_description": "Freelancers wait 60 days to get paid. " * 20,
+        "product_description": "Instant invoice financing. " * 20,
+        "founder_background": "Ex-Stripe",
+        "users_count": 1200,
+    },
+    "metadata": {"submitted_at": "2026-01-01T00:00:00", "version": "2.0"},
+}
+
+UPSTREAM = {
+    "financial": {
+        "metrics": {"runway_months": 20, "burn_rate": 20000, "ebitda": -10000},
+        "score": 62,
+        "anomalies": [],
+        "reasoning": "Long CFO narrative. " * 50,
+        "confidence_score": 0.8,
+        "_meta": {"agent": "evaluator_financial", "started_at": "t0"},
+    },
+    "market": {"tam": 1e9, "sam": 1e8, "som": 1e7, "growth_rate": "12% CAGR",
+               "reasoning": "Sizing logic. " * 50, "confidence_score": 0.7},
+    "competition": {"error": True, "message": "timeout"},
+}
+
+
+class TestProjectContext(unittest.TestCase):
+
+    def test_root_agent_gets_only_its_fields(self):
+        projected = project_context("market", BASE_CONTEXT)
+
+        self.assertEqual(set(projected), {"startup_context", "qualitative"})
+        self.assertNotIn("startup_id", projected["startup_context"])
+        self.assertNotIn("founder_background", projected["qualitative"])
+
+    def test_upstream_drops_meta_and_free_text(self):
+        merged = build_autogen_context(BASE_CONTEXT, UPSTREAM)
+
+        projected = project_context("risk", merged)
+
+        financial = projected["upstream_outputs"]["financial"]
+        self.assertNotIn("_meta", financial)
+        self.assertNotIn("reasoning", financial)
+        self.assertEqual(financial["metrics"]["runway_months"], 20)
+        self.assertEqual(projected["upstream_outputs"]["competition"], {"error": True, "message": "timeout"})
+
+    def test_dotted_paths_select_nested_fields(self):
+        merged = build_autogen_context(BASE_CONTEXT, UPSTREAM)
+
+        metrics = project_context("longevity", merged)["upstream_outputs"]["financial"]["metrics"]
+
+        self.assertEqual(metrics, {"runway_months": 20, "burn_rate": 20000})
+
+    def test_originals_are_not_mutated(self):
+        merged = build_autogen_context(BASE_CONTEXT, UPSTREAM)
+        before = json.dumps(merged, sort_keys=True, default=str)
+
+        project_context("investor_fit", merged)
+
+        self.assertEqual(json.dumps(merged, sort_keys=True, default=str), before)
+
+    def test_env_override_disables_projection(self):
+        with patch.dict(os.environ, {"CONTEXT_PROJECTION": json.dumps({"market": "*"})}):
+            projected = project_context("market", BASE_CONTEXT)
+        self.assertIn("metadata", projected)
+
+    def test_unknown_step_and_flat_context_pass_through(self):
+        self.assertEqual(project_context("custom_step", {"a": 1}), {"a": 1})
+        self.assertEqual(project_context("market", {"name": "Flat"}), {"name": "Flat"})
+
+
+class TestTokenReport(unittest.TestCase):
+
+    def test_serialization_is_compact(self):
+        self.assertEqual(serialize_context({"a": [1, 2], "b": "é"}), '{"a":[1,2],"b":"é"}')
+
+    def test_report_measures_reduction(self):
+        merged = build_autogen_context(BASE_CONTEXT, UPSTREAM)
+
+        report = context_token_report(merged, project_context("risk", merged))
+
+        self.assertLess(report["projected"], report["unprojected"])
+        self.assertGreater(report["reduction_pct"], 50)
+
+
+class _EchoAgent:
+    """Fake agent that records the message it was sent."""
+
+    def __init__(self, name):
+        self.name = name
+        self.sent = None
+
+    async def on_messages(self, messages, cancellation_token):
+        self.sent = messages[0].content
+        return SimpleNamespace(chat_message=SimpleNamespace(content='{"score": 50, "confidence_score": 0.5}'))
+
+
+class TestOrchestratorProjection(unittest.TestCase):
+
+    def test_agents_receive_projected_context_and_report_tokens(self):
+        agents = {
+            f"evaluator_{step}": _EchoAgent(f"evaluator_{step}")
+            for step in ("validator", "financial", "market", "competition",
+                         "risk", "longevity", "investor_fit")
+        }
+        orchestrator = AutoGenEvaluationOrchestrator(agents, tracker=LatencyTracker())
+
+        result = _run(orchestrator.run_full_evaluation(BASE_CONTEXT))
+
+        sent = json.loads(agents["evaluator_risk"].sent)
+        self.assertNotIn("metadata", sent)
+        self.assertNotIn("_meta", json.dumps(sent))
+
+        risk_meta = result["agents"]["risk"]["_meta"]["context_tokens"]
+        self.assertLess(risk_meta["projected"], risk_meta["unprojected"])
+        totals = result["_meta"]["context_tokens"]
+        self.assertGreater(totals["reduction_pct"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Unit tests for the dependency-graph scheduler (Module 6)
+and its use by AutoGenEvaluationOrchestrator.
+"""
+import unittest
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.orchestrator.autogen_dag_scheduler import (
+    DEFAULT_PIPELINE_DAG,
+    load_pipeline_dag,
+    run_dag,
+    validate_dag,
+)
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _LatencyAgent:
+    """Fake AutoGen agent that answers after an injected delay."""
+
+    def __init__(self, name: str, latency: float, log: list):
+        self.name = name
+        self.latency = latency
+        self.log = log
+
+    async def on_messages(self, messages, cancellation_token):
+        self.log.append(("start", self.name, time.perf_counter()))
+        await asyncio.sleep(self.latency)
+        self.log.append(("end", self.name, time.perf_counter()))
+        content = json.dumps({"confidence_score": 0.9, "agent": self.name})
+        return SimpleNamespace(chat_message=SimpleNamespace(content=content))
+
+
+# Validator and competition are slow; everything else is fast.
+LATENCIES = {
+    "validator": 0.30,
+    "financial": 0.05,
+    "market": 0.05,
+    "competition": 0.30,
+    "risk": 0.05,
+    "longevity": 0.05,
+    "investor_fit": 0.05,
+}
+
+
+def _make_agents(log):
+    return {
+        f"evaluator_{step}": _LatencyAgent(f"evaluator_{step}", latency, log)
+        for step, latency in LATENCIES.items()
+    }
+
+
+class TestDagValidation(unittest.TestCase):
+
+    def test_default_dag_is_valid(self):
+        dag = validate_dag(DEFAULT_PIPELINE_DAG)
+        self.assertEqual(list(dag), list(DEFAULT_PIPELINE_DAG))
+
+    def test_unknown_dependency_raises(self):
+        with self.assertRaises(ValueError):
+            validate_dag({"risk": ["financial"]})
+
+    def test_cycle_raises(self):
+        with self.assertRaises(ValueError):
+            validate_dag({"a": ["b"], "b": ["c"], "c": ["a"]})
+
+    def test_self_dependency_raises(self):
+        with self.assertRaises(ValueError):
+            validate_dag({"a": ["a"]})
+
+    def test_load_from_env(self):
+        custom = {"validator": [], "risk": ["validator"]}
+        with patch.dict(os.environ, {"PIPELINE_DAG": json.dumps(custom)}):
+            dag = load_pipeline_dag()
+        self.assertEqual(dag, {"validator": (), "risk": ("validator",)})
+
+    def test_load_defaults_without_env(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(load_pipeline_dag(), DEFAULT_PIPELINE_DAG)
+
+
+class TestRunDag(unittest.TestCase):
+
+    def test_upstream_outputs_are_passed(self):
+        seen = {}
+
+        async def run_step(step, upstream):
+            seen[step] = sorted(upstream)
+            return {"step": step}
+
+        outputs = _run(run_dag(validate_dag({"a": [], "b": [], "c": ["a", "b"]}), run_step))
+
+        self.assertEqual(list(outputs), ["a", "b", "c"])
+        self.assertEqual(seen["c"], ["a", "b"])
+
+    def test_failed_step_becomes_error_object(self):
+        async def run_step(step, upstream):
+            if step == "a":
+                raise RuntimeError("boom")
+            return {"step": step, "upstream": upstream}
+
+        outputs = _run(run_dag(validate_dag({"a": [], "b": ["a"]}), run_step))
+
+        self.assertTrue(outputs["a"]["error"])
+        self.assertIn("boom", outputs["a"]["message"])
+        # Dependents still run and see the error object
+        self.assertTrue(outputs["b"]["upstream"]["a"]["error"])
+
+
+class TestOrchestratorScheduling(unittest.TestCase):
+
+    def test_dag_beats_barrier_stages(self):
+        """Critical path is the longest chain, not the sum of stage maxima."""
+        log = []
+        orchestrator = AutoGenEvaluationOrchestrator(_make_agents(log))
+
+        started = time.perf_counter()
+        result = _run(orchestrator.run_full_evaluation({"name": "Fast"}))
+        elapsed = time.perf_counter() - started
+
+        # Old barrier pipeline: validator -> max(core) -> max(advanced)
+        staged = (
+            LATENCIES["validator"]
+            + max(LATENCIES["financial"], LATENCIES["market"], LATENCIES["competition"])
+            + max(LATENCIES["risk"], LATENCIES["longevity"], LATENCIES["investor_fit"])
+        )
+        critical_path = LATENCIES["competition"] + LATENCIES["risk"]
+
+        self.assertEqual(result["summary"]["successful"], 7)
+        self.assertGreaterEqual(elapsed, critical_path)
+        self.assertLess(elapsed, staged - 0.15)
+
+    def test_agents_start_when_their_inputs_are_ready(self):
+        log = []
+        orchestrator = AutoGenEvaluationOrchestrator(_make_agents(log))
+        _run(orchestrator.run_full_evaluation({"name": "Order"}))
+
+        starts = {name: t for kind, name, t in log if kind == "start"}
+        ends = {name: t for kind, name, t in log if kind == "end"}
+
+        # Core agents do not wait for the validator
+        self.assertLess(starts["evaluator_financial"], ends["evaluator_validator"])
+        # Risk never reads the validator, and starts right after competition
+        self.assertGreaterEqual(starts["evaluator_risk"], ends["evaluator_competition"])
+        # Longevity waits for everything it reads
+        self.assertGreaterEqual(starts["evaluator_longevity"], ends["evaluator_validator"])
+
+    def test_progress_callbacks_emitted_per_agent(self):
+        events = []
+
+        async def on_progress(agent, status):
+            events.append((agent, status))
+
+        orchestrator = AutoGenEvaluationOrchestrator(_make_agents([]))
+        _run(orchestrator.run_full_evaluation({"name": "Progress"}, progress_callback=on_progress))
+
+        for step in LATENCIES:
+            running = events.index((step, "running"))
+            completed = events.index((step, "completed"))
+            self.assertLess(running, completed)
+        self.assertEqual(len(events), 2 * len(LATENCIES))
+
+    def test_custom_dag(self):
+        log = []
+        agents = _make_agents(log)
+        dag = {"validator": [], "risk": ["validator"]}
+
+        orchestrator = AutoGenEvaluationOrchestrator(agents, dag=dag)
+        result = _run(orchestrator.run_full_evaluation({"name": "Custom"}))
+
+        self.assertEqual(list(result["agents"]), ["validator", "risk"])
+        self.assertEqual(result["summary"]["total_agents"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Unit tests for the non-blocking database executor and the repository on top of it.
+"""
+import unittest
+import asyncio
+import time
+from types import SimpleNamespace
+
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_repository import EvaluationRepository
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Query:
+    """Sync PostgREST builder whose execute() blocks like a network round-trip."""
+
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.client.latency)
+        if self.client.error:
+            raise self.client.error
+        self.client.calls += 1
+        return SimpleNamespace(data=self.rows)
+
+
+class _SlowClient:
+    def __init__(self, latency=0.1, error=None):
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    def table(self, name):
+        return SimpleNamespace(
+            insert=lambda rows: _Query(self, rows if isinstance(rows, list) else [rows]),
+            select=lambda *args: _Query(self, [{"startup_id": "s1", "report_json": "{}"}]),
+        )
+
+
+class _AsyncQuery:
+    async def execute(self):
+        return SimpleNamespace(data=[{"id": 1}])
+
+
+async def _max_tick_gap(work, interval=0.01):
+    """Run `work` next to a ticker; return the longest gap between ticks (seconds)."""
+    done = False
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    try:
+        result = await work
+    finally:
+        done = True
+        await task
+    return result, max(gaps)
+
+
+class TestDBExecutor(unittest.TestCase):
+
+    def test_offloaded_calls_do_not_block_the_loop(self):
+        executor = DBExecutor(max_workers=4)
+        repository = EvaluationRepository(_SlowClient(latency=0.15), executor=executor)
+        writes = asyncio.gather(*(repository.save_evaluation({"startup_id": f"s{i}"}) for i in range(4)))
+
+        saved, gap = _run(_max_tick_gap(writes))
+
+        self.assertEqual([s["startup_id"] for s in saved], ["s0", "s1", "s2", "s3"])
+        self.assertLess(gap, 0.1)
+        self.assertEqual(executor.stats()["offloaded"], 4)
+        executor.shutdown()
+
+    def test_inline_mode_blocks(self):
+        executor = DBExecutor(max_workers=0)
+        repository = EvaluationRepository(_SlowClient(latency=0.15), executor=executor)
+
+        _, gap = _run(_max_tick_gap(repository.save_evaluation({"startup_id": "s1"})))
+
+        self.assertGreaterEqual(gap, 0.15)
+        self.assertEqual(executor.stats()["inline"], 1)
+
+    def test_pool_is_bounded(self):
+        executor = DBExecutor(max_workers=2)
+
+        async def scenario():
+            return await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(6)))
+
+        started = time.perf_counter()
+        _run(scenario())
+        elapsed = time.perf_counter() - started
+
+        stats = executor.stats()
+        self.assertEqual(stats["max_in_flight"], 2)
+        self.assertGreaterEqual(elapsed, 0.14)
+        self.assertGreater(stats["max_wait_ms"], 0)
+        executor.shutdown()
+
+    def test_async_builders_are_awaited(self):
+        executor = DBExecutor(max_workers=1)
+        result = _run(executor.execute(_AsyncQuery()))
+
+        self.assertEqual(result.data, [{"id": 1}])
+        self.assertEqual((executor.stats()["awaited"], executor.stats()["offloaded"]), (1, 0))
+        executor.shutdown()
+
+    def test_errors_surface_through_the_repository(self):
+        executor = DBExecutor(max_workers=1)
+        repository = EvaluationRepository(_SlowClient(latency=0, error=RuntimeError("boom")), executor=executor)
+
+        saved = _run(repository.save_evaluation({"startup_id": "s1"}))
+        record = _run(repository.get_evaluation("s1"))
+
+        self.assertTrue(saved["error"])
+        self.assertIn("boom", saved["message"])
+        self.assertIsNone(record)
+        self.assertEqual(executor.stats()["errors"], 2)
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the evaluation read cache and the read-through path of
+EvaluationRepository.get_evaluation.
+"""
+import unittest
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_cache import EvaluationCache, token_scope
+from backend.scoring.evaluation_repository import EvaluationRepository
+from backend.scoring.persistence_outbox import PersistenceOutbox
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Query:
+    def __init__(self, supabase, rows=None):
+        self.supabase = supabase
+        self.rows = rows
+
+    def select(self, *args):
+        return self
+
+    def eq(self, column, value):
+        self.startup_id = value
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        if self.rows is not None:   # insert
+            self.supabase.rows.extend(self.rows)
+            return SimpleNamespace(data=self.rows)
+        self.supabase.selects += 1
+        if self.supabase.error:
+            raise self.supabase.error
+        matches = [row for row in self.supabase.rows if row["startup_id"] == self.startup_id]
+        return SimpleNamespace(data=matches[-1:])
+
+
+class _Supabase:
+    """In-memory startup_evaluations table that counts selects."""
+
+    def __init__(self):
+        self.rows = []
+        self.selects = 0
+        self.error = None
+
+    def table(self, name):
+        return SimpleNamespace(
+            select=lambda *args: _Query(self).select(*args),
+            insert=lambda rows: _Query(self, rows if isinstance(rows, list) else [rows]),
+        )
+
+
+def _report(startup_id, score):
+    return {"startup_id": startup_id, "final_score": score, "risk_label": "LOW_RISK"}
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self.cache = EvaluationCache(max_entries=2, ttl_seconds=60, negative_ttl_seconds=5,
+                                     clock=self.clock)
+
+    def test_lru_eviction(self):
+        for startup_id in ("a", "b"):
+            self.cache.put(startup_id, "anon", {"id": startup_id}, 0)
+        self.cache.get("a")
+        self.cache.put("c", "anon", {"id": "c"}, 0)   # evicts b
+
+        self.assertTrue(self.cache.get("a").hit)
+        self.assertFalse(self.cache.get("b").hit)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_and_negative_ttl(self):
+        self.cache.put("a", "anon", {"id": "a"}, 0)
+        self.cache.put("missing", "anon", None, 0)
+
+        lookup = self.cache.get("missing")
+        self.assertEqual((lookup.hit, lookup.record), (True, None))
+        self.clock.now += 5
+        self.assertFalse(self.cache.get("missing").hit)
+        self.assertTrue(self.cache.get("a").hit)
+        self.clock.now += 55
+        self.assertFalse(self.cache.get("a").hit)
+
+    def test_fill_that_raced_a_save_is_dropped(self):
+        lookup = self.cache.get("a")              # read starts
+        new_generation = self.cache.invalidate("a")   # save lands meanwhile
+
+        self.assertFalse(self.cache.put("a", "anon", {"score": "old"}, lookup.generation))
+        self.assertTrue(self.cache.put("a", "anon", {"score": "new"}, new_generation))
+        self.assertEqual(self.cache.get("a").record, {"score": "new"})
+        self.assertEqual(self.cache.stats()["stale_fills"], 1)
+
+    def test_scopes_are_separate(self):
+        self.cache.put("a", token_scope("alice"), {"owner": "alice"}, 0)
+
+        self.assertFalse(self.cache.get("a", token_scope("bob")).hit)
+        self.assertFalse(self.cache.get("a").hit)
+        self.assertNotIn("alice", token_scope("alice"))
+
+
+class TestSharedFileTier(unittest.TestCase):
+
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "evaluation_cache.db")
+        self.worker_a = EvaluationCache(sqlite_path=path)
+        self.worker_b = EvaluationCache(sqlite_path=path)
+
+    def tearDown(self):
+        self.worker_a.close()
+        self.worker_b.close()
+
+    def test_fill_in_one_worker_is_a_hit_in_another(self):
+        self.worker_a.put("a", "anon", {"score": 7}, 0)
+
+        lookup = self.worker_b.get("a")
+        self.assertEqual((lookup.hit, lookup.record), (True, {"score": 7}))
+        self.assertEqual(self.worker_b.stats()["disk_hits"], 1)
+
+    def test_save_in_one_worker_invalidates_the_others_memory(self):
+        self.worker_a.put("a", "anon", {"score": 7}, 0)
+        self.worker_b.get("a")                    # now in b's memory tier
+
+        generation = self.worker_a.invalidate("a")
+        self.assertFalse(self.worker_b.get("a").hit)
+        self.worker_a.put("a", "anon", {"score": 9}, generation)
+        self.assertEqual(self.worker_b.get("a").record, {"score": 9})
+
+
+class TestRepositoryReadThrough(unittest.TestCase):
+
+    def setUp(self):
+        self.supabase = _Supabase()
+        self.cache = EvaluationCache()
+        self.executor = DBExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _repository(self, **kwargs):
+        return EvaluationRepository(self.supabase, executor=self.executor, cache=self.cache, **kwargs)
+
+    def test_repeated_reads_hit_supabase_once(self):
+        self.supabase.rows.append({"id": "e1", "startup_id": "s1", "report_json": "{}"})
+        repository = self._repository()
+
+        for _ in range(3):
+            self.assertEqual(_run(repository.get_evaluation("s1"))["id"], "e1")
+            self.assertIsNone(_run(repository.get_evaluation("unknown")))
+
+        self.assertEqual(self.supabase.selects, 2)
+        self.assertEqual(self.cache.stats()["negative_hits"], 2)
+
+    def test_errors_are_not_cached(self):
+        repository = self._repository()
+        self.supabase.error = ConnectionError("supabase down")
+        self.assertIsNone(_run(repository.get_evaluation("s1")))
+
+        self.supabase.error = None
+        self.supabase.rows.append({"id": "e1", "startup_id": "s1"})
+        self.assertEqual(_run(repository.get_evaluation("s1"))["id"], "e1")
+        self.assertEqual(self.supabase.selects, 2)
+
+    def test_save_replaces_the_cached_row(self):
+        repository = self._repository(auth_token="alice")
+        self.assertIsNone(_run(repository.get_evaluation("s1")))   # negative entry
+
+        _run(repository.save_evaluation(_report("s1", 8.5), user_id="u1"))
+
+        self.assertEqual(_run(repository.get_evaluation("s1"))["final_score"], 8.5)
+        self.assertEqual(self.supabase.selects, 1)
+        self.assertFalse(self.cache.get("s1", token_scope("bob")).hit)
+
+    def test_queued_save_is_visible_before_the_flush(self):
+        self.supabase.rows.append({"id": "old", "startup_id": "s1", "final_score": 3.0})
+        repository = self._repository(outbox=PersistenceOutbox(":memory:"), auth_token="alice")
+        self.assertEqual(_run(repository.get_evaluation("s1"))["id"], "old")
+
+        [queued] = _run(repository.save_evaluations([(_report("s1", 8.5), "u1")]))
+
+        record = _run(repository.get_evaluation("s1"))
+        self.assertEqual((record["id"], record["final_score"]), (queued["id"], 8.5))
+        self.assertNotIn("_queued", record)
+        self.assertEqual(self.supabase.selects, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
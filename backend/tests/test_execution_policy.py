@@ -0,0 +1,329 @@
+"""
+Unit tests for per-agent timeouts, hedged requests and retries (Module 8).
+"""
+import unittest
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from autogen_core.models import UserMessage
+
+from backend.agents.autogen_rate_limiter import AdaptiveRateLimiter, RateLimitedChatCompletionClient
+from backend.orchestrator.autogen_execution_policy import (
+    DEFAULT_POLICY,
+    LatencyTracker,
+    get_agent_policy,
+)
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _ScriptedAgent:
+    """Fake agent whose n-th call sleeps latencies[n] seconds."""
+
+    def __init__(self, latencies, name="evaluator_market"):
+        self.name = name
+        self.latencies = list(latencies)
+        self.calls = 0
+        self.tokens = []
+
+    async def on_messages(self, messages, cancellation_token):
+        latency = self.latencies[min(self.calls, len(self.latencies) - 1)]
+        self.calls += 1
+        self.tokens.append(cancellation_token)
+        await asyncio.sleep(latency)
+        return SimpleNamespace(chat_message=SimpleNamespace(content=json.dumps({"latency": latency})))
+
+
+class _ReplyAgent:
+    """Fake agent returning replies[n] (or raising it) on the n-th call."""
+
+    def __init__(self, replies, name="evaluator_market"):
+        self.name = name
+        self.replies = list(replies)
+        self.calls = 0
+        self.resets = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(chat_message=SimpleNamespace(content=reply))
+
+    async def on_reset(self, cancellation_token):
+        self.resets += 1
+
+
+class _SleepyModel:
+    """Model client stand-in that answers after `latency` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def create(self, messages, **kwargs):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=json.dumps({"latency": self.latency}), usage=None)
+
+    async def create_stream(self, messages, **kwargs):
+        yield await self.create(messages)
+
+
+class _LimitedAgent:
+    """Fake agent whose model calls go through a RateLimitedChatCompletionClient."""
+
+    def __init__(self, limiter, latency, name="evaluator_market"):
+        self.name = name
+        self.client = RateLimitedChatCompletionClient(_SleepyModel(latency), limiter)
+        self.calls = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        result = await self.client.create([UserMessage(content="{}", source="user")])
+        return SimpleNamespace(chat_message=SimpleNamespace(content=result.content))
+
+
+def _policy(**overrides):
+    policy = dict(DEFAULT_POLICY)
+    policy.update({"soft_timeout_seconds": None, "hard_timeout_seconds": None, "hedge": False})
+    policy.update(overrides)
+    return policy
+
+
+class TestPolicyResolution(unittest.TestCase):
+
+    def test_agent_override_applies(self):
+        policy = get_agent_policy("evaluator_risk")
+        self.assertEqual(policy["soft_timeout_seconds"], 20.0)
+        self.assertEqual(policy["hard_timeout_seconds"], DEFAULT_POLICY["hard_timeout_seconds"])
+
+    def test_env_override(self):
+        raw = json.dumps({"default": {"hard_timeout_seconds": 5}, "evaluator_market": {"hedge": True}})
+        with patch.dict(os.environ, {"AGENT_EXECUTION_POLICY": raw}):
+            market = get_agent_policy("evaluator_market")
+            risk = get_agent_policy("evaluator_risk")
+        self.assertEqual(market["hard_timeout_seconds"], 5)
+        self.assertTrue(market["hedge"])
+        self.assertEqual(risk["hard_timeout_seconds"], 5)
+
+
+class TestTimeouts(unittest.TestCase):
+
+    def test_hard_timeout_returns_error_and_cancels(self):
+        agent = _ScriptedAgent([5.0])
+        tracker = LatencyTracker()
+
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(hard_timeout_seconds=0.05), tracker=tracker
+        ))
+
+        self.assertTrue(result["error"])
+        self.assertIn("hard timeout", result["message"])
+        self.assertTrue(result["_meta"]["timed_out"])
+        self.assertTrue(agent.tokens[0].is_cancelled())
+        self.assertEqual(tracker.stats()["hard_timeouts"], 1)
+
+    def test_soft_timeout_is_flagged_but_not_fatal(self):
+        agent = _ScriptedAgent([0.1])
+
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(soft_timeout_seconds=0.02, hard_timeout_seconds=1.0),
+            tracker=LatencyTracker(),
+        ))
+
+        self.assertNotIn("error", result)
+        self.assertTrue(result["_meta"]["soft_timeout_exceeded"])
+
+
+class TestRateLimiterQueue(unittest.TestCase):
+
+    def _busy_limiter(self):
+        # One request per 0.2s, and the first one is already taken
+        limiter = AdaptiveRateLimiter(requests_per_minute=300, tokens_per_minute=0, burst_seconds=0.2)
+        _run(limiter.acquire())
+        return limiter
+
+    def test_queue_wait_does_not_count_toward_deadlines(self):
+        agent = _LimitedAgent(self._busy_limiter(), latency=0.02)
+        policy = _policy(hedge=True, soft_timeout_seconds=0.05, hard_timeout_seconds=0.1)
+
+        result = _run(execute_autogen_agent(agent, {}, policy=policy, tracker=LatencyTracker()))
+
+        self.assertNotIn("error", result)
+        self.assertEqual(agent.calls, 1)
+        self.assertFalse(result["_meta"]["hedged"])
+        self.assertFalse(result["_meta"]["soft_timeout_exceeded"])
+        self.assertGreater(result["_meta"]["queue_wait_seconds"], 0.1)
+        self.assertLess(result["_meta"]["latency_seconds"], 0.05)
+
+    def test_deadline_starts_when_the_call_is_granted(self):
+        agent = _LimitedAgent(self._busy_limiter(), latency=1.0)
+        loop = asyncio.get_event_loop()
+
+        started = loop.time()
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(hard_timeout_seconds=0.1), tracker=LatencyTracker()
+        ))
+
+        self.assertTrue(result["_meta"]["timed_out"])
+        self.assertGreater(loop.time() - started, 0.25)   # ~0.2s queued + 0.1s deadline
+        self.assertGreater(result["_meta"]["queue_wait_seconds"], 0.1)
+
+
+class TestHedging(unittest.TestCase):
+
+    def _warm_tracker(self, latency=0.02, samples=20):
+        tracker = LatencyTracker()
+        for _ in range(samples):
+            tracker.record("evaluator_market", latency, latency)
+        return tracker
+
+    def test_hedge_wins_and_cancels_primary(self):
+        agent = _ScriptedAgent([2.0, 0.01])   # primary stalls, duplicate is fast
+        tracker = self._warm_tracker()
+        loop = asyncio.get_event_loop()
+
+        started = loop.time()
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(hedge=True, hard_timeout_seconds=5.0), tracker=tracker
+        ))
+        elapsed = loop.time() - started
+
+        self.assertEqual(agent.calls, 2)
+        self.assertTrue(result["_meta"]["hedged"])
+        self.assertTrue(result["_meta"]["hedge_won"])
+        self.assertTrue(agent.tokens[0].is_cancelled())
+        self.assertLess(elapsed, 0.5)
+
+        stats = tracker.stats()
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+
+    def test_fast_primary_is_not_hedged(self):
+        agent = _ScriptedAgent([0.005])
+        tracker = self._warm_tracker(latency=0.2)
+
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(hedge=True), tracker=tracker
+        ))
+
+        self.assertEqual(agent.calls, 1)
+        self.assertFalse(result["_meta"]["hedged"])
+
+    def test_soft_timeout_triggers_hedge_without_history(self):
+        agent = _ScriptedAgent([2.0, 0.01])
+
+        result = _run(execute_autogen_agent(
+            agent, {}, policy=_policy(hedge=True, soft_timeout_seconds=0.02),
+            tracker=LatencyTracker(),
+        ))
+
+        self.assertTrue(result["_meta"]["hedge_won"])
+
+    def test_tracker_reports_p99_improvement(self):
+        tracker = LatencyTracker()
+        for _ in range(9):
+            tracker.record("a", 0.1, 0.1)
+        # Primary had been running 2.0s when the 0.3s hedge answered
+        tracker.record("a", 0.3, 2.0, hedged=True, hedge_won=True)
+
+        stats = tracker.stats()
+        self.assertEqual(stats["hedge_rate"], 0.1)
+        self.assertAlmostEqual(stats["p99_improvement_seconds"], 1.7, places=3)
+
+
+class TestRetries(unittest.TestCase):
+
+    def _execute(self, agent, **overrides):
+        policy = _policy(retry_base_delay_seconds=0.01, retry_jitter=0.0, **overrides)
+        return _run(execute_autogen_agent(agent, {}, policy=policy, tracker=LatencyTracker()))
+
+    def test_malformed_reply_is_repaired_without_retry(self):
+        agent = _ReplyAgent(["Here you go: {'score': 7, 'ok': True,}"])
+
+        result = self._execute(agent)
+
+        self.assertEqual(result["score"], 7)
+        self.assertEqual(agent.calls, 1)
+        self.assertEqual(result["_meta"]["attempts"], 1)
+        self.assertIn("single_quotes", result["_meta"]["json_repairs"])
+        self.assertIn("trailing_commas", result["_meta"]["json_repairs"])
+
+    def test_unrepairable_reply_is_retried_after_reset(self):
+        agent = _ReplyAgent(["I cannot answer that.", '{"score": 5}'])
+
+        result = self._execute(agent)
+
+        self.assertEqual(result["score"], 5)
+        self.assertEqual(agent.calls, 2)
+        self.assertEqual(agent.resets, 1)
+        meta = result["_meta"]
+        self.assertEqual(meta["attempts"], 2)
+        self.assertEqual(len(meta["retry_errors"]), 1)
+        self.assertAlmostEqual(meta["retry_wait_seconds"], 0.01)
+        self.assertGreaterEqual(meta["time_lost_seconds"], 0.01)
+
+    def test_transient_error_backs_off_exponentially(self):
+        agent = _ReplyAgent([ConnectionError("reset"), ConnectionError("reset"), '{"score": 4}'])
+
+        result = self._execute(agent)
+
+        self.assertEqual(result["score"], 4)
+        self.assertAlmostEqual(result["_meta"]["retry_wait_seconds"], 0.03)  # 0.01 + 0.02
+
+    def test_attempts_are_bounded(self):
+        agent = _ReplyAgent(["not json"])
+
+        result = self._execute(agent, max_attempts=2)
+
+        self.assertTrue(result["error"])
+        self.assertEqual(agent.calls, 2)
+        self.assertEqual(result["_meta"]["attempts"], 2)
+
+    def test_non_transient_error_is_not_retried(self):
+        agent = _ReplyAgent([RuntimeError("bad request")])
+
+        result = self._execute(agent)
+
+        self.assertTrue(result["error"])
+        self.assertEqual(agent.calls, 1)
+
+    def test_repair_can_be_disabled_per_agent(self):
+        raw = json.dumps({"evaluator_market": {"json_repair": False, "max_attempts": 1}})
+        with patch.dict(os.environ, {"AGENT_EXECUTION_POLICY": raw}):
+            policy = get_agent_policy("evaluator_market")
+        agent = _ReplyAgent(["{'score': 7}"])
+
+        result = _run(execute_autogen_agent(agent, {}, policy=policy, tracker=LatencyTracker()))
+
+        self.assertTrue(result["error"])
+        self.assertEqual(agent.calls, 1)
+
+
+class TestOrchestrationMeta(unittest.TestCase):
+
+    def test_orchestration_meta_reports_hedging(self):
+        agents = {
+            f"evaluator_{step}": _ScriptedAgent([0.001], name=f"evaluator_{step}")
+            for step in ("validator", "financial", "market", "competition",
+                         "risk", "longevity", "investor_fit")
+        }
+        orchestrator = AutoGenEvaluationOrchestrator(agents, tracker=LatencyTracker())
+
+        result = _run(orchestrator.run_full_evaluation({"name": "Meta"}))
+
+        hedging = result["_meta"]["hedging"]
+        self.assertEqual(hedging["agents_hedged"], [])
+        self.assertEqual(hedging["hedge_rate"], 0.0)
+        self.assertEqual(hedging["process"]["calls"], 7)
+        self.assertIn("p99_improvement_seconds", hedging["process"])
+
+
+if __name__ == "__main__":
+    unittest.main()
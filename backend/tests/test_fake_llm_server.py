@@ -0,0 +1,101 @@
+"""
+Tests for the offline fake LLM server and the real HTTP path through it:
+AutoGen agents -> OpenAIChatCompletionClient -> FakeLLMServer (incl. streaming).
+"""
+import unittest
+import asyncio
+import random
+from unittest.mock import patch
+
+from backend.agents.autogen_registry import AGENT_SPECS, initialize_agents
+from backend.agents.autogen_utils import get_model_client, load_system_prompt
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.testing.fake_llm_server import (
+    AGENT_RESPONSES,
+    FakeLLMServer,
+    identify_agent,
+    latency_sampler,
+)
+
+
+NO_RETRY = {"max_attempts": 1, "json_repair": False}
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _agents(server: FakeLLMServer):
+    with patch.dict("os.environ", {"GROQ_API_KEY": "test", "GROQ_BASE_URL": server.base_url}):
+        return initialize_agents(get_model_client(max_retries=0))
+
+
+class TestLatencySampler(unittest.TestCase):
+
+    def test_specs(self):
+        rng = random.Random(1)
+        self.assertEqual(latency_sampler(None)(rng), 0.0)
+        self.assertEqual(latency_sampler("fixed:0.25")(rng), 0.25)
+        self.assertTrue(0.1 <= latency_sampler("uniform:0.1,0.2")(rng) <= 0.2)
+        samples = sorted(latency_sampler("lognormal:0.5,0.3")(rng) for _ in range(501))
+        self.assertAlmostEqual(samples[250], 0.5, delta=0.05)  # median
+
+    def test_invalid_spec(self):
+        for spec in ("gamma:1", "uniform:1", "fixed:x"):
+            with self.assertRaises(ValueError):
+                latency_sampler(spec)
+
+
+class TestAgentIdentification(unittest.TestCase):
+
+    def test_system_prompt_names_the_agent(self):
+        for spec in AGENT_SPECS:
+            messages = [{"role": "system", "content": load_system_prompt(spec["prompt"])},
+                        {"role": "user", "content": "{}"}]
+            self.assertEqual(identify_agent(messages), spec["name"])
+        self.assertIsNone(identify_agent([{"role": "user", "content": "hi"}]))
+
+
+class TestEndToEnd(unittest.TestCase):
+
+    def test_full_evaluation_over_http(self):
+        with FakeLLMServer() as server:
+            agents = _agents(server)
+            result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+                {"startup_context": {"name": "Acme"}}
+            ))
+            stats = server.stats()
+
+        self.assertEqual(result["summary"]["failed"], 0)
+        self.assertEqual(result["agents"]["market"]["tam"], AGENT_RESPONSES["evaluator_market"]["tam"])
+        self.assertEqual(set(stats["by_agent"]), {spec["name"] for spec in AGENT_SPECS})
+        self.assertEqual(stats["streamed"], stats["completed"])  # agents stream by default
+
+    def test_injected_errors_surface_as_agent_errors(self):
+        with FakeLLMServer(error_rate=1.0) as server:
+            agents = _agents(server)
+            with patch("backend.orchestrator.autogen_execution_wrapper.get_agent_policy",
+                       return_value=NO_RETRY):
+                result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+                    {"startup_context": {"name": "Acme"}}
+                ))
+            stats = server.stats()
+
+        self.assertEqual(result["summary"]["successful"], 0)
+        self.assertEqual(stats["completed"], 0)
+        self.assertEqual(stats["errors"], stats["requests"])
+
+    def test_custom_responses_and_latency(self):
+        custom = {"evaluator_market": {"tam": 1, "confidence_score": 0.9}}
+        with FakeLLMServer(responses=custom, latency="fixed:0.05") as server:
+            agents = _agents(server)
+            result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+                {"startup_context": {"name": "Acme"}}
+            ))
+
+        self.assertEqual(result["agents"]["market"]["tam"], 1)
+        self.assertGreaterEqual(result["agents"]["market"]["_meta"]["latency_seconds"], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
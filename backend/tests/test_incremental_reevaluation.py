@@ -0,0 +1,149 @@
+"""
+Unit tests for incremental re-evaluation: per-agent input fingerprints,
+reuse of unchanged agents, and persistence of fingerprints with the report.
+"""
+import unittest
+import asyncio
+import json
+from types import SimpleNamespace
+
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.scoring.evaluation_repository import EvaluationRepository
+from backend.scoring.evaluation_service import EvaluationService
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _EchoAgent:
+    """Output depends on the input, like a real agent's would."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        score = len(messages[0].content) % 100
+        return SimpleNamespace(chat_message=SimpleNamespace(content=json.dumps({
+            "score": score, "competitor_risk_score": score, "confidence_score": 0.7,
+        })))
+
+
+def _agents():
+    return {f"evaluator_{s}": _EchoAgent(f"evaluator_{s}") for s in STEPS}
+
+
+def _context(competitors="Stripe"):
+    return {
+        "startup_context": {"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                            "description": "Payments for freelancers"},
+        "financial_input": {"revenue": 50000, "cash_balance": 100000, "monthly_burn_rate": 4000},
+        "qualitative": {"problem_description": "Late invoices", "competitors": competitors},
+        "metadata": {},
+    }
+
+
+def _prior(result):
+    fingerprints = result["_meta"]["reuse"]["fingerprints"]
+    return {
+        step: {"fingerprint": fingerprints[step], "output": result["agents"][step]}
+        for step in fingerprints
+    }
+
+
+class TestIncrementalReevaluation(unittest.TestCase):
+
+    def test_unchanged_inputs_reuse_every_agent(self):
+        first = _run(AutoGenEvaluationOrchestrator(agents=_agents()).run_full_evaluation(_context()))
+
+        agents = _agents()
+        second = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+            _context(), prior_outputs=_prior(first)
+        ))
+
+        self.assertEqual(sum(a.calls for a in agents.values()), 0)
+        self.assertEqual(sorted(second["_meta"]["reuse"]["reused"]), sorted(STEPS))
+        self.assertEqual(second["_meta"]["reuse"]["recomputed"], [])
+        self.assertEqual(second["agents"]["market"]["score"], first["agents"]["market"]["score"])
+
+    def test_changed_field_reruns_its_readers_and_their_dependents(self):
+        first = _run(AutoGenEvaluationOrchestrator(agents=_agents()).run_full_evaluation(_context()))
+
+        agents = _agents()
+        second = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+            _context(competitors="Stripe, Wise and a dozen regional banks"),
+            prior_outputs=_prior(first),
+        ))
+        reuse = second["_meta"]["reuse"]
+
+        # competitors is read by validator + competition; the advanced agents consume competition
+        self.assertEqual(sorted(reuse["reused"]), ["financial", "market"])
+        self.assertEqual(agents["evaluator_financial"].calls, 0)
+        self.assertEqual(agents["evaluator_competition"].calls, 1)
+        self.assertEqual(agents["evaluator_risk"].calls, 1)
+
+    def test_upstream_change_outside_the_projection_keeps_dependents(self):
+        first = _run(AutoGenEvaluationOrchestrator(agents=_agents()).run_full_evaluation(_context()))
+        prior = _prior(first)
+        # risk only sees competition's signal fields, so a new summary does not invalidate it
+        prior["competition"]["output"] = {**prior["competition"]["output"], "summary": "edited"}
+
+        agents = _agents()
+        second = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+            _context(), prior_outputs=prior
+        ))
+
+        self.assertEqual(sum(a.calls for a in agents.values()), 0)
+        self.assertEqual(second["agents"]["competition"]["summary"], "edited")
+
+    def test_failed_prior_outputs_are_recomputed(self):
+        first = _run(AutoGenEvaluationOrchestrator(agents=_agents()).run_full_evaluation(_context()))
+        prior = _prior(first)
+        prior["market"]["output"] = {"error": True, "message": "timeout"}
+
+        agents = _agents()
+        _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+            _context(), prior_outputs=prior
+        ))
+
+        self.assertEqual(agents["evaluator_market"].calls, 1)
+
+
+class TestFingerprintPersistence(unittest.TestCase):
+
+    def test_report_carries_fingerprints_and_reuse(self):
+        result = _run(AutoGenEvaluationOrchestrator(agents=_agents()).run_full_evaluation(_context()))
+        result["agents"]["financial"]["_meta"]["reused"] = True
+
+        report = EvaluationService().build_report("s1", result, "Acme")
+
+        self.assertEqual(set(report["agent_fingerprints"]), set(STEPS))
+        self.assertEqual(len(report["reuse"]["recomputed"]), len(STEPS))
+        self.assertEqual(report["summary"]["reused_agents"], ["financial"])
+
+    def test_repository_returns_prior_outputs(self):
+        report = {
+            "agent_fingerprints": {"market": "abc", "risk": "def"},
+            "agent_results": {"market": {"score": 70}, "risk": {"error": True}},
+        }
+        repo = EvaluationRepository()
+
+        async def latest(startup_id):
+            return {"startup_id": startup_id, "report_json": json.dumps(report)}
+
+        repo.get_evaluation = latest
+        prior = _run(repo.get_prior_agent_outputs("s1"))
+
+        self.assertEqual(prior, {"market": {"fingerprint": "abc", "output": {"score": 70}}})
+
+    def test_no_previous_evaluation(self):
+        self.assertEqual(_run(EvaluationRepository().get_prior_agent_outputs("s1")), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,300 @@
+"""
+Unit tests for the durable evaluation job queue (backend/jobs) and /jobs.
+"""
+import unittest
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import jwt
+from fastapi.testclient import TestClient
+
+from backend.jobs.job_store import JobStore
+from backend.jobs.job_worker import JobWorkerPool
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.scoring.supabase_auth import TokenVerifier
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _CountingAgent:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        return SimpleNamespace(chat_message=SimpleNamespace(content='{"score": 60, "confidence_score": 0.7}'))
+
+
+def _agents():
+    return {f"evaluator_{step}": _CountingAgent(f"evaluator_{step}") for step in STEPS}
+
+
+# ── JobStore ─────────────────────────────────────────────────
+
+class TestJobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.store = JobStore(":memory:", lease_seconds=30, max_attempts=2, clock=self.clock)
+
+    def test_submit_claim_complete(self):
+        job_id = self.store.submit({"name": "Acme"})
+
+        job = self.store.claim("w1")
+        self.assertEqual((job["id"], job["request"], job["attempts"]), (job_id, {"name": "Acme"}, 1))
+        self.assertIsNone(self.store.claim("w2"))  # leased to w1
+
+        self.store.save_checkpoint(job_id, "validator", {"score": 60})
+        self.store.complete(job_id, {"final_score": 0.7, "agent_results": {"validator": {"score": 60}}})
+        status = self.store.get(job_id)
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["result"]["final_score"], 0.7)
+        # The report carries the agent outputs; the checkpoints are gone
+        self.assertEqual(status["agent_outputs"], {"validator": {"score": 60}})
+        self.assertEqual(self.store.load_checkpoints(job_id), {})
+
+    def test_expired_lease_is_reclaimed_with_checkpoints(self):
+        job_id = self.store.submit({})
+        self.store.claim("w1")
+        self.store.save_checkpoint(job_id, "validator", {"score": 60})
+
+        self.clock.now += 31  # w1 crashed, no heartbeat
+        job = self.store.claim("w2")
+
+        self.assertEqual((job["id"], job["attempts"]), (job_id, 2))
+        self.assertEqual(self.store.load_checkpoints(job_id), {"validator": {"score": 60}})
+        self.assertFalse(self.store.heartbeat(job_id, "w1"))
+        self.assertTrue(self.store.heartbeat(job_id, "w2"))
+
+    def test_gives_up_after_max_attempts(self):
+        job_id = self.store.submit({})
+        self.store.claim("w1")
+        self.clock.now += 31
+        self.store.claim("w2")
+        self.clock.now += 31
+
+        self.assertIsNone(self.store.claim("w3"))
+        self.assertEqual(self.store.get(job_id)["status"], "failed")
+
+    def test_fail_requeues_until_max_attempts(self):
+        job_id = self.store.submit({})
+        self.store.claim("w1")
+        self.store.fail(job_id, "boom")
+        self.assertEqual(self.store.get(job_id)["status"], "queued")
+
+        self.store.claim("w1")
+        self.store.fail(job_id, "boom")
+        status = self.store.get(job_id)
+        self.assertEqual((status["status"], status["error"]), ("failed", "boom"))
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.store.get("missing"))
+
+
+# ── Resume ───────────────────────────────────────────────────
+
+class TestResumeFromCheckpoints(unittest.TestCase):
+
+    def test_completed_steps_are_not_rerun(self):
+        agents = _agents()
+        orchestrator = AutoGenEvaluationOrchestrator(agents=agents)
+        finished = []
+
+        async def on_step_complete(step, output):
+            finished.append(step)
+
+        restored = {step: {"score": 55, "confidence_score": 0.6}
+                    for step in ("validator", "financial", "market", "competition")}
+        result = _run(orchestrator.run_full_evaluation(
+            {"startup_context": {"name": "Acme"}},
+            completed_outputs=restored,
+            on_step_complete=on_step_complete,
+        ))
+
+        self.assertEqual(agents["evaluator_financial"].calls, 0)
+        self.assertEqual(agents["evaluator_risk"].calls, 1)
+        self.assertEqual(sorted(finished), ["investor_fit", "longevity", "risk"])
+        self.assertEqual(result["agents"]["financial"]["score"], 55)
+
+
+# ── JobWorkerPool ────────────────────────────────────────────
+
+class TestJobWorkerPool(unittest.TestCase):
+
+    def test_workers_drain_the_queue(self):
+        store = JobStore(":memory:")
+        seen = []
+
+        async def run_job(job, store):
+            seen.append(job["request"]["n"])
+            return {"n": job["request"]["n"]}
+
+        async def scenario():
+            pool = JobWorkerPool(store, run_job, concurrency=2, poll_interval=0.01)
+            pool.start()
+            ids = [store.submit({"n": n}) for n in range(3)]
+            pool.notify()
+            for _ in range(100):
+                if all(store.get(i)["status"] == "completed" for i in ids):
+                    break
+                await asyncio.sleep(0.01)
+            await pool.stop()
+            return pool.stats()
+
+        stats = _run(scenario())
+
+        self.assertEqual(sorted(seen), [0, 1, 2])
+        self.assertEqual(stats["completed"], 3)
+        self.assertEqual(stats["queue"]["completed"], 3)
+
+    def test_lost_lease_cancels_the_run(self):
+        clock = _Clock()
+        store = JobStore(":memory:", lease_seconds=0.3, clock=clock)
+        job_id = store.submit({})
+
+        async def run_job(job, store):
+            clock.now += 10          # lease expires...
+            store.claim("other")     # ...and another worker takes the job over
+            await asyncio.sleep(5)
+            return {}
+
+        async def scenario():
+            pool = JobWorkerPool(store, run_job)
+            await pool.process(store.claim("mine"), "mine")
+            return pool.stats()
+
+        stats = _run(scenario())
+
+        self.assertEqual((stats["completed"], stats["failed"]), (0, 0))
+        self.assertEqual(store.get(job_id)["status"], "running")
+
+
+# ── /jobs ────────────────────────────────────────────────────
+
+def _request(name):
+    return {
+        "startup_context": {"name": name, "industry": "Fintech", "stage": "Seed",
+                            "description": f"{name} does payments"},
+        "financial_raw_input": {
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": 50000, "cogs": 1000, "operating_expenses": 5000,
+            "cash_balance": 100000, "monthly_burn_rate": 4000,
+        },
+        "qualitative": {},
+        "metadata": {},
+    }
+
+
+class _FakeRegistry:
+    def __init__(self, agents):
+        self.agents = agents
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.agents
+
+
+class TestJobEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        import backend.main as main
+        self.main = main
+        self.store = JobStore(":memory:")
+        self.agents = _agents()
+        patches = [
+            patch.object(main, "get_shared_job_store", lambda: self.store),
+            patch.object(main, "get_shared_registry", lambda: _FakeRegistry(self.agents)),
+            patch.object(main, "get_shared_response_cache", lambda: None),
+            patch.object(main, "job_pool", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = TestClient(main.app)
+
+    def test_submit_poll_and_resume(self):
+        response = self.client.post("/jobs", json=_request("Acme"))
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(self.client.get(f"/jobs/{job_id}").json()["status"], "queued")
+
+        # A previous attempt already finished the validator before crashing
+        job = self.store.claim("w1")
+        self.store.save_checkpoint(job_id, "validator", {"score": 70, "confidence_score": 0.8})
+        report = _run(self.main.run_evaluation_job(job, self.store))
+        self.store.complete(job_id, report)
+
+        status = self.client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(len(status["completed_steps"]), len(STEPS))
+        self.assertEqual(status["result"]["startup_id"], response.json()["startup_id"])
+        self.assertEqual(self.agents["evaluator_validator"].calls, 0)
+        self.assertEqual(self.agents["evaluator_risk"].calls, 1)
+
+    def test_job_persists_with_the_service_client_as_its_submitter(self):
+        calls = []
+
+        async def save_startup_rows(client, rows, auth_token=None, user_id=None):
+            calls.append(("startups", client, user_id, rows[0].get("founder_id")))
+            return "saved"
+
+        async def evaluate(**kwargs):
+            return {"startup_id": kwargs["startup_id"], "user_id": kwargs["user_id"]}
+
+        def evaluation_service(client, auth_token=None, user_id=None):
+            calls.append(("evaluations", client, user_id))
+            return SimpleNamespace(evaluate=evaluate)
+
+        service_client = object()
+        job_id = self.store.submit({**_request("Acme"), "user_id": "mallory"}, "alice")
+        with patch.object(self.main, "service_supabase", service_client), \
+                patch.object(self.main, "_save_startup_rows", save_startup_rows), \
+                patch.object(self.main, "_evaluation_service", evaluation_service):
+            report = _run(self.main.run_evaluation_job(self.store.claim("w1"), self.store))
+
+        self.assertEqual(calls, [("startups", service_client, "alice", "alice"),
+                                 ("evaluations", service_client, "alice")])
+        self.assertEqual(report["user_id"], "alice")
+        self.assertEqual(self.store.get(job_id)["user_id"], "alice")
+
+    def test_only_the_submitter_can_read_a_job(self):
+        secret = "job-test-secret-of-at-least-32-bytes!"
+
+        def bearer(user_id):
+            claims = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 600}
+            return {"Authorization": f"Bearer {jwt.encode(claims, secret, algorithm='HS256')}"}
+
+        with patch.object(self.main, "token_verifier", TokenVerifier(jwt_secret=secret)):
+            job_id = self.client.post("/jobs", json=_request("Acme"), headers=bearer("alice")).json()["job_id"]
+
+            self.assertEqual(self.client.get(f"/jobs/{job_id}", headers=bearer("alice")).status_code, 200)
+            self.assertEqual(self.client.get(f"/jobs/{job_id}", headers=bearer("bob")).status_code, 404)
+            self.assertEqual(self.client.get(f"/jobs/{job_id}").status_code, 401)
+
+    def test_invalid_request_is_rejected(self):
+        response = self.client.post("/jobs", json={**_request("Acme"), "startup_context": {}})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get("/jobs/nope").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
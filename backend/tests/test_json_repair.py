@@ -0,0 +1,56 @@
+"""
+Unit tests for the local JSON repair pass (Module 9).
+"""
+import unittest
+
+from backend.orchestrator.autogen_json_repair import repair_json
+
+
+class TestRepairJson(unittest.TestCase):
+
+    def test_valid_json_needs_no_repair(self):
+        parsed, repairs = repair_json('{"score": 8, "notes": ["a", "b"]}')
+        self.assertEqual(parsed, {"score": 8, "notes": ["a", "b"]})
+        self.assertEqual(repairs, [])
+
+    def test_stray_prose_around_object(self):
+        parsed, repairs = repair_json('Sure! {"score": 8} Let me know if {you} need more.')
+        self.assertEqual(parsed, {"score": 8})
+        self.assertEqual(repairs, ["stray_prose"])
+
+    def test_trailing_commas(self):
+        parsed, repairs = repair_json('{"risks": ["a", "b",], "score": 3,}')
+        self.assertEqual(parsed, {"risks": ["a", "b"], "score": 3})
+        self.assertIn("trailing_commas", repairs)
+
+    def test_single_quotes_and_python_literals(self):
+        parsed, repairs = repair_json("{'name': 'it\\'s \"new\"', 'viable': True, 'gap': None}")
+        self.assertEqual(parsed, {"name": 'it\'s "new"', "viable": True, "gap": None})
+        self.assertIn("single_quotes", repairs)
+        self.assertIn("python_literals", repairs)
+
+    def test_apostrophes_inside_double_quotes_are_kept(self):
+        parsed, _ = repair_json('{"summary": "founder\'s market, True story"}')
+        self.assertEqual(parsed["summary"], "founder's market, True story")
+
+    def test_truncated_closing_braces(self):
+        parsed, repairs = repair_json('{"score": 6, "details": {"tam": 100, "sam": [1, 2')
+        self.assertEqual(parsed, {"score": 6, "details": {"tam": 100, "sam": [1, 2]}})
+        self.assertIn("truncated", repairs)
+
+    def test_truncated_mid_string_drops_partial_field(self):
+        parsed, repairs = repair_json('{"score": 6, "summ')
+        self.assertEqual(parsed, {"score": 6})
+        self.assertIn("unterminated_string", repairs)
+
+    def test_truncated_after_colon(self):
+        parsed, _ = repair_json('{"score": 6, "summary":')
+        self.assertEqual(parsed, {"score": 6, "summary": None})
+
+    def test_no_object_raises(self):
+        with self.assertRaises(ValueError):
+            repair_json("I am unable to evaluate this startup.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Unit tests for the Prometheus metrics registry and the pipeline instrumentation.
+"""
+import unittest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+from autogen_core.models import RequestUsage
+
+from backend import metrics
+from backend.metrics import MetricsRegistry
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.scoring.evaluation_service import EvaluationService
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+NO_RETRY = {"max_attempts": 1, "json_repair": False}
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Agent:
+    def __init__(self, name, reply, usage=None):
+        self.name = name
+        self.reply = reply
+        self.usage = usage
+
+    async def on_messages(self, messages, cancellation_token):
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        content = self.reply if isinstance(self.reply, str) else json.dumps(self.reply)
+        return SimpleNamespace(chat_message=SimpleNamespace(content=content, models_usage=self.usage))
+
+
+# ── Registry / exposition format ─────────────────────────────
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter("jobs_total", "Jobs.", ("kind",))
+        gauge = self.registry.gauge("in_flight", "Work in flight.")
+        counter.inc(kind="a")
+        counter.inc(2, kind='quote"d')
+        with gauge.track_inprogress():
+            self.assertEqual(gauge.value(), 1)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE ideaevaluator_jobs_total counter", text)
+        self.assertIn('ideaevaluator_jobs_total{kind="a"} 1', text)
+        self.assertIn('ideaevaluator_jobs_total{kind="quote\\"d"} 2', text)
+        self.assertIn("ideaevaluator_in_flight 0", text)
+        with self.assertRaises(ValueError):
+            counter.inc(-1, kind="a")
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = self.registry.histogram("op_seconds", "Op.", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            hist.observe(value, op="x")
+
+        text = self.registry.render()
+        self.assertIn('ideaevaluator_op_seconds_bucket{op="x",le="0.1"} 1', text)
+        self.assertIn('ideaevaluator_op_seconds_bucket{op="x",le="1"} 3', text)
+        self.assertIn('ideaevaluator_op_seconds_bucket{op="x",le="+Inf"} 4', text)
+        self.assertIn('ideaevaluator_op_seconds_sum{op="x"} 4.25', text)
+        self.assertIn('ideaevaluator_op_seconds_count{op="x"} 4', text)
+
+    def test_labels_must_match(self):
+        hist = self.registry.histogram("op_seconds", "Op.", ("op",))
+        with self.assertRaises(ValueError):
+            hist.observe(1.0)
+        with self.assertRaises(ValueError):
+            self.registry.counter("op_seconds", "Op.", ("op",))
+
+
+# ── Instrumentation ──────────────────────────────────────────
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_agent_call_tokens_and_json(self):
+        usage = RequestUsage(prompt_tokens=120, completion_tokens=30)
+        agent = _Agent("metrics_ok_agent", {"confidence_score": 0.9}, usage=usage)
+        before = metrics.JSON_EXTRACTION_SECONDS.count(outcome="ok")
+
+        _run(execute_autogen_agent(agent, {}, policy=NO_RETRY))
+
+        self.assertEqual(metrics.AGENT_CALL_SECONDS.count(agent="metrics_ok_agent", outcome="ok"), 1)
+        self.assertEqual(metrics.LLM_TOKENS.value(agent="metrics_ok_agent", kind="prompt"), 120)
+        self.assertEqual(metrics.LLM_TOKENS.value(agent="metrics_ok_agent", kind="completion"), 30)
+        self.assertEqual(metrics.JSON_EXTRACTION_SECONDS.count(outcome="ok"), before + 1)
+
+    def test_failures_and_retries(self):
+        agent = _Agent("metrics_flaky_agent", ConnectionError("reset"))
+        policy = {"max_attempts": 2, "retry_base_delay_seconds": 0, "retry_jitter": 0}
+
+        output = _run(execute_autogen_agent(agent, {}, policy=policy))
+
+        self.assertTrue(output["error"])
+        self.assertEqual(metrics.AGENT_RETRIES.value(agent="metrics_flaky_agent"), 1)
+        self.assertEqual(metrics.AGENT_FAILURES.value(agent="metrics_flaky_agent", reason="error"), 1)
+
+    def test_evaluation_stages(self):
+        agents = {f"evaluator_{s}": _Agent(f"evaluator_{s}", {"confidence_score": 0.9}) for s in STEPS}
+        before = {stage: metrics.STAGE_SECONDS.count(stage=stage)
+                  for stage in ("context", "agents", "aggregate", "evaluation")}
+        scoring_before = metrics.SCORING_SECONDS.count()
+
+        with patch.dict("os.environ", {"AGENT_MODEL_ROUTING": '{"default": {"required_fields": []}}'}):
+            result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation({"name": "Acme"}))
+        EvaluationService().build_report("s1", result, "Acme")
+
+        self.assertEqual(metrics.STAGE_SECONDS.count(stage="context"), before["context"] + len(STEPS))
+        for stage in ("agents", "aggregate", "evaluation"):
+            self.assertEqual(metrics.STAGE_SECONDS.count(stage=stage), before[stage] + 1)
+        self.assertEqual(metrics.SCORING_SECONDS.count(), scoring_before + 1)
+        self.assertEqual(metrics.EVALUATIONS_IN_FLIGHT.value(), 0)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def test_prometheus_text(self):
+        import backend.main as main
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/metrics")
+
+        response = _run(scenario())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE ideaevaluator_agent_call_seconds histogram", response.text)
+        self.assertIn("\nideaevaluator_evaluations_in_flight 0\n", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Unit tests for tiered model routing (Module 16) and per-tier agent variants.
+"""
+import unittest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.agents.autogen_registry import AGENT_SPECS, initialize_agents, tier_agent_name
+from backend.agents.autogen_utils import get_model_client
+from backend.llm_config import get_agent_route
+from backend.orchestrator.autogen_model_router import escalation_reason, execute_routed_agent
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+ROUTE = {"tiers": ["small", "large"], "min_confidence": 0.6, "required_fields": ["tam", "confidence_score"]}
+NO_RETRY = {"max_attempts": 1, "json_repair": False}
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Agent:
+    def __init__(self, name, reply):
+        self.name = name
+        self.reply = reply
+        self.calls = 0
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        content = self.reply if isinstance(self.reply, str) else json.dumps(self.reply)
+        return SimpleNamespace(chat_message=SimpleNamespace(content=content))
+
+
+def _tiered(small_reply, large_reply, name="evaluator_market"):
+    return {
+        tier_agent_name(name, "small"): _Agent(name, small_reply),
+        name: _Agent(name, large_reply),
+    }
+
+
+def _route(agents, name="evaluator_market", **kwargs):
+    return _run(execute_routed_agent(agents, name, {"x": 1}, route=ROUTE, policy=NO_RETRY, **kwargs))
+
+
+class TestEscalationReason(unittest.TestCase):
+
+    def test_reasons(self):
+        self.assertIsNone(escalation_reason({"tam": 1, "confidence_score": 0.8}, ROUTE))
+        self.assertEqual(escalation_reason({"error": True}, ROUTE), "error")
+        self.assertTrue(escalation_reason({"confidence_score": 0.9}, ROUTE).startswith("missing_fields"))
+        self.assertTrue(escalation_reason({"tam": 1, "confidence_score": 0.3}, ROUTE).startswith("low_confidence"))
+        self.assertEqual(escalation_reason({"tam": 1, "confidence_score": "high"}, ROUTE),
+                         "invalid confidence_score")
+
+    def test_routing_table_overrides(self):
+        self.assertEqual(get_agent_route("evaluator_risk")["min_confidence"], 0.7)
+        with patch.dict("os.environ", {"MODEL_ROUTING": "0"}):
+            self.assertEqual(get_agent_route("evaluator_risk")["tiers"], ["large"])
+
+
+class TestRoutedExecution(unittest.TestCase):
+
+    def test_confident_small_answer_is_kept(self):
+        agents = _tiered({"tam": 1, "confidence_score": 0.9}, {"tam": 2, "confidence_score": 0.9})
+        output = _route(agents)
+
+        self.assertEqual(output["tam"], 1)
+        self.assertEqual(output["_meta"]["model_tier"], "small")
+        self.assertEqual(output["_meta"]["escalations"], [])
+        self.assertEqual(agents["evaluator_market"].calls, 0)
+
+    def test_low_confidence_escalates(self):
+        agents = _tiered({"tam": 1, "confidence_score": 0.4}, {"tam": 2, "confidence_score": 0.9})
+        output = _route(agents)
+
+        self.assertEqual(output["tam"], 2)
+        self.assertEqual(output["_meta"]["model_tier"], "large")
+        self.assertEqual(output["_meta"]["escalations"][0]["tier"], "small")
+
+    def test_invalid_json_escalates(self):
+        agents = _tiered("not json at all", {"tam": 2, "confidence_score": 0.9})
+        output = _route(agents)
+
+        self.assertEqual(output["tam"], 2)
+        self.assertEqual(output["_meta"]["escalations"][0]["reason"], "error")
+
+    def test_failed_escalation_keeps_the_earlier_answer(self):
+        agents = _tiered({"tam": 1, "confidence_score": 0.4}, "still not json")
+        output = _route(agents)
+
+        self.assertEqual(output["tam"], 1)
+        self.assertTrue(output["_meta"]["escalation_failed"])
+
+    def test_agent_set_without_tiers_runs_the_default_model(self):
+        agents = {"evaluator_market": _Agent("evaluator_market", {"tam": 1, "confidence_score": 0.1})}
+        output = _route(agents)
+
+        self.assertEqual(output["_meta"]["model_tier"], "large")
+        self.assertEqual(agents["evaluator_market"].calls, 1)
+
+    def test_deltas_restart_with_a_new_attempt_number(self):
+        attempts = []
+
+        async def on_delta(text, attempt):
+            attempts.append(attempt)
+
+        class _Streaming(_Agent):
+            async def on_messages_stream(self, messages, cancellation_token):
+                from autogen_agentchat.base import Response
+                from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
+                content = json.dumps(self.reply)
+                yield ModelClientStreamingChunkEvent(content=content, source=self.name)
+                yield Response(chat_message=TextMessage(content=content, source=self.name))
+
+        agents = {
+            "evaluator_market@small": _Streaming("evaluator_market", {"tam": 1, "confidence_score": 0.1}),
+            "evaluator_market": _Streaming("evaluator_market", {"tam": 2, "confidence_score": 0.9}),
+        }
+        _route(agents, on_delta=on_delta)
+
+        self.assertEqual(attempts, [1, 2])
+
+
+class TestOrchestratorTiers(unittest.TestCase):
+
+    def test_meta_records_the_answering_tier(self):
+        agents = {}
+        for step in STEPS:
+            name = f"evaluator_{step}"
+            confidence = 0.2 if step == "market" else 0.9
+            agents[tier_agent_name(name, "small")] = _Agent(name, {"confidence_score": confidence})
+            agents[name] = _Agent(name, {"confidence_score": 0.95})
+
+        with patch.dict("os.environ", {"AGENT_MODEL_ROUTING": '{"default": {"required_fields": []}}'}):
+            result = _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+                {"startup_context": {"name": "Acme"}}
+            ))
+
+        tiers = result["_meta"]["model_tiers"]
+        self.assertEqual(tiers["answered_by"]["market"], "large")
+        self.assertEqual(tiers["answered_by"]["financial"], "small")
+        self.assertEqual(tiers["escalated"], ["market"])
+
+
+class TestTierAgents(unittest.TestCase):
+
+    @patch('backend.agents.autogen_utils.os.environ.get')
+    def test_initialize_agents_builds_tier_variants(self, mock_env):
+        mock_env.return_value = "test_api_key"
+        small = get_model_client(model="llama-3.1-8b-instant")
+
+        agents = initialize_agents(get_model_client(), tier_clients={"small": small})
+
+        for spec in AGENT_SPECS:
+            variant = agents[tier_agent_name(spec["name"], "small")]
+            self.assertIs(variant._model_client, small)
+            self.assertEqual(variant.name, spec["name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
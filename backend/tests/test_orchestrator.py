@@ -5,12 +5,12 @@ Tests all 5 modules with mocked AutoGen agents.
 import unittest
 import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
 
 from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent, _extract_json
 from backend.orchestrator.autogen_parallel_executor import run_autogen_parallel
-from backend.orchestrator.autogen_context_builder import build_autogen_context
+from backend.orchestrator.autogen_context_builder import build_autogen_context, dumps_context, freeze
 from backend.orchestrator.autogen_result_aggregator import build_orchestration_result
 from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
 
@@ -18,10 +18,13 @@ from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestra
 # ─── Helpers ──────────────────────────────────────────────
 
 def _make_mock_agent(name: str, response: dict):
-    """Create a mock agent that returns a JSON response."""
-    agent = MagicMock()
+    """Create a mock agent whose on_messages (v0.7 API) returns a JSON response."""
+    agent = MagicMock(spec=["name", "on_messages", "on_reset"])
     agent.name = name
-    agent.a_generate_reply = AsyncMock(return_value=json.dumps(response))
+    agent.on_messages = AsyncMock(
+        return_value=SimpleNamespace(chat_message=SimpleNamespace(content=json.dumps(response)))
+    )
+    agent.on_reset = AsyncMock()
     return agent
 
 
@@ -46,9 +49,8 @@ class TestExecutionWrapper(unittest.TestCase):
         self.assertEqual(result["_meta"]["agent"], "test_agent")
 
     def test_error_returns_structured_error(self):
-        agent = MagicMock()
-        agent.name = "broken_agent"
-        agent.a_generate_reply = AsyncMock(side_effect=RuntimeError("LLM timeout"))
+        agent = _make_mock_agent("broken_agent", {})
+        agent.on_messages = AsyncMock(side_effect=RuntimeError("LLM timeout"))
 
         result = _run(execute_autogen_agent(agent, {}))
 
@@ -127,6 +129,43 @@ class TestContextBuilder(unittest.TestCase):
 
         self.assertTrue(merged["upstream_outputs"]["broken"]["error"])
 
+    def test_merged_context_is_read_only(self):
+        base = {"startup": {"name": "test", "tags": ["a"]}}
+        additional = {"financial": {"metrics": {"runway": 12}}}
+
+        merged = build_autogen_context(base, additional)
+
+        with self.assertRaises(TypeError):
+            merged["startup"]["name"] = "changed"
+        with self.assertRaises(TypeError):
+            merged["upstream_outputs"]["financial"]["metrics"].update(runway=0)
+        with self.assertRaises(AttributeError):
+            merged["startup"]["tags"].append("b")  # lists become tuples
+        self.assertEqual(base["startup"], {"name": "test", "tags": ["a"]})
+        self.assertEqual(additional["financial"]["metrics"]["runway"], 12)
+
+    def test_frozen_inputs_are_shared_not_copied(self):
+        base = freeze({"startup": {"name": "test"}})
+        financial = freeze({"score": 0.9})
+
+        first = build_autogen_context(base, {"financial": financial})
+        second = build_autogen_context(base, {"financial": financial, "market": {"tam": 1}})
+
+        self.assertIs(first["startup"], second["startup"])
+        self.assertIs(first["upstream_outputs"]["financial"], financial)
+
+    def test_serialisation_matches_json_dumps(self):
+        base = {"startup": {"name": "Café", "tags": ["a", {"b": None}], "empty": {}}, "n": 1.5}
+        merged = build_autogen_context(base, {"financial": {"score": 0.9, "items": []}})
+        plain = json.loads(json.dumps(merged))
+
+        self.assertEqual(
+            dumps_context(merged), json.dumps(plain, separators=(",", ":"), ensure_ascii=False)
+        )
+        self.assertEqual(
+            dumps_context(merged, indent=2), json.dumps(plain, indent=2, ensure_ascii=False)
+        )
+
 
 # ─── Module 4: Result Aggregator ─────────────────────────
 
@@ -214,7 +253,7 @@ class TestOrchestrator(unittest.TestCase):
             agents[name] = _make_mock_agent(name, resp)
 
         # Make financial agent crash
-        agents["evaluator_financial"].a_generate_reply = AsyncMock(
+        agents["evaluator_financial"].on_messages = AsyncMock(
             side_effect=RuntimeError("Groq rate limit")
         )
 
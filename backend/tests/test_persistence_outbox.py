@@ -0,0 +1,241 @@
+"""
+Unit tests for write-behind persistence: the SQLite outbox, the background
+flusher and the queued save path of EvaluationService.
+"""
+import unittest
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+from types import SimpleNamespace
+
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.evaluation_repository import EvaluationRepository
+from backend.scoring.evaluation_service import EvaluationService
+from backend.scoring.persistence_outbox import OutboxFlusher, PersistenceOutbox, latest_per_key
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Supabase:
+    """Records upserts; raises while `error` is set."""
+
+    def __init__(self, log=None):
+        self.log = log if log is not None else []
+        self.error = None
+
+    def table(self, name):
+        def upsert(rows, on_conflict=None):
+            def execute():
+                if self.error:
+                    raise self.error
+                keys = [tuple(row[c] for c in on_conflict.split(",")) for row in rows]
+                if len(set(keys)) != len(keys):
+                    raise RuntimeError("ON CONFLICT DO UPDATE command cannot affect row a second time")
+                self.log.append((name, on_conflict, [row["id"] for row in rows]))
+                return SimpleNamespace(data=rows)
+            return SimpleNamespace(execute=execute)
+        return SimpleNamespace(upsert=upsert)
+
+
+class TestPersistenceOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.outbox = PersistenceOutbox(":memory:", max_attempts=3, retry_base_seconds=2.0,
+                                        claim_seconds=60.0, clock=self.clock)
+
+    def test_claim_hides_rows_until_acked(self):
+        ids = self.outbox.enqueue("startups", [{"id": "a"}, {"id": "b"}])
+        claimed = self.outbox.claim(10)
+
+        self.assertEqual([row["id"] for row in claimed], ids)
+        self.assertEqual(claimed[0]["record"], {"id": "a"})
+        self.assertEqual(self.outbox.claim(10), [])
+        self.outbox.ack(ids)
+        self.assertEqual(self.outbox.stats()["depth"], 0)
+
+    def test_backoff_then_dead(self):
+        [row_id] = self.outbox.enqueue("startup_evaluations", [{"id": "e1"}])
+
+        self.outbox.claim()
+        self.assertEqual(self.outbox.retry([row_id], "503"), 0)
+        self.clock.now += 1.9
+        self.assertEqual(self.outbox.claim(), [])      # backoff 2 s
+        self.clock.now += 0.1
+        self.outbox.retry([self.outbox.claim()[0]["id"]], "503")
+        self.clock.now += 3.9
+        self.assertEqual(self.outbox.claim(), [])      # backoff 4 s
+        self.clock.now += 0.1
+        self.assertEqual(self.outbox.retry([self.outbox.claim()[0]["id"]], "503"), 1)
+
+        stats = self.outbox.stats()
+        self.assertEqual((stats["depth"], stats["dead"]), (0, 1))
+        self.clock.now += 1000
+        self.assertEqual(self.outbox.claim(), [])
+
+    def test_rows_survive_a_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "outbox.db")
+        PersistenceOutbox(path).enqueue("startups", [{"id": "a"}])
+
+        reopened = PersistenceOutbox(path)
+        self.assertEqual(reopened.stats()["depth"], 1)
+        self.assertEqual(reopened.claim()[0]["record"], {"id": "a"})
+
+    def test_tokens_left_by_older_versions_are_scrubbed(self):
+        path = os.path.join(tempfile.mkdtemp(), "outbox.db")
+        legacy = sqlite3.connect(path)
+        legacy.execute(
+            "CREATE TABLE persistence_outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT NOT NULL,"
+            " on_conflict TEXT NOT NULL, record_json TEXT NOT NULL, auth_token TEXT, status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, next_attempt_at REAL NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        legacy.execute("INSERT INTO persistence_outbox (table_name, on_conflict, record_json, auth_token,"
+                       " status, next_attempt_at, created_at) VALUES ('startups', 'id', '{}', 'jwt', 'pending', 0, 0)")
+        legacy.commit()
+        legacy.close()
+
+        outbox = PersistenceOutbox(path)
+        outbox.close()
+        self.assertEqual(sqlite3.connect(path).execute("SELECT auth_token FROM persistence_outbox").fetchall(),
+                         [(None,)])
+
+
+class TestOutboxFlusher(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.outbox = PersistenceOutbox(":memory:", retry_base_seconds=1.0, clock=self.clock)
+        self.log = []
+        self.client = _Supabase(self.log)
+        self.executor = DBExecutor(max_workers=2)
+        self.flusher = OutboxFlusher(self.outbox, self.client, executor=self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_batches_per_table_in_queue_order(self):
+        self.outbox.enqueue("startups", [{"id": "s1", "founder_id": "u1"}])
+        self.outbox.enqueue("startup_evaluations", [{"id": "e1", "user_id": "u1"}, {"id": "e2", "user_id": "u1"}])
+        self.outbox.enqueue("startup_evaluations", [{"id": "e3", "user_id": "u2"}])
+
+        saved = _run(self.flusher.flush_once())
+
+        self.assertEqual(saved, 4)
+        self.assertEqual(self.log, [
+            ("startups", "id", ["s1"]),
+            ("startup_evaluations", "id", ["e1", "e2", "e3"]),
+        ])
+        self.assertEqual(self.flusher.stats()["outbox"]["depth"], 0)
+
+    def test_duplicate_keys_collapse_to_the_newest_row(self):
+        self.outbox.enqueue("startups", [{"id": "s1", "stage": "Seed"}, {"id": "s2", "stage": "Seed"}])
+        self.outbox.enqueue("startups", [{"id": "s1", "stage": "Series A"}])
+
+        self.assertEqual(_run(self.flusher.flush_once()), 3)
+
+        self.assertEqual(self.log, [("startups", "id", ["s1", "s2"])])
+        self.assertEqual(self.flusher.stats()["superseded"], 1)
+        self.assertEqual(self.outbox.stats()["depth"], 0)   # the superseded row is acked too
+        self.assertEqual(latest_per_key([{"id": "s1", "v": 1}, {"id": "s2"}, {"id": "s1", "v": 2}]),
+                         [{"id": "s1", "v": 2}, {"id": "s2"}])
+
+    def test_failed_batch_is_retried(self):
+        self.client.error = ConnectionError("supabase down")
+        self.outbox.enqueue("startup_evaluations", [{"id": "e1"}])
+
+        self.assertEqual(_run(self.flusher.flush_once()), 0)
+        stats = self.flusher.stats()
+        self.assertEqual((stats["failed"], stats["outbox"]["retrying"]), (1, 1))
+        self.assertIn("supabase down", stats["last_error"])
+
+        self.client.error = None
+        self.clock.now += 1.0
+        self.assertEqual(_run(self.flusher.flush_once()), 1)
+        self.assertEqual(self.log, [("startup_evaluations", "id", ["e1"])])
+
+    def test_background_flush_after_enqueue(self):
+        async def scenario():
+            self.flusher.interval = 30.0   # only notify() can wake it in time
+            self.flusher.start()
+            self.outbox.enqueue("startups", [{"id": "s1"}])
+            for _ in range(100):
+                if self.log:
+                    break
+                await asyncio.sleep(0.01)
+            await self.flusher.stop()
+
+        _run(scenario())
+        self.assertEqual(self.log, [("startups", "id", ["s1"])])
+        self.assertEqual(self.outbox.listeners, [])
+
+
+class TestQueuedEvaluation(unittest.TestCase):
+
+    def test_report_is_queued_not_written(self):
+        outbox = PersistenceOutbox(":memory:")
+        client = _Supabase()
+        service = EvaluationService(supabase_client=client, outbox=outbox, auth_token="tok", owner_id="u1")
+
+        # The body's claim is not trusted: queued rows carry the verified owner
+        report = _run(service.evaluate("s1", {"agents": {}}, "Acme", user_id="someone-else"))
+
+        persistence = report["_persistence"]
+        self.assertEqual(persistence["status"], "queued")
+        self.assertFalse(persistence["saved"])
+        self.assertEqual(client.log, [])
+        [row] = outbox.claim()
+        self.assertNotIn("auth_token", row)
+        self.assertEqual(row["record"]["id"], persistence["evaluation_id"])
+        self.assertEqual((row["record"]["startup_id"], row["record"]["user_id"]), ("s1", "u1"))
+
+    def test_queued_startup_rows_carry_the_owner(self):
+        outbox = PersistenceOutbox(":memory:")
+        repository = EvaluationRepository(_Supabase(), outbox=outbox, owner_id="u1")
+
+        status = _run(repository.save_startups([{"id": "s1", "name": "Acme", "founder_id": "u2"}]))
+
+        self.assertEqual(status, "queued")
+        self.assertEqual(outbox.claim()[0]["record"]["founder_id"], "u1")
+
+    def test_outbox_calls_run_off_the_event_loop(self):
+        threads = []
+
+        class _Outbox(PersistenceOutbox):
+            # Records which thread touches the file (a locked file would block it)
+            def enqueue(self, *args, **kwargs):
+                threads.append(threading.get_ident())
+                return super().enqueue(*args, **kwargs)
+
+            def claim(self, *args, **kwargs):
+                threads.append(threading.get_ident())
+                return super().claim(*args, **kwargs)
+
+        outbox = _Outbox(":memory:")
+        executor = DBExecutor(max_workers=1)
+        repository = EvaluationRepository(_Supabase(), outbox=outbox, owner_id="u1", executor=executor)
+        flusher = OutboxFlusher(outbox, _Supabase(), executor=executor)
+
+        _run(repository.save_startups([{"id": "s1", "name": "Acme"}]))
+        _run(repository.save_evaluations([({"startup_id": "s1"}, None)]))
+        self.assertEqual(_run(flusher.flush_once()), 2)
+        executor.shutdown()
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
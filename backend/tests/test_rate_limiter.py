@@ -0,0 +1,226 @@
+"""
+Unit tests for the adaptive rate limiter and the rate-limited model client.
+Integration tests run against the local fake OpenAI-compatible server.
+"""
+import unittest
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import openai
+from autogen_core.models import UserMessage
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from backend.agents import autogen_rate_limiter
+from backend.agents.autogen_rate_limiter import (
+    AdaptiveRateLimiter,
+    QueueClock,
+    RateLimitedChatCompletionClient,
+    get_rate_limiter,
+    queue_clock,
+    rate_limit_key,
+)
+from backend.testing.fake_llm_server import FakeLLMServer
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+MODEL_INFO = {
+    "vision": False,
+    "function_calling": True,
+    "json_output": True,
+    "structured_output": False,
+    "family": "unknown",
+}
+
+
+def _client(server: FakeLLMServer) -> OpenAIChatCompletionClient:
+    return OpenAIChatCompletionClient(
+        model="llama-3.3-70b-versatile",
+        api_key="test",
+        base_url=server.base_url,
+        max_retries=0,
+        model_info=MODEL_INFO,
+    )
+
+
+def _messages():
+    return [UserMessage(content="Evaluate this startup.", source="user")]
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def test_requests_are_paced_by_the_bucket(self):
+        # 600 rpm = 10/s with a burst of one request
+        limiter = AdaptiveRateLimiter(requests_per_minute=600, tokens_per_minute=0, burst_seconds=0.1)
+
+        async def scenario():
+            started = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+            return time.perf_counter() - started
+
+        elapsed = _run(scenario())
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertEqual(limiter.stats()["granted"], 4)
+
+    def test_token_budget_is_enforced(self):
+        limiter = AdaptiveRateLimiter(requests_per_minute=0, tokens_per_minute=6000, burst_seconds=1.0)
+
+        async def scenario():
+            started = time.perf_counter()
+            await limiter.acquire(tokens=100)   # fits the 100-token burst
+            await limiter.acquire(tokens=50)    # needs 0.5s of refill
+            return time.perf_counter() - started
+
+        self.assertGreaterEqual(_run(scenario()), 0.45)
+
+    def test_round_robin_between_keys(self):
+        limiter = AdaptiveRateLimiter(requests_per_minute=1200, tokens_per_minute=0, burst_seconds=0.05)
+        order = []
+
+        async def request(key, label):
+            await limiter.acquire(key=key)
+            order.append(label)
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(request("big", f"big{i}")) for i in range(5)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(request("small", "small0")))
+            await asyncio.gather(*tasks)
+
+        _run(scenario())
+        # The single request of the second evaluation is not stuck behind all five
+        self.assertLess(order.index("small0"), 3)
+
+    def test_rate_limited_backs_off_and_recovers(self):
+        limiter = AdaptiveRateLimiter(requests_per_minute=60, tokens_per_minute=0)
+        limiter.on_rate_limited(retry_after=2.0)
+
+        stats = limiter.stats()
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["rate_scale"], 0.5)
+        self.assertGreater(stats["paused_for_ms"], 1500)
+
+        for _ in range(20):
+            limiter.on_success()
+        self.assertEqual(limiter.stats()["rate_scale"], 1.0)
+
+    def test_queue_depth_is_reported(self):
+        limiter = AdaptiveRateLimiter(requests_per_minute=60, tokens_per_minute=0, burst_seconds=1.0)
+
+        async def scenario():
+            await limiter.acquire()
+            token = rate_limit_key.set("evaluation:x")
+            try:
+                pending = asyncio.ensure_future(limiter.acquire())
+                await asyncio.sleep(0.01)
+                depth = limiter.stats()["queue_depth_by_key"]
+                pending.cancel()
+                return depth
+            finally:
+                rate_limit_key.reset(token)
+
+        self.assertEqual(_run(scenario()), {"evaluation:x": 1})
+
+
+class TestPerModelLimiters(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(autogen_rate_limiter, "_shared_limiters", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_each_model_gets_its_own_limits(self):
+        overrides = json.dumps({"llama-3.3-70b-versatile": {"requests_per_minute": 1000}})
+        with patch.dict("os.environ", {"MODEL_RATE_LIMITS": overrides}):
+            large = get_rate_limiter("llama-3.3-70b-versatile")
+            small = get_rate_limiter("llama-3.1-8b-instant")
+
+        self.assertIsNot(large, small)
+        self.assertIs(get_rate_limiter("llama-3.1-8b-instant"), small)
+        self.assertEqual((large.requests_per_minute, large.tokens_per_minute), (1000, 12000))
+        self.assertEqual((small.requests_per_minute, small.tokens_per_minute), (30, 6000))
+        self.assertEqual(set(autogen_rate_limiter.rate_limiter_stats()),
+                         {"llama-3.3-70b-versatile", "llama-3.1-8b-instant"})
+
+    def test_cancelled_acquire_leaves_the_queue_clock(self):
+        limiter = AdaptiveRateLimiter(requests_per_minute=1, tokens_per_minute=0, burst_seconds=1)
+        wrapped = SimpleNamespace(create_stream=lambda messages: None)
+        client = RateLimitedChatCompletionClient(wrapped, limiter)
+
+        async def scenario():
+            await limiter.acquire()          # drains the one-request bucket
+            clock = QueueClock()
+            queue_clock.set(clock)
+            waiting = asyncio.ensure_future(client._acquire(0))
+            await asyncio.sleep(0.01)
+            self.assertTrue(clock.queued)
+            waiting.cancel()                 # e.g. the losing hedge
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            return clock
+
+        self.assertFalse(_run(scenario()).queued)
+
+
+class TestRateLimitedClientAgainstFakeServer(unittest.TestCase):
+
+    def test_unlimited_burst_hits_provider_limits(self):
+        """Baseline: without the limiter, a burst gets 429s."""
+        with FakeLLMServer(requests_per_window=3, window_seconds=1.0) as server:
+            client = _client(server)
+
+            async def scenario():
+                return await asyncio.gather(
+                    *(client.create(_messages()) for _ in range(6)), return_exceptions=True
+                )
+
+            results = _run(scenario())
+            _run(client.close())
+
+        failures = [r for r in results if isinstance(r, openai.RateLimitError)]
+        self.assertGreater(len(failures), 0)
+
+    def test_limiter_keeps_burst_under_provider_limits(self):
+        with FakeLLMServer(requests_per_window=3, window_seconds=1.0) as server:
+            # 1.5 requests/s stays under the provider's 3 per second
+            limiter = AdaptiveRateLimiter(requests_per_minute=90, tokens_per_minute=0, burst_seconds=1.0)
+            client = RateLimitedChatCompletionClient(_client(server), limiter)
+
+            async def scenario():
+                return await asyncio.gather(*(client.create(_messages()) for _ in range(6)))
+
+            results = _run(scenario())
+            _run(client.close())
+            server_stats = server.stats()
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(server_stats["rate_limited"], 0)
+        self.assertGreater(limiter.stats()["total_wait_ms"], 0)
+
+    def test_limiter_adapts_to_429_and_retry_after(self):
+        """Configured far above the provider limit, the limiter learns from 429s."""
+        with FakeLLMServer(requests_per_window=3, window_seconds=0.5, retry_after=0.5) as server:
+            limiter = AdaptiveRateLimiter(requests_per_minute=6000, tokens_per_minute=0, burst_seconds=1.0)
+            client = RateLimitedChatCompletionClient(_client(server), limiter, max_rate_limit_retries=5)
+
+            async def scenario():
+                return await asyncio.gather(*(client.create(_messages()) for _ in range(6)))
+
+            results = _run(scenario())
+            _run(client.close())
+            server_stats = server.stats()
+
+        stats = limiter.stats()
+        self.assertEqual(len(results), 6)
+        self.assertGreater(server_stats["rate_limited"], 0)
+        self.assertEqual(stats["rate_limited"], server_stats["rate_limited"])
+        self.assertLess(stats["rate_scale"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Unit tests for the content-addressed agent response cache (Module 7)
+and its integration with execute_autogen_agent.
+"""
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.orchestrator.autogen_execution_policy import get_agent_policy
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_response_cache import (
+    AgentResponseCache,
+    cache_key,
+    canonical_json,
+    get_shared_response_cache,
+)
+from backend.scoring.db_executor import DBExecutor
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _CountingAgent:
+    """Fake AutoGen agent that counts LLM calls."""
+
+    def __init__(self, name="evaluator_market", response=None, prompt="ROLE: market"):
+        self.name = name
+        self.calls = 0
+        self.response = response or {"market_growth_score": 0.7, "confidence_score": 0.8}
+        self._system_messages = [SimpleNamespace(content=prompt)]
+        self._model_client = SimpleNamespace(
+            _create_args={"model": "llama-3.3-70b-versatile", "temperature": 0.2}
+        )
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls += 1
+        return SimpleNamespace(chat_message=SimpleNamespace(content=json.dumps(self.response)))
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def test_key_ignores_dict_order_and_meta(self):
+        agent = _CountingAgent()
+        a = {"b": 1, "a": {"x": 1, "_meta": {"completed_at": "t1"}}}
+        b = {"a": {"_meta": {"completed_at": "t2"}, "x": 1}, "b": 1}
+        self.assertEqual(cache_key(agent, a), cache_key(agent, b))
+        self.assertEqual(canonical_json(a), '{"a":{"x":1},"b":1}')
+
+    def test_key_changes_with_prompt_model_and_context(self):
+        base = cache_key(_CountingAgent(), {"a": 1})
+        self.assertNotEqual(base, cache_key(_CountingAgent(prompt="ROLE: other"), {"a": 1}))
+        self.assertNotEqual(base, cache_key(_CountingAgent(name="evaluator_risk"), {"a": 1}))
+        self.assertNotEqual(base, cache_key(_CountingAgent(), {"a": 2}))
+
+        other_model = _CountingAgent()
+        other_model._model_client._create_args["model"] = "llama-3.1-8b-instant"
+        self.assertNotEqual(base, cache_key(other_model, {"a": 1}))
+
+
+class TestAgentResponseCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = AgentResponseCache(max_entries=2)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")          # a becomes most recently used
+        cache.set("c", {"v": 3})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        clock = _FakeClock()
+        cache = AgentResponseCache(ttl_seconds=10, clock=clock)
+        cache.set("a", {"v": 1})
+
+        clock.now += 9
+        self.assertIsNotNone(cache.get("a"))
+        clock.now += 2
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_values_are_private_copies(self):
+        cache = AgentResponseCache()
+        cache.set("a", {"v": [1]})
+        cache.get("a")["v"].append(2)
+        self.assertEqual(cache.get("a"), {"v": [1]})
+
+    def test_sqlite_tier_survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            first = AgentResponseCache(sqlite_path=path)
+            first.set("a", {"v": 1})
+            first.close()
+
+            second = AgentResponseCache(sqlite_path=path)
+            self.assertEqual(second.get("a"), {"v": 1})
+            self.assertEqual(second.stats()["disk_hits"], 1)
+            # Promoted to memory on the way out
+            self.assertEqual(second.get("a"), {"v": 1})
+            self.assertEqual(second.stats()["memory_hits"], 1)
+            second.close()
+
+    def test_sqlite_tier_is_size_bounded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            clock = _FakeClock()
+            cache = AgentResponseCache(
+                max_entries=1, sqlite_path=os.path.join(tmp, "c.db"),
+                disk_max_entries=2, clock=clock,
+            )
+            for key in ("a", "b", "c"):
+                clock.now += 1
+                cache.set(key, {"k": key})
+
+            cache._memory.clear()
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("c"))
+            cache.close()
+
+    def test_async_api_runs_the_disk_tier_on_the_executor(self):
+        executor = DBExecutor(max_workers=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AgentResponseCache(sqlite_path=os.path.join(tmp, "c.db"), executor=executor)
+            _run(cache.store("a", {"v": 1}))
+            cache._memory.clear()
+
+            self.assertEqual(_run(cache.lookup("a")), {"v": 1})
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+            # The put and the read went through the pool; the memory hit does not
+            self.assertEqual(_run(cache.lookup("a")), {"v": 1})
+            self.assertEqual(executor.stats()["offloaded"], 2)
+            cache.close()
+        executor.shutdown()
+
+    def test_disabled_unless_opted_in(self):
+        env = {k: v for k, v in os.environ.items() if k != "AGENT_CACHE_ENABLED"}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertIsNone(get_shared_response_cache())
+        with patch.dict(os.environ, {"AGENT_CACHE_ENABLED": "1"}):
+            self.assertIsInstance(get_shared_response_cache(), AgentResponseCache)
+
+
+class TestExecutionWrapperCaching(unittest.TestCase):
+
+    def test_second_call_is_served_from_cache(self):
+        cache = AgentResponseCache()
+        agent = _CountingAgent()
+
+        first = _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache))
+        second = _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache))
+
+        self.assertEqual(agent.calls, 1)
+        self.assertFalse(first["_meta"]["cache_hit"])
+        self.assertTrue(second["_meta"]["cache_hit"])
+        self.assertEqual(second["_meta"]["started_at"], first["_meta"]["started_at"])
+        self.assertEqual(second["market_growth_score"], 0.7)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_bypass_forces_fresh_call(self):
+        cache = AgentResponseCache()
+        agent = _CountingAgent()
+
+        _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache))
+        fresh = _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache, bypass_cache=True))
+
+        self.assertEqual(agent.calls, 2)
+        self.assertFalse(fresh["_meta"]["cache_hit"])
+
+    def test_errors_are_not_cached(self):
+        cache = AgentResponseCache()
+        agent = _CountingAgent()
+        agent.response = None
+
+        async def broken(messages, cancellation_token):
+            agent.calls += 1
+            return SimpleNamespace(chat_message=SimpleNamespace(content="not json"))
+
+        agent.on_messages = broken
+        # One attempt per evaluation so each call maps to one LLM request
+        policy = {**get_agent_policy(agent.name), "max_attempts": 1}
+
+        _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache, policy=policy))
+        _run(execute_autogen_agent(agent, {"name": "Acme"}, cache=cache, policy=policy))
+
+        self.assertEqual(agent.calls, 2)
+        self.assertEqual(cache.stats()["sets"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,303 @@
+"""
+Unit tests for single-flight evaluations (Module 14) and Idempotency-Key support.
+"""
+import unittest
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+
+from backend.orchestrator.autogen_single_flight import (
+    IdempotencyConflict,
+    IdempotencyStore,
+    SingleFlight,
+    evaluation_key,
+)
+from backend.orchestrator.autogen_usage import BudgetExceeded
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEvaluationKey(unittest.TestCase):
+
+    def test_identical_payloads_share_a_key(self):
+        payload = {"startup_context": {"name": "Acme"}, "qualitative": {"a": 1, "b": 2}}
+        reordered = {"qualitative": {"b": 2, "a": 1}, "startup_context": {"name": "Acme"}}
+        self.assertEqual(evaluation_key(payload), evaluation_key(reordered))
+        self.assertEqual(evaluation_key(payload), evaluation_key({**payload, "on_disconnect": "finish"}))
+        self.assertEqual(evaluation_key(payload),
+                         evaluation_key({**payload, "metadata": {"submitted_at": "2026-10-18T10:00:00Z"}}))
+
+    def test_startup_id_and_content_are_part_of_the_key(self):
+        payload = {"startup_context": {"name": "Acme", "startup_id": "s1"}}
+        self.assertTrue(evaluation_key(payload).startswith("s1:"))
+        self.assertNotEqual(evaluation_key(payload), evaluation_key({"startup_context": {"name": "Beta"}}))
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_duplicates_share_one_run(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        async def run(flight):
+            runs.append(flight.key)
+            await asyncio.sleep(0.02)
+            return {"final_score": 0.7}
+
+        async def scenario():
+            first, started_first = single_flight.start("k", run)
+            second, started_second = single_flight.start("k", run)
+            results = await asyncio.gather(first.result(), second.result())
+            return started_first, started_second, first is second, results
+
+        started_first, started_second, same, results = _run(scenario())
+
+        self.assertEqual((started_first, started_second, same), (True, False, True))
+        self.assertEqual(runs, ["k"])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(_run(single_flight.stats())["coalesced"], 1)
+        self.assertEqual(_run(single_flight.stats())["in_flight"], 0)
+
+    def test_late_subscriber_replays_the_stream(self):
+        single_flight = SingleFlight()
+
+        async def run(flight):
+            flight.publish({"step": "validator", "status": "running"})
+            await asyncio.sleep(0.01)
+            flight.publish({"step": "validator", "status": "completed"})
+            return {}
+
+        async def scenario():
+            flight, _ = single_flight.start("k", run)
+            await asyncio.sleep(0.005)
+            late, _ = single_flight.start("k", run)
+            events = late.subscribe()
+            received = []
+            while (item := await events.get()) is not None:
+                received.append(item["status"])
+            return received
+
+        self.assertEqual(_run(scenario()), ["running", "completed"])
+
+    def test_failed_run_propagates_to_every_caller(self):
+        single_flight = SingleFlight()
+
+        async def run(flight):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("agents failed")
+
+        async def scenario():
+            first, _ = single_flight.start("k", run)
+            second, _ = single_flight.start("k", run)
+            return await asyncio.gather(first.result(), second.result(), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in _run(scenario())))
+
+
+class TestIdempotencyKeys(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.single_flight = SingleFlight(idempotency_ttl=60, clock=self.clock)
+
+    def _complete(self, key, report):
+        async def run(flight):
+            return report
+
+        async def scenario():
+            flight, _ = self.single_flight.start(key, run)
+            return await flight.result()
+
+        return _run(scenario())
+
+    def test_completed_report_is_replayed_within_the_window(self):
+        self.assertIsNone(_run(self.single_flight.replay("u:retry-1", "k")))
+        self._complete("k", {"final_score": 0.7})
+
+        self.assertEqual(_run(self.single_flight.replay("u:retry-1", "k")), {"final_score": 0.7})
+        self.clock.now += 61
+        self.assertIsNone(_run(self.single_flight.replay("u:retry-1", "k")))
+
+    def test_key_reused_with_other_payload_is_rejected(self):
+        _run(self.single_flight.replay("u:retry-1", "k"))
+        with self.assertRaises(IdempotencyConflict):
+            _run(self.single_flight.replay("u:retry-1", "other"))
+
+    def test_failed_runs_are_not_remembered(self):
+        _run(self.single_flight.replay("u:retry-1", "k"))
+
+        async def run(flight):
+            raise RuntimeError("boom")
+
+        async def scenario():
+            flight, _ = self.single_flight.start("k", run)
+            await asyncio.gather(flight.result(), return_exceptions=True)
+
+        _run(scenario())
+        self.assertEqual(_run(self.single_flight.stats())["idempotency_keys"], 0)
+
+    def test_keys_are_shared_through_the_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "idempotency.db")
+        first = SingleFlight(store=IdempotencyStore(path, clock=self.clock))
+        _run(first.replay("u:retry-1", "k"))
+
+        async def scenario():
+            flight, _ = first.start("k", lambda flight: asyncio.sleep(0, {"final_score": 0.7}))
+            return await flight.result()
+
+        _run(scenario())
+        # Another worker process, or this one after a restart
+        other = SingleFlight(store=IdempotencyStore(path, clock=self.clock))
+        self.assertEqual(_run(other.replay("u:retry-1", "k")), {"final_score": 0.7})
+        with self.assertRaises(IdempotencyConflict):
+            _run(other.replay("u:retry-1", "other"))
+
+    def test_pending_keys_of_a_crashed_run_expire(self):
+        _run(self.single_flight.replay("u:retry-1", "k"))
+        self.clock.now += 61
+        self.assertIsNone(_run(self.single_flight.replay("u:retry-1", "other")))
+
+
+# ── /evaluate ────────────────────────────────────────────────
+
+class _CountingAgent:
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    async def on_messages(self, messages, cancellation_token):
+        self.calls.append(self.name)
+        await asyncio.sleep(0.02)
+        return SimpleNamespace(chat_message=SimpleNamespace(content='{"score": 60, "confidence_score": 0.7}'))
+
+
+class _FakeRegistry:
+    def __init__(self, calls):
+        self.calls = calls
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield {f"evaluator_{s}": _CountingAgent(f"evaluator_{s}", self.calls) for s in STEPS}
+
+
+def _body(name="Acme"):
+    return {
+        "startup_context": {"name": name, "industry": "Fintech", "stage": "Seed",
+                            "description": f"{name} does payments"},
+        "financial_raw_input": {
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": 50000, "cogs": 1000, "operating_expenses": 5000,
+            "cash_balance": 100000, "monthly_burn_rate": 4000,
+        },
+        "qualitative": {},
+        "metadata": {},
+    }
+
+
+class TestEvaluateCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        import backend.main as main
+        self.main = main
+        self.calls = []
+        self.saved = []
+        self.single_flight = SingleFlight()
+        service = SimpleNamespace(evaluate=self._evaluate)
+        patches = [
+            patch.object(main, "get_shared_registry", lambda: _FakeRegistry(self.calls)),
+            patch.object(main, "get_shared_response_cache", lambda: None),
+            patch.object(main, "get_shared_single_flight", lambda: self.single_flight),
+            patch.object(main, "EvaluationService", lambda supabase_client: service),
+            patch.object(main, "supabase", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def _evaluate(self, **kwargs):
+        self.saved.append(kwargs["startup_id"])
+        return {"startup_id": kwargs["startup_id"], "final_score": 0.6}
+
+    def _post_all(self, *requests):
+        async def scenario():
+            transport = httpx.ASGITransport(app=self.main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*[
+                    client.post("/evaluate", json=body, headers=headers)
+                    for body, headers in requests
+                ])
+
+        return _run(scenario())
+
+    def test_double_submit_runs_once(self):
+        first, second = self._post_all((_body(), {}), (_body(), {}))
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(self.calls), len(STEPS))
+        self.assertEqual(len(self.saved), 1)
+
+    def test_double_click_with_new_submitted_at_runs_once(self):
+        # The evaluation form stamps metadata.submitted_at on every submit
+        first = {**_body(), "metadata": {"submitted_at": "2026-10-18T10:00:00.000Z", "version": "2.0"}}
+        second = {**_body(), "metadata": {"submitted_at": "2026-10-18T10:00:00.180Z", "version": "2.0"}}
+
+        one, two = self._post_all((first, {}), (second, {}))
+
+        self.assertEqual(one.json(), two.json())
+        self.assertEqual(len(self.calls), len(STEPS))
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(_run(self.single_flight.stats())["coalesced"], 1)
+
+    def test_idempotent_retry_returns_stored_report(self):
+        headers = {"Idempotency-Key": "submit-42"}
+        (first,) = self._post_all((_body(), headers))
+        (retry,) = self._post_all((_body(), headers))
+
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(len(self.saved), 1)
+        self.assertEqual(_run(self.single_flight.stats())["idempotent_replays"], 1)
+
+    def test_rejected_request_does_not_keep_its_key(self):
+        headers = {"Idempotency-Key": "submit-42"}
+
+        class _Broke:
+            async def check_persisted_budget(self, user_id, repository=None):
+                raise BudgetExceeded("Daily token budget of 1 reached")
+
+        with patch.object(self.main, "get_shared_usage_ledger", lambda: _Broke()):
+            (rejected,) = self._post_all((_body("Acme"), headers))
+        self.assertEqual(rejected.status_code, 429)
+        self.assertEqual(_run(self.single_flight.stats())["idempotency_keys"], 0)
+
+        # The corrected request may reuse the key
+        (retry,) = self._post_all((_body("Beta"), headers))
+        self.assertEqual(retry.status_code, 200)
+
+    def test_idempotency_key_with_other_payload_is_422(self):
+        headers = {"Idempotency-Key": "submit-42"}
+        self._post_all((_body("Acme"), headers))
+        (conflict,) = self._post_all((_body("Beta"), headers))
+
+        self.assertEqual(conflict.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
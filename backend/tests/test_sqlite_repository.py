@@ -0,0 +1,127 @@
+"""
+Unit tests for the local SQLite persistence backend and its selection in main.
+"""
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+
+import httpx
+
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.sqlite_repository import SQLiteEvaluationRepository, get_persistence_backend
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _report(startup_id, score, **extra):
+    return {"startup_id": startup_id, "final_score": score, "risk_label": "LOW_RISK", **extra}
+
+
+class TestSQLiteEvaluationRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = DBExecutor(max_workers=2)
+        self.repository = SQLiteEvaluationRepository(":memory:", executor=self.executor)
+
+    def tearDown(self):
+        self.repository.close()
+        self.executor.shutdown()
+
+    def test_latest_evaluation_round_trip(self):
+        usage = {"prompt_tokens": 120, "completion_tokens": 30, "cost_usd": 0.002,
+                 "by_agent": {"market": {"prompt_tokens": 120}}}
+        _run(self.repository.save_evaluation(_report("s1", 6.0), user_id="u1"))
+        saved = _run(self.repository.save_evaluation(_report("s1", 8.5, usage=usage), user_id="u1"))
+
+        record = _run(self.repository.get_evaluation("s1"))
+        self.assertEqual((record["id"], record["final_score"]), (saved["id"], 8.5))
+        self.assertEqual(record["agent_usage"], {"market": {"prompt_tokens": 120}})
+        self.assertIsInstance(record["report_json"], str)   # as PostgREST returns it
+        self.assertIsNone(_run(self.repository.get_evaluation("unknown")))
+
+    def test_batch_insert_keeps_order(self):
+        saved = _run(self.repository.save_evaluations(
+            [(_report(f"s{i}", float(i)), "u1") for i in range(5)]
+        ))
+
+        self.assertEqual([r["startup_id"] for r in saved], ["s0", "s1", "s2", "s3", "s4"])
+        self.assertEqual(len({r["id"] for r in saved}), 5)
+        self.assertEqual(_run(self.repository.get_evaluation("s3"))["final_score"], 3.0)
+
+    def test_prior_agent_outputs(self):
+        report = _report("s1", 7.0, agent_fingerprints={"market": "f1", "risk": "f2"},
+                         agent_results={"market": {"score": 0.7}, "risk": {"error": "timeout"}})
+        _run(self.repository.save_evaluation(report))
+
+        prior = _run(self.repository.get_prior_agent_outputs("s1"))
+        self.assertEqual(prior, {"market": {"fingerprint": "f1", "output": {"score": 0.7}}})
+
+    def test_usage_rows_by_window_and_user(self):
+        _run(self.repository.save_evaluations([(_report("s1", 1.0), "u1"), (_report("s2", 1.0), "u2")]))
+
+        self.assertEqual(len(_run(self.repository.get_usage_rows("2000-01-01"))), 2)
+        [row] = _run(self.repository.get_usage_rows("2000-01-01", user_id="u2"))
+        self.assertEqual((row["user_id"], row["agent_usage"]), ("u2", {}))
+        self.assertEqual(_run(self.repository.get_usage_rows("2999-01-01")), [])
+
+    def test_startups_upsert(self):
+        self.assertEqual(_run(self.repository.save_startups([
+            {"id": "s1", "name": "Acme", "stage": "Seed"},
+            {"id": "s2", "name": "Beta", "founder_id": "u1"},
+        ])), "saved")
+        created_at = self.repository.get_startup("s1")["created_at"]
+        _run(self.repository.save_startups([{"id": "s1", "name": "Acme", "stage": "Series A"}]))
+
+        startup = self.repository.get_startup("s1")
+        self.assertEqual((startup["stage"], startup["created_at"]), ("Series A", created_at))
+        self.assertEqual(self.repository.get_startup("s2")["founder_id"], "u1")
+
+    def test_data_survives_a_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "local.db")
+        first = SQLiteEvaluationRepository(path, executor=self.executor)
+        _run(first.save_evaluation(_report("s1", 5.0)))
+        first.close()
+
+        reopened = SQLiteEvaluationRepository(path, executor=self.executor)
+        self.assertEqual(_run(reopened.get_evaluation("s1"))["final_score"], 5.0)
+        reopened.close()
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def test_invalid_backend_is_rejected(self):
+        with patch.dict(os.environ, {"PERSISTENCE_BACKEND": "postgres"}):
+            with self.assertRaises(ValueError):
+                get_persistence_backend()
+
+    def test_main_persists_locally(self):
+        import backend.main as main
+
+        repository = SQLiteEvaluationRepository(":memory:")
+        with patch.object(main, "get_local_repository", lambda: repository), \
+                patch.object(main, "supabase", None):
+            service = main._evaluation_service(None)
+            self.assertIs(service.repository, repository)
+            self.assertEqual(_run(main._save_startup_rows(None, [{"id": "s1", "name": "Acme"}])), "saved")
+            self.assertIsNone(main._outbox())
+
+            report = _run(service.evaluate("s1", {"agents": {}}, "Acme", user_id="u1"))
+            self.assertEqual(report["_persistence"]["status"], "saved")
+
+            async def usage():
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return (await client.get("/usage", params={"user_id": "u1"})).json()
+
+            body = _run(usage())
+        self.assertEqual(body["source"], "database")
+        self.assertEqual(sum(day["evaluations"] for day in body["daily"]), 1)
+        self.assertEqual(repository.get_startup("s1")["name"], "Acme")
+
+
+if __name__ == "__main__":
+    unittest.main()
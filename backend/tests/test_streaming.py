@@ -0,0 +1,175 @@
+"""
+Unit tests for the incremental JSON parser (Module 13) and token streaming
+through the orchestrator and /evaluate-stream.
+"""
+import unittest
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
+from fastapi.testclient import TestClient
+
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.orchestrator.autogen_stream_parser import IncrementalJSONParser
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+REPLY = '```json\n{"market_growth_score": 7, "summary": "Big, \\"growing\\" market", "tam": {"usd": [1, 2]}, "confidence_score": 0.8}\n```'
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _feed_all(text, size):
+    parser = IncrementalJSONParser()
+    fields = []
+    for i in range(0, len(text), size):
+        fields.extend(parser.feed(text[i:i + size]))
+    return parser, fields
+
+
+class TestIncrementalJSONParser(unittest.TestCase):
+
+    def test_fields_match_full_parse_for_any_chunking(self):
+        for size in (1, 2, 5, 17, len(REPLY)):
+            parser, fields = _feed_all(REPLY, size)
+            self.assertTrue(parser.done)
+            self.assertEqual(dict(fields), {
+                "market_growth_score": 7,
+                "summary": 'Big, "growing" market',
+                "tam": {"usd": [1, 2]},
+                "confidence_score": 0.8,
+            })
+
+    def test_field_surfaces_as_soon_as_it_closes(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"summary": "Big market"'), [("summary", "Big market")])
+        self.assertEqual(parser.feed(', "score": 7'), [])   # a number may still continue
+        self.assertEqual(parser.feed(', "tam": {"usd": 1'), [("score", 7)])
+        self.assertEqual(parser.feed('}'), [("tam", {"usd": 1})])
+
+    def test_invalid_values_are_skipped(self):
+        _, fields = _feed_all("{'a': 1, \"b\": 2}", 3)
+        self.assertEqual(fields, [("b", 2)])
+
+
+class _StreamingAgent:
+    def __init__(self, name, chunks):
+        self.name = name
+        self.chunks = chunks
+
+    async def on_messages_stream(self, messages, cancellation_token):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield ModelClientStreamingChunkEvent(content=chunk, source=self.name)
+        yield Response(chat_message=TextMessage(content="".join(self.chunks), source=self.name))
+
+    async def on_messages(self, messages, cancellation_token):
+        return Response(chat_message=TextMessage(content="".join(self.chunks), source=self.name))
+
+
+def _chunks(text, size=6):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreamingExecution(unittest.TestCase):
+
+    def test_wrapper_forwards_chunks(self):
+        agent = _StreamingAgent("evaluator_market", _chunks(REPLY))
+        received = []
+
+        async def on_delta(text, attempt):
+            received.append((text, attempt))
+
+        output = _run(execute_autogen_agent(agent, {"x": 1}, on_delta=on_delta))
+
+        self.assertEqual("".join(text for text, _ in received), REPLY)
+        self.assertEqual({attempt for _, attempt in received}, {1})
+        self.assertEqual(output["market_growth_score"], 7)
+
+    def test_orchestrator_tags_deltas_and_fields_by_step(self):
+        agents = {f"evaluator_{s}": _StreamingAgent(f"evaluator_{s}", _chunks(REPLY)) for s in STEPS}
+        deltas = []
+
+        async def on_delta(step, delta):
+            deltas.append((step, delta))
+
+        _run(AutoGenEvaluationOrchestrator(agents=agents).run_full_evaluation(
+            {"startup_context": {"name": "Acme"}}, delta_callback=on_delta
+        ))
+
+        market = [d for step, d in deltas if step == "market"]
+        self.assertEqual("".join(d["text"] for d in market), REPLY)
+        fields = {k: v for d in market for k, v in d["fields"].items()}
+        self.assertEqual(fields["market_growth_score"], 7)
+        self.assertEqual({step for step, _ in deltas}, set(STEPS))
+
+
+# ── /evaluate-stream ─────────────────────────────────────────
+
+class _FakeRegistry:
+    @asynccontextmanager
+    async def acquire(self):
+        yield {f"evaluator_{s}": _StreamingAgent(f"evaluator_{s}", _chunks(REPLY)) for s in STEPS}
+
+
+class TestEvaluateStreamDeltas(unittest.TestCase):
+
+    def setUp(self):
+        import backend.main as main
+        service = SimpleNamespace(evaluate=self._evaluate)
+        patches = [
+            patch.object(main, "get_shared_registry", lambda: _FakeRegistry()),
+            patch.object(main, "get_shared_response_cache", lambda: None),
+            patch.object(main, "EvaluationService", lambda supabase_client: service),
+            patch.object(main, "supabase", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = TestClient(main.app)
+
+    async def _evaluate(self, **kwargs):
+        return {"startup_id": kwargs["startup_id"]}
+
+    def _events(self, text):
+        events = []
+        for frame in text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in frame.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    def test_delta_and_field_frames(self):
+        body = {
+            "startup_context": {"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                                "description": "Acme does payments"},
+            "financial_raw_input": {
+                "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+                "revenue": 50000, "cogs": 1000, "operating_expenses": 5000,
+                "cash_balance": 100000, "monthly_burn_rate": 4000,
+            },
+            "qualitative": {},
+            "metadata": {},
+        }
+
+        events = self._events(self.client.post("/evaluate-stream", json=body).text)
+
+        kinds = {kind for kind, _ in events}
+        self.assertTrue({"progress", "delta", "field", "result"} <= kinds)
+        market_fields = {d["field"]: d["value"] for kind, d in events
+                         if kind == "field" and d["step"] == "market"}
+        self.assertEqual(market_fields["market_growth_score"], 7)
+        first_delta = next(i for i, (kind, _) in enumerate(events) if kind == "delta")
+        result = next(i for i, (kind, _) in enumerate(events) if kind == "result")
+        self.assertLess(first_delta, result)
+        self.assertEqual(events[first_delta][1]["agent"], f"evaluator_{events[first_delta][1]['step']}")
+
+
+if __name__ == "__main__":
+    unittest.main()
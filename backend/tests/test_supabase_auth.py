@@ -0,0 +1,78 @@
+"""
+Unit tests for bearer-token verification (local HS256 and Supabase Auth).
+"""
+import unittest
+import asyncio
+import time
+from types import SimpleNamespace
+
+import jwt
+
+from backend.scoring.db_executor import DBExecutor
+from backend.scoring.supabase_auth import AuthenticatedUser, TokenVerifier
+
+
+SECRET = "test-secret-with-at-least-32-bytes!!"
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _token(sub="u1", secret=SECRET, expires_in=3600, **claims):
+    payload = {"sub": sub, "aud": "authenticated", "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+class _Auth:
+    """Stand-in for supabase.auth that counts get_user calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_user(self, token):
+        self.calls += 1
+        if token != "good":
+            raise ValueError("invalid JWT")
+        return SimpleNamespace(user=SimpleNamespace(id="u9", app_metadata={"role": "admin"}))
+
+
+class TestLocalVerification(unittest.TestCase):
+
+    def setUp(self):
+        self.verifier = TokenVerifier(jwt_secret=SECRET)
+
+    def test_valid_token(self):
+        user = _run(self.verifier.verify(_token(app_metadata={"role": "admin"})))
+        self.assertEqual(user, AuthenticatedUser("u1", "admin"))
+
+    def test_forged_expired_and_missing_tokens_are_rejected(self):
+        self.assertIsNone(_run(self.verifier.verify(_token(secret="another-secret-of-at-least-32-bytes"))))
+        self.assertIsNone(_run(self.verifier.verify(_token(expires_in=-10))))
+        self.assertIsNone(_run(self.verifier.verify("not-a-jwt")))
+        self.assertIsNone(_run(self.verifier.verify(None)))
+
+
+class TestSupabaseAuthVerification(unittest.TestCase):
+
+    def setUp(self):
+        self.auth = _Auth()
+        self.executor = DBExecutor(max_workers=1)
+        self.verifier = TokenVerifier(supabase_client=SimpleNamespace(auth=self.auth), executor=self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_verified_token_is_remembered(self):
+        for _ in range(3):
+            self.assertEqual(_run(self.verifier.verify("good")), AuthenticatedUser("u9", "admin"))
+        self.assertEqual(self.auth.calls, 1)
+
+    def test_rejected_token_is_asked_again(self):
+        self.assertIsNone(_run(self.verifier.verify("bad")))
+        self.assertIsNone(_run(self.verifier.verify("bad")))
+        self.assertEqual(self.auth.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Unit tests for the per-token Supabase client pool.
+"""
+import unittest
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+from supabase import ClientOptions, create_client
+
+from backend.scoring.supabase_clients import SupabaseClientPool, token_expiry
+
+
+ANON_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.sig"
+
+
+def _jwt(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.sig"
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenExpiry(unittest.TestCase):
+
+    def test_exp_claim(self):
+        self.assertEqual(token_expiry(_jwt(sub="u1", exp=1_700_000_000)), 1_700_000_000)
+        self.assertIsNone(token_expiry(_jwt(sub="u1")))
+        self.assertIsNone(token_expiry("not-a-jwt"))
+
+
+class TestSupabaseClientPool(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.built = []
+        self.pool = SupabaseClientPool(self._factory, max_clients=2, ttl_seconds=60, clock=self.clock)
+
+    def _factory(self, token):
+        self.built.append(token)
+        return object()
+
+    def test_reuses_client_per_token(self):
+        first = self.pool.get("a")
+        self.assertIs(self.pool.get("a"), first)
+        self.assertIsNot(self.pool.get("b"), first)
+        self.assertEqual(self.built, ["a", "b"])
+        self.assertEqual(self.pool.stats()["hit_rate"], 0.3333)
+
+    def test_least_recently_used_is_evicted(self):
+        self.pool.get("a")
+        self.pool.get("b")
+        self.pool.get("a")
+        self.pool.get("c")   # evicts b
+
+        self.pool.get("a")
+        self.pool.get("b")
+        self.assertEqual(self.built, ["a", "b", "c", "b"])
+        self.assertEqual(self.pool.stats()["evicted"], 2)
+
+    def test_ttl_and_token_expiry(self):
+        short_lived = _jwt(sub="u1", exp=self.clock.now + 10)
+        self.pool.get("a")
+        self.pool.get(short_lived)
+
+        self.clock.now += 11
+        self.pool.get("a")            # within the TTL
+        self.pool.get(short_lived)    # past exp: rebuilt
+        self.clock.now += 50
+        self.pool.get("a")            # past the TTL: rebuilt
+
+        self.assertEqual(self.built, ["a", short_lived, short_lived, "a"])
+        self.assertEqual(self.pool.stats()["expired"], 2)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen = []
+    connections = set()
+
+    def do_GET(self):
+        _Handler.seen.append(self.headers.get("Authorization"))
+        _Handler.connections.add(self.client_address)
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPooledClientsOverHTTP(unittest.TestCase):
+
+    def setUp(self):
+        _Handler.seen, _Handler.connections = [], set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.transport = httpx.Client()
+        url = f"http://127.0.0.1:{self.server.server_port}"
+
+        def factory(token):
+            client = create_client(url, ANON_KEY, options=ClientOptions(httpx_client=self.transport))
+            client.postgrest.auth(token)
+            return client
+
+        self.pool = SupabaseClientPool(factory)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_each_user_sends_own_token_on_shared_connections(self):
+        for token in ("alice", "bob", "alice", "bob"):
+            self.pool.get(token).table("startup_evaluations").select("*").execute()
+
+        self.assertEqual(_Handler.seen, ["Bearer alice", "Bearer bob", "Bearer alice", "Bearer bob"])
+        self.assertEqual(len(_Handler.connections), 1)
+        self.assertEqual(self.pool.stats()["misses"], 2)
+
+
+class TestRequestClients(unittest.TestCase):
+
+    def test_main_reuses_the_client_of_a_token(self):
+        import backend.main as main
+
+        pool = SupabaseClientPool(lambda token: object())
+        anon = object()
+        with patch.object(main, "supabase", anon), patch.object(main, "supabase_clients", pool):
+            self.assertIs(main._supabase_for_token("tok"), main._supabase_for_token("tok"))
+            self.assertIs(main._supabase_for_token(None), anon)
+        with patch.object(main, "supabase", None):
+            self.assertIsNone(main._supabase_for_token("tok"))
+
+
+if __name__ == "__main__":
+    unittest.main()
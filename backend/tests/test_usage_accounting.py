@@ -0,0 +1,276 @@
+"""
+Unit tests for token usage and cost accounting (Module 18): per call, per
+model tier, per evaluation, persisted columns and the per-user/day ledger.
+"""
+import unittest
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import jwt
+from autogen_core.models import RequestUsage
+
+from backend.agents.autogen_registry import tier_agent_name
+from backend.llm_config import estimate_cost_usd
+from backend.orchestrator.autogen_execution_wrapper import execute_autogen_agent
+from backend.orchestrator.autogen_model_router import execute_routed_agent
+from backend.orchestrator.autogen_usage import (
+    BudgetExceeded,
+    UsageLedger,
+    get_shared_usage_ledger,
+    summarize_usage,
+)
+from backend.scoring.evaluation_repository import EvaluationRepository
+from backend.scoring.evaluation_service import EvaluationService
+from backend.scoring.supabase_auth import TokenVerifier
+
+
+ROUTE = {"tiers": ["small", "large"], "min_confidence": 0.6, "required_fields": []}
+NO_RETRY = {"max_attempts": 1, "json_repair": False}
+JWT_SECRET = "usage-test-secret-of-at-least-32-bytes"
+# 2026-03-10 12:00:00 UTC
+NOW = datetime(2026, 3, 10, 12, tzinfo=timezone.utc).timestamp()
+DAY = 86400
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Agent:
+    def __init__(self, name, reply, prompt_tokens=100, completion_tokens=20):
+        self.name = name
+        self.reply = reply
+        self.usage = RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    async def on_messages(self, messages, cancellation_token):
+        return SimpleNamespace(chat_message=SimpleNamespace(
+            content=json.dumps(self.reply), models_usage=self.usage,
+        ))
+
+
+async def _resolved(value):
+    return value
+
+
+def _usage(prompt, completion, cost, calls=1):
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "llm_calls": calls, "cost_usd": cost}
+
+
+# ── Per call / per tier / per evaluation ─────────────────────
+
+class TestUsageCapture(unittest.TestCase):
+
+    def test_wrapper_records_models_usage(self):
+        agent = _Agent("usage_agent", {"confidence_score": 0.9}, 300, 40)
+        output = _run(execute_autogen_agent(agent, {}, policy=NO_RETRY))
+
+        self.assertEqual(output["_meta"]["usage"], _usage(300, 40, 0.0))
+
+    def test_router_prices_every_tier_called(self):
+        name = "evaluator_market"
+        agents = {
+            tier_agent_name(name, "small"): _Agent(name, {"confidence_score": 0.2}, 1000, 100),
+            name: _Agent(name, {"confidence_score": 0.9}, 2000, 200),
+        }
+        output = _run(execute_routed_agent(agents, name, {}, route=ROUTE, policy=NO_RETRY))
+
+        usage = output["_meta"]["usage"]
+        self.assertEqual(output["_meta"]["model_tier"], "large")
+        self.assertEqual((usage["prompt_tokens"], usage["completion_tokens"], usage["llm_calls"]),
+                         (3000, 300, 2))
+        expected = (estimate_cost_usd("llama-3.1-8b-instant", 1000, 100)
+                    + estimate_cost_usd("llama-3.3-70b-versatile", 2000, 200))
+        self.assertAlmostEqual(usage["cost_usd"], expected)
+
+    def test_cached_and_reused_outputs_cost_nothing(self):
+        summary = summarize_usage({
+            "market": {"_meta": {"usage": _usage(100, 10, 0.001)}},
+            "risk": {"_meta": {"usage": _usage(50, 5, 0.0005)}},
+            "financial": {"_meta": {"cache_hit": True, "usage": _usage(999, 99, 1.0)}},
+            "longevity": {"_meta": {"reused": True, "usage": _usage(999, 99, 1.0)}},
+        })
+
+        self.assertEqual(summary["total_tokens"], 165)
+        self.assertEqual(summary["llm_calls"], 2)
+        self.assertAlmostEqual(summary["cost_usd"], 0.0015)
+        self.assertEqual(set(summary["by_agent"]), {"market", "risk"})
+
+    def test_report_and_record_columns(self):
+        usage = summarize_usage({"market": {"_meta": {"usage": _usage(100, 10, 0.001)}}})
+        service = EvaluationService(usage_ledger=UsageLedger())
+        report = service.build_report("s1", {"agents": {}, "usage": usage}, "Acme")
+        record = EvaluationRepository()._build_record(report, "u1")
+
+        self.assertEqual(report["usage"]["total_tokens"], 110)
+        self.assertEqual((record["prompt_tokens"], record["completion_tokens"], record["cost_usd"]),
+                         (100, 10, 0.001))
+        self.assertEqual(record["agent_usage"]["market"]["prompt_tokens"], 100)
+
+
+# ── Ledger ───────────────────────────────────────────────────
+
+class TestUsageLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.now = NOW
+        self.ledger = UsageLedger(retention_days=3, clock=lambda: self.now)
+
+    def _record(self, user, prompt, cost, days_ago=0):
+        at = datetime.fromtimestamp(self.now - days_ago * DAY, tz=timezone.utc)
+        usage = {**_usage(prompt, 0, cost), "by_agent": {"market": _usage(prompt, 0, cost)}}
+        self.ledger.record(user, usage, at=at)
+
+    def test_rolling_daily_summary(self):
+        self._record("u1", 100, 0.01)
+        self._record("u1", 50, 0.02)
+        self._record("u2", 10, 0.5, days_ago=1)
+        self._record("u1", 999, 9.0, days_ago=5)   # past retention
+
+        summary = self.ledger.summary(days=7)
+
+        self.assertEqual([d["date"] for d in summary["daily"]], ["2026-03-10", "2026-03-09"])
+        self.assertEqual(summary["daily"][0]["evaluations"], 2)
+        self.assertEqual(summary["total"]["prompt_tokens"], 160)
+        self.assertEqual(summary["by_user"]["u2"]["evaluations"], 1)
+        self.assertEqual(summary["top_agents"], ["market"])
+        self.assertEqual(self.ledger.summary(user_id="u1", days=1)["total"]["prompt_tokens"], 150)
+
+    def test_from_rows(self):
+        rows = [{"user_id": "u1", "created_at": "2026-03-10T08:00:00Z", "prompt_tokens": 70,
+                 "completion_tokens": 7, "cost_usd": "0.003",
+                 "agent_usage": json.dumps({"risk": _usage(70, 7, 0.003)})}]
+        ledger = UsageLedger.from_rows(rows, clock=lambda: NOW)
+
+        today = ledger.spent_today("u1")
+        self.assertEqual((today["prompt_tokens"], today["llm_calls"]), (70, 1))
+        self.assertAlmostEqual(today["cost_usd"], 0.003)
+
+    def test_daily_budget(self):
+        budget = json.dumps({"default": {"daily_cost_usd": 0.05}, "vip": {"daily_cost_usd": None}})
+        with patch.dict("os.environ", {"USAGE_BUDGET": budget}):
+            self._record("u1", 100, 0.04)
+            self.ledger.check_budget("u1")
+            self._record("u1", 100, 0.02)
+            with self.assertRaises(BudgetExceeded):
+                self.ledger.check_budget("u1")
+
+            self._record("vip", 100, 5.0)
+            self.ledger.check_budget("vip")
+            self.now += DAY   # a new UTC day resets the budget
+            self.ledger.check_budget("u1")
+
+    def test_budget_counts_persisted_usage(self):
+        queries = []
+
+        class _Repository:
+            async def get_usage_rows(self, since, user_id=None):
+                queries.append((since, user_id))
+                return [{"user_id": "u1", "created_at": "2026-03-10T08:00:00Z", "prompt_tokens": 90,
+                         "completion_tokens": 10, "cost_usd": 0.01, "agent_usage": {}}]
+
+        budget = json.dumps({"default": {"daily_tokens": 150}})
+        with patch.dict("os.environ", {"USAGE_BUDGET": budget}):
+            # Another worker (or this one before a restart) spent 100 tokens
+            _run(self.ledger.check_persisted_budget("u1", _Repository()))
+            self.assertEqual(queries, [("2026-03-10", "u1")])
+
+            # Cached: this process's newer spend still counts
+            self._record("u1", 160, 0.0)
+            with self.assertRaises(BudgetExceeded):
+                _run(self.ledger.check_persisted_budget("u1", _Repository()))
+            self.assertEqual(len(queries), 1)
+
+            # A restarted process starts empty but still sees the persisted spend
+            rows = 2 * [{"user_id": "u1", "created_at": "2026-03-10T09:00:00Z", "prompt_tokens": 80,
+                         "completion_tokens": 0, "cost_usd": 0.0, "agent_usage": {}}]
+            repository = SimpleNamespace(get_usage_rows=lambda since, user_id=None: _resolved(rows))
+            with self.assertRaises(BudgetExceeded):
+                _run(UsageLedger(clock=lambda: self.now).check_persisted_budget("u1", repository))
+
+
+# ── Endpoints ────────────────────────────────────────────────
+
+def _body(user_id):
+    return {
+        "startup_context": {"name": "Acme", "industry": "Fintech", "stage": "Seed",
+                            "description": "Acme does payments"},
+        "financial_raw_input": {
+            "period_start": "2025-01-01T00:00:00", "period_end": "2025-12-31T00:00:00",
+            "revenue": 50000, "cogs": 1000, "operating_expenses": 5000,
+            "cash_balance": 100000, "monthly_burn_rate": 4000,
+        },
+        "qualitative": {},
+        "metadata": {},
+        "user_id": user_id,
+    }
+
+
+def _bearer(user_id, role=None):
+    claims = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 600}
+    if role:
+        claims["app_metadata"] = {"role": role}
+    return {"Authorization": f"Bearer {jwt.encode(claims, JWT_SECRET, algorithm='HS256')}"}
+
+
+class TestUsageEndpoints(unittest.TestCase):
+
+    def _request(self, method, path, verify=False, **kwargs):
+        import backend.main as main
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path, **kwargs)
+
+        verifier = TokenVerifier(jwt_secret=JWT_SECRET if verify else None)
+        with patch.object(main, "supabase", None), patch.object(main, "token_verifier", verifier):
+            return _run(scenario())
+
+    def test_usage_report_from_process_ledger(self):
+        get_shared_usage_ledger().record("usage-endpoint-user", {**_usage(40, 4, 0.002), "by_agent": {}})
+
+        response = self._request("GET", "/usage", params={"user_id": "usage-endpoint-user", "days": 1})
+
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["source"], "process")
+        self.assertEqual(data["total"]["prompt_tokens"], 40)
+        self.assertEqual(data["budget"]["tokens_today"], 44)
+
+    def test_usage_is_scoped_to_the_verified_user(self):
+        get_shared_usage_ledger().record("usage-alice", {**_usage(10, 1, 0.001), "by_agent": {}})
+        get_shared_usage_ledger().record("usage-bob", {**_usage(20, 2, 0.002), "by_agent": {}})
+
+        self.assertEqual(self._request("GET", "/usage", verify=True).status_code, 401)
+        forbidden = self._request("GET", "/usage", verify=True, params={"user_id": "usage-bob"},
+                                  headers=_bearer("usage-alice"))
+        self.assertEqual(forbidden.status_code, 403)
+
+        own = self._request("GET", "/usage", verify=True, params={"days": 1}, headers=_bearer("usage-alice"))
+        self.assertEqual(own.json()["total"]["prompt_tokens"], 10)
+        self.assertNotIn("by_user", own.json())
+
+        admin = self._request("GET", "/usage", verify=True, params={"days": 1},
+                              headers=_bearer("usage-root", role="admin"))
+        self.assertIn("usage-bob", admin.json()["by_user"])
+
+    def test_evaluate_over_budget_is_rejected(self):
+        get_shared_usage_ledger().record("usage-broke-user", {**_usage(500, 0, 0.0), "by_agent": {}})
+        budget = json.dumps({"usage-broke-user": {"daily_tokens": 100}})
+
+        # The budget follows the token, whatever user_id the body claims
+        with patch.dict("os.environ", {"USAGE_BUDGET": budget}):
+            response = self._request("POST", "/evaluate", verify=True, json=_body("someone-else"),
+                                     headers=_bearer("usage-broke-user"))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Daily token budget", response.json()["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
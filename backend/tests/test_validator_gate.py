@@ -0,0 +1,169 @@
+"""
+Unit tests for the validator gate (Module 15) and INSUFFICIENT_DATA reports.
+"""
+import unittest
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.orchestrator.autogen_dag_scheduler import DEFAULT_PIPELINE_DAG
+from backend.orchestrator.autogen_orchestrator import AutoGenEvaluationOrchestrator
+from backend.orchestrator.autogen_validator_gate import (
+    GateStats,
+    evaluate_gate,
+    gated_dag,
+    get_gate_policy,
+)
+from backend.scoring.evaluation_service import EvaluationService
+from backend.scoring.scoring_engine import INSUFFICIENT_DATA
+
+
+STEPS = ("validator", "financial", "market", "competition", "risk", "longevity", "investor_fit")
+
+JUNK = {"data_consistency_score": 0.1, "completeness_score": 0.05,
+        "suspicion_flags": ["lorem ipsum", "revenue > TAM"], "requires_manual_review": True,
+        "confidence_score": 0.9}
+SOUND = {"data_consistency_score": 0.8, "completeness_score": 0.9,
+         "suspicion_flags": [], "requires_manual_review": False, "confidence_score": 0.8}
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Agent:
+    def __init__(self, name, reply, started):
+        self.name = name
+        self.reply = reply
+        self.started = started
+
+    async def on_messages(self, messages, cancellation_token):
+        self.started.append(self.name)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(chat_message=SimpleNamespace(content=json.dumps(self.reply)))
+
+
+def _agents(validator_reply, started):
+    agents = {f"evaluator_{s}": _Agent(f"evaluator_{s}", {"score": 60, "confidence_score": 0.7}, started)
+              for s in STEPS}
+    agents["evaluator_validator"].reply = validator_reply
+    return agents
+
+
+class TestGatePolicy(unittest.TestCase):
+
+    def test_thresholds(self):
+        policy = get_gate_policy({"mode": "enforce"})
+        self.assertTrue(evaluate_gate(SOUND, policy)["passed"])
+
+        decision = evaluate_gate(JUNK, policy)
+        self.assertFalse(decision["passed"])
+        self.assertEqual(len(decision["reasons"]), 2)  # completeness + consistency
+
+        strict = {**policy, "max_suspicion_flags": 1, "gate_on_manual_review": True}
+        self.assertEqual(len(evaluate_gate(JUNK, strict)["reasons"]), 4)
+
+    def test_failed_validator_fails_open(self):
+        policy = get_gate_policy({"mode": "enforce"})
+        self.assertTrue(evaluate_gate({"error": True, "message": "timeout"}, policy)["passed"])
+
+    def test_unknown_mode_is_off(self):
+        self.assertEqual(get_gate_policy({"mode": "bogus"})["mode"], "off")
+
+    def test_mode_env_is_read_on_every_call(self):
+        with patch.dict("os.environ", {"VALIDATOR_GATE": "shadow"}):
+            self.assertEqual(get_gate_policy()["mode"], "shadow")
+            with patch.dict("os.environ", {"VALIDATOR_GATE_POLICY": json.dumps({"mode": "enforce"})}):
+                self.assertEqual(get_gate_policy()["mode"], "enforce")
+        self.assertEqual(get_gate_policy()["mode"], "off")
+
+    def test_root_steps_wait_for_the_validator(self):
+        dag = gated_dag(DEFAULT_PIPELINE_DAG)
+        self.assertEqual(dag["validator"], ())
+        self.assertEqual(dag["market"], ("validator",))
+        self.assertEqual(dag["risk"], DEFAULT_PIPELINE_DAG["risk"])
+
+
+class TestGatedEvaluation(unittest.TestCase):
+
+    def _evaluate(self, mode, validator_reply):
+        started, stats = [], GateStats()
+        orchestrator = AutoGenEvaluationOrchestrator(
+            agents=_agents(validator_reply, started),
+            gate_policy={"mode": mode}, gate_stats=stats,
+        )
+        result = _run(orchestrator.run_full_evaluation({"startup_context": {"name": "Junk"}}))
+        with patch.dict("os.environ", {"VALIDATOR_GATE": mode}):
+            return result, started, stats.stats()
+
+    def test_enforce_skips_the_rest_of_the_pipeline(self):
+        result, started, stats = self._evaluate("enforce", JUNK)
+
+        self.assertEqual(started, ["evaluator_validator"])
+        gate = result["_meta"]["gate"]
+        self.assertFalse(gate["passed"])
+        self.assertEqual(sorted(gate["skipped"]), sorted(STEPS[1:]))
+        self.assertTrue(result["agents"]["market"]["gated"])
+        self.assertEqual((stats["gated"], stats["llm_calls_saved"]), (1, 6))
+
+    def test_enforce_runs_everything_after_a_passing_gate(self):
+        result, started, stats = self._evaluate("enforce", SOUND)
+
+        self.assertEqual(started[0], "evaluator_validator")
+        self.assertEqual(len(started), len(STEPS))
+        self.assertTrue(result["_meta"]["gate"]["passed"])
+        self.assertEqual((stats["evaluations"], stats["gated"]), (1, 0))
+
+    def test_shadow_counts_without_skipping(self):
+        result, started, stats = self._evaluate("shadow", JUNK)
+
+        self.assertEqual(len(started), len(STEPS))
+        self.assertFalse(result["_meta"]["gate"]["passed"])
+        self.assertEqual((stats["would_gate"], stats["llm_calls_would_save"]), (1, 6))
+        self.assertEqual(stats["by_mode"]["enforce"]["evaluations"], 0)
+
+    def test_off_by_default(self):
+        result, started, stats = self._evaluate("off", JUNK)
+
+        self.assertEqual(len(started), len(STEPS))
+        self.assertIsNone(result["_meta"]["gate"]["passed"])
+        self.assertEqual(stats["evaluations"], 0)
+
+
+    def test_stats_are_kept_per_mode(self):
+        stats = GateStats()
+        stats.record({"mode": "shadow", "passed": False, "skipped": ["market", "risk"]})
+        stats.record({"mode": "shadow", "passed": False, "skipped": ["market", "risk"]})
+        stats.record({"mode": "enforce", "passed": True, "skipped": []})
+
+        # After switching to enforce, the shadow decisions don't count as gated
+        with patch.dict("os.environ", {"VALIDATOR_GATE": "enforce"}):
+            report = stats.stats()
+        self.assertEqual((report["mode"], report["evaluations"], report["gated"]), ("enforce", 1, 0))
+        self.assertEqual(report["gate_rate"], 0.0)
+        self.assertEqual(report["by_mode"]["shadow"]["would_gate"], 2)
+        self.assertEqual(report["by_mode"]["shadow"]["gate_rate"], 1.0)
+
+
+class TestInsufficientDataReport(unittest.TestCase):
+
+    def test_gated_run_is_labelled_insufficient_data(self):
+        started = []
+        orchestrator = AutoGenEvaluationOrchestrator(
+            agents=_agents(JUNK, started), gate_policy={"mode": "enforce"}, gate_stats=GateStats(),
+        )
+        result = _run(orchestrator.run_full_evaluation({"startup_context": {"name": "Junk"}}))
+
+        report = EvaluationService().build_report("s1", result, "Junk")
+
+        self.assertEqual(report["risk_label"], INSUFFICIENT_DATA)
+        self.assertEqual(report["final_score"], 0.0)
+        self.assertEqual(list(report["component_scores"]), ["validator"])
+        self.assertEqual(sorted(report["summary"]["gated_agents"]), sorted(STEPS[1:]))
+        self.assertEqual(report["summary"]["failed_agents"], [])
+        self.assertFalse(report["validator_gate"]["passed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -104,9 +104,38 @@ CREATE TABLE IF NOT EXISTS startup_evaluations (
     final_score NUMERIC,
     risk_label TEXT,
     report_json JSONB,
+    prompt_tokens INTEGER DEFAULT 0,      -- LLM tokens spent by this evaluation
+    completion_tokens INTEGER DEFAULT 0,
+    cost_usd NUMERIC DEFAULT 0,           -- estimated from per-model token prices
+    agent_usage JSONB DEFAULT '{}',       -- per-agent tokens / cost
     created_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Token usage columns for tables created before they existed
+ALTER TABLE startup_evaluations ADD COLUMN IF NOT EXISTS prompt_tokens INTEGER DEFAULT 0;
+ALTER TABLE startup_evaluations ADD COLUMN IF NOT EXISTS completion_tokens INTEGER DEFAULT 0;
+ALTER TABLE startup_evaluations ADD COLUMN IF NOT EXISTS cost_usd NUMERIC DEFAULT 0;
+ALTER TABLE startup_evaluations ADD COLUMN IF NOT EXISTS agent_usage JSONB DEFAULT '{}';
+
+-- Per-user, per-day token usage and cost (rolling budgets, expensive users).
+-- security_invoker: the view reads startup_evaluations with the caller's
+-- rights, so its RLS policies apply (a plain view runs as its owner and
+-- would bypass them). Requires Postgres 15+.
+CREATE OR REPLACE VIEW evaluation_usage_daily
+WITH (security_invoker = true) AS
+SELECT
+    user_id,
+    date_trunc('day', created_at AT TIME ZONE 'UTC')::date AS day,
+    count(*) AS evaluations,
+    sum(prompt_tokens) AS prompt_tokens,
+    sum(completion_tokens) AS completion_tokens,
+    sum(cost_usd) AS cost_usd
+FROM startup_evaluations
+GROUP BY user_id, date_trunc('day', created_at AT TIME ZONE 'UTC')::date;
+
+REVOKE ALL ON evaluation_usage_daily FROM anon;
+GRANT SELECT ON evaluation_usage_daily TO authenticated;
+
 ALTER TABLE startup_evaluations ENABLE ROW LEVEL SECURITY;
 
 DO $$ BEGIN
@@ -153,6 +182,7 @@ CREATE INDEX IF NOT EXISTS idx_startups_stage ON startups(stage);
 CREATE INDEX IF NOT EXISTS idx_investors_user_id ON investors(user_id);
 CREATE INDEX IF NOT EXISTS idx_investor_interests_user_id ON investor_interests(user_id);
 CREATE INDEX IF NOT EXISTS idx_startup_evaluations_user_id ON startup_evaluations(user_id);
+CREATE INDEX IF NOT EXISTS idx_startup_evaluations_user_created ON startup_evaluations(user_id, created_at);
 
 
 -- 6. AUTO-CREATE PROFILE ON USER SIGNUP (trigger)